@@ -4,7 +4,7 @@ from .domain import (
     AutoLabelJob, JobStatus, JobStatistics, InvalidJobStateError,
     ImageItem, LabelResult,
     EngineType, Confidence, JobId,
-    IEngineRepository, IDetectionEngine, ILabelStore,
+    IEngineRepository, IDetectionEngine, ILabelStore, IResultCache, CachedOutput, IJobJournal,
     EngineSelector, QualityGate, QualityReport
 )
 from .event import AutoLabelFinished
@@ -12,11 +12,13 @@ from .application import (
     RunAutoLabelCmd,
     RunAutoLabelHandler,
     AutoLabelResultDTO,
-    LabelAssembler
+    LabelAssembler,
+    LabelWriter,
+    LabelWriterError
 )
 from .infrastructure import (
     IDetectionEngine, YoloEngine, FasterRcnnEngine, VlmEngine,
-    FileLabelStore, EngineRepositoryImpl
+    FileLabelStore, EngineRepositoryImpl, SqliteResultCache, FileJobJournal
 )
 from .api import main
 
@@ -24,11 +26,12 @@ __all__ = [
     "AutoLabelJob", "JobStatus", "JobStatistics", "InvalidJobStateError",
     "ImageItem", "LabelResult",
     "EngineType", "Confidence", "JobId",
-    "IEngineRepository", "IDetectionEngine", "ILabelStore",
+    "IEngineRepository", "IDetectionEngine", "ILabelStore", "IResultCache", "CachedOutput", "IJobJournal",
     "EngineSelector", "QualityGate", "QualityReport",
     "AutoLabelFinished",
     "RunAutoLabelCmd", "RunAutoLabelHandler", "AutoLabelResultDTO", "LabelAssembler",
+    "LabelWriter", "LabelWriterError",
     "IDetectionEngine", "YoloEngine", "FasterRcnnEngine", "VlmEngine",
-    "FileLabelStore", "EngineRepositoryImpl",
+    "FileLabelStore", "EngineRepositoryImpl", "SqliteResultCache", "FileJobJournal",
     "main"
 ]
@@ -3,6 +3,7 @@
 import sys
 import argparse
 import logging
+import signal
 from pathlib import Path
 
 from shared_kernel.config.loader import ConfigLoader
@@ -12,6 +13,8 @@ from autolabel_context.application.command.run_autolabel_cmd import RunAutoLabel
 from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
 from autolabel_context.infrastructure.persistence.engine_repository_impl import EngineRepositoryImpl
 from autolabel_context.infrastructure.persistence.file_label_store import FileLabelStore
+from autolabel_context.infrastructure.persistence.file_job_journal import FileJobJournal
+from autolabel_context.infrastructure.persistence.sqlite_result_cache import SqliteResultCache
 
 
 def setup_logging_config():
@@ -60,12 +63,56 @@ def create_parser() -> argparse.ArgumentParser:
         '--batch-size', '-b',
         type=int,
         default=4,
-        help='Batch size for parallel processing (default: 4)'
+        help='Images per batched detection call (default: 4)'
     )
     run_parser.add_argument(
         '--model-id', '-m',
         help='Specific model ID to use'
     )
+    run_parser.add_argument(
+        '--decode-workers',
+        type=int,
+        default=2,
+        help='Threads decoding images ahead of inference (default: 2)'
+    )
+    run_parser.add_argument(
+        '--prefetch',
+        type=int,
+        default=8,
+        help='Decoded images kept ready for inference, 0 disables prefetching (default: 8)'
+    )
+    run_parser.add_argument(
+        '--reduced-decode',
+        action='store_true',
+        help='Decode large JPEGs at reduced resolution when the engine downscales anyway'
+    )
+    run_parser.add_argument(
+        '--cache',
+        metavar='PATH',
+        help='SQLite file caching engine outputs by image content across runs (default: disabled)'
+    )
+    run_parser.add_argument(
+        '--cache-max-mb',
+        type=int,
+        default=512,
+        help='Size limit of the result cache, least recently used entries are evicted (default: 512)'
+    )
+    run_parser.add_argument(
+        '--restart',
+        action='store_true',
+        help='Ignore the job journal in the output directory and label every image again'
+    )
+    run_parser.add_argument(
+        '--no-recursive',
+        action='store_true',
+        help='Only scan the top level of the input directory'
+    )
+    run_parser.add_argument(
+        '--shard',
+        default='0/1',
+        metavar='INDEX/COUNT',
+        help='Process only images whose path hash falls in this shard (default: 0/1)'
+    )
     
     list_parser = subparsers.add_parser('list', help='List available engines')
     
@@ -78,7 +125,18 @@ def cmd_run(args) -> int:
     
     engine_repo = EngineRepositoryImpl(config_loader)
     label_store = FileLabelStore(args.output)
-    handler = RunAutoLabelHandler(engine_repo, label_store, config_loader)
+    result_cache = SqliteResultCache(args.cache, args.cache_max_mb * 1024 * 1024) if args.cache else None
+    
+    shard_index, _, shard_count = args.shard.partition('/')
+    # 每个引擎、每个分片一个日志文件，多个分片进程写同一输出目录时互不干扰
+    journal_name = f".autolabel_journal_{args.engine}"
+    if int(shard_count or 1) > 1:
+        journal_name += f"_{shard_index}of{shard_count}"
+    journal_path = Path(args.output) / f"{journal_name}.jsonl"
+    if args.restart:
+        journal_path.unlink(missing_ok=True)
+    journal = FileJobJournal(str(journal_path))
+    handler = RunAutoLabelHandler(engine_repo, label_store, config_loader, result_cache, journal)
     
     command = RunAutoLabelCmd(
         engine_type=args.engine,
@@ -86,9 +144,22 @@ def cmd_run(args) -> int:
         output_dir=args.output,
         confidence_threshold=args.confidence,
         batch_size=args.batch_size,
-        model_id=args.model_id
+        model_id=args.model_id,
+        recursive=not args.no_recursive,
+        shard_index=int(shard_index),
+        shard_count=int(shard_count or 1),
+        decode_workers=args.decode_workers,
+        prefetch=args.prefetch,
+        reduced_decode=args.reduced_decode
     )
     
+    def request_cancel(signum, frame):
+        # 第一次 Ctrl+C 协作式取消（收完在途图片并写完日志），第二次直接中断
+        print("\nCancelling: finishing in-flight images...", file=sys.stderr)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        handler.cancel()
+    
+    previous_handler = signal.signal(signal.SIGINT, request_cancel)
     try:
         result = handler.handle(command)
         
@@ -97,11 +168,18 @@ def cmd_run(args) -> int:
         print(f"  Status: {result.status}")
         print(f"  Statistics:")
         print(f"    - Total images: {result.total_images}")
+        if result.journaled_images:
+            print(f"    - Already labelled (journal): {result.journaled_images}")
         print(f"    - Processed: {result.processed_images}")
         print(f"    - Skipped: {result.skipped_images}")
         print(f"    - Failed: {result.failed_images}")
         print(f"    - Total detections: {result.total_detections}")
         print(f"    - Success rate: {result.success_rate:.2%}")
+        if result.cache_hits or result.cache_misses:
+            print(f"    - Cache hits/misses: {result.cache_hits}/{result.cache_misses}")
+        if result.status == "cancelled":
+            print(f"  Journal: {journal_path} (rerun the same command to resume)")
+            return 130
         
         return 0
         
@@ -109,6 +187,8 @@ def cmd_run(args) -> int:
         logging.exception("Error running auto-labeling")
         print(f"Error: {e}", file=sys.stderr)
         return 1
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
 
 
 def cmd_list(args) -> int:
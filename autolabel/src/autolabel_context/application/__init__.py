@@ -4,10 +4,13 @@ from .command import RunAutoLabelCmd
 from .handler import RunAutoLabelHandler
 from .dto import AutoLabelResultDTO
 from .assembler import LabelAssembler
+from .service import LabelWriter, LabelWriterError
 
 __all__ = [
     "RunAutoLabelCmd",
     "RunAutoLabelHandler",
     "AutoLabelResultDTO",
-    "LabelAssembler"
+    "LabelAssembler",
+    "LabelWriter",
+    "LabelWriterError"
 ]
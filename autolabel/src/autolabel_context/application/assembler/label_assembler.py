@@ -85,5 +85,8 @@ class LabelAssembler:
             failed_images=job.statistics.failed_images,
             total_detections=job.statistics.total_detections,
             detections_by_category=job.statistics.detections_by_category,
-            success_rate=job.statistics.success_rate
+            success_rate=job.statistics.success_rate,
+            cache_hits=job.statistics.cache_hits,
+            cache_misses=job.statistics.cache_misses,
+            journaled_images=job.statistics.journaled_images
         )
@@ -1,20 +1,35 @@
 """运行自动标注命令"""
 
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+from shared_kernel.utils import IMAGE_EXTENSIONS
 
 from autolabel_context.domain.model.value_object.engine_type import EngineType
 
 
 @dataclass
 class RunAutoLabelCmd:
-    """运行自动标注命令"""
+    """运行自动标注命令
+
+    image_paths 中的目录按 extensions 流式扫描（recursive 时包含子目录），
+    shard_count > 1 时只处理按相对路径哈希落在 shard_index 分片的图片；
+    prefetch > 0 时由 decode_workers 个线程提前解码（最多 prefetch 张在途），
+    reduced_decode 允许引擎按推理尺寸降分辨率解码
+    """
     engine_type: EngineType
     image_paths: List[str]
     output_dir: str
     confidence_threshold: float = 0.5
     batch_size: int = 4
     model_id: Optional[str] = None
+    recursive: bool = True
+    extensions: Tuple[str, ...] = IMAGE_EXTENSIONS
+    shard_index: int = 0
+    shard_count: int = 1
+    decode_workers: int = 2
+    prefetch: int = 8
+    reduced_decode: bool = False
     
     @classmethod
     def create(
@@ -24,14 +39,20 @@ class RunAutoLabelCmd:
         output_dir: str,
         confidence_threshold: float = 0.5,
         batch_size: int = 4,
-        model_id: Optional[str] = None
+        model_id: Optional[str] = None,
+        recursive: bool = True,
+        shard_index: int = 0,
+        shard_count: int = 1
     ) -> "RunAutoLabelCmd":
         """工厂方法：创建命令"""
         return cls(
             engine_type=EngineType.from_string(engine_type),
-            image_paths=[input_dir],  # 简化：使用目录作为输入
+            image_paths=[input_dir],  # 目录在处理时流式扫描
             output_dir=output_dir,
             confidence_threshold=confidence_threshold,
             batch_size=batch_size,
-            model_id=model_id
+            model_id=model_id,
+            recursive=recursive,
+            shard_index=shard_index,
+            shard_count=shard_count
         )
@@ -16,6 +16,9 @@ class AutoLabelResultDTO:
     total_detections: int
     detections_by_category: Dict[str, int]
     success_rate: float
+    cache_hits: int = 0
+    cache_misses: int = 0
+    journaled_images: int = 0
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "AutoLabelResultDTO":
@@ -28,7 +31,10 @@ class AutoLabelResultDTO:
             failed_images=data.get("failed_images", 0),
             total_detections=data.get("total_detections", 0),
             detections_by_category=data.get("detections_by_category", {}),
-            success_rate=data.get("success_rate", 0.0)
+            success_rate=data.get("success_rate", 0.0),
+            cache_hits=data.get("cache_hits", 0),
+            cache_misses=data.get("cache_misses", 0),
+            journaled_images=data.get("journaled_images", 0)
         )
     
     def to_dict(self) -> Dict[str, Any]:
@@ -42,6 +48,9 @@ class AutoLabelResultDTO:
                 "failed_images": self.failed_images,
                 "total_detections": self.total_detections,
                 "detections_by_category": self.detections_by_category,
-                "success_rate": self.success_rate
+                "success_rate": self.success_rate,
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "journaled_images": self.journaled_images
             }
         }
@@ -1,15 +1,20 @@
 """运行自动标注处理器"""
 
+import hashlib
 import logging
+import os
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 from tqdm import tqdm
 
 from shared_kernel.config.loader import ConfigLoader
 from shared_kernel.domain.annotation import BoundingBox, Detection, DetectionSource
 from shared_kernel.domain.taxonomy import WasteCategory
+from shared_kernel.utils import file_digest, image_size_cache, iter_files
 
 from autolabel_context.domain.model.value_object.engine_type import EngineType
 from autolabel_context.domain.model.entity.image_item import ImageItem
@@ -17,111 +22,353 @@ from autolabel_context.domain.model.entity.label_result import LabelResult
 from autolabel_context.domain.model.aggregate.autolabel_job import AutoLabelJob
 from autolabel_context.domain.repository.i_engine_repository import IEngineRepository
 from autolabel_context.domain.repository.i_label_store import ILabelStore
+from autolabel_context.domain.repository.i_result_cache import IResultCache, CachedOutput
+from autolabel_context.domain.repository.i_job_journal import IJobJournal
 
 from ..command.run_autolabel_cmd import RunAutoLabelCmd
 from ..dto.autolabel_dto import AutoLabelResultDTO
 from ..assembler.label_assembler import LabelAssembler
+from ..service.label_writer import LabelWriter
 
 logger = logging.getLogger(__name__)
 
+_CATEGORY_MAP = {
+    "Kitchen_waste": WasteCategory.KITCHEN_WASTE,
+    "Recyclable_waste": WasteCategory.RECYCLABLE_WASTE,
+    "Hazardous_waste": WasteCategory.HAZARDOUS_WASTE,
+    "Other_waste": WasteCategory.OTHER_WASTE
+}
+
+# 未启用预取时同时推理的批次数：一批在模型中前向时，另一批读取图像
+_BATCH_WORKERS = 2
+
+
+class _Entry(NamedTuple):
+    """解码阶段产出的条目：cached 不为 None 时为缓存命中的引擎输出，无需推理"""
+    item: ImageItem
+    image: Any                      # 引擎输入：路径或已解码的图像
+    cache_key: Optional[str]        # 未启用缓存时为 None
+    cached: Optional[CachedOutput]
+
 
 class RunAutoLabelHandler:
-    """运行自动标注处理器（应用服务）"""
+    """运行自动标注处理器（应用服务）
+    
+    配置任务日志时，标签写入后的图片记入日志，以相同的引擎、模型与阈值续跑被取消、
+    中断或有图片失败的任务时跳过；任务全部成功完成后日志退役，重新运行处理全部图片。
+    cancel() 协作式取消当前任务：停止提交新图片，收完在途结果并写完日志后返回
+    """
     
     def __init__(
         self,
         engine_repo: IEngineRepository,
         label_store: ILabelStore,
-        config_loader: ConfigLoader
+        config_loader: ConfigLoader,
+        result_cache: Optional[IResultCache] = None,
+        journal: Optional[IJobJournal] = None
     ):
         self._engine_repo = engine_repo
         self._label_store = label_store
         self._config_loader = config_loader
+        self._result_cache = result_cache
+        self._journal = journal
+        self._current_job: Optional[AutoLabelJob] = None
     
     def handle(self, command: RunAutoLabelCmd) -> AutoLabelResultDTO:
         """处理自动标注命令"""
         engine = self._engine_repo.get_engine(command.engine_type)
         
-        job = AutoLabelJob.create(
+        completed = set()
+        if self._journal is not None:
+            completed = self._journal.begin(self._run_scope(engine, command))
+        if completed:
+            logger.info(f"Resuming: {len(completed)} images already labelled")
+        
+        def remaining_items() -> Iterator[ImageItem]:
+            for item in self._iter_image_items(command):
+                if item.path in completed:
+                    job.record_journaled()
+                else:
+                    yield item
+        
+        job = AutoLabelJob.create_streaming(
             engine_type=command.engine_type,
-            image_paths=command.image_paths,
+            image_paths=remaining_items(),
             confidence_threshold=command.confidence_threshold
         )
         
         job.start()
+        self._current_job = job
         
-        self._process_images(job, engine, command)
+        try:
+            # 结果完成即由后台线程分批写入，任务只保留统计；处理中途出错或取消时已完成的结果仍会写完
+            with LabelWriter(self._label_store, journal=self._journal) as writer:
+                self._process_images(job, engine, command, on_result=writer.submit)
+        finally:
+            self._current_job = None
         
-        job.complete()
+        if job.cancel_requested:
+            job.cancel()
+        else:
+            job.complete()
+            if self._journal is not None and job.statistics.failed_images == 0:
+                # 全部成功：不再续跑，之后的运行（含内容已变化的图片）重新处理
+                self._journal.finish()
         
         self._label_store.save_job(job)
         
         return LabelAssembler.result_dto_from_job(job)
     
-    def _process_images(self, job: AutoLabelJob, engine, command: RunAutoLabelCmd) -> None:
-        """处理图片"""
-        image_items = [item for item in job._image_items if item.exists]
+    def cancel(self) -> None:
+        """请求取消正在处理的任务（可从其他线程或信号处理函数调用）"""
+        job = self._current_job
+        if job is not None:
+            job.request_cancel()
+    
+    @staticmethod
+    def _iter_image_items(command: RunAutoLabelCmd) -> Iterator[ImageItem]:
+        """展开输入路径：目录流式扫描（含分片过滤，记录相对输入目录的路径），文件转为绝对路径"""
+        for path in command.image_paths:
+            if os.path.isdir(path):
+                prefix = len(os.path.join(os.path.abspath(path), ""))
+                for file_path in iter_files(
+                    path,
+                    extensions=command.extensions,
+                    recursive=command.recursive,
+                    shard_index=command.shard_index,
+                    shard_count=command.shard_count
+                ):
+                    yield ImageItem(path=file_path, relative_path=file_path[prefix:])
+            else:
+                yield ImageItem(path=os.path.abspath(path))
+    
+    def _process_images(
+        self,
+        job: AutoLabelJob,
+        engine,
+        command: RunAutoLabelCmd,
+        on_result: Optional[Callable[[LabelResult], None]] = None
+    ) -> None:
+        """处理图片，每个结果按输入顺序加入任务后交给 on_result
         
-        def process_single(item: ImageItem) -> LabelResult:
-            if not item.exists:
-                return LabelResult.failed(item, "Image file not found")
-            
+        图片项按需从任务中取出，每 batch_size 张组成一批调用 engine.detect_batch；
+        启用预取时由独立的解码线程池提前解码，推理线程只做推理；
+        结果缓存命中的图片不解码也不推理。
+        同时在途的批次数有上限，首张图片无需等待扫描完成，内存不随图片总数增长
+        """
+        image_items = (item for item in job.iter_image_items() if item.exists)
+        batch_size = max(1, command.batch_size)
+        cache_scope = self._cache_scope(engine, command)
+        
+        def infer(misses: List[_Entry]) -> List[Any]:
+            """未命中缓存的图片的引擎输出，出错的图片对应异常对象"""
             try:
-                detections = engine.detect(item.path)
-                
-                engine_result = []
-                category_map = {
-                    "Kitchen_waste": WasteCategory.KITCHEN_WASTE,
-                    "Recyclable_waste": WasteCategory.RECYCLABLE_WASTE,
-                    "Hazardous_waste": WasteCategory.HAZARDOUS_WASTE,
-                    "Other_waste": WasteCategory.OTHER_WASTE
-                }
-                
-                for det in detections:
-                    category_name = det.get("name")
-                    category = category_map.get(category_name)
-                    
-                    if category:
-                        img = item._file_path if hasattr(item, '_file_path') else None
-                        if img is None:
-                            continue
-                        import cv2
-                        img_data = cv2.imread(str(item.path))
-                        if img_data is None:
-                            continue
-                        img_height, img_width = img_data.shape[:2]
-                        
-                        x1, y1, x2, y2 = det["x1"], det["y1"], det["x2"], det["y2"]
-                        x_center = ((x1 + x2) / 2) / img_width
-                        y_center = ((y1 + y2) / 2) / img_height
-                        width = (x2 - x1) / img_width
-                        height = (y2 - y1) / img_height
-                        
-                        bbox = BoundingBox(
-                            x_center=x_center,
-                            y_center=y_center,
-                            width=width,
-                            height=height
-                        )
-                        
-                        detection = Detection.create(
-                            category=category,
-                            confidence=det.get("confidence", 0.0),
-                            bounding_box=bbox,
-                            source=DetectionSource.MANUAL,
-                            raw_label=category_name
-                        )
-                        engine_result.append(detection)
-                
-                return LabelResult.success(item, engine_result)
-                
+                return engine.detect_batch([entry.image for entry in misses])
+            except Exception:
+                # 批量失败时逐张重试，只让出错的图片失败
+                logger.exception("Batch detection failed, retrying images one by one")
+            outputs = []
+            for entry in misses:
+                try:
+                    outputs.append(engine.detect(entry.image))
+                except Exception as e:
+                    logger.exception(f"Error processing {entry.item.path}")
+                    outputs.append(e)
+            return outputs
+        
+        def process_batch(entries: List[_Entry]) -> List[Tuple[LabelResult, Optional[bool]]]:
+            misses = [entry for entry in entries if entry.cached is None]
+            outputs = iter(infer(misses) if misses else [])
+            results = []
+            for entry in entries:
+                if entry.cached is not None:
+                    results.append((self._to_result(entry.item, entry.cached.detections), True))
+                    continue
+                output = next(outputs)
+                if isinstance(output, Exception):
+                    result = LabelResult.failed(entry.item, str(output))
+                else:
+                    if entry.cache_key is not None:
+                        # 引擎解码时已记录原图尺寸，随输出一起保存，命中时不必再解码
+                        self._result_cache.put(entry.cache_key, output, image_size_cache.get(entry.item.path))
+                    result = self._to_result(entry.item, output)
+                results.append((result, False if entry.cache_key is not None else None))
+            return results
+        
+        # 预取时解码已与推理重叠，单个推理线程即可保持满载
+        workers = 1 if command.prefetch > 0 else _BATCH_WORKERS
+        max_in_flight = workers * 2
+        entries = self._prefetch(image_items, engine, command, cache_scope)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="infer") as executor, \
+                tqdm(desc="Processing images", unit="img") as progress:
+            in_flight = deque()
+            try:
+                for batch in _batched(entries, batch_size):
+                    if job.cancel_requested:
+                        # 不再提交；已取出但未提交的图片没有结果，续跑时重新处理
+                        break
+                    in_flight.append(executor.submit(process_batch, batch))
+                    if len(in_flight) >= max_in_flight:
+                        self._collect(job, in_flight.popleft().result(), progress, on_result)
+            finally:
+                # 停止扫描与预取（等待已提交的解码结束）
+                entries.close()
+            while in_flight:
+                self._collect(job, in_flight.popleft().result(), progress, on_result)
+    
+    def _cache_scope(self, engine, command: RunAutoLabelCmd) -> Optional[str]:
+        """本次运行的缓存键前缀：引擎类型、引擎标识、模型 ID 与解码方式的哈希
+        
+        未配置缓存或引擎输出不可缓存时返回 None
+        """
+        if self._result_cache is None:
+            return None
+        identity = engine.cache_identity()
+        if identity is None:
+            logger.info("Engine output is not cacheable, result cache disabled for this run")
+            return None
+        scope = f"{command.engine_type}|{identity}|{command.model_id}|reduced={command.reduced_decode}"
+        return hashlib.blake2b(scope.encode("utf-8"), digest_size=8).hexdigest()
+    
+    @staticmethod
+    def _run_scope(engine, command: RunAutoLabelCmd) -> Optional[str]:
+        """任务日志的运行标识：引擎标识、模型 ID、置信度阈值与解码方式
+        
+        引擎无法给出标识（如权重文件不在本地）时返回 None，不续跑
+        """
+        identity = engine.cache_identity()
+        if identity is None:
+            logger.info("Engine output cannot be identified, job journal starts fresh for this run")
+            return None
+        return (f"{command.engine_type}|{identity}|{command.model_id}"
+                f"|conf={command.confidence_threshold}|reduced={command.reduced_decode}")
+    
+    def _prefetch(
+        self, items: Iterable[ImageItem], engine, command: RunAutoLabelCmd, cache_scope: Optional[str]
+    ) -> Iterator["_Entry"]:
+        """解码阶段：按输入顺序产出待推理的条目
+        
+        启用缓存时先按内容哈希查缓存，命中的条目带上缓存的引擎输出、不再解码
+        （原图尺寸取自缓存条目，无尺寸且文件头无法探测时按未命中处理）；
+        decode_workers 个线程调用 engine.decode 提前解码，最多 prefetch 张在途；
+        未启用预取、引擎不提供解码或解码出错时引擎输入为路径，由引擎自行读取
+        """
+        def prepare(item: ImageItem) -> _Entry:
+            cache_key = None
+            if cache_scope is not None:
+                try:
+                    cache_key = f"{cache_scope}:{file_digest(item.path)}"
+                    cached = self._result_cache.get(cache_key)
+                except Exception as e:
+                    logger.warning(f"Result cache lookup failed for {item.path}: {e}")
+                    cache_key, cached = None, None
+                if cached is not None and self._restore_image_size(item.path, cached):
+                    return _Entry(item, None, cache_key, cached)
+            if command.prefetch <= 0:
+                return _Entry(item, item.path, cache_key, None)
+            try:
+                decoded = engine.decode(item.path, allow_reduced=command.reduced_decode)
             except Exception as e:
-                logger.exception(f"Error processing {item.path}")
-                return LabelResult.failed(item, str(e))
+                logger.warning(f"Prefetch decode failed for {item.path}: {e}")
+                decoded = None
+            return _Entry(item, decoded if decoded is not None else item.path, cache_key, None)
+        
+        if command.prefetch <= 0:
+            for item in items:
+                yield prepare(item)
+            return
         
-        with ThreadPoolExecutor(max_workers=command.batch_size) as executor:
-            futures = [executor.submit(process_single, item) for item in image_items]
+        with ThreadPoolExecutor(max_workers=max(1, command.decode_workers), thread_name_prefix="decode") as pool:
+            pending = deque()
+            for item in items:
+                pending.append(pool.submit(prepare, item))
+                if len(pending) >= command.prefetch:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    @staticmethod
+    def _restore_image_size(image_path: str, cached: CachedOutput) -> bool:
+        """缓存命中时记录原图尺寸供坐标换算与标签写入；尺寸无从得知时返回 False
+        
+        只读文件头的探测不支持 BMP/WebP 等格式，缓存条目中的尺寸由引擎解码时得到
+        """
+        if cached.image_size is not None:
+            image_size_cache.put(image_path, *cached.image_size)
+            return True
+        return not cached.detections or image_size_cache.get(image_path) is not None
+    
+    @staticmethod
+    def _collect(
+        job: AutoLabelJob,
+        results: List[Tuple[LabelResult, Optional[bool]]],
+        progress,
+        on_result: Optional[Callable[[LabelResult], None]]
+    ) -> None:
+        for result, cache_hit in results:
+            if cache_hit is not None:
+                job.record_cache_lookup(cache_hit)
+            job.add_result(result)
+            if on_result is not None:
+                on_result(result)
+        progress.update(len(results))
+    
+    @staticmethod
+    def _to_result(item: ImageItem, detections: List[dict]) -> LabelResult:
+        """把引擎输出的像素坐标检测转换为标注结果（坐标无效时该图片失败）"""
+        try:
+            return RunAutoLabelHandler._convert(item, detections)
+        except Exception as e:
+            logger.exception(f"Error converting detections of {item.path}")
+            return LabelResult.failed(item, str(e))
+    
+    @staticmethod
+    def _convert(item: ImageItem, detections: List[dict]) -> LabelResult:
+        if not detections:
+            return LabelResult.success(item, [])
+        
+        # 图像尺寸每张图取一次：引擎解码时已记录，否则只读文件头
+        size = image_size_cache.get(item.path)
+        if size is None:
+            return LabelResult.failed(item, "Cannot determine image size")
+        img_width, img_height = size
+        
+        engine_result = []
+        for det in detections:
+            category_name = det.get("name")
+            category = _CATEGORY_MAP.get(category_name)
             
-            for future in tqdm(futures, desc="Processing images"):
-                result = future.result()
-                job.add_result(result)
+            if category:
+                x1, y1, x2, y2 = det["x1"], det["y1"], det["x2"], det["y2"]
+                x_center = ((x1 + x2) / 2) / img_width
+                y_center = ((y1 + y2) / 2) / img_height
+                width = (x2 - x1) / img_width
+                height = (y2 - y1) / img_height
+                
+                bbox = BoundingBox(
+                    x_center=x_center,
+                    y_center=y_center,
+                    width=width,
+                    height=height
+                )
+                
+                detection = Detection.create(
+                    category=category,
+                    confidence=det.get("confidence", 0.0),
+                    bbox=bbox,
+                    source=DetectionSource.MANUAL,
+                    raw_label=category_name
+                )
+                engine_result.append(detection)
+        
+        return LabelResult.success(item, engine_result)
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """按 size 分组，最后一批可能不满"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,5 @@
+"""应用服务模块"""
+
+from .label_writer import LabelWriter, LabelWriterError
+
+__all__ = ["LabelWriter", "LabelWriterError"]
@@ -0,0 +1,124 @@
+"""后台标签写入器 - 标注结果完成即分批写入标签存储"""
+
+import logging
+import queue
+import threading
+from typing import List, Optional
+
+from autolabel_context.domain.model.entity.label_result import LabelResult
+from autolabel_context.domain.repository.i_label_store import ILabelStore
+from autolabel_context.domain.repository.i_job_journal import IJobJournal
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class LabelWriterError(Exception):
+    """标签写入失败"""
+    pass
+
+
+class LabelWriter:
+    """后台标签写入器
+    
+    职责:
+    - submit 把完成的结果放入有界队列，队列满时阻塞（写入跟不上时反压推理）
+    - 后台线程攒批调用 label_store.save_results，每批最多 batch_size 条，
+      不足一批时最多等待 flush_interval_s
+    - 每批写入标签存储后，把成功与跳过的图片追加到任务日志（失败的图片续跑时重试）
+    - close 写完队列中剩余的结果、关闭任务日志后返回
+    
+    写入失败后不再接受结果：submit 与 close 抛出 LabelWriterError
+    """
+    
+    def __init__(
+        self,
+        label_store: ILabelStore,
+        batch_size: int = 64,
+        flush_interval_s: float = 1.0,
+        max_pending: int = 256,
+        journal: Optional[IJobJournal] = None
+    ):
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        if flush_interval_s <= 0:
+            raise ValueError(f"flush_interval_s must be positive, got {flush_interval_s}")
+        if max_pending < batch_size:
+            raise ValueError(f"max_pending must be at least batch_size, got {max_pending}")
+        self._label_store = label_store
+        self._journal = journal
+        self._batch_size = batch_size
+        self._flush_interval_s = flush_interval_s
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self.written = 0
+        self.batches = 0
+    
+    def __enter__(self) -> "LabelWriter":
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # 处理出错时仍写完已完成的结果，异常由调用方的原异常决定
+        try:
+            self.close()
+        except LabelWriterError:
+            if exc_type is None:
+                raise
+            logger.exception("Label writer failed while unwinding")
+    
+    def start(self) -> None:
+        """启动写入线程"""
+        self._thread = threading.Thread(target=self._run, name="label-writer")
+        self._thread.daemon = True
+        self._thread.start()
+    
+    def submit(self, result: LabelResult) -> None:
+        """提交一个完成的结果"""
+        self._raise_if_failed()
+        self._queue.put(result)
+    
+    def close(self) -> None:
+        """写完剩余结果并停止写入线程"""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+        if self._journal is not None:
+            self._journal.close()
+        self._raise_if_failed()
+    
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise LabelWriterError(f"Writing labels failed: {self._error}") from self._error
+    
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[LabelResult] = []
+            try:
+                item = self._queue.get(timeout=self._flush_interval_s)
+            except queue.Empty:
+                continue
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=self._flush_interval_s)
+                except queue.Empty:
+                    break
+            stopping = item is _STOP
+            if batch and self._error is None:
+                try:
+                    self._label_store.save_results(batch)
+                    if self._journal is not None:
+                        self._journal.record([r.image_item.path for r in batch if not r.is_failed])
+                    self.written += len(batch)
+                    self.batches += 1
+                except Exception as e:
+                    # 之后的结果只从队列取出丢弃，避免阻塞 submit
+                    logger.exception("Writing label batch failed")
+                    self._error = e
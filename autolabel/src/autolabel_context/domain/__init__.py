@@ -5,13 +5,13 @@ from .model import (
     ImageItem, LabelResult,
     EngineType, Confidence, JobId
 )
-from .repository import IEngineRepository, IDetectionEngine, ILabelStore
+from .repository import IEngineRepository, IDetectionEngine, ILabelStore, IResultCache, CachedOutput, IJobJournal
 from .service import EngineSelector, QualityGate, QualityReport
 
 __all__ = [
     "AutoLabelJob", "JobStatus", "JobStatistics", "InvalidJobStateError",
     "ImageItem", "LabelResult",
     "EngineType", "Confidence", "JobId",
-    "IEngineRepository", "IDetectionEngine", "ILabelStore",
+    "IEngineRepository", "IDetectionEngine", "ILabelStore", "IResultCache", "CachedOutput", "IJobJournal",
     "EngineSelector", "QualityGate", "QualityReport"
 ]
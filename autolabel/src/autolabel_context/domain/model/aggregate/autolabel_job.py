@@ -3,7 +3,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Union
 
 from shared_kernel.domain.base import AggregateRoot
 
@@ -33,6 +33,9 @@ class JobStatistics:
     failed_images: int = 0
     total_detections: int = 0
     detections_by_category: dict = field(default_factory=dict)
+    cache_hits: int = 0         # 结果缓存命中（跳过推理）的图片数
+    cache_misses: int = 0       # 查询缓存未命中、经过推理的图片数
+    journaled_images: int = 0   # 续跑时按任务日志跳过的已完成图片数（不计入 total_images）
     
     @property
     def success_rate(self) -> float:
@@ -52,6 +55,10 @@ class AutoLabelJob(AggregateRoot):
     不变量:
     - 任务一旦完成或取消，不能再添加结果
     - 统计数据始终与实际结果一致
+    
+    流式任务（create_streaming）不预先创建图片项：iter_image_items 按需产生，
+    图片总数随之累加；图片项与结果都不在任务中保留，只维护统计数据，
+    结果由调用方增量写入标签存储
     """
     
     def __init__(
@@ -59,15 +66,19 @@ class AutoLabelJob(AggregateRoot):
         job_id: JobId,
         engine_type: EngineType,
         image_items: List[ImageItem],
-        confidence_threshold: float = 0.5
+        confidence_threshold: float = 0.5,
+        retain_results: bool = True
     ):
         super().__init__()
         self._job_id = job_id
         self._engine_type = engine_type
         self._image_items = image_items
+        self._pending_paths: Optional[Iterator[Union[str, ImageItem]]] = None
         self._confidence_threshold = confidence_threshold
         self._status = JobStatus.PENDING
         self._results: List[LabelResult] = []
+        self._retain_results = retain_results
+        self._cancel_requested = False
         self._statistics = JobStatistics(total_images=len(image_items))
         self._created_at = datetime.utcnow()
         self._completed_at: Optional[datetime] = None
@@ -95,8 +106,17 @@ class AutoLabelJob(AggregateRoot):
     
     @property
     def results(self) -> List[LabelResult]:
+        """已添加的结果（不保留结果的任务为空列表）"""
         return self._results.copy()
     
+    @property
+    def retains_results(self) -> bool:
+        return self._retain_results
+    
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_requested
+    
     @property
     def confidence_threshold(self) -> float:
         return self._confidence_threshold
@@ -130,6 +150,34 @@ class AutoLabelJob(AggregateRoot):
             confidence_threshold=confidence_threshold
         )
     
+    @classmethod
+    def create_streaming(
+        cls,
+        engine_type: EngineType,
+        image_paths: Iterable[Union[str, ImageItem]],
+        confidence_threshold: float = 0.5
+    ) -> "AutoLabelJob":
+        """工厂方法：创建流式任务（image_paths 为绝对路径或图片项，可以是生成器，按需消费）"""
+        job = cls(
+            job_id=JobId.generate(),
+            engine_type=engine_type,
+            image_items=[],
+            confidence_threshold=confidence_threshold,
+            retain_results=False
+        )
+        job._pending_paths = iter(image_paths)
+        return job
+    
+    def iter_image_items(self) -> Iterator[ImageItem]:
+        """依次产生图片项：先是已创建的图片项，再按需创建流式任务的待处理路径"""
+        yield from self._image_items
+        if self._pending_paths is None:
+            return
+        for path in self._pending_paths:
+            self._statistics.total_images += 1
+            # 路径已是绝对路径，不再逐个 resolve
+            yield path if isinstance(path, ImageItem) else ImageItem(path=path)
+    
     def start(self) -> None:
         """启动任务"""
         if self._status != JobStatus.PENDING:
@@ -146,9 +194,21 @@ class AutoLabelJob(AggregateRoot):
         if self._status != JobStatus.RUNNING:
             raise InvalidJobStateError(f"Cannot add result in {self._status} status")
         
-        self._results.append(result)
+        if self._retain_results:
+            self._results.append(result)
         self._update_statistics(result)
     
+    def record_journaled(self) -> None:
+        """记录一张按任务日志跳过的已完成图片"""
+        self._statistics.journaled_images += 1
+    
+    def record_cache_lookup(self, hit: bool) -> None:
+        """记录一次结果缓存查询"""
+        if hit:
+            self._statistics.cache_hits += 1
+        else:
+            self._statistics.cache_misses += 1
+    
     def _update_statistics(self, result: LabelResult) -> None:
         """更新统计数据"""
         if result.is_success:
@@ -181,6 +241,17 @@ class AutoLabelJob(AggregateRoot):
         self._error_message = error_message
         self._completed_at = datetime.utcnow()
     
+    def request_cancel(self) -> None:
+        """请求协作式取消
+        
+        RUNNING 状态只做标记：处理方停止提交新图片、收完在途结果后调用 cancel；
+        尚未开始的任务直接取消
+        """
+        if self._status == JobStatus.PENDING:
+            self.cancel()
+        elif self._status == JobStatus.RUNNING:
+            self._cancel_requested = True
+    
     def cancel(self) -> None:
         """取消任务"""
         if self._status in (JobStatus.COMPLETED, JobStatus.FAILED):
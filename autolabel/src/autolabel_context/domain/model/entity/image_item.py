@@ -2,17 +2,20 @@
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 
 @dataclass
 class ImageItem:
     """图片项实体
     
-    封装单张图片的信息和处理状态
+    封装单张图片的信息和处理状态。relative_path 为扫描目录得到的图片相对输入目录的路径，
+    标签按此路径镜像到输出目录，不同子目录下的同名图片互不覆盖
     """
     path: str
     _processed: bool = False
     _processing_error: str | None = None
+    relative_path: Optional[str] = None
     
     @classmethod
     def create(cls, path: str) -> "ImageItem":
@@ -53,3 +56,10 @@ class ImageItem:
     @property
     def stem(self) -> str:
         return self.file_path.stem
+    
+    @property
+    def label_name(self) -> Path:
+        """标签相对输出目录的路径（不含扩展名）：目录输入保留子目录，单独给出的文件只取文件名"""
+        if self.relative_path:
+            return Path(self.relative_path).with_suffix("")
+        return Path(self.stem)
@@ -2,5 +2,7 @@
 
 from .i_engine_repository import IEngineRepository, IDetectionEngine
 from .i_label_store import ILabelStore
+from .i_result_cache import IResultCache, CachedOutput
+from .i_job_journal import IJobJournal
 
-__all__ = ["IEngineRepository", "IDetectionEngine", "ILabelStore"]
+__all__ = ["IEngineRepository", "IDetectionEngine", "ILabelStore", "IResultCache", "CachedOutput", "IJobJournal"]
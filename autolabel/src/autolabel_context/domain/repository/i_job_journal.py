@@ -0,0 +1,42 @@
+"""任务日志接口"""
+
+from abc import ABC, abstractmethod
+from typing import Optional, Sequence, Set
+
+
+class IJobJournal(ABC):
+    """任务日志接口（定义在 Domain 层）
+    
+    只追加地记录标签已写入的图片，续跑被取消、中断或有图片失败的任务时跳过这些图片；
+    任务全部成功完成后日志即退役，之后的重新运行处理全部图片。
+    日志带有运行标识（引擎、模型、阈值等），标识不同的运行不复用日志
+    """
+    
+    @abstractmethod
+    def begin(self, scope: Optional[str]) -> Set[str]:
+        """开始一次运行，返回可跳过的已完成图片
+        
+        日志的运行标识与 scope 相同时返回其中的图片；否则（或 scope 为 None，
+        即无法确认输出不变时）清空日志、以新标识重新开始并返回空集合
+        """
+        pass
+    
+    @abstractmethod
+    def completed_paths(self) -> Set[str]:
+        """已完成的图片路径"""
+        pass
+    
+    @abstractmethod
+    def record(self, paths: Sequence[str]) -> None:
+        """追加一批已完成的图片路径（标签写入之后调用）"""
+        pass
+    
+    @abstractmethod
+    def finish(self) -> None:
+        """任务全部成功完成：关闭并删除日志"""
+        pass
+    
+    @abstractmethod
+    def close(self) -> None:
+        """刷新并关闭日志"""
+        pass
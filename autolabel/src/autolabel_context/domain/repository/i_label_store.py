@@ -1,9 +1,10 @@
 """标签存储接口"""
 
 from abc import ABC, abstractmethod
-from typing import Protocol
+from typing import Protocol, Sequence
 
 from ..model.aggregate.autolabel_job import AutoLabelJob
+from ..model.entity.label_result import LabelResult
 
 
 class ILabelStore(ABC):
@@ -14,6 +15,11 @@ class ILabelStore(ABC):
         """保存任务"""
         pass
     
+    @abstractmethod
+    def save_results(self, results: Sequence[LabelResult]) -> None:
+        """保存一批完成的标注结果（处理过程中增量调用，每个结果的写入应是原子的，返回前已落盘）"""
+        pass
+    
     @abstractmethod
     def find_by_id(self, job_id: str) -> AutoLabelJob | None:
         """根据 ID 查找任务"""
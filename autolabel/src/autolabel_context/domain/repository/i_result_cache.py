@@ -0,0 +1,31 @@
+"""检测结果缓存接口"""
+
+from abc import ABC, abstractmethod
+from typing import List, NamedTuple, Optional, Tuple
+
+
+class CachedOutput(NamedTuple):
+    """缓存的引擎输出
+
+    image_size 为原图尺寸 (width, height)，命中时不解码图像也能换算坐标；
+    保存时尺寸未知则为 None
+    """
+    detections: List[dict]
+    image_size: Optional[Tuple[int, int]] = None
+
+
+class IResultCache(ABC):
+    """检测结果缓存接口（定义在 Domain 层）
+    
+    以内容寻址的键保存引擎原始输出（像素坐标的检测字典列表）及原图尺寸，跨任务复用
+    """
+    
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedOutput]:
+        """查找缓存的引擎输出，未命中返回 None"""
+        pass
+    
+    @abstractmethod
+    def put(self, key: str, detections: List[dict], image_size: Optional[Tuple[int, int]] = None) -> None:
+        """保存引擎输出及原图尺寸"""
+        pass
@@ -1,9 +1,9 @@
 """Infrastructure 层"""
 
 from .engine import IDetectionEngine, YoloEngine, FasterRcnnEngine, VlmEngine
-from .persistence import FileLabelStore, EngineRepositoryImpl
+from .persistence import FileLabelStore, EngineRepositoryImpl, SqliteResultCache, FileJobJournal
 
 __all__ = [
     "IDetectionEngine", "YoloEngine", "FasterRcnnEngine", "VlmEngine",
-    "FileLabelStore", "EngineRepositoryImpl"
+    "FileLabelStore", "EngineRepositoryImpl", "SqliteResultCache", "FileJobJournal"
 ]
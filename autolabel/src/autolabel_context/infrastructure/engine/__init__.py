@@ -1,8 +1,11 @@
 """引擎模块"""
 
-from .i_detection_engine import IDetectionEngine
+from .i_detection_engine import IDetectionEngine, DecodedImage, ImageInput, decode_image
 from .yolo_engine import YoloEngine
 from .faster_rcnn_engine import FasterRcnnEngine
 from .vlm_engine import VlmEngine
 
-__all__ = ["IDetectionEngine", "YoloEngine", "FasterRcnnEngine", "VlmEngine"]
+__all__ = [
+    "IDetectionEngine", "DecodedImage", "ImageInput", "decode_image",
+    "YoloEngine", "FasterRcnnEngine", "VlmEngine"
+]
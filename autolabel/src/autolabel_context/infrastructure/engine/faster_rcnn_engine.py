@@ -1,17 +1,19 @@
 """Faster R-CNN检测引擎"""
 
-import cv2
 import torch
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
 
 from torchvision.models.detection import fasterrcnn_resnet50_fpn, FasterRCNN_ResNet50_FPN_Weights
 from torchvision.models.detection.faster_rcnn import FastRCNNPredictor
 from torchvision import transforms as T
 
-from .i_detection_engine import IDetectionEngine
+from .i_detection_engine import IDetectionEngine, DecodedImage, ImageInput, decode_image
 from autolabel_context.domain.model.value_object.engine_type import EngineType
 
+# 与 fasterrcnn_resnet50_fpn 默认的 max_size 一致：模型内部会把长边缩放到不超过该值
+_DECODE_TARGET_SIZE = 1333
+
 
 class FasterRcnnEngine(IDetectionEngine):
     """Faster R-CNN检测引擎实现"""
@@ -26,6 +28,7 @@ class FasterRcnnEngine(IDetectionEngine):
         self._model_path = config.get("model_path")
         self._confidence_threshold = config.get("confidence_threshold", 0.5)
         self._model = None
+        self._identity: Optional[str] = None
         self._device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
         self._category_names = {
@@ -69,25 +72,53 @@ class FasterRcnnEngine(IDetectionEngine):
         except Exception:
             return False
     
-    def detect(self, image_path: str) -> List[dict]:
+    def detect(self, image: ImageInput) -> List[dict]:
         """检测图像中的对象"""
+        return self.detect_batch([image])[0]
+    
+    def detect_batch(self, images: Sequence[ImageInput]) -> List[List[dict]]:
+        """批量检测：可读取的图像作为一个批次送入模型（尺寸不同时由模型内部填充）"""
         self._load_model()
         
-        img = cv2.imread(image_path)
-        if img is None:
-            return []
-        
-        img_height, img_width = img.shape[:2]
-        img_tensor = self._transforms(img)
-        img_tensor = img_tensor.to(self._device)
+        outputs: List[List[dict]] = [[] for _ in images]
+        valid = []
+        tensors = []
+        for index, image in enumerate(images):
+            decoded = self._as_decoded(image)
+            if decoded is None:
+                continue
+            valid.append((index, decoded))
+            tensors.append(self._transforms(decoded.array).to(self._device))
+        if not tensors:
+            return outputs
         
         with torch.no_grad():
-            predictions = self._model([img_tensor])
+            predictions = self._model(tensors)
         
+        for (index, decoded), prediction in zip(valid, predictions):
+            outputs[index] = self._parse_prediction(prediction, decoded)
+        return outputs
+    
+    def cache_identity(self) -> Optional[str]:
+        """权重内容 + 置信度阈值（权重哈希只计算一次）"""
+        if self._identity is None:
+            digest = self._weights_digest(self._model_path)
+            if digest:
+                self._identity = f"faster_rcnn:{digest}:conf={self._confidence_threshold}"
+        return self._identity
+    
+    def decode(self, image_path: str, allow_reduced: bool = False) -> Optional[DecodedImage]:
+        """读取图像；允许时按模型输入的最大边长降分辨率解码"""
+        return decode_image(image_path, _DECODE_TARGET_SIZE if allow_reduced else None)
+    
+    def _parse_prediction(self, prediction: Dict[str, Any], decoded: DecodedImage) -> List[dict]:
+        """把单张图像的预测转换为检测字典（坐标还原到原图像素）"""
         detections = []
-        boxes = predictions[0]["boxes"]
-        labels = predictions[0]["labels"]
-        scores = predictions[0]["scores"]
+        boxes = prediction["boxes"]
+        labels = prediction["labels"]
+        scores = prediction["scores"]
+        img_height, img_width = decoded.array.shape[:2]
+        scale = decoded.scale
         
         for box, label, score in zip(boxes, labels, scores):
             if score < self._confidence_threshold:
@@ -98,6 +129,7 @@ class FasterRcnnEngine(IDetectionEngine):
             y1 = max(0, y1)
             x2 = min(img_width, x2)
             y2 = min(img_height, y2)
+            x1, y1, x2, y2 = x1 * scale, y1 * scale, x2 * scale, y2 * scale
             
             class_id = label.item() - 1  # 减去背景类
             if class_id in self._category_names:
@@ -1,10 +1,71 @@
 """检测引擎接口"""
 
 from abc import ABC, abstractmethod
-from typing import List
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+from shared_kernel.utils import file_digest, image_size_cache
 
 from autolabel_context.domain.model.value_object.engine_type import EngineType
 
+# 降分辨率解码：缩小倍数 -> imread 标志（JPEG 在 IDCT 阶段直接缩小，其他格式解码后缩小）
+_REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+@dataclass(frozen=True)
+class DecodedImage:
+    """解码阶段产出的图像
+
+    scale 为降分辨率解码的缩小倍数，引擎输出的坐标需乘以 scale 还原到原图像素
+    """
+    path: str
+    array: np.ndarray
+    scale: int = 1
+
+    def __post_init__(self):
+        if self.scale not in _REDUCED_FLAGS:
+            raise ValueError(f"scale must be one of {sorted(_REDUCED_FLAGS)}, got {self.scale}")
+
+
+# 引擎输入：图像路径或已解码的图像
+ImageInput = Union[str, DecodedImage]
+
+
+def reduction_factor(size: Tuple[int, int], target_size: int) -> int:
+    """缩小后长边仍不小于 target_size 的最大缩小倍数（1/2/4/8）"""
+    longest = max(size)
+    for factor in (8, 4, 2):
+        if longest // factor >= target_size:
+            return factor
+    return 1
+
+
+def decode_image(image_path: str, target_size: Optional[int] = None) -> Optional[DecodedImage]:
+    """读取图像，给出 target_size 时按文件头尺寸选择降分辨率解码
+
+    原图尺寸记入 image_size_cache（降分辨率时由文件头探测得到），无法读取时返回 None
+    """
+    scale = 1
+    if target_size:
+        size = image_size_cache.get(image_path)
+        if size is not None:
+            scale = reduction_factor(size, target_size)
+    img = cv2.imread(image_path, _REDUCED_FLAGS[scale])
+    if img is None:
+        return None
+    if scale == 1:
+        image_size_cache.put(image_path, img.shape[1], img.shape[0])
+    return DecodedImage(path=image_path, array=img, scale=scale)
+
 
 class IDetectionEngine(ABC):
     """检测引擎接口"""
@@ -15,17 +76,56 @@ class IDetectionEngine(ABC):
         pass
     
     @abstractmethod
-    def detect(self, image_path: str) -> List[dict]:
+    def detect(self, image: ImageInput) -> List[dict]:
         """检测图像中的对象
         
+        image 为路径或 decode 产出的 DecodedImage。从路径解码后应调用
+        shared_kernel.utils.image_size_cache.put 记录尺寸，标注处理归一化坐标时
+        直接复用，不再读取图像
+        
         Returns:
             List[dict]: 检测结果列表，每个dict包含:
                 - category: 分类名称
                 - confidence: 置信度
-                - x1, y1, x2, y2: 边界框坐标
+                - x1, y1, x2, y2: 边界框坐标（原图像素）
         """
         pass
     
+    def detect_batch(self, images: Sequence[ImageInput]) -> List[List[dict]]:
+        """批量检测，返回与 images 一一对应的检测结果列表
+        
+        默认逐张调用 detect；支持批量前向的引擎应覆盖此方法，
+        无法读取的图像对应空列表
+        """
+        return [self.detect(image) for image in images]
+    
+    def decode(self, image_path: str, allow_reduced: bool = False) -> Optional[DecodedImage]:
+        """在独立的解码阶段读取图像，供 detect/detect_batch 使用
+        
+        默认返回 None，表示引擎自行从路径读取；allow_reduced 时引擎可按推理尺寸
+        降分辨率解码
+        """
+        return None
+    
+    def cache_identity(self) -> Optional[str]:
+        """决定输出的全部因素（权重内容、提示词、阈值等）的标识，用于结果缓存的键
+        
+        默认返回 None，表示输出不可缓存
+        """
+        return None
+    
+    @staticmethod
+    def _weights_digest(model_path: Optional[str]) -> Optional[str]:
+        """权重文件内容哈希；文件不存在时（如按名称下载或从配置随机初始化）返回 None"""
+        if not model_path or not Path(model_path).is_file():
+            return None
+        return file_digest(model_path)
+    
+    @staticmethod
+    def _as_decoded(image: ImageInput) -> Optional[DecodedImage]:
+        """已解码的图像原样返回，路径按原分辨率读取"""
+        return image if isinstance(image, DecodedImage) else decode_image(image)
+    
     @abstractmethod
     def validate(self) -> bool:
         """验证引擎是否可用"""
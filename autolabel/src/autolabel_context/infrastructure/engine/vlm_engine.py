@@ -2,14 +2,16 @@
 
 import base64
 import cv2
+import hashlib
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
 
 from openai import OpenAI
 
-from .i_detection_engine import IDetectionEngine
+from .i_detection_engine import IDetectionEngine, DecodedImage, ImageInput, decode_image
 from autolabel_context.domain.model.value_object.engine_type import EngineType
 
 
@@ -66,12 +68,17 @@ class VlmEngine(IDetectionEngine):
         except Exception:
             return False
     
-    def detect(self, image_path: str) -> List[dict]:
-        """检测图像中的对象"""
-        img = cv2.imread(image_path)
-        if img is None:
+    def detect(self, image: ImageInput) -> List[dict]:
+        """检测图像中的对象
+        
+        重试耗尽后抛出最后一次的异常：API 故障不能当作"无检测"返回，
+        否则空结果会写入结果缓存，服务恢复后仍命中空结果
+        """
+        decoded = self._as_decoded(image)
+        if decoded is None:
             return []
         
+        img = decoded.array
         img_height, img_width = img.shape[:2]
         
         _, buffer = cv2.imencode('.jpg', img)
@@ -79,6 +86,7 @@ class VlmEngine(IDetectionEngine):
         
         detections = []
         retries = 0
+        last_error: Optional[Exception] = None
         
         while retries <= self._max_retries:
             try:
@@ -97,8 +105,13 @@ class VlmEngine(IDetectionEngine):
                 detections = self._parse_response(response_text)
                 break
                 
-            except Exception:
+            except Exception as e:
+                last_error = e
                 retries += 1
+        else:
+            raise RuntimeError(
+                f"VLM request failed after {self._max_retries + 1} attempts: {last_error}"
+            ) from last_error
         
         valid_detections = []
         for det in detections:
@@ -121,6 +134,22 @@ class VlmEngine(IDetectionEngine):
         
         return valid_detections
     
+    def detect_batch(self, images: Sequence[ImageInput]) -> List[List[dict]]:
+        """批量检测：API 每次只接受一张图像，批内请求并发发出"""
+        if len(images) <= 1:
+            return [self.detect(image) for image in images]
+        with ThreadPoolExecutor(max_workers=len(images)) as executor:
+            return list(executor.map(self.detect, images))
+    
+    def cache_identity(self) -> Optional[str]:
+        """服务地址 + 模型名 + 提示词哈希 + 置信度阈值"""
+        prompt_hash = hashlib.sha256(self._prompt.encode("utf-8")).hexdigest()[:16]
+        return f"vlm:{self._base_url}:{self._model}:prompt={prompt_hash}:conf={self._confidence_threshold}"
+    
+    def decode(self, image_path: str, allow_reduced: bool = False) -> Optional[DecodedImage]:
+        """读取图像（模型返回的坐标基于所见图像，始终按原分辨率解码）"""
+        return decode_image(image_path)
+    
     def _parse_response(self, response_text: str) -> List[dict]:
         """解析API响应"""
         detections = []
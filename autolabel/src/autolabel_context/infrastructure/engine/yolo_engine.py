@@ -1,15 +1,13 @@
 """YOLO检测引擎"""
 
-import cv2
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
 
 from ultralytics import YOLO
 
 from shared_kernel.config.loader import ConfigLoader
 from shared_kernel.domain.taxonomy import WasteCategory
-
-from .i_detection_engine import IDetectionEngine
+from .i_detection_engine import IDetectionEngine, DecodedImage, ImageInput, decode_image
 from autolabel_context.domain.model.value_object.engine_type import EngineType
 
 
@@ -25,6 +23,8 @@ class YoloEngine(IDetectionEngine):
         self._config = config
         self._model_path = config.get("model_path")
         self._confidence_threshold = config.get("confidence_threshold", 0.5)
+        self._imgsz = config.get("imgsz", 640)
+        self._identity: Optional[str] = None
         self._model = None
         self._category_mapping = self._build_category_mapping()
     
@@ -57,40 +57,68 @@ class YoloEngine(IDetectionEngine):
         except Exception:
             return False
     
-    def detect(self, image_path: str) -> List[dict]:
+    def detect(self, image: ImageInput) -> List[dict]:
         """检测图像中的对象
         
         Args:
-            image_path: 图像路径
+            image: 图像路径或已解码的图像
         
         Returns:
             检测结果列表
         """
+        return self.detect_batch([image])[0]
+    
+    def detect_batch(self, images: Sequence[ImageInput]) -> List[List[dict]]:
+        """批量检测：可读取的图像在一次前向中推理"""
         self._load_model()
         
-        img = cv2.imread(image_path)
-        if img is None:
-            return []
+        decoded = [self._as_decoded(image) for image in images]
+        valid = [index for index, img in enumerate(decoded) if img is not None]
+        outputs: List[List[dict]] = [[] for _ in images]
+        if not valid:
+            return outputs
         
-        results = self._model(img, conf=self._confidence_threshold, verbose=False)
+        # imgsz 与 decode 降分辨率解码使用的目标尺寸一致
+        results = self._model(
+            [decoded[index].array for index in valid],
+            conf=self._confidence_threshold,
+            imgsz=self._imgsz,
+            verbose=False
+        )
+        for index, result in zip(valid, results):
+            outputs[index] = self._parse_result(result, decoded[index].scale)
+        return outputs
+    
+    def cache_identity(self) -> Optional[str]:
+        """权重内容 + 置信度阈值 + 输入尺寸（权重哈希只计算一次）"""
+        if self._identity is None:
+            digest = self._weights_digest(self._model_path)
+            if digest:
+                self._identity = f"yolo:{digest}:conf={self._confidence_threshold}:imgsz={self._imgsz}"
+        return self._identity
+    
+    def decode(self, image_path: str, allow_reduced: bool = False) -> Optional[DecodedImage]:
+        """读取图像；允许时按 imgsz 降分辨率解码（推理前本就会缩放到 imgsz）"""
+        return decode_image(image_path, self._imgsz if allow_reduced else None)
+    
+    def _parse_result(self, result, scale: int = 1) -> List[dict]:
+        """把单张图像的推理结果转换为检测字典（坐标还原到原图像素）"""
         detections = []
-        
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                conf = float(box.conf[0])
-                cls = int(box.cls[0])
-                
-                category_name = self._category_mapping.get(cls)
-                if category_name:
-                    detections.append({
-                        "name": category_name,
-                        "confidence": conf,
-                        "x1": x1,
-                        "y1": y1,
-                        "x2": x2,
-                        "y2": y2
-                    })
+        boxes = result.boxes
+        for box in boxes:
+            x1, y1, x2, y2 = (int(v * scale) for v in box.xyxy[0])
+            conf = float(box.conf[0])
+            cls = int(box.cls[0])
+            
+            category_name = self._category_mapping.get(cls)
+            if category_name:
+                detections.append({
+                    "name": category_name,
+                    "confidence": conf,
+                    "x1": x1,
+                    "y1": y1,
+                    "x2": x2,
+                    "y2": y2
+                })
         
         return detections
@@ -2,5 +2,7 @@
 
 from .file_label_store import FileLabelStore
 from .engine_repository_impl import EngineRepositoryImpl
+from .sqlite_result_cache import SqliteResultCache
+from .file_job_journal import FileJobJournal
 
-__all__ = ["FileLabelStore", "EngineRepositoryImpl"]
+__all__ = ["FileLabelStore", "EngineRepositoryImpl", "SqliteResultCache", "FileJobJournal"]
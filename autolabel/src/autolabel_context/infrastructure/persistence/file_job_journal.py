@@ -0,0 +1,115 @@
+"""文件任务日志实现 - 首行为运行标识，其后每行一个 JSON 字符串形式的图片路径，只追加"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Sequence, Set, TextIO, Tuple
+
+from shared_kernel.utils import fsync_dir
+
+from autolabel_context.domain.repository.i_job_journal import IJobJournal
+
+logger = logging.getLogger(__name__)
+
+
+class FileJobJournal(IJobJournal):
+    """文件任务日志
+    
+    每批记录写入后 flush 并 fsync，进程或机器中途退出时已记录的图片不会丢失
+    （标签存储在记录前已将该批标签落盘）；
+    崩溃时写了一半的末行在读取时忽略
+    """
+    
+    def __init__(self, path: str):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: Optional[TextIO] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def path(self) -> Path:
+        return self._path
+    
+    def begin(self, scope: Optional[str]) -> Set[str]:
+        """运行标识相同时续用日志，否则以新标识重写日志"""
+        header, paths = self._read()
+        if scope is not None and header == scope:
+            return set(paths)
+        if header is not None or paths:
+            logger.info(f"Job journal {self._path} belongs to a different run configuration; starting fresh")
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            tmp_path = self._path.with_name(f".{self._path.name}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({"scope": scope}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path)
+            fsync_dir(self._path.parent)
+        return set()
+    
+    def completed_paths(self) -> Set[str]:
+        """已完成的图片路径（日志不存在时为空）"""
+        return set(self._read()[1])
+    
+    def record(self, paths: Sequence[str]) -> None:
+        """追加一批已完成的图片路径"""
+        if not paths:
+            return
+        with self._lock:
+            if self._file is None:
+                self._file = open(self._path, 'a', encoding='utf-8')
+                self._terminate_torn_line()
+            self._file.write("".join(json.dumps(path, ensure_ascii=False) + "\n" for path in paths))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+    
+    def finish(self) -> None:
+        """任务全部成功完成：关闭并删除日志"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._path.unlink(missing_ok=True)
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+    
+    def _read(self) -> Tuple[Optional[str], List[str]]:
+        """读取运行标识与已完成的图片路径（无标识行时标识为 None）"""
+        header: Optional[str] = None
+        paths: List[str] = []
+        try:
+            with open(self._path, 'r', encoding='utf-8') as f:
+                for index, line in enumerate(f):
+                    if not line.endswith("\n"):
+                        logger.warning(f"Ignoring truncated journal line in {self._path}")
+                        break
+                    try:
+                        value = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Ignoring corrupt journal line in {self._path}")
+                        continue
+                    if isinstance(value, str):
+                        paths.append(value)
+                    elif index == 0 and isinstance(value, dict):
+                        header = value.get("scope")
+        except FileNotFoundError:
+            pass
+        return header, paths
+    
+    def _terminate_torn_line(self) -> None:
+        """上次崩溃留下的半行补上换行，避免与新记录拼接（该行读取时按损坏行忽略）"""
+        if self._file.tell() == 0:
+            return
+        with open(self._path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                self._file.write("\n")
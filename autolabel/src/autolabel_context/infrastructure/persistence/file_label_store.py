@@ -1,15 +1,28 @@
 """文件标签存储实现"""
 
 import json
+import logging
+import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence
+
+from shared_kernel.utils import fsync_dir, image_size_cache
 
 from autolabel_context.domain.model.aggregate.autolabel_job import AutoLabelJob
+from autolabel_context.domain.model.entity.label_result import LabelResult
 from autolabel_context.domain.repository.i_label_store import ILabelStore
 
+logger = logging.getLogger(__name__)
+
 
 class FileLabelStore(ILabelStore):
-    """文件标签存储实现"""
+    """文件标签存储实现
+    
+    每张图片一个 JSON：目录输入的图片按相对输入目录的路径镜像（<子目录>/<stem>.json），
+    单独给出的文件为 <stem>.json。先写临时文件并 fsync 再原子替换，
+    每批替换后 fsync 所在目录：save_results 返回（任务日志记录该批）时标签已落盘，
+    进程或机器中途退出时已写入的标签文件都是完整的
+    """
     
     def __init__(self, output_dir: str):
         """初始化文件标签存储
@@ -21,38 +34,62 @@ class FileLabelStore(ILabelStore):
         self._output_dir.mkdir(parents=True, exist_ok=True)
     
     def save_job(self, job: AutoLabelJob) -> None:
-        """保存任务结果到文件"""
-        for result in job.results:
-            output_path = self._output_dir / f"{result.image_item.stem}.json"
+        """保存任务结果到文件（流式任务的结果已通过 save_results 写入）"""
+        self.save_results(job.results)
+    
+    def save_results(self, results: Sequence[LabelResult]) -> None:
+        """保存一批结果，失败的结果不写文件；返回前已落盘"""
+        directories = set()
+        for result in results:
+            output_path = self._output_dir / f"{result.image_item.label_name}.json"
+            output_path.parent.mkdir(parents=True, exist_ok=True)
             
             if result.is_success:
                 self._save_detection_result(output_path, result)
             elif result.is_skipped:
                 self._save_empty_json(output_path)
+            else:
+                continue
+            directories.add(output_path.parent)
+        # 目录项（重命名）每批每个目录只 fsync 一次
+        for directory in directories:
+            fsync_dir(directory)
     
     def _save_detection_result(self, output_path: Path, result) -> None:
-        """保存检测结果到JSON文件"""
+        """保存检测结果到JSON文件（坐标为原图像素）"""
         labels = []
-        for det in result.detections:
-            labels.append({
-                "name": det.category.value,
-                "x1": det.bounding_box.x1,
-                "y1": det.bounding_box.y1,
-                "x2": det.bounding_box.x2,
-                "y2": det.bounding_box.y2,
-                "confidence": det.confidence.value
-            })
+        if result.detections:
+            size = image_size_cache.get(result.image_item.path)
+            if size is None:
+                logger.warning(f"Cannot determine image size, labels not written: {result.image_item.path}")
+                return
+            img_width, img_height = size
+            for det in result.detections:
+                x1, y1, x2, y2 = det.bounding_box.to_xyxy(img_width, img_height)
+                labels.append({
+                    "name": det.category.value,
+                    "x1": x1,
+                    "y1": y1,
+                    "x2": x2,
+                    "y2": y2,
+                    "confidence": det.confidence.value
+                })
         
-        data = {"labels": labels}
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        self._write_json(output_path, {"labels": labels})
     
     def _save_empty_json(self, output_path: Path) -> None:
         """保存空JSON文件"""
-        data = {"labels": []}
-        with open(output_path, 'w', encoding='utf-8') as f:
+        self._write_json(output_path, {"labels": []})
+    
+    @staticmethod
+    def _write_json(output_path: Path, data: Dict[str, Any]) -> None:
+        """原子写入：同目录临时文件写完并 fsync 后替换目标文件"""
+        tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, output_path)
     
     def find_by_id(self, job_id: str) -> Optional[AutoLabelJob]:
         """根据ID查找任务（文件存储不支持）"""
@@ -0,0 +1,118 @@
+"""SQLite 检测结果缓存实现 - 单文件持久化，按总字节数 LRU 淘汰"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from autolabel_context.domain.repository.i_result_cache import IResultCache, CachedOutput
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used INTEGER NOT NULL
+)
+"""
+
+
+class SqliteResultCache(IResultCache):
+    """SQLite 检测结果缓存
+
+    职责:
+    - 以键保存引擎输出与原图尺寸的 JSON，跨进程、跨任务复用
+    - 条目总字节数超过 max_bytes 时按最近使用时间淘汰
+
+    线程安全：所有访问共用一个连接并加锁；hits/misses 为本实例的查找统计
+    """
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024):
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._conn.commit()
+        total, clock = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(MAX(last_used), 0) FROM results"
+        ).fetchone()
+        self._total_bytes = total
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def get(self, key: str) -> Optional[CachedOutput]:
+        """查找缓存的引擎输出，命中时刷新最近使用时间"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (self._tick(), key))
+            self._conn.commit()
+            self.hits += 1
+        value = json.loads(row[0])
+        if isinstance(value, list):
+            # 未保存尺寸的旧条目
+            return CachedOutput(value)
+        size = value.get("image_size")
+        return CachedOutput(value["detections"], tuple(size) if size else None)
+
+    def put(self, key: str, detections: List[dict], image_size: Optional[Tuple[int, int]] = None) -> None:
+        """保存引擎输出，超出容量时淘汰最久未使用的条目（单条超过容量时不保存）"""
+        value = json.dumps(
+            {"detections": detections, "image_size": list(image_size) if image_size else None},
+            ensure_ascii=False, separators=(",", ":")
+        )
+        size = len(key) + len(value.encode("utf-8"))
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, size, self._tick())
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def _evict(self) -> None:
+        """按最近使用时间从旧到新删除，直到总字节数不超过容量"""
+        while self._total_bytes > self._max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM results ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            removed = []
+            for key, size in rows:
+                if self._total_bytes <= self._max_bytes:
+                    break
+                removed.append((key,))
+                self._total_bytes -= size
+            self._conn.executemany("DELETE FROM results WHERE key = ?", removed)
@@ -218,6 +218,717 @@ class TestRunAutoLabelCmd:
         assert cmd.batch_size == 8
 
 
+class _StubEngine:
+    """只实现 detect 的测试引擎，detect_batch 沿用接口的逐张默认实现"""
+    
+    engine_type = EngineType.YOLO
+    
+    def validate(self):
+        return True
+
+
+def _stub_engine(detect):
+    from autolabel_context.infrastructure.engine.i_detection_engine import IDetectionEngine
+    return type("StubEngine", (_StubEngine, IDetectionEngine), {"detect": detect})()
+
+
+class TestRunAutoLabelHandler:
+    """测试自动标注处理器的图像尺寸获取与分批检测"""
+    
+    def _run(self, tmp_path, engine, paths, batch_size=2):
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        engine_repo = Mock()
+        engine_repo.get_engine.return_value = engine
+        handler = RunAutoLabelHandler(engine_repo, Mock(), Mock())
+        command = RunAutoLabelCmd(
+            engine_type=EngineType.YOLO, image_paths=paths, output_dir=str(tmp_path), batch_size=batch_size
+        )
+        job = AutoLabelJob.create(EngineType.YOLO, paths, 0.5)
+        job.start()
+        handler._process_images(job, engine, command)
+        return job
+    
+    def test_dense_image_not_reread(self, tmp_path, monkeypatch):
+        """测试每个检测不再读取图像：尺寸来自引擎记录或文件头"""
+        import cv2
+        import numpy as np
+        from shared_kernel.utils import image_size_cache
+        path = tmp_path / "dense.jpg"
+        cv2.imwrite(str(path), np.zeros((200, 400, 3), dtype=np.uint8))
+        boxes = [{"name": "Kitchen_waste", "confidence": 0.9, "x1": 0, "y1": 0, "x2": 40, "y2": 20}] * 20
+        
+        engine = _stub_engine(lambda self, image_path: boxes)
+        
+        def forbidden(*args, **kwargs):
+            raise AssertionError("image decoded during labelling")
+        monkeypatch.setattr(cv2, "imread", forbidden)
+        image_size_cache.clear()
+        job = self._run(tmp_path, engine, [str(path)])
+        result = job.results[0]
+        assert result.is_success and result.detection_count == 20
+        box = result.detections[0].bounding_box
+        assert (box.x_center, box.y_center, box.width, box.height) == (0.05, 0.05, 0.1, 0.1)
+        assert image_size_cache.probes == 1
+    
+    def test_engine_recorded_size_used(self, tmp_path):
+        """测试引擎解码时记录的尺寸被直接复用"""
+        from shared_kernel.utils import image_size_cache
+        path = tmp_path / "engine.png"
+        path.write_bytes(b"not an image header")
+        
+        def detect(self, image_path):
+            image_size_cache.put(image_path, 100, 50)
+            return [{"name": "Other_waste", "confidence": 0.8, "x1": 10, "y1": 10, "x2": 30, "y2": 20}]
+        
+        image_size_cache.clear()
+        job = self._run(tmp_path, _stub_engine(detect), [str(path)])
+        box = job.results[0].detections[0].bounding_box
+        assert (box.x_center, box.y_center, box.width, box.height) == (0.2, 0.3, 0.2, 0.2)
+        assert image_size_cache.probes == 0
+
+    
+    def test_batches_follow_batch_size(self, tmp_path):
+        """测试按 batch_size 分批调用 detect_batch，结果按输入顺序写入任务"""
+        paths = []
+        for index in range(7):
+            path = tmp_path / f"{index}.jpg"
+            path.write_bytes(b"x")
+            paths.append(str(path))
+        calls = []
+        
+        def detect_batch(self, image_paths):
+            calls.append(len(image_paths))
+            return [[] for _ in image_paths]
+        
+        engine = _stub_engine(lambda self, image_path: [])
+        engine.detect_batch = detect_batch.__get__(engine)
+        job = self._run(tmp_path, engine, paths, batch_size=3)
+        assert sorted(calls) == [1, 3, 3]
+        assert [r.image_item.path for r in job.results] == paths
+    
+    def test_failed_batch_retried_per_image(self, tmp_path):
+        """测试批量检测出错时逐张重试，只有出错的图片失败"""
+        paths = []
+        for name in ("ok.jpg", "bad.jpg"):
+            (tmp_path / name).write_bytes(b"x")
+            paths.append(str(tmp_path / name))
+        
+        def detect(self, image_path):
+            if image_path.endswith("bad.jpg"):
+                raise RuntimeError("corrupt")
+            return []
+        
+        job = self._run(tmp_path, _stub_engine(detect), paths)
+        assert [r.is_success for r in job.results] == [True, False]
+    
+    def test_prefetch_decodes_off_inference_thread(self, tmp_path):
+        """测试预取：解码在独立线程中完成，引擎收到已解码的图像，关闭预取时收到路径"""
+        import threading
+        import cv2
+        import numpy as np
+        from autolabel_context.infrastructure.engine.i_detection_engine import DecodedImage
+        paths = []
+        for index in range(5):
+            path = tmp_path / f"{index}.png"
+            cv2.imwrite(str(path), np.zeros((8, 8, 3), dtype=np.uint8))
+            paths.append(str(path))
+        seen = []
+        
+        def detect(self, image):
+            seen.append(image)
+            return []
+        
+        def decode(self, image_path, allow_reduced=False):
+            assert threading.current_thread().name.startswith("decode")
+            return DecodedImage(path=image_path, array=cv2.imread(image_path))
+        
+        engine = _stub_engine(detect)
+        engine.decode = decode.__get__(engine)
+        job = self._run(tmp_path, engine, paths)
+        assert [image.path for image in seen] == paths
+        assert all(isinstance(image, DecodedImage) for image in seen)
+        assert all(r.is_success for r in job.results)
+        
+        seen.clear()
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        command = RunAutoLabelCmd(
+            engine_type=EngineType.YOLO, image_paths=paths, output_dir=str(tmp_path), prefetch=0
+        )
+        job = AutoLabelJob.create(EngineType.YOLO, paths, 0.5)
+        job.start()
+        RunAutoLabelHandler(Mock(), Mock(), Mock())._process_images(job, engine, command)
+        assert seen == paths
+    
+    def test_handle_streams_labels_to_store(self, tmp_path):
+        """测试 handle 把结果增量写入标签存储：标签文件为原图像素坐标，任务不保留结果"""
+        import json
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.infrastructure.persistence.file_label_store import FileLabelStore
+        images = tmp_path / "images"
+        images.mkdir()
+        for name in ("a.jpg", "b.jpg"):
+            (images / name).write_bytes(b"x")
+        
+        def detect(self, image_path):
+            from shared_kernel.utils import image_size_cache
+            image_size_cache.put(image_path, 256, 128)
+            return [{"name": "Hazardous_waste", "confidence": 0.7, "x1": 32, "y1": 16, "x2": 96, "y2": 64}]
+        
+        engine_repo = Mock()
+        engine_repo.get_engine.return_value = _stub_engine(detect)
+        output = tmp_path / "labels"
+        handler = RunAutoLabelHandler(engine_repo, FileLabelStore(str(output)), Mock())
+        result = handler.handle(RunAutoLabelCmd(
+            engine_type=EngineType.YOLO, image_paths=[str(images)], output_dir=str(output)
+        ))
+        assert result.processed_images == 2 and result.total_detections == 2
+        assert sorted(p.name for p in output.iterdir()) == ["a.json", "b.json"]
+        labels = json.loads((output / "a.json").read_text())["labels"]
+        assert labels == [{"name": "Hazardous_waste", "x1": 32, "y1": 16, "x2": 96, "y2": 64, "confidence": 0.7}]
+    
+    def test_directory_input_streamed(self, tmp_path):
+        """测试目录输入流式扫描：按分片过滤，图片数随处理累加"""
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        images = tmp_path / "images"
+        (images / "sub").mkdir(parents=True)
+        for rel in ("a.jpg", "b.png", "sub/c.jpg", "sub/skip.txt"):
+            (images / rel).write_bytes(b"x")
+        
+        handler = RunAutoLabelHandler(Mock(), Mock(), Mock())
+        processed = set()
+        for shard in range(2):
+            command = RunAutoLabelCmd(
+                engine_type=EngineType.YOLO, image_paths=[str(images)], output_dir=str(tmp_path),
+                shard_index=shard, shard_count=2
+            )
+            job = AutoLabelJob.create_streaming(
+                EngineType.YOLO, handler._iter_image_items(command), 0.5
+            )
+            assert job.statistics.total_images == 0
+            job.start()
+            results = []
+            handler._process_images(job, _stub_engine(lambda self, image_path: []), command, results.append)
+            assert job.statistics.total_images == len(results)
+            assert job.results == []
+            processed |= {r.image_item.path for r in results}
+        assert {Path(p).name for p in processed} == {"a.jpg", "b.png", "c.jpg"}
+    
+    def test_nested_labels_mirror_input_tree(self, tmp_path):
+        """测试不同子目录下的同名图片各自写入镜像路径的标签，不互相覆盖"""
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.infrastructure.persistence.file_label_store import FileLabelStore
+        images = tmp_path / "images"
+        for rel in ("img1.jpg", "a/img1.jpg", "b/img1.jpg"):
+            (images / rel).parent.mkdir(parents=True, exist_ok=True)
+            (images / rel).write_bytes(b"x")
+        single = tmp_path / "single.jpg"
+        single.write_bytes(b"x")
+        engine_repo = Mock()
+        engine_repo.get_engine.return_value = _stub_engine(lambda self, image_path: [])
+        output = tmp_path / "labels"
+        handler = RunAutoLabelHandler(engine_repo, FileLabelStore(str(output)), Mock())
+        
+        result = handler.handle(RunAutoLabelCmd(
+            engine_type=EngineType.YOLO, image_paths=[str(images), str(single)], output_dir=str(output)
+        ))
+        assert result.processed_images == 4
+        written = {p.relative_to(output).as_posix() for p in output.rglob("*.json")}
+        assert written == {"img1.json", "a/img1.json", "b/img1.json", "single.json"}
+
+class TestDecodeImage:
+    """测试解码阶段的降分辨率解码"""
+    
+    def test_reduction_factor(self):
+        """测试缩小后长边不小于目标尺寸"""
+        from autolabel_context.infrastructure.engine.i_detection_engine import reduction_factor
+        assert reduction_factor((4000, 3000), 640) == 4
+        assert reduction_factor((1920, 1080), 640) == 2
+        assert reduction_factor((1279, 720), 640) == 1
+        assert reduction_factor((640, 480), 640) == 1
+        assert reduction_factor((8000, 6000), 640) == 8
+    
+    def test_reduced_decode_keeps_original_size(self, tmp_path):
+        """测试降分辨率解码：数组缩小，尺寸缓存仍记录原图尺寸"""
+        import cv2
+        import numpy as np
+        from shared_kernel.utils import image_size_cache
+        from autolabel_context.infrastructure.engine.i_detection_engine import DecodedImage, decode_image
+        path = str(tmp_path / "large.jpg")
+        cv2.imwrite(path, np.zeros((1080, 1920, 3), dtype=np.uint8))
+        image_size_cache.clear()
+        reduced = decode_image(path, target_size=640)
+        assert reduced.scale == 2 and reduced.array.shape[:2] == (540, 960)
+        assert image_size_cache.get(path) == (1920, 1080)
+        full = decode_image(path)
+        assert full.scale == 1 and full.array.shape[:2] == (1080, 1920)
+        assert decode_image(str(tmp_path / "missing.jpg")) is None
+        with pytest.raises(ValueError):
+            DecodedImage(path=path, array=full.array, scale=3)
+    
+    def test_yolo_infers_at_decode_size(self, tmp_path):
+        """测试 YOLO 推理尺寸与降分辨率解码的目标尺寸一致"""
+        pytest.importorskip("ultralytics")
+        import cv2
+        import numpy as np
+        from autolabel_context.infrastructure.engine.yolo_engine import YoloEngine
+        path = str(tmp_path / "large.jpg")
+        cv2.imwrite(path, np.zeros((1080, 1920, 3), dtype=np.uint8))
+        engine = YoloEngine({"model_path": "model.pt", "imgsz": 960})
+        engine._model = Mock(return_value=[])
+        engine.detect_batch([engine.decode(path, allow_reduced=True)])
+        assert engine._model.call_args.kwargs["imgsz"] == 960
+
+
+class TestLabelWriter:
+    """测试后台标签写入器"""
+    
+    @staticmethod
+    def _results(count):
+        from autolabel_context.domain.model.entity.image_item import ImageItem
+        from autolabel_context.domain.model.entity.label_result import LabelResult
+        return [LabelResult.success(ImageItem(path=f"/data/{i}.jpg"), []) for i in range(count)]
+    
+    def test_batches_in_order(self):
+        """测试按批写入且保持提交顺序"""
+        from autolabel_context.application.service import LabelWriter
+        store = Mock()
+        results = self._results(10)
+        with LabelWriter(store, batch_size=4, flush_interval_s=0.05) as writer:
+            for result in results:
+                writer.submit(result)
+        written = [r for call in store.save_results.call_args_list for r in call.args[0]]
+        assert written == results
+        assert all(len(call.args[0]) <= 4 for call in store.save_results.call_args_list)
+        assert writer.written == 10
+    
+    def test_store_failure_surfaces(self):
+        """测试写入失败后 submit 与 close 抛出 LabelWriterError"""
+        import time
+        from autolabel_context.application.service import LabelWriter, LabelWriterError
+        store = Mock()
+        store.save_results.side_effect = OSError("disk full")
+        writer = LabelWriter(store, batch_size=1, flush_interval_s=0.05)
+        writer.start()
+        writer.submit(self._results(1)[0])
+        deadline = time.monotonic() + 2.0
+        while store.save_results.call_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        with pytest.raises(LabelWriterError):
+            writer.submit(self._results(1)[0])
+        with pytest.raises(LabelWriterError):
+            writer.close()
+        with pytest.raises(ValueError):
+            LabelWriter(store, batch_size=8, max_pending=4)
+    
+    def test_file_store_atomic_write(self, tmp_path):
+        """测试文件存储原子写入：不留临时文件，失败结果不写文件"""
+        from autolabel_context.domain.model.entity.image_item import ImageItem
+        from autolabel_context.domain.model.entity.label_result import LabelResult
+        from autolabel_context.infrastructure.persistence.file_label_store import FileLabelStore
+        store = FileLabelStore(str(tmp_path))
+        store.save_results([
+            LabelResult.success(ImageItem(path="/data/ok.jpg"), []),
+            LabelResult.skipped(ImageItem(path="/data/skip.jpg")),
+            LabelResult.failed(ImageItem(path="/data/bad.jpg"), "boom"),
+        ])
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["ok.json", "skip.json"]
+    
+    def test_file_store_syncs_batch(self, tmp_path):
+        """测试每个标签文件 fsync 后再替换，每批对所在目录只 fsync 一次"""
+        from unittest.mock import patch
+        from autolabel_context.domain.model.entity.image_item import ImageItem
+        from autolabel_context.domain.model.entity.label_result import LabelResult
+        from autolabel_context.infrastructure.persistence.file_label_store import FileLabelStore
+        store = FileLabelStore(str(tmp_path))
+        with patch("os.fsync", wraps=os.fsync) as fsync, patch(
+            "autolabel_context.infrastructure.persistence.file_label_store.fsync_dir"
+        ) as fsync_dir:
+            store.save_results([
+                LabelResult.success(ImageItem(path="/data/a.jpg"), []),
+                LabelResult.skipped(ImageItem(path="/data/b.jpg")),
+                LabelResult.failed(ImageItem(path="/data/c.jpg"), "boom"),
+            ])
+        assert fsync.call_count == 2
+        fsync_dir.assert_called_once_with(tmp_path)
+
+
+class TestResultCache:
+    """测试内容寻址的结果缓存"""
+    
+    def test_sqlite_cache_lru(self, tmp_path):
+        """测试持久化、命中刷新与按字节数淘汰"""
+        from autolabel_context.domain.repository import CachedOutput
+        from autolabel_context.infrastructure.persistence.sqlite_result_cache import SqliteResultCache
+        path = str(tmp_path / "cache" / "results.sqlite")
+        detections = [{"name": "Other_waste", "confidence": 0.9, "x1": 1, "y1": 2, "x2": 3, "y2": 4}]
+        cache = SqliteResultCache(path)
+        cache.put("a", detections, (640, 480))
+        cache.put("b", [])
+        assert cache.get("a") == CachedOutput(detections, (640, 480))
+        assert cache.get("b") == CachedOutput([], None)
+        assert cache.get("missing") is None
+        assert (cache.hits, cache.misses) == (2, 1)
+        cache.close()
+        
+        reopened = SqliteResultCache(path, max_bytes=cache.total_bytes + 2)
+        assert reopened.get("a").detections == detections
+        reopened.put("c", [])       # 超出容量，淘汰最久未使用的 b
+        assert reopened.get("b") is None
+        assert reopened.get("a").image_size == (640, 480) and reopened.get("c").detections == []
+        assert reopened.total_bytes <= cache.total_bytes + 2
+        with pytest.raises(ValueError):
+            SqliteResultCache(path, max_bytes=0)
+    
+    def test_rerun_skips_inference(self, tmp_path):
+        """测试重复运行时未变化的图片命中缓存、不再推理，统计命中与未命中数"""
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.infrastructure.persistence.sqlite_result_cache import SqliteResultCache
+        images = tmp_path / "images"
+        images.mkdir()
+        for name in ("a.jpg", "b.jpg", "c.jpg"):
+            (images / name).write_bytes(name.encode())
+        calls = []
+        
+        def detect(self, image):
+            calls.append(image)
+            return []
+        
+        engine = _stub_engine(detect)
+        engine.cache_identity = lambda: "stub:v1"
+        engine_repo = Mock()
+        engine_repo.get_engine.return_value = engine
+        cache = SqliteResultCache(str(tmp_path / "cache.sqlite"))
+        handler = RunAutoLabelHandler(engine_repo, Mock(), Mock(), cache)
+        command = RunAutoLabelCmd(engine_type=EngineType.YOLO, image_paths=[str(images)], output_dir=str(tmp_path))
+        
+        first = handler.handle(command)
+        assert (first.cache_hits, first.cache_misses) == (0, 3) and len(calls) == 3
+        (images / "b.jpg").write_bytes(b"changed")
+        second = handler.handle(command)
+        assert (second.cache_hits, second.cache_misses) == (2, 1) and len(calls) == 4
+        assert second.processed_images == 3
+        
+        # 引擎输出不可缓存时不查询缓存
+        engine.cache_identity = lambda: None
+        third = handler.handle(command)
+        assert (third.cache_hits, third.cache_misses) == (0, 0) and len(calls) == 7
+    
+    def test_vlm_outage_not_cached(self, tmp_path):
+        """测试 VLM 重试耗尽时图片失败且不写入缓存，服务恢复后重新请求"""
+        import cv2
+        import numpy as np
+        from types import SimpleNamespace
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.infrastructure.engine.vlm_engine import VlmEngine
+        from autolabel_context.infrastructure.persistence.sqlite_result_cache import SqliteResultCache
+        images = tmp_path / "images"
+        images.mkdir()
+        cv2.imwrite(str(images / "a.jpg"), np.full((64, 64, 3), 127, dtype=np.uint8))
+        engine = VlmEngine({"api_key": "test", "max_retries": 1})
+        engine._client = Mock()
+        engine._client.chat.completions.create.side_effect = ConnectionError("service unavailable")
+        engine_repo = Mock()
+        engine_repo.get_engine.return_value = engine
+        cache = SqliteResultCache(str(tmp_path / "cache.sqlite"))
+        handler = RunAutoLabelHandler(engine_repo, Mock(), Mock(), cache)
+        command = RunAutoLabelCmd(engine_type=EngineType.VLM, image_paths=[str(images)], output_dir=str(tmp_path))
+        
+        outage = handler.handle(command)
+        assert outage.failed_images == 1 and outage.processed_images == 0
+        assert engine._client.chat.completions.create.call_count >= 2
+        
+        content = ('```json\n{"labels": [{"name": "Other_waste", "x1": 4, "y1": 4, '
+                   '"x2": 40, "y2": 40, "confidence": 0.9}]}\n```')
+        engine._client.chat.completions.create.side_effect = None
+        engine._client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+        recovered = handler.handle(command)
+        assert recovered.cache_hits == 0 and recovered.total_detections == 1
+    
+    def test_hit_restores_size_of_unprobeable_formats(self, tmp_path):
+        """测试新进程中命中缓存的 BMP/WebP 图片用缓存的尺寸换算坐标，不解码、不推理"""
+        import cv2
+        import numpy as np
+        from shared_kernel.utils import image_size_cache
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.infrastructure.persistence.sqlite_result_cache import SqliteResultCache
+        images = tmp_path / "images"
+        images.mkdir()
+        for name in ("a.bmp", "a.webp", "a.jpg"):
+            assert cv2.imwrite(str(images / name), np.full((100, 200, 3), 128, dtype=np.uint8))
+        calls = []
+        
+        def detect(self, image):
+            calls.append(image)
+            image_size_cache.put(image, 200, 100)      # 引擎解码时记录原图尺寸
+            return [{"name": "Other_waste", "confidence": 0.9, "x1": 50, "y1": 25, "x2": 150, "y2": 75}]
+        
+        engine = _stub_engine(detect)
+        engine.cache_identity = lambda: "stub:v1"
+        engine_repo = Mock()
+        engine_repo.get_engine.return_value = engine
+        command = RunAutoLabelCmd(engine_type=EngineType.YOLO, image_paths=[str(images)],
+                                  output_dir=str(tmp_path), prefetch=0)
+        
+        def run():
+            image_size_cache.clear()    # 模拟新进程
+            cache = SqliteResultCache(str(tmp_path / "cache.sqlite"))
+            try:
+                return RunAutoLabelHandler(engine_repo, Mock(), Mock(), cache).handle(command)
+            finally:
+                cache.close()
+        
+        first = run()
+        assert (first.processed_images, first.failed_images, len(calls)) == (3, 0, 3)
+        second = run()
+        assert (second.cache_hits, second.processed_images, second.failed_images) == (3, 3, 0)
+        assert len(calls) == 3
+    
+    def test_legacy_entry_without_size_reinfers(self, tmp_path):
+        """测试未保存尺寸的旧条目在文件头无法探测时按未命中重新推理"""
+        import json
+        import sqlite3
+        import cv2
+        import numpy as np
+        from shared_kernel.utils import image_size_cache
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.infrastructure.persistence.sqlite_result_cache import SqliteResultCache
+        images = tmp_path / "images"
+        images.mkdir()
+        assert cv2.imwrite(str(images / "a.bmp"), np.zeros((100, 200, 3), dtype=np.uint8))
+        detections = [{"name": "Other_waste", "confidence": 0.9, "x1": 50, "y1": 25, "x2": 150, "y2": 75}]
+        calls = []
+        
+        def detect(self, image):
+            calls.append(image)
+            image_size_cache.put(image, 200, 100)
+            return detections
+        
+        engine = _stub_engine(detect)
+        engine.cache_identity = lambda: "stub:v1"
+        engine_repo = Mock()
+        engine_repo.get_engine.return_value = engine
+        cache = SqliteResultCache(str(tmp_path / "cache.sqlite"))
+        handler = RunAutoLabelHandler(engine_repo, Mock(), Mock(), cache)
+        command = RunAutoLabelCmd(engine_type=EngineType.YOLO, image_paths=[str(images)],
+                                  output_dir=str(tmp_path), prefetch=0)
+        handler.handle(command)
+        # 改写为旧格式（只有检测列表）
+        conn = sqlite3.connect(str(tmp_path / "cache.sqlite"))
+        conn.execute("UPDATE results SET value = ?", (json.dumps(detections),))
+        conn.commit()
+        conn.close()
+        
+        image_size_cache.clear()
+        result = handler.handle(command)
+        assert (result.processed_images, result.failed_images, result.cache_misses) == (1, 0, 1)
+        assert len(calls) == 2
+        conn = sqlite3.connect(str(tmp_path / "cache.sqlite"))
+        (key,) = conn.execute("SELECT key FROM results").fetchone()
+        conn.close()
+        assert cache.get(key).image_size == (200, 100)
+
+
+
+class TestJobJournal:
+    """测试任务日志、断点续跑与协作式取消"""
+    
+    @staticmethod
+    def _images(tmp_path, count):
+        images = tmp_path / "images"
+        images.mkdir()
+        for index in range(count):
+            (images / f"{index:02d}.jpg").write_bytes(b"x")
+        return images
+    
+    @staticmethod
+    def _engine(detect, identity="stub:v1"):
+        engine = _stub_engine(detect)
+        engine.cache_identity = lambda: identity
+        return engine
+    
+    def test_file_journal_survives_torn_line(self, tmp_path):
+        """测试记录持久化，崩溃留下的半行在读取时忽略且不与新记录拼接"""
+        from autolabel_context.infrastructure.persistence.file_job_journal import FileJobJournal
+        path = tmp_path / "out" / "journal.jsonl"
+        journal = FileJobJournal(str(path))
+        assert journal.begin("run-1") == set()
+        journal.record(["/a.jpg", "/b c.jpg"])
+        journal.close()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('"/torn')
+        
+        reopened = FileJobJournal(str(path))
+        assert reopened.begin("run-1") == {"/a.jpg", "/b c.jpg"}
+        reopened.record(["/d.jpg"])
+        reopened.close()
+        assert reopened.completed_paths() == {"/a.jpg", "/b c.jpg", "/d.jpg"}
+    
+    def test_file_journal_scope_mismatch_starts_fresh(self, tmp_path):
+        """测试运行标识不同、无标识或旧格式的日志不复用"""
+        from autolabel_context.infrastructure.persistence.file_job_journal import FileJobJournal
+        path = tmp_path / "journal.jsonl"
+        path.write_text('"/legacy.jpg"\n', encoding="utf-8")
+        journal = FileJobJournal(str(path))
+        assert journal.begin("run-1") == set()
+        journal.record(["/a.jpg"])
+        assert journal.begin("run-2") == set()
+        assert journal.completed_paths() == set()
+        journal.record(["/b.jpg"])
+        assert journal.begin(None) == set()
+        assert journal.begin(None) == set()
+        journal.close()
+    
+    def test_resume_skips_journaled_images(self, tmp_path):
+        """测试日志中已完成的图片不再推理，失败的图片不记入日志、续跑时重试"""
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.infrastructure.persistence.file_job_journal import FileJobJournal
+        images = self._images(tmp_path, 5)
+        calls = []
+        broken = {str(images / "03.jpg")}
+        
+        def detect(self, image_path):
+            calls.append(image_path)
+            if image_path in broken:
+                raise RuntimeError("unreadable")
+            return []
+        
+        engine_repo = Mock()
+        engine_repo.get_engine.return_value = self._engine(detect)
+        journal = FileJobJournal(str(tmp_path / "journal.jsonl"))
+        handler = RunAutoLabelHandler(engine_repo, Mock(), Mock(), journal=journal)
+        command = RunAutoLabelCmd(engine_type=EngineType.YOLO, image_paths=[str(images)],
+                                  output_dir=str(tmp_path), batch_size=1)
+        
+        first = handler.handle(command)
+        assert (first.processed_images, first.failed_images, first.journaled_images) == (4, 1, 0)
+        assert len(journal.completed_paths()) == 4
+        
+        calls.clear()
+        broken.clear()
+        second = handler.handle(command)
+        assert calls == [str(images / "03.jpg")]
+        assert (second.total_images, second.processed_images, second.journaled_images) == (1, 1, 4)
+        # 全部成功后日志退役
+        assert not journal.path.exists()
+    
+    def test_completed_run_retires_journal(self, tmp_path):
+        """测试成功完成的任务不再续跑：重新运行处理全部图片，包括内容已变化的图片"""
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.infrastructure.persistence.file_job_journal import FileJobJournal
+        images = self._images(tmp_path, 5)
+        calls = []
+        
+        def detect(self, image_path):
+            calls.append(image_path)
+            return []
+        
+        engine_repo = Mock()
+        engine_repo.get_engine.return_value = self._engine(detect)
+        journal = FileJobJournal(str(tmp_path / "journal.jsonl"))
+        handler = RunAutoLabelHandler(engine_repo, Mock(), Mock(), journal=journal)
+        command = RunAutoLabelCmd(engine_type=EngineType.YOLO, image_paths=[str(images)], output_dir=str(tmp_path))
+        
+        assert handler.handle(command).processed_images == 5
+        assert not journal.path.exists()
+        (images / "00.jpg").write_bytes(b"changed")
+        calls.clear()
+        rerun = handler.handle(command)
+        assert (rerun.processed_images, rerun.journaled_images) == (5, 0)
+        assert len(calls) == 5
+    
+    def test_changed_configuration_relabels(self, tmp_path):
+        """测试模型 ID、阈值或引擎标识变化后重新标注全部图片，标识不变时续跑"""
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.infrastructure.persistence.file_job_journal import FileJobJournal
+        images = self._images(tmp_path, 3)
+        calls = []
+        broken = str(images / "02.jpg")
+        
+        def detect(self, image_path):
+            calls.append(image_path)
+            if image_path == broken:
+                raise RuntimeError("unreadable")
+            return []
+        
+        # 每次运行都有一张图片失败（批量失败后逐张重试，同一图片可能调用两次），日志不退役，可观察续跑
+        engine = self._engine(detect)
+        engine_repo = Mock()
+        engine_repo.get_engine.return_value = engine
+        journal = FileJobJournal(str(tmp_path / "journal.jsonl"))
+        handler = RunAutoLabelHandler(engine_repo, Mock(), Mock(), journal=journal)
+        
+        def run(**overrides):
+            calls.clear()
+            values = dict(engine_type=EngineType.YOLO, image_paths=[str(images)], output_dir=str(tmp_path))
+            values.update(overrides)
+            return handler.handle(RunAutoLabelCmd(**values))
+        
+        run()
+        assert len(set(calls)) == 3
+        assert run().journaled_images == 2 and set(calls) == {broken}
+        assert run(model_id="v2").journaled_images == 0 and len(set(calls)) == 3
+        assert run(model_id="v2", confidence_threshold=0.3).journaled_images == 0 and len(set(calls)) == 3
+        engine.cache_identity = lambda: "stub:v2"
+        assert run(model_id="v2", confidence_threshold=0.3).journaled_images == 0 and len(set(calls)) == 3
+        # 无法确认引擎输出时不续跑
+        engine.cache_identity = lambda: None
+        run()
+        assert run().journaled_images == 0 and len(set(calls)) == 3
+    
+    def test_cancel_drains_in_flight_and_resumes(self, tmp_path):
+        """测试取消后不再提交新批次，已完成的结果写入存储与日志，重跑处理剩余图片"""
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.infrastructure.persistence.file_job_journal import FileJobJournal
+        images = self._images(tmp_path, 12)
+        calls = []
+        handler = None
+        cancel_after = [3]
+        
+        def detect(self, image_path):
+            calls.append(image_path)
+            if len(calls) == cancel_after[0]:
+                handler.cancel()
+            return []
+        
+        engine_repo = Mock()
+        engine_repo.get_engine.return_value = self._engine(detect)
+        label_store = Mock()
+        journal = FileJobJournal(str(tmp_path / "journal.jsonl"))
+        handler = RunAutoLabelHandler(engine_repo, label_store, Mock(), journal=journal)
+        command = RunAutoLabelCmd(engine_type=EngineType.YOLO, image_paths=[str(images)],
+                                  output_dir=str(tmp_path), batch_size=1, prefetch=0)
+        
+        cancelled = handler.handle(command)
+        assert cancelled.status == "cancelled"
+        assert 3 <= len(calls) < 12
+        saved = [r.image_item.path for c in label_store.save_results.call_args_list for r in c.args[0]]
+        assert sorted(saved) == sorted(calls)
+        assert journal.completed_paths() == set(calls)
+        assert cancelled.processed_images == len(calls)
+        
+        done = list(calls)
+        calls.clear()
+        cancel_after[0] = None
+        resumed = handler.handle(command)
+        assert resumed.status == "completed"
+        assert not set(calls) & set(done)
+        assert len(done) + len(calls) == 12
+        assert resumed.journaled_images == len(done)
+    
+    def test_cancel_pending_job(self):
+        """测试未启动的任务立即取消，运行中的任务只记录取消请求"""
+        pending = AutoLabelJob.create_streaming(EngineType.YOLO, iter(()), 0.5)
+        pending.request_cancel()
+        assert pending.status == JobStatus.CANCELLED
+        running = AutoLabelJob.create_streaming(EngineType.YOLO, iter(()), 0.5)
+        running.start()
+        running.request_cancel()
+        assert running.cancel_requested and running.status == JobStatus.RUNNING
+
+
 class TestAutoLabelResultDTO:
     """测试自动标注结果DTO"""
     
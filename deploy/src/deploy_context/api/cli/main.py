@@ -1,87 +1,218 @@
 """部署 CLI 入口"""
 
-import argparse
 import sys
-import os
-
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import json
+import argparse
 
-from application.command import StartRuntimeCmd
-from application.handler import StartRuntimeHandler
+from deploy_context.application.command import StartRuntimeCmd, TunePolicyCmd
+from deploy_context.application.handler import StartRuntimeHandler, TunePolicyHandler
 
 
-def main():
-    """CLI 主入口"""
+def create_parser() -> argparse.ArgumentParser:
+    """创建命令行参数解析器"""
     parser = argparse.ArgumentParser(description="Deploy Context - 垃圾分类部署系统")
-    parser.add_argument(
-        "--model", 
-        type=str, 
+    subparsers = parser.add_subparsers(dest="command", help="可用命令")
+
+    run_parser = subparsers.add_parser("run", help="启动部署运行时")
+    run_parser.add_argument(
+        "--model",
+        type=str,
         required=True,
-        help="模型路径 (.pt 或 .onnx)"
+        help="模型路径 (.pt / .onnx / .rknn)"
+    )
+    run_parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="设备配置文件 (如 rk3588，对应 config/profiles/device_rk3588.yaml)；"
+             "相机、运行时、工作线程、队列深度与稳定/冷却策略均从中读取"
     )
-    parser.add_argument(
+    run_parser.add_argument(
         "--camera",
-        type=int,
-        default=0,
-        help="相机 ID (默认: 0)"
+        type=str,
+        default=None,
+        help="相机 ID 或设备路径 (默认: 配置文件或 0)"
     )
-    parser.add_argument(
+    run_parser.add_argument(
         "--width",
         type=int,
-        default=1280,
-        help="相机宽度 (默认: 1280)"
+        default=None,
+        help="相机宽度 (默认: 配置文件或 1280)"
     )
-    parser.add_argument(
+    run_parser.add_argument(
         "--height",
         type=int,
-        default=720,
-        help="相机高度 (默认: 720)"
+        default=None,
+        help="相机高度 (默认: 配置文件或 720)"
     )
-    parser.add_argument(
+    run_parser.add_argument(
         "--serial",
         type=str,
         default=None,
-        help="串口设备路径 (如 /dev/ttyUSB0)"
+        help="串口设备路径 (如 /dev/ttyUSB0，默认: 配置文件)"
     )
-    parser.add_argument(
+    run_parser.add_argument(
         "--baudrate",
         type=int,
-        default=115200,
-        help="串口波特率 (默认: 115200)"
+        default=None,
+        help="串口波特率 (默认: 配置文件或 115200)"
+    )
+    run_parser.add_argument(
+        "--runtime",
+        type=str,
+        default=None,
+        choices=["rknn", "onnx", "pytorch", "auto"],
+        help="推理运行时；auto 在启动时测量可用后端与线程数并按主机/模型缓存结果 (默认: 配置文件或 pytorch)"
+    )
+    run_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="推理工作线程数 (默认: 配置文件中的 NPU 核心数或 1)"
     )
-    parser.add_argument(
+    run_parser.add_argument(
+        "--no-pinning",
+        action="store_true",
+        help="忽略配置文件中的阶段 CPU 亲和性与优先级设置（用于对比延迟抖动）"
+    )
+    run_parser.add_argument(
         "--threshold",
         type=float,
         default=0.5,
         help="置信度阈值 (默认: 0.5)"
     )
-    parser.add_argument(
+    run_parser.add_argument(
         "--protocol",
         type=str,
         default="default",
         help="协议类型 (default/stm32/arduino)"
     )
-    
-    args = parser.parse_args()
-    
+    run_parser.add_argument(
+        "--latency-budget",
+        type=float,
+        default=None,
+        help="端到端延迟预算（毫秒），超出时按降级阶梯自动降档 (默认: 不启用)"
+    )
+    run_parser.add_argument(
+        "--fallback-model",
+        type=str,
+        default=None,
+        help="降级阶梯最后一档使用的小模型路径"
+    )
+    run_parser.add_argument(
+        "--crop-classifier",
+        type=str,
+        default=None,
+        help="第二阶段裁剪分类模型路径，目标首次稳定时分类一次 (默认: 配置文件或不启用)"
+    )
+    run_parser.add_argument(
+        "--shadow-model",
+        type=str,
+        default=None,
+        help="影子评估的候选模型路径，在抽样帧上低优先级运行并统计与主模型的分歧 (默认: 配置文件或不启用)"
+    )
+    run_parser.add_argument(
+        "--hard-examples",
+        type=str,
+        default=None,
+        help="难例采集目录，保存低置信度/类别翻转/跟踪断裂的帧及其检测结果 (默认: 配置文件或不启用)"
+    )
+    run_parser.add_argument(
+        "--preview-port",
+        type=int,
+        default=None,
+        help="MJPEG 预览端口，浏览器访问 http://<设备>:<端口>/ (默认: 配置文件或不启用)"
+    )
+    run_parser.add_argument(
+        "--record-dir",
+        type=str,
+        default=None,
+        help="检测日志目录（内存映射列文件，默认: 不记录）"
+    )
+
+    tune_parser = subparsers.add_parser("tune", help="在记录的检测流上离线调优稳定/冷却策略")
+    tune_parser.add_argument(
+        "recordings",
+        nargs="+",
+        help="检测日志目录（每个目录下需有 ground_truth.json）"
+    )
+    tune_parser.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2,...",
+        help="参数候选值，可重复 (stability_threshold_ms / detection_reset_ms / "
+             "position_tolerance / min_detection_count / evidence_threshold / cooldown_ms)"
+    )
+    tune_parser.add_argument(
+        "--decision-rule",
+        choices=["fixed", "sprt"],
+        default="fixed",
+        help="稳定判定规则；sprt 时同时回放 fixed 规则并报告平均决策延迟的减少 (默认: fixed)"
+    )
+    tune_parser.add_argument(
+        "--samples",
+        type=int,
+        default=None,
+        help="随机搜索的组合数 (默认: 遍历全部网格)"
+    )
+    tune_parser.add_argument("--seed", type=int, default=0, help="随机种子 (默认: 0)")
+    tune_parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="进程数 (默认: CPU 核心数)"
+    )
+    tune_parser.add_argument("--top", type=int, default=10, help="输出的最优组合数 (默认: 10)")
+    tune_parser.add_argument("--output", type=str, default=None, help="结果 JSON 输出路径")
+
+    return parser
+
+
+def cmd_run(args) -> int:
+    """执行 run 命令"""
+    camera = args.camera
+    if camera is not None and camera.isdigit():
+        camera = int(camera)
+
     # 创建命令
     cmd = StartRuntimeCmd(
         model_path=args.model,
-        camera_id=args.camera,
+        camera_id=camera,
         camera_width=args.width,
         camera_height=args.height,
         serial_port=args.serial,
         serial_baudrate=args.baudrate,
         confidence_threshold=args.threshold,
-        protocol=args.protocol
+        protocol=args.protocol,
+        device_profile=args.profile,
+        runtime=args.runtime,
+        workers=args.workers,
+        pin_stages=not args.no_pinning,
+        latency_budget_ms=args.latency_budget,
+        fallback_model_path=args.fallback_model,
+        record_dir=args.record_dir,
+        preview_port=args.preview_port,
+        crop_classifier_path=args.crop_classifier,
+        shadow_model_path=args.shadow_model,
+        hard_example_dir=args.hard_examples
     )
-    
+
     # 处理命令
     handler = StartRuntimeHandler()
     result = handler.handle(cmd)
-    
+
     print(f"Session ID: {result.session_id}")
     print(f"Status: {result.status}")
+    if result.device_profile:
+        print(f"Device Profile: {result.device_profile}")
+    print(f"Runtime: {result.runtime}" + (f" ({result.runtime_threads} threads)" if result.runtime_threads else ""))
+    if result.backend_probe:
+        source = "cache" if result.backend_probe["from_cache"] else "probe"
+        print(f"Backend Probe ({source}): {result.backend_probe['results']}")
+    print(f"Workers: {result.workers}")
+    if result.preview_port:
+        print(f"Preview: http://0.0.0.0:{result.preview_port}/ (metrics: /metrics)")
     print(f"Running: {result.is_running}")
     print(f"Model Loaded: {result.model_loaded}")
     print(f"Camera Opened: {result.camera_opened}")
@@ -89,15 +220,94 @@ def main():
     print(f"Total Frames: {result.total_frames}")
     print(f"Total Detections: {result.total_detections}")
     print(f"Serial Packets Sent: {result.serial_packets_sent}")
-    
+    if args.latency_budget:
+        print(f"Degradation Level: {result.degradation_level}")
+    if result.temperature_c is not None:
+        print(f"Temperature: {result.temperature_c:.1f} C (thermal level {result.thermal_level})")
+    if result.error:
+        print(f"Error: {result.error}")
+        handler.stop()
+        return 1
+
     try:
         input("\n按 Enter 停止运行时...")
     except KeyboardInterrupt:
         pass
     finally:
+        # 报告各阶段延迟抖动（可配合 --no-pinning 对比）
+        status = handler.get_status()
+        if status.pinned_stages:
+            print(f"Pinned Stages: {status.pinned_stages}")
+        if status.shadow:
+            print(f"Shadow: evaluated {status.shadow['evaluated']}, "
+                  f"disagreement {status.shadow['disagreement_rate']:.1%}, "
+                  f"mean IoU {status.shadow['mean_iou']}")
+        if status.resources:
+            resources = status.resources
+            print(f"Resources: CPU {resources['process_cpu_percent']}%, RSS {resources['rss_mb']} MB, "
+                  f"cores {resources['core_load_percent']}, NPU {resources['npu_load_percent']}, "
+                  f"camera {resources['camera_fps']} fps")
+        if status.hard_examples:
+            print(f"Hard Examples: written {status.hard_examples['written']}, "
+                  f"reasons {status.hard_examples['reasons']}")
+        for stage, summary in status.stage_latency.items():
+            if summary.get("count"):
+                print(f"{stage}: p50 {summary['p50_ms']} ms, p99 {summary['p99_ms']} ms, "
+                      f"jitter {summary['jitter_ms']} ms")
         handler.stop()
         print("\n运行时已停止")
+    return 0
+
+
+def cmd_tune(args) -> int:
+    """执行 tune 命令"""
+    grid = {}
+    for entry in args.grid:
+        name, _, values = entry.partition("=")
+        grid[name.strip()] = [float(v) for v in values.split(",") if v.strip()]
+
+    result = TunePolicyHandler().handle(TunePolicyCmd(
+        recordings=args.recordings,
+        grid=grid,
+        samples=args.samples,
+        seed=args.seed,
+        processes=args.processes,
+        top=args.top,
+        decision_rule=args.decision_rule
+    ))
+    if result.error:
+        print(f"Error: {result.error}")
+        return 1
+
+    print(f"Configurations: {result.configurations}, Streams: {result.streams}, "
+          f"Frames: {result.frames}, Elapsed: {result.elapsed_s} s")
+    for rank, entry in enumerate(result.results, 1):
+        params = ", ".join(f"{k}={v}" for k, v in entry["params"].items())
+        print(f"{rank:3d}. error {entry['count_error']} ({entry['relative_error']:.1%}), "
+              f"latency mean {entry['latency_mean_ms']} ms p90 {entry['latency_p90_ms']} ms | {params}")
+        if "latency_reduction_ms" in entry:
+            print(f"     vs fixed: error {entry['baseline_count_error']}, "
+                  f"latency mean {entry['baseline_latency_mean_ms']} ms "
+                  f"(-{entry['latency_reduction_ms']} ms)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result.results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+def main() -> int:
+    """CLI 主入口"""
+    parser = create_parser()
+    args = parser.parse_args()
+
+    if args.command == "run":
+        return cmd_run(args)
+    if args.command == "tune":
+        return cmd_tune(args)
+
+    parser.print_help()
+    return 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
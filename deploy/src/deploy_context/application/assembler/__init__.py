@@ -0,0 +1,5 @@
+"""汇编器模块导出"""
+
+from .deploy_assembler import DeployAssembler
+
+__all__ = ["DeployAssembler"]
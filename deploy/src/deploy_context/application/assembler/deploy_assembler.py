@@ -1,7 +1,7 @@
 """部署汇编器"""
 
 from ...domain.model import SortingSession
-from .dto import DeployStatusDTO, DetectionResultDTO
+from ..dto import DeployStatusDTO, DetectionResultDTO
 
 
 class DeployAssembler:
@@ -0,0 +1,6 @@
+"""命令模块导出"""
+
+from .start_runtime_cmd import StartRuntimeCmd
+from .tune_policy_cmd import TunePolicyCmd
+
+__all__ = ["StartRuntimeCmd", "TunePolicyCmd"]
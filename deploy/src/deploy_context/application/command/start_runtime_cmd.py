@@ -1,18 +1,29 @@
 """启动运行时命令"""
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Union
 
 
 @dataclass
 class StartRuntimeCmd:
     """启动运行时命令"""
     model_path: str
-    camera_id: int = 0
-    camera_width: int = 1280
-    camera_height: int = 720
+    # 以下相机/串口/运行时参数为 None 时取设备配置文件（未指定配置文件时取默认值）
+    camera_id: Optional[Union[int, str]] = None
+    camera_width: Optional[int] = None
+    camera_height: Optional[int] = None
     serial_port: Optional[str] = None
-    serial_baudrate: int = 115200
+    serial_baudrate: Optional[int] = None
     confidence_threshold: float = 0.5
     protocol: str = "default"
-    device_profile: str = "rk3588"
+    device_profile: Optional[str] = None         # 设备配置文件名，如 rk3588
+    runtime: Optional[str] = None                # rknn / onnx / pytorch
+    workers: Optional[int] = None                # 推理工作线程数
+    pin_stages: bool = True                      # 按配置文件绑定阶段 CPU 与优先级
+    preview_port: Optional[int] = None           # MJPEG 预览端口
+    crop_classifier_path: Optional[str] = None   # 第二阶段裁剪分类模型
+    shadow_model_path: Optional[str] = None      # 影子评估的候选模型
+    hard_example_dir: Optional[str] = None       # 难例采集目录
+    latency_budget_ms: Optional[float] = None    # 端到端延迟预算，None 表示不启用调控
+    fallback_model_path: Optional[str] = None    # 降级阶梯最后一档使用的小模型
+    record_dir: Optional[str] = None             # 检测日志目录，None 表示不记录
@@ -0,0 +1,22 @@
+"""策略调参命令"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class TunePolicyCmd:
+    """策略调参命令
+
+    recordings 为检测日志目录，每个目录下需有 ground_truth.json:
+    {"counts": {"Kitchen_waste": 12, "Recyclable_waste": 30, ...}}
+    """
+    recordings: List[str]
+    # 参数名 -> 候选值；未给出的参数取 StabilityPolicy/CooldownPolicy 的默认值
+    grid: Dict[str, List[float]] = field(default_factory=dict)
+    samples: Optional[int] = None      # 随机搜索的组合数，None 表示遍历全部网格
+    seed: int = 0
+    processes: Optional[int] = None    # 进程数，None 表示 CPU 核心数
+    top: int = 10                      # 结果中保留的最优组合数
+    # 稳定判定规则（fixed / sprt）；sprt 时结果附带同参数 fixed 规则的决策延迟对比
+    decision_rule: str = "fixed"
@@ -1,5 +1,5 @@
 """DTO 模块导出"""
 
-from .deploy_dto import DeployStatusDTO, DetectionResultDTO
+from .deploy_dto import DeployStatusDTO, DetectionResultDTO, PolicyTuningDTO
 
-__all__ = ["DeployStatusDTO", "DetectionResultDTO"]
+__all__ = ["DeployStatusDTO", "DetectionResultDTO", "PolicyTuningDTO"]
@@ -18,7 +18,31 @@ class DeployStatusDTO:
     total_detections: int = 0
     serial_packets_sent: int = 0
     counter: Dict[str, int] = field(default_factory=dict)
+    # 通道名 -> 通道统计（未配置通道时为空；上面的计数为各通道之和）
+    lanes: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    hard_examples: Dict[str, Any] = field(default_factory=dict)   # 难例采集统计（未启用时为空）
     timestamp: datetime = field(default_factory=datetime.utcnow)
+    error: Optional[str] = None
+    device_profile: Optional[str] = None
+    workers: int = 1
+    runtime: str = ""
+    runtime_threads: Optional[int] = None
+    backend_probe: Dict[str, Any] = field(default_factory=dict)   # auto 探测结果
+    preview_port: Optional[int] = None
+    # 阶段延迟统计（阶段名 -> p50/p99/抖动等）与 CPU 绑定结果
+    stage_latency: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    pinned_stages: Dict[str, bool] = field(default_factory=dict)     # 线程名 -> 调度参数是否应用成功
+    # 延迟预算调控
+    degradation_level: int = 0
+    latency_ms: float = 0.0
+    governor_transitions: List[Dict[str, Any]] = field(default_factory=list)
+    # 影子模型分歧统计（未启用时为空）
+    shadow: Dict[str, Any] = field(default_factory=dict)
+    # 温控
+    thermal_level: int = 0
+    temperature_c: Optional[float] = None
+    # 资源采样：进程 CPU、RSS、各核负载、NPU 负载、相机帧率（未启用时为空）
+    resources: Dict[str, Any] = field(default_factory=dict)
 
 
 @dataclass
@@ -32,3 +56,17 @@ class DetectionResultDTO:
     y_normalized: Optional[float] = None
     serial_packet_sent: bool = False
     packet_data: Optional[List[int]] = None
+
+
+@dataclass
+class PolicyTuningDTO:
+    """策略调参结果 DTO"""
+    configurations: int
+    streams: int
+    frames: int
+    elapsed_s: float
+    # 按计数误差、决策延迟排序的最优组合：params/count_error/total_error/
+    # relative_error/packets/latency_mean_ms/latency_p90_ms；
+    # sprt 规则另有 baseline_count_error/baseline_latency_mean_ms/latency_reduction_ms（相同参数的 fixed 规则）
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
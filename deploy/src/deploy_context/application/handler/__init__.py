@@ -0,0 +1,6 @@
+"""处理器模块导出"""
+
+from .start_runtime_handler import StartRuntimeHandler
+from .tune_policy_handler import TunePolicyHandler
+
+__all__ = ["StartRuntimeHandler", "TunePolicyHandler"]
@@ -1,19 +1,50 @@
 """启动运行时处理器"""
 
-from typing import Optional
+import logging
+import queue
+from dataclasses import asdict, dataclass
+from typing import Optional, List, Dict
 import threading
 import time
+from datetime import datetime, timedelta
 import cv2
+import numpy as np
 
 from shared_kernel.config.loader import ConfigLoader
 
-from ...domain.model import SortingSession, SessionStatus, CooldownPolicy, StabilityPolicy
+from ...domain.model import (
+    SortingSession, SessionStatus, LatencyBudgetPolicy, DegradationLevel, LaneDefinition, DetectionBatch
+)
 from ...domain.model.entity import DetectionFrame
-from ...domain.service import PacketEncoder
-from ...infrastructure import YoloRuntime, CameraOpencv, SerialPyserial
+from ...domain.repository import IInferenceRuntime, ICropClassifier
+from ...domain.service import (
+    PacketEncoder, LatencyGovernor, GovernorTransition, LaneRouter, HardExampleSampler
+)
+from ...infrastructure import (
+    YoloRuntime, CameraOpencv, SerialPyserial, MotionGate, DetectionRecorder, DecisionFlag,
+    PipelineBuilder, PipelineSettings, LatencyStats, apply_stage_scheduling, CompressedFrame,
+    MjpegCameraOpencv, MjpegPreviewServer, PreviewFrame, ThermalMonitor, ThermalReading,
+    ShadowRunner, BackendChoice, HardExampleWriter, ResourceSampler
+)
 
-from .dto import DeployStatusDTO, DetectionResultDTO
-from .command import StartRuntimeCmd
+from ..dto import DeployStatusDTO, DetectionResultDTO
+from ..command.start_runtime_cmd import StartRuntimeCmd
+
+logger = logging.getLogger(__name__)
+
+# 状态中上报延迟统计的阶段（end_to_end 从开始读帧到决策完成，包含采集与排队等待；
+# output 从开始读帧到串口写入完成，即数据包实际发出时该帧的完整延迟）
+_LATENCY_STAGES = ("capture", "decode", "inference", "decision", "serial", "end_to_end", "output")
+
+
+@dataclass
+class SortingLane:
+    """分拣通道：画面中的一个 ROI，独立的会话与串口"""
+    definition: LaneDefinition
+    session: SortingSession
+    serial: Optional[SerialPyserial] = None
+    serial_queue: Optional[queue.Queue] = None
+    serial_latency_ms: float = 0.0              # 决策到串口写入完成的滑动平均
 
 
 class StartRuntimeHandler:
@@ -27,35 +58,134 @@ class StartRuntimeHandler:
         config_loader: Optional[ConfigLoader] = None,
     ):
         self._config_loader = config_loader or ConfigLoader()
-        self._runtime: Optional[YoloRuntime] = None
+        self._settings = PipelineSettings()
+        self._runtime: Optional[IInferenceRuntime] = None
+        self._worker_runtimes: List[IInferenceRuntime] = []
+        self._fallback_runtime: Optional[IInferenceRuntime] = None
+        self._crop_classifier: Optional[ICropClassifier] = None
+        self._shadow: Optional[ShadowRunner] = None
+        self._backend_choice: Optional[BackendChoice] = None
+        self._active_runtime: Optional[IInferenceRuntime] = None
+        self._governor: Optional[LatencyGovernor] = None
+        self._thermal_monitor: Optional[ThermalMonitor] = None
+        self._thermal_level = 0
+        self._resource_sampler: Optional[ResourceSampler] = None
+        self._motion_gate = MotionGate()
+        self._recorder: Optional[DetectionRecorder] = None
+        self._hard_example_sampler: Optional[HardExampleSampler] = None
+        self._hard_example_writer: Optional[HardExampleWriter] = None
+        self._confidence_threshold = 0.0               # 送入会话的检测的最低置信度
+        self._frame_seq = 0
+        self._last_decided_seq = 0
+        self._decided_frames = 0                       # 会话已处理的帧数（检测日志的帧序号）
+        self._inference_interval_s = 0.0
+        self._frame_queue: Optional[queue.Queue] = None
+        self._result_queue: Optional[queue.Queue] = None
+        self._serial_queue: Optional[queue.Queue] = None
+        self._stage_stats: Dict[str, LatencyStats] = {name: LatencyStats() for name in _LATENCY_STAGES}
+        self._pinned_stages: Dict[str, bool] = {}      # 线程名 -> 调度参数是否全部应用成功
+        self._serial_latency_ms = 0.0                  # 决策到串口写入完成的滑动平均
+        self._preview: Optional[MjpegPreviewServer] = None
+        self._pipeline_threads: List[threading.Thread] = []
         self._camera: Optional[CameraOpencv] = None
         self._serial: Optional[SerialPyserial] = None
         self._session: Optional[SortingSession] = None
+        self._lanes: List[SortingLane] = []
+        self._lane_router: Optional[LaneRouter] = None
         self._packet_encoder: Optional[PacketEncoder] = None
         self._is_running = False
         self._processing_thread: Optional[threading.Thread] = None
     
     def handle(self, command: StartRuntimeCmd) -> DeployStatusDTO:
         """处理启动运行时命令"""
+        builder = PipelineBuilder(self._config_loader)
+        # runtime=auto 时按微基准测试结果（或缓存）确定后端
+        settings, self._backend_choice = builder.resolve_backend(
+            self._resolve_settings(command), command.model_path, command.confidence_threshold
+        )
+        self._settings = settings
+        
         # 加载协议映射
         self._packet_encoder = PacketEncoder(self._config_loader)
         self._packet_encoder.load_protocol_mapping(command.protocol)
         
-        # 创建会话
+        # 第二阶段裁剪分类器（可选）
+        self._crop_classifier = builder.build_crop_classifier(settings)
+        if self._crop_classifier:
+            self._crop_classifier.load_model(settings.crop_classifier_model)
+        
+        # 创建会话（配置了通道时每个通道一个会话，共用一次推理）
         class_mapping = self._config_loader.get_deploy_class_map(command.protocol)
-        self._session = SortingSession.create(
+        create_session = lambda: SortingSession.create(
             class_mapping=class_mapping,
-            cooldown_policy=CooldownPolicy(),
-            stability_policy=StabilityPolicy()
+            cooldown_policy=settings.cooldown_policy,
+            stability_policy=settings.stability_policy,
+            compensation_policy=settings.compensation_policy,
+            crop_classifier=self._crop_classifier,
+            crop_policy=settings.crop_policy
         )
+        if settings.lanes:
+            self._lanes = [SortingLane(lane, create_session()) for lane in settings.lanes]
+            self._lane_router = LaneRouter(settings.lanes)
+            self._session = self._lanes[0].session
+        else:
+            self._session = create_session()
         
-        # 初始化运行时
-        self._runtime = YoloRuntime(confidence_threshold=command.confidence_threshold)
-        self._runtime.load_model(command.model_path)
+        # 初始化运行时（每个工作线程一个实例）；启用难例采集时运行时阈值可能低于运行阈值
+        self._confidence_threshold = command.confidence_threshold
+        runtime_threshold = settings.runtime_confidence_threshold(command.confidence_threshold)
+        self._worker_runtimes = builder.build_runtimes(settings, runtime_threshold)
+        for runtime in self._worker_runtimes:
+            runtime.load_model(command.model_path)
+        self._runtime = self._worker_runtimes[0]
+        self._active_runtime = self._runtime
+        
+        # 影子模型（可选）
+        self._shadow = builder.build_shadow_runner(settings, command.confidence_threshold)
+        if self._shadow:
+            self._shadow.runtime.load_model(settings.shadow_model)
+        self._inference_interval_s = settings.inference_interval_ms / 1000.0
+        
+        # 延迟预算调控（可选）
+        if command.latency_budget_ms:
+            policy = LatencyBudgetPolicy(budget_ms=command.latency_budget_ms)
+            if command.fallback_model_path and settings.workers == 1:
+                # 小模型提前加载，降档时只需切换引用
+                self._fallback_runtime = YoloRuntime(
+                    confidence_threshold=runtime_threshold,
+                    input_size=settings.input_size
+                )
+                self._fallback_runtime.load_model(command.fallback_model_path)
+            else:
+                if command.fallback_model_path:
+                    logger.warning("Fallback model is only supported with a single worker; ignored")
+                policy = policy.without_fallback_model()
+            self._governor = LatencyGovernor(policy)
+            self._apply_degradation_level(self._governor.current)
+        
+        # 温控（可选）：温控档位作为降级阶梯的下限，并按档位拉长推理间隔
+        if settings.thermal_policy.enabled:
+            if self._governor is None:
+                # 未设延迟预算时预算视为无穷大：从不因延迟降档，温控下限解除后逐档恢复
+                self._governor = LatencyGovernor(
+                    LatencyBudgetPolicy(budget_ms=float("inf")).without_fallback_model()
+                )
+            self._thermal_monitor = builder.build_thermal_monitor(
+                settings, self._governor.policy.max_level, self._on_thermal_level
+            )
+        
+        # 检测记录（可选）
+        if command.record_dir:
+            self._recorder = DetectionRecorder(command.record_dir)
+        
+        # 难例采集（可选）
+        self._hard_example_writer = builder.build_hard_example_writer(settings)
+        if self._hard_example_writer:
+            self._hard_example_sampler = HardExampleSampler(settings.hard_example_policy)
         
         # 打开相机
-        self._camera = CameraOpencv()
-        if not self._camera.open(command.camera_id, command.camera_width, command.camera_height):
+        self._camera = builder.build_camera(settings)
+        if not self._camera.open(settings.camera_index, settings.camera_width, settings.camera_height):
             return DeployStatusDTO(
                 session_id=self._session.id,
                 status="error",
@@ -66,10 +196,27 @@ class StartRuntimeHandler:
                 error="Failed to open camera"
             )
         
-        # 打开串口
-        if command.serial_port:
-            self._serial = SerialPyserial()
-            if not self._serial.open(command.serial_port, command.serial_baudrate):
+        # 打开串口（通道模式下每个通道各自的串口）
+        for lane in self._lanes:
+            lane.serial = builder.build_lane_serial(lane.definition)
+            if lane.serial and not lane.serial.open(
+                lane.definition.serial_port,
+                lane.definition.serial_baudrate or settings.serial_baudrate,
+                settings.serial_timeout
+            ):
+                return DeployStatusDTO(
+                    session_id=self._session.id,
+                    status="error",
+                    is_running=False,
+                    model_loaded=True,
+                    camera_opened=True,
+                    serial_connected=False,
+                    error=f"Failed to open serial port for lane {lane.definition.name}"
+                )
+        self._serial = None if self._lanes else builder.build_serial(settings)
+        if self._serial:
+            if not self._serial.open(settings.serial_port, settings.serial_baudrate,
+                                     settings.serial_timeout):
                 return DeployStatusDTO(
                     session_id=self._session.id,
                     status="error",
@@ -82,52 +229,467 @@ class StartRuntimeHandler:
         
         # 初始化会话
         width, height = self._camera.get_resolution()
-        self._session.initialize(width, height)
-        self._session.start()
+        for session in self._sessions():
+            session.initialize(width, height)
+            session.start()
         self._is_running = True
         
-        # 启动处理线程
-        self._processing_thread = threading.Thread(target=self._process_frames)
-        self._processing_thread.daemon = True
-        self._processing_thread.start()
+        # 预览服务（可选，无订阅者时不做任何标注与编码）
+        self._preview = builder.build_preview(settings)
+        if self._preview:
+            self._preview.set_status_provider(lambda: asdict(self._get_status()))
+            self._preview.start()
+        
+        if self._thermal_monitor:
+            self._thermal_monitor.start()
+        
+        # 资源采样（低频）：相机帧率取采集阶段的累计帧数
+        self._resource_sampler = builder.build_resource_sampler(
+            settings, frame_counter=lambda: self._stage_stats["capture"].count
+        )
+        if self._resource_sampler:
+            self._resource_sampler.start()
+        
+        if self._shadow:
+            self._shadow.start()
+        
+        if self._hard_example_writer:
+            self._hard_example_writer.start()
+        
+        # 启动处理线程：单工作线程时在一个线程内顺序处理，否则按阶段拆分
+        if settings.workers == 1:
+            self._processing_thread = threading.Thread(target=self._process_frames, name="inference-0")
+            self._processing_thread.daemon = True
+            self._processing_thread.start()
+        else:
+            self._start_staged_pipeline()
         
         return self._get_status()
     
+    def _resolve_settings(self, command: StartRuntimeCmd) -> PipelineSettings:
+        """确定管线参数：设备配置文件为基础，命令中显式给出的参数优先"""
+        if command.device_profile:
+            settings = PipelineBuilder(self._config_loader).load_settings(command.device_profile)
+        else:
+            settings = PipelineSettings()
+        return settings.override(
+            camera_index=command.camera_id,
+            camera_width=command.camera_width,
+            camera_height=command.camera_height,
+            serial_port=command.serial_port,
+            serial_baudrate=command.serial_baudrate,
+            runtime=command.runtime,
+            workers=command.workers,
+            preview_port=command.preview_port,
+            crop_classifier_model=command.crop_classifier_path,
+            shadow_model=command.shadow_model_path,
+            hard_example_dir=command.hard_example_dir,
+            stage_scheduling=None if command.pin_stages else {},
+        )
+    
+    def _enter_stage(self, stage: str) -> None:
+        """在阶段线程启动时应用该阶段的 CPU 亲和性与优先级
+        
+        调度参数只作用于调用线程，同一阶段的每个线程（多个推理工作线程、
+        每个通道的串口线程）都要各自应用；状态按线程名分别上报
+        """
+        scheduling = self._settings.stage_scheduling.get(stage)
+        if scheduling:
+            thread_name = threading.current_thread().name
+            self._pinned_stages[thread_name] = apply_stage_scheduling(thread_name, scheduling)
+    
     def _process_frames(self) -> None:
-        """处理相机帧"""
+        """处理相机帧（单工作线程）
+
+        MJPEG 相机同样保留压缩帧：推理使用降采样解码，裁剪分类按需全分辨率解码
+        """
+        self._enter_stage("inference")
+        stats = self._stage_stats
+        compressed = isinstance(self._camera, MjpegCameraOpencv)
+        last_infer = 0.0
         while self._is_running and self._camera.is_opened():
-            frame = self._camera.read()
+            read_start = time.perf_counter()
+            frame = self._camera.read_compressed() if compressed else self._camera.read()
             if frame is None:
                 continue
+            frame_start = time.perf_counter()
+            stats["capture"].add((frame_start - read_start) * 1000)
             
-            # 执行推理
-            detections = self._runtime.infer(frame)
+            # 推理间隔：相机持续读帧保持缓冲区最新，但按间隔送入推理
+            if self._inference_interval_s and frame_start - last_infer < self._inference_interval_s:
+                continue
             
-            # 创建检测帧
-            if detections:
-                detection = detections[0]
-                detection_frame = DetectionFrame(
-                    frame_id=str(time.time()),
-                    image_width=frame.shape[1],
-                    image_height=frame.shape[0],
-                    detected_category=detection.category,
-                    confidence=detection.confidence.value,
-                    x_normalized=detection.bounding_box.x_center,
-                    y_normalized=detection.bounding_box.y_center
-                )
-            else:
-                detection_frame = DetectionFrame(
-                    frame_id=str(time.time()),
-                    image_width=frame.shape[1],
-                    image_height=frame.shape[0]
-                )
+            # 运动门控：画面基本不变时跳过推理
+            if not self._should_infer(frame):
+                continue
+            last_infer = frame_start
             
-            # 处理帧
-            packet = self._session.process_frame(detection_frame)
+            # 执行推理
+            image = self._decode(frame)
+            if image is None:
+                continue
+            infer_start = time.perf_counter()
+            detections = self._infer(self._active_runtime, image)
+            stats["inference"].add((time.perf_counter() - infer_start) * 1000)
             
-            # 发送串口数据
-            if packet and self._serial:
-                self._serial.write_packet(packet)
+            # 端到端延迟从开始读帧算起，包含采集耗时
+            self._frame_seq += 1
+            self._decide(self._frame_seq, frame, detections, read_start)
+    
+    def _start_staged_pipeline(self) -> None:
+        """启动分阶段管线：采集 -> 推理（多个工作线程）-> 决策 -> 串口"""
+        self._frame_queue = queue.Queue(maxsize=self._settings.frame_queue_size)
+        self._result_queue = queue.Queue(maxsize=self._settings.max_queue_size)
+        self._pipeline_threads = [threading.Thread(target=self._capture_loop, name="capture")]
+        for index, runtime in enumerate(self._worker_runtimes):
+            self._pipeline_threads.append(threading.Thread(
+                target=self._inference_loop, args=(runtime,), name=f"inference-{index}"
+            ))
+        self._pipeline_threads.append(threading.Thread(target=self._decision_loop, name="decision"))
+        queue_size = self._settings.cooldown_policy.max_queue_size
+        if self._serial:
+            self._serial_queue = queue.Queue(maxsize=queue_size)
+            self._pipeline_threads.append(threading.Thread(target=self._serial_loop, name="serial"))
+        for lane in self._lanes:
+            if lane.serial:
+                lane.serial_queue = queue.Queue(maxsize=queue_size)
+                self._pipeline_threads.append(threading.Thread(
+                    target=self._serial_loop, args=(lane,), name=f"serial-{lane.definition.name}"
+                ))
+        for thread in self._pipeline_threads:
+            thread.daemon = True
+            thread.start()
+    
+    def _capture_loop(self) -> None:
+        """采集阶段：读帧、按间隔与运动门控筛选后送入帧队列
+
+        MJPEG 相机只取压缩数据，解码推迟到推理线程；运动门控使用
+        1/8 灰度解码，开销远小于完整解码
+        """
+        self._enter_stage("capture")
+        stats = self._stage_stats["capture"]
+        compressed = isinstance(self._camera, MjpegCameraOpencv)
+        last_infer = 0.0
+        while self._is_running and self._camera.is_opened():
+            read_start = time.perf_counter()
+            frame = self._camera.read_compressed() if compressed else self._camera.read()
+            if frame is None:
+                continue
+            frame_start = time.perf_counter()
+            stats.add((frame_start - read_start) * 1000)
+            if self._inference_interval_s and frame_start - last_infer < self._inference_interval_s:
+                continue
+            if not self._should_infer(frame):
+                continue
+            last_infer = frame_start
+            self._frame_seq += 1
+            # 帧以采集时刻（开始读帧）为起点，端到端延迟包含采集与排队等待
+            self._put_latest(self._frame_queue, (self._frame_seq, frame, read_start))
+    
+    def _inference_loop(self, runtime: IInferenceRuntime) -> None:
+        """推理阶段：每个工作线程独占一个运行时实例，压缩帧在此按需解码"""
+        self._enter_stage("inference")
+        stats = self._stage_stats["inference"]
+        while self._is_running:
+            try:
+                frame_seq, frame, captured = self._frame_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            image = self._decode(frame)
+            if image is None:
+                continue
+            infer_start = time.perf_counter()
+            detections = self._infer(runtime, image)
+            stats.add((time.perf_counter() - infer_start) * 1000)
+            # 携带原帧，需要裁剪时再做全分辨率解码
+            self._put_latest(self._result_queue, (frame_seq, frame, detections, captured))
+    
+    def _should_infer(self, frame) -> bool:
+        """运动门控；压缩帧使用 1/8 灰度解码，开销远小于完整解码"""
+        if self._motion_gate.threshold <= 0.0:
+            return True
+        preview = frame.decode_preview() if isinstance(frame, CompressedFrame) else frame
+        return self._motion_gate.should_infer(preview)
+    
+    def _decode(self, frame):
+        """推理用图像：压缩帧按 decode_scale 降采样解码并记录解码耗时"""
+        if not isinstance(frame, CompressedFrame):
+            return frame
+        decode_start = time.perf_counter()
+        image = frame.decode(self._settings.decode_scale)
+        self._stage_stats["decode"].add((time.perf_counter() - decode_start) * 1000)
+        return image
+    
+    def _decision_loop(self) -> None:
+        """决策阶段：单线程驱动会话，保证会话状态按帧序更新"""
+        self._enter_stage("decision")
+        while self._is_running:
+            try:
+                frame_seq, frame, detections, captured = self._result_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            # 乱序完成的旧帧直接丢弃，避免跟踪状态回退
+            if frame_seq <= self._last_decided_seq:
+                continue
+            self._last_decided_seq = frame_seq
+            self._decide(frame_seq, frame, detections, captured)
+    
+    def _serial_loop(self, lane: Optional[SortingLane] = None) -> None:
+        """串口阶段：串口写入可能阻塞到 write_timeout，不占用决策线程（每个通道一个线程）"""
+        self._enter_stage("serial")
+        serial = lane.serial if lane else self._serial
+        serial_queue = lane.serial_queue if lane else self._serial_queue
+        while self._is_running:
+            try:
+                packet, captured, decided = serial_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self._write_packet(serial, packet, captured, decided, lane)
+    
+    def _write_packet(
+        self, serial, packet, captured: float, decided: float, lane: Optional[SortingLane] = None
+    ) -> None:
+        """写入数据包并记录输出延迟
+        
+        写入完成时刻减去帧的采集时刻为该帧的完整输出延迟；其中决策之后的部分
+        （串口队列等待与写入阻塞）以指数滑动平均更新会话的输出延迟，会话外推时
+        再加上观测帧采集到决策的实测时长，合计即采集到数据包发出
+        """
+        write_start = time.perf_counter()
+        serial.write_packet(packet)
+        write_end = time.perf_counter()
+        self._stage_stats["serial"].add((write_end - write_start) * 1000)
+        self._stage_stats["output"].add((write_end - captured) * 1000)
+        latency_ms = (write_end - decided) * 1000
+        if lane is not None:
+            lane.serial_latency_ms += 0.2 * (latency_ms - lane.serial_latency_ms)
+            lane.session.set_output_latency(lane.serial_latency_ms)
+            return
+        self._serial_latency_ms += 0.2 * (latency_ms - self._serial_latency_ms)
+        self._session.set_output_latency(self._serial_latency_ms)
+    
+    def _send_packet(self, packet, captured: float, lane: Optional[SortingLane] = None) -> None:
+        """发送串口数据（分阶段管线中交给串口线程）；captured 为该帧的采集时刻"""
+        serial = lane.serial if lane else self._serial
+        if not serial:
+            return
+        serial_queue = lane.serial_queue if lane else self._serial_queue
+        decided = time.perf_counter()
+        if serial_queue is not None:
+            self._put_latest(serial_queue, (packet, captured, decided))
+        else:
+            self._write_packet(serial, packet, captured, decided, lane)
+    
+    @staticmethod
+    def _put_latest(target: queue.Queue, item) -> None:
+        """入队；队列满时丢弃最旧的一项，优先处理最新帧"""
+        while True:
+            try:
+                target.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    target.get_nowait()
+                except queue.Empty:
+                    pass
+    
+    @staticmethod
+    def _infer(runtime, image) -> DetectionBatch:
+        """推理，结果统一为检测批（只实现 infer() 的运行时按列表结果转换）"""
+        if isinstance(runtime, IInferenceRuntime):
+            return runtime.infer_batch(image)
+        return DetectionBatch.from_detections(runtime.infer(image))
+    
+    def _decide(self, frame_seq: int, frame, detections: DetectionBatch, captured: float) -> None:
+        """根据推理结果更新会话、发送串口数据并记录
+        
+        captured 为该帧开始读取时的 perf_counter，端到端延迟从采集算起，
+        包含采集、排队、解码、推理与决策
+        """
+        decide_start = time.perf_counter()
+        shape = frame.shape
+        self._decided_frames += 1
+        # 低于运行阈值的检测（难例采集时运行时按难例区间下限输出）只用于难例判定
+        candidates = detections
+        detections = detections.above(self._confidence_threshold)
+        # 检测帧时间戳取采集时刻，供执行延迟补偿计算实测延迟
+        captured_at = datetime.utcnow() - timedelta(seconds=decide_start - captured)
+        
+        # 按通道分配检测，各通道会话各自判定并发送
+        sessions = self._sessions()
+        stable_before = sum(session.statistics.stable_detections for session in sessions)
+        if self._lane_router is None:
+            packet = self._session.process_frame(
+                self._detection_frame(frame, detections, shape, captured_at)
+            )
+            if packet:
+                self._send_packet(packet, captured)
+            primary_track = self._session.current_track
+        else:
+            packet = None
+            primary_track = None
+            lane_indices = self._lane_router.lane_indices(detections)
+            for index, lane in enumerate(self._lanes):
+                lane_detections = detections.take(np.flatnonzero(lane_indices == index))
+                lane_packet = lane.session.process_frame(
+                    self._detection_frame(frame, lane_detections, shape, captured_at)
+                )
+                if lane_packet:
+                    self._send_packet(lane_packet, captured, lane)
+                    packet = packet or lane_packet
+                if len(lane_indices) and lane_indices[0] == index:
+                    primary_track = lane.session.current_track
+        
+        # 记录检测
+        if self._recorder and detections:
+            flags = DecisionFlag.NONE
+            if sum(session.statistics.stable_detections for session in sessions) > stable_before:
+                flags |= DecisionFlag.STABLE
+            if packet:
+                flags |= DecisionFlag.PACKET_SENT
+            self._record_detections(self._decided_frames, detections, int(flags))
+        
+        # 阶段延迟
+        decide_end = time.perf_counter()
+        latency_ms = (decide_end - captured) * 1000
+        self._stage_stats["decision"].add((decide_end - decide_start) * 1000)
+        self._stage_stats["end_to_end"].add(latency_ms)
+        
+        # 影子评估（抽样、不等待；在阶段延迟统计之后提交，不计入主路径）
+        if self._shadow is not None:
+            # 本帧有检测且会话已判定稳定时，首个检测即会话据以分拣的检测
+            stable = bool(detections) and primary_track is not None and primary_track.is_stable
+            decision = detections.category(0) if stable else None
+            self._shadow.offer(frame, detections, decision)
+        
+        # 难例采集（只判定并交出引用，编码与写盘在写入线程）
+        if self._hard_example_sampler is not None:
+            reasons = self._hard_example_sampler.reasons(
+                candidates, primary_track.track_id if primary_track else None
+            )
+            if reasons:
+                self._hard_example_writer.offer(frame, candidates, reasons, frame_seq)
+        
+        # 预览（仅在有订阅者时构造预览帧）
+        if self._preview is not None and self._preview.has_subscribers:
+            self._offer_preview(frame, detections, packet, latency_ms)
+        
+        # 延迟预算调控（温控下限在决策线程中应用，避免与 observe 并发修改）
+        if self._governor:
+            if self._governor.floor != self._thermal_level:
+                transition = self._governor.set_floor(self._thermal_level)
+                if transition:
+                    self._on_governor_transition(transition)
+            transition = self._governor.observe(latency_ms)
+            if transition:
+                self._on_governor_transition(transition)
+    
+    def _detection_frame(self, frame, detections: DetectionBatch, shape, captured_at: datetime) -> DetectionFrame:
+        """以首个检测创建会话输入的检测帧（直接读取列数组）"""
+        if not detections:
+            return DetectionFrame(
+                frame_id=str(time.time()),
+                image_width=shape[1],
+                image_height=shape[0],
+                timestamp=captured_at
+            )
+        x, y, width, height = detections.box(0)
+        return DetectionFrame(
+            frame_id=str(time.time()),
+            image_width=shape[1],
+            image_height=shape[0],
+            detected_category=detections.category(0),
+            confidence=detections.score(0),
+            x_normalized=x,
+            y_normalized=y,
+            box_width=width,
+            box_height=height,
+            timestamp=captured_at,
+            crop_loader=self._crop_loader(frame) if self._crop_classifier else None
+        )
+    
+    def _sessions(self) -> List[SortingSession]:
+        """全部会话（通道模式下每个通道一个）"""
+        if self._lanes:
+            return [lane.session for lane in self._lanes]
+        return [self._session] if self._session else []
+    
+    @staticmethod
+    def _crop_loader(frame):
+        """裁剪用原图：压缩帧只在会话确实需要裁剪时才做全分辨率解码"""
+        if isinstance(frame, CompressedFrame):
+            return frame.decode_full
+        return lambda: frame
+    
+    def _offer_preview(self, frame, detections, packet, latency_ms: float) -> None:
+        """提交预览帧"""
+        track = self._session.current_track
+        if packet:
+            track_state = "sent"
+        elif track is not None:
+            track_state = "stable" if track.is_stable else "tracking"
+        else:
+            track_state = ""
+        self._preview.offer(PreviewFrame(
+            frame=frame,
+            detections=detections,
+            track_id=track.track_id if track else None,
+            track_state=track_state,
+            packet=packet,
+            latency_ms=latency_ms
+        ))
+    
+    def _record_detections(self, decided_seq: int, detections: DetectionBatch, flags: int) -> None:
+        """将本帧检测按列数组一次追加到检测日志
+        
+        帧序号取会话处理过的帧数而不是采集序号：被队列丢弃或乱序丢弃的帧
+        不占序号，回放时序号间隔即会话实际处理过的无检测帧数。
+        每条记录都带本帧的决策标志，首个检测（送入会话的检测）另加 PRIMARY
+        """
+        self._recorder.record_batch(
+            time.time(),
+            decided_seq,
+            detections.class_ids,
+            detections.scores,
+            detections.boxes,
+            flags,
+            primary=True
+        )
+    
+    def _on_governor_transition(self, transition: GovernorTransition) -> None:
+        """处理档位切换"""
+        level = self._governor.current
+        logger.info(
+            "Latency governor %s: level %d -> %d (p%d latency %.1f ms, budget %.1f ms, "
+            "input_size=%d, motion_threshold=%.3f, fallback_model=%s)",
+            transition.reason, transition.from_level, transition.to_level,
+            int(self._governor.policy.percentile * 100), transition.latency_ms,
+            self._governor.policy.budget_ms, level.input_size, level.motion_threshold,
+            level.use_fallback_model
+        )
+        self._apply_degradation_level(level)
+    
+    def _on_thermal_level(self, level: int, reading: ThermalReading) -> None:
+        """温控档位变化（在监控线程中调用，只做赋值）"""
+        self._thermal_level = level
+        self._inference_interval_s = self._settings.thermal_policy.inference_interval_ms(
+            self._settings.inference_interval_ms, level
+        ) / 1000.0
+    
+    def _apply_degradation_level(self, level: DegradationLevel) -> None:
+        """将档位参数应用到推理管线"""
+        for runtime in (*(self._worker_runtimes or [self._runtime]), self._fallback_runtime):
+            if runtime:
+                runtime.set_input_size(level.input_size)
+        self._motion_gate.set_threshold(level.motion_threshold)
+        if level.use_fallback_model and self._fallback_runtime:
+            self._active_runtime = self._fallback_runtime
+        else:
+            self._active_runtime = self._runtime
+    
+    def get_status(self) -> DeployStatusDTO:
+        """获取运行时状态"""
+        return self._get_status()
     
     def _get_status(self) -> DeployStatusDTO:
         """获取当前状态"""
@@ -137,19 +699,77 @@ class StartRuntimeHandler:
             is_running=self._is_running,
             model_loaded=self._runtime.is_loaded() if self._runtime else False,
             camera_opened=self._camera.is_opened() if self._camera else False,
-            serial_connected=self._serial.is_connected() if self._serial else False,
+            serial_connected=self._serial_connected(),
             total_frames=self._session.statistics.total_frames if self._session else 0,
-            total_detections=self._session.statistics.total_detections if self._session else 0,
-            serial_packets_sent=self._session.statistics.serial_packets_sent if self._session else 0,
-            counter={str(k): v for k, v in self._session.counter.counts.items()} if self._session else {}
+            total_detections=sum(s.statistics.total_detections for s in self._sessions()),
+            serial_packets_sent=sum(s.statistics.serial_packets_sent for s in self._sessions()),
+            counter=self._merged_counter(),
+            lanes={
+                lane.definition.name: {
+                    "total_detections": lane.session.statistics.total_detections,
+                    "serial_packets_sent": lane.session.statistics.serial_packets_sent,
+                    "counter": {str(k): v for k, v in lane.session.counter.counts.items()},
+                    "serial_connected": lane.serial.is_connected() if lane.serial else False,
+                }
+                for lane in self._lanes
+            },
+            device_profile=self._settings.profile_name,
+            preview_port=self._preview.port if self._preview else None,
+            stage_latency={name: stats.summary() for name, stats in self._stage_stats.items()},
+            pinned_stages=dict(self._pinned_stages),
+            workers=self._settings.workers,
+            runtime=self._settings.runtime,
+            runtime_threads=self._settings.threads,
+            backend_probe=(
+                {"results": dict(self._backend_choice.results),
+                 "from_cache": self._backend_choice.from_cache}
+                if self._backend_choice else {}
+            ),
+            degradation_level=self._governor.level if self._governor else 0,
+            latency_ms=self._governor.rolling_latency_ms if self._governor else 0.0,
+            governor_transitions=(
+                [t.to_dict() for t in self._governor.transitions] if self._governor else []
+            ),
+            shadow=self._shadow.summary() if self._shadow else {},
+            hard_examples=self._hard_example_writer.stats.to_dict() if self._hard_example_writer else {},
+            thermal_level=self._thermal_level,
+            temperature_c=(
+                self._thermal_monitor.last_reading.max_temperature_c if self._thermal_monitor else None
+            ),
+            resources=self._resource_sampler.latest.to_dict() if self._resource_sampler else {}
         )
     
+    def _serial_connected(self) -> bool:
+        """串口是否已连接（通道模式下所有配置了串口的通道均已连接）"""
+        if self._lanes:
+            serials = [lane.serial for lane in self._lanes if lane.serial]
+            return bool(serials) and all(serial.is_connected() for serial in serials)
+        return self._serial.is_connected() if self._serial else False
+    
+    def _merged_counter(self) -> Dict[str, int]:
+        """各会话计数之和"""
+        counter: Dict[str, int] = {}
+        for session in self._sessions():
+            for category, count in session.counter.counts.items():
+                counter[str(category)] = counter.get(str(category), 0) + count
+        return counter
+    
     def stop(self) -> None:
         """停止运行时"""
         self._is_running = False
         
-        if self._session:
-            self._session.stop()
+        if self._thermal_monitor:
+            self._thermal_monitor.stop()
+        
+        if self._resource_sampler:
+            self._resource_sampler.stop()
+        
+        for thread in self._pipeline_threads:
+            thread.join(timeout=1.0)
+        self._pipeline_threads = []
+        
+        for session in self._sessions():
+            session.stop()
         
         if self._camera:
             self._camera.close()
@@ -157,8 +777,32 @@ class StartRuntimeHandler:
         if self._serial:
             self._serial.close()
         
-        if self._runtime:
-            self._runtime.unload()
+        for lane in self._lanes:
+            if lane.serial:
+                lane.serial.close()
+        
+        for runtime in self._worker_runtimes or [self._runtime]:
+            if runtime:
+                runtime.unload()
+        
+        if self._fallback_runtime:
+            self._fallback_runtime.unload()
+        
+        if self._crop_classifier:
+            self._crop_classifier.unload()
+        
+        if self._shadow:
+            self._shadow.stop()
+            self._shadow.runtime.unload()
+        
+        if self._recorder:
+            self._recorder.close()
+        
+        if self._hard_example_writer:
+            self._hard_example_writer.stop()
+        
+        if self._preview:
+            self._preview.stop()
     
     def get_session(self) -> Optional[SortingSession]:
         """获取会话"""
@@ -0,0 +1,244 @@
+"""策略调参处理器 - 在记录的检测流上并行回放参数组合"""
+
+import itertools
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from shared_kernel.domain.taxonomy import WasteCategory
+
+from ...domain.model.value_object import CooldownPolicy, StabilityPolicy
+from ...domain.service import PolicyReplayer, ReplayFrame
+from ...infrastructure import DetectionLogReader, DecisionFlag
+
+from ..dto import PolicyTuningDTO
+from ..command.tune_policy_cmd import TunePolicyCmd
+
+logger = logging.getLogger(__name__)
+
+GROUND_TRUTH_FILE = "ground_truth.json"
+
+# 可调参数 -> 取值类型
+TUNABLE_PARAMETERS = {
+    "stability_threshold_ms": int,
+    "detection_reset_ms": int,
+    "position_tolerance": float,
+    "min_detection_count": int,
+    "evidence_threshold": float,
+    "cooldown_ms": int,
+}
+
+# 未指定网格时的默认搜索空间
+DEFAULT_GRID: Dict[str, List[float]] = {
+    "stability_threshold_ms": [200, 400, 600, 800, 1000, 1500],
+    "detection_reset_ms": [200, 500, 1000],
+    "position_tolerance": [0.02, 0.05, 0.1],
+    "min_detection_count": [2, 3, 5],
+    "cooldown_ms": [100, 500, 1000],
+}
+# sprt 规则下默认网格额外搜索的证据阈值
+DEFAULT_EVIDENCE_THRESHOLDS = [2.0, 3.0, 4.0, 6.0]
+
+_CATEGORIES = list(WasteCategory)
+
+# 工作进程中的检测流与判定规则（由进程池初始化函数设置，避免每个任务重复序列化）
+_worker_streams: List[Tuple[List[ReplayFrame], Dict[str, int]]] = []
+_worker_decision_rule = "fixed"
+
+
+def load_replay_frames(directory: str) -> List[ReplayFrame]:
+    """从检测日志读取送入会话的检测，按帧序号补出中间的无检测帧数
+
+    日志帧序号只计会话处理过的帧，序号间隔即会话实际处理过的无检测帧，
+    被队列或运动门控丢弃的帧不会在回放中被补成空帧
+    """
+    columns = DetectionLogReader(directory).load()
+    primary = (columns["flags"] & DecisionFlag.PRIMARY) != 0
+    order = np.argsort(columns["frame_seq"][primary], kind="stable")
+    seq = columns["frame_seq"][primary][order]
+    timestamps = columns["timestamp"][primary][order]
+    class_ids = columns["class_id"][primary][order]
+    confidences = columns["confidence"][primary][order]
+    boxes = columns["box"][primary][order]
+    idle = np.maximum(np.diff(seq, prepend=seq[:1]) - 1, 0)
+
+    frames = []
+    for i in range(len(seq)):
+        class_id = int(class_ids[i])
+        frames.append(ReplayFrame(
+            timestamp=float(timestamps[i]),
+            category=_CATEGORIES[class_id] if 0 <= class_id < len(_CATEGORIES) else None,
+            confidence=float(confidences[i]),
+            x=float(boxes[i, 0]),
+            y=float(boxes[i, 1]),
+            idle_before=int(idle[i]),
+        ))
+    return frames
+
+
+def load_ground_truth(directory: str) -> Dict[str, int]:
+    """读取检测日志目录下的真实计数"""
+    data = json.loads((Path(directory) / GROUND_TRUTH_FILE).read_text(encoding="utf-8"))
+    return {str(k): int(v) for k, v in data.get("counts", {}).items()}
+
+
+def build_policies(
+    params: Dict[str, float],
+    decision_rule: str = "fixed",
+) -> Tuple[StabilityPolicy, CooldownPolicy]:
+    """参数组合 -> 策略值对象"""
+    stability_defaults = StabilityPolicy()
+    stability = StabilityPolicy(
+        stability_threshold_ms=int(params.get(
+            "stability_threshold_ms", stability_defaults.stability_threshold_ms
+        )),
+        detection_reset_ms=int(params.get("detection_reset_ms", stability_defaults.detection_reset_ms)),
+        position_tolerance=float(params.get("position_tolerance", stability_defaults.position_tolerance)),
+        min_detection_count=int(params.get(
+            "min_detection_count", stability_defaults.min_detection_count
+        )),
+        decision_rule=decision_rule,
+        evidence_threshold=float(params.get("evidence_threshold", stability_defaults.evidence_threshold)),
+    )
+    cooldown = CooldownPolicy(
+        min_interval_ms=int(params.get("cooldown_ms", CooldownPolicy().min_interval_ms))
+    )
+    return stability, cooldown
+
+
+def evaluate(
+    params: Dict[str, float],
+    streams: Sequence[Tuple[List[ReplayFrame], Dict[str, int]]],
+    decision_rule: str = "fixed",
+) -> Dict[str, Any]:
+    """在所有检测流上评估一个参数组合
+
+    sprt 规则下同时以 fixed 规则回放相同参数，给出平均决策延迟的减少量
+    """
+    stability, cooldown = build_policies(params, decision_rule)
+    result = {"params": dict(params), **_replay_all(PolicyReplayer(stability, cooldown), streams)}
+    if decision_rule != "fixed":
+        baseline = _replay_all(PolicyReplayer(replace(stability, decision_rule="fixed"), cooldown), streams)
+        result["baseline_count_error"] = baseline["count_error"]
+        result["baseline_latency_mean_ms"] = baseline["latency_mean_ms"]
+        result["latency_reduction_ms"] = round(baseline["latency_mean_ms"] - result["latency_mean_ms"], 3)
+    return result
+
+
+def _replay_all(
+    replayer: PolicyReplayer,
+    streams: Sequence[Tuple[List[ReplayFrame], Dict[str, int]]],
+) -> Dict[str, Any]:
+    """回放全部检测流并汇总计数误差与决策延迟"""
+    count_error = 0
+    total_error = 0
+    truth_total = 0
+    packets = 0
+    latencies: List[float] = []
+    for frames, truth in streams:
+        result = replayer.replay(frames)
+        count_error += result.count_error(truth)
+        total_error += abs(sum(result.counts.values()) - sum(truth.values()))
+        truth_total += sum(truth.values())
+        packets += result.packets
+        latencies.extend(result.decision_latencies_ms)
+    return {
+        "count_error": count_error,
+        "total_error": total_error,
+        "relative_error": round(count_error / truth_total, 4) if truth_total else 0.0,
+        "packets": packets,
+        "latency_mean_ms": round(float(np.mean(latencies)), 3) if latencies else 0.0,
+        "latency_p90_ms": round(float(np.percentile(latencies, 90)), 3) if latencies else 0.0,
+    }
+
+
+def _init_worker(streams, decision_rule: str) -> None:
+    global _worker_streams, _worker_decision_rule
+    _worker_streams = streams
+    _worker_decision_rule = decision_rule
+
+
+def _evaluate_in_worker(params: Dict[str, float]) -> Dict[str, Any]:
+    return evaluate(params, _worker_streams, _worker_decision_rule)
+
+
+class TunePolicyHandler:
+    """策略调参处理器
+
+    应用服务：加载记录的检测流与真实计数，对参数网格（或其中的随机样本）
+    逐一回放，按计数误差与决策延迟排序
+    """
+
+    def handle(self, command: TunePolicyCmd) -> PolicyTuningDTO:
+        """处理策略调参命令"""
+        started = time.perf_counter()
+        try:
+            build_policies({}, command.decision_rule)     # 校验判定规则
+            grid = command.grid or self.default_grid(command.decision_rule)
+            configurations = self.expand_grid(grid, command.samples, command.seed)
+            streams = [
+                (load_replay_frames(directory), load_ground_truth(directory))
+                for directory in command.recordings
+            ]
+        except (OSError, ValueError, KeyError) as e:
+            return PolicyTuningDTO(configurations=0, streams=0, frames=0, elapsed_s=0.0, error=str(e))
+
+        results = self._run(configurations, streams, command.processes, command.decision_rule)
+        results.sort(key=lambda r: (r["count_error"], r["latency_mean_ms"]))
+        return PolicyTuningDTO(
+            configurations=len(configurations),
+            streams=len(streams),
+            frames=sum(len(frames) for frames, _ in streams),
+            elapsed_s=round(time.perf_counter() - started, 3),
+            results=results[:command.top] if command.top > 0 else results,
+        )
+
+    @staticmethod
+    def default_grid(decision_rule: str = "fixed") -> Dict[str, List[float]]:
+        """未指定网格时的搜索空间（sprt 规则额外搜索证据阈值）"""
+        grid = dict(DEFAULT_GRID)
+        if decision_rule != "fixed":
+            grid["evidence_threshold"] = list(DEFAULT_EVIDENCE_THRESHOLDS)
+        return grid
+
+    @staticmethod
+    def expand_grid(
+        grid: Dict[str, Sequence[float]],
+        samples: Optional[int] = None,
+        seed: int = 0,
+    ) -> List[Dict[str, float]]:
+        """展开参数网格；给出 samples 时不放回随机抽取"""
+        unknown = set(grid) - set(TUNABLE_PARAMETERS)
+        if unknown:
+            raise ValueError(f"unknown tuning parameters: {sorted(unknown)}")
+        names = sorted(grid)
+        values = [[TUNABLE_PARAMETERS[name](v) for v in grid[name]] for name in names]
+        combinations = [dict(zip(names, combo)) for combo in itertools.product(*values)]
+        if samples is not None and samples < len(combinations):
+            combinations = random.Random(seed).sample(combinations, samples)
+        return combinations
+
+    @staticmethod
+    def _run(
+        configurations: List[Dict[str, float]],
+        streams: List[Tuple[List[ReplayFrame], Dict[str, int]]],
+        processes: Optional[int],
+        decision_rule: str = "fixed",
+    ) -> List[Dict[str, Any]]:
+        """单进程时直接执行，否则分块提交到进程池"""
+        processes = processes or os.cpu_count() or 1
+        if processes == 1 or len(configurations) <= 1:
+            return [evaluate(params, streams, decision_rule) for params in configurations]
+        chunksize = max(1, len(configurations) // (processes * 4))
+        with ProcessPoolExecutor(
+            max_workers=processes, initializer=_init_worker, initargs=(streams, decision_rule)
+        ) as pool:
+            return list(pool.map(_evaluate_in_worker, configurations, chunksize=chunksize))
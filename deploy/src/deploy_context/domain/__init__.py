@@ -7,5 +7,6 @@ from .event import *
 
 __all__ = ["SortingSession", "SessionStatus", "SessionStatistics",
            "StabilityJudge", "StabilityReport", "PacketEncoder",
+           "LatencyGovernor", "GovernorTransition",
            "IInferenceRuntime", "ICamera", "ISerialDevice",
            "ItemClassified"]
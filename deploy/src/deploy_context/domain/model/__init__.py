@@ -0,0 +1,16 @@
+"""领域模型模块导出"""
+
+from .aggregate import SortingSession, SessionStatus, SessionStatistics
+from .entity import DetectionFrame, Counter
+from .value_object import (
+    SerialPacket, CooldownPolicy, StabilityPolicy, LatencyBudgetPolicy, DegradationLevel,
+    ActuationCompensationPolicy, CropClassificationPolicy, ThermalPolicy, LaneDefinition,
+    HardExamplePolicy, DetectionBatch
+)
+
+__all__ = ["SortingSession", "SessionStatus", "SessionStatistics",
+           "DetectionFrame", "Counter",
+           "SerialPacket", "CooldownPolicy", "StabilityPolicy",
+           "LatencyBudgetPolicy", "DegradationLevel", "ActuationCompensationPolicy",
+           "CropClassificationPolicy", "ThermalPolicy", "LaneDefinition", "HardExamplePolicy",
+           "DetectionBatch"]
@@ -1,16 +1,26 @@
 """分拣会话聚合根 - 管理部署运行时的核心业务逻辑"""
 
+from collections import deque
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import List, Optional, Dict, Any
+from typing import Callable, Deque, List, Optional, Dict, Any, Tuple
 from uuid import uuid4
 
 from shared_kernel.domain.base import AggregateRoot
+from shared_kernel.domain.taxonomy import WasteCategory
 
-from ..value_object import SerialPacket, CooldownPolicy, StabilityPolicy
+from ..value_object import (
+    SerialPacket, CooldownPolicy, StabilityPolicy, ActuationCompensationPolicy,
+    CropClassificationPolicy
+)
 from ..entity import DetectionFrame, Counter
 from ...event.item_classified import ItemClassified
+from ...repository.i_crop_classifier import ICropClassifier
+
+
+# 分类序号（部署编号映射的键）
+_CATEGORY_ORDER = list(WasteCategory)
 
 
 class SessionStatus(Enum):
@@ -42,8 +52,16 @@ class TrackedObject:
     first_seen: datetime
     last_updated: datetime
     detection_count: int = 0
+    evidence: float = 0.0  # 累计置信度证据（sprt 稳定判定）
     is_stable: bool = False
     is_counted: bool = False
+    track_id: int = 0  # 会话内递增编号（用于展示与日志）
+    # 第二阶段裁剪分类结果（每个跟踪对象只分类一次）
+    crop_classified: bool = False
+    verified_category_id: Optional[int] = None
+    verified_confidence: Optional[float] = None
+    # 最近观测 (采集时间戳秒, x, y)，用于估计速度
+    history: Deque[Tuple[float, float, float]] = field(default_factory=deque)
 
 
 @dataclass
@@ -53,6 +71,8 @@ class SessionStatistics:
     total_detections: int = 0
     stable_detections: int = 0
     serial_packets_sent: int = 0
+    crop_classifications: int = 0   # 第二阶段分类次数
+    crop_overrides: int = 0         # 第二阶段改变类别的次数
     error_count: int = 0
 
 
@@ -76,12 +96,22 @@ class SortingSession(AggregateRoot):
         session_id: str,
         cooldown_policy: Optional[CooldownPolicy] = None,
         stability_policy: Optional[StabilityPolicy] = None,
+        compensation_policy: Optional[ActuationCompensationPolicy] = None,
+        crop_classifier: Optional[ICropClassifier] = None,
+        crop_policy: Optional[CropClassificationPolicy] = None,
+        clock: Optional[Callable[[], datetime]] = None,
     ):
         super().__init__()
         self._session_id = session_id
         self._status = SessionStatus.IDLE
         self._cooldown_policy = cooldown_policy or CooldownPolicy()
         self._stability_policy = stability_policy or StabilityPolicy()
+        self._compensation_policy = compensation_policy or ActuationCompensationPolicy()
+        self._output_latency_ms: float = 0.0  # 决策到数据包到达下位机的实测延迟
+        self._crop_classifier = crop_classifier
+        self._crop_policy = crop_policy or CropClassificationPolicy()
+        # 跟踪与冷却使用的时钟（离线回放时按记录时间推进）
+        self._clock = clock or datetime.utcnow
         
         # 运行时状态
         self._camera_width: Optional[int] = None
@@ -90,6 +120,8 @@ class SortingSession(AggregateRoot):
         
         # 跟踪状态
         self._tracked_objects: Dict[str, TrackedObject] = {}
+        self._current_track: Optional[TrackedObject] = None
+        self._next_track_id = 1
         self._last_serial_time: Optional[datetime] = None
         self._last_detected_category: Optional[int] = None
         self._detection_reset_timer: float = 0.0
@@ -123,6 +155,11 @@ class SortingSession(AggregateRoot):
     def is_running(self) -> bool:
         return self._status == SessionStatus.RUNNING
     
+    @property
+    def current_track(self) -> Optional[TrackedObject]:
+        """最近一次处理的帧所关联的跟踪对象（无检测时为 None）"""
+        return self._current_track
+    
     @classmethod
     def create(
         cls,
@@ -130,6 +167,10 @@ class SortingSession(AggregateRoot):
         class_mapping: Optional[Dict[int, int]] = None,
         cooldown_policy: Optional[CooldownPolicy] = None,
         stability_policy: Optional[StabilityPolicy] = None,
+        compensation_policy: Optional[ActuationCompensationPolicy] = None,
+        crop_classifier: Optional[ICropClassifier] = None,
+        crop_policy: Optional[CropClassificationPolicy] = None,
+        clock: Optional[Callable[[], datetime]] = None,
     ) -> "SortingSession":
         """工厂方法：创建新会话"""
         session_id = session_id or str(uuid4())
@@ -137,6 +178,10 @@ class SortingSession(AggregateRoot):
             session_id=session_id,
             cooldown_policy=cooldown_policy,
             stability_policy=stability_policy,
+            compensation_policy=compensation_policy,
+            crop_classifier=crop_classifier,
+            crop_policy=crop_policy,
+            clock=clock,
         )
         session._class_mapping = class_mapping or {}
         return session
@@ -176,6 +221,10 @@ class SortingSession(AggregateRoot):
             raise InvalidSessionStateError(f"Cannot resume session in {self._status} status")
         self._status = SessionStatus.RUNNING
     
+    def set_output_latency(self, latency_ms: float) -> None:
+        """更新决策到数据包送达的实测延迟（用于执行延迟补偿）"""
+        self._output_latency_ms = max(0.0, latency_ms)
+    
     def process_frame(self, frame: DetectionFrame) -> Optional[SerialPacket]:
         """处理检测帧
         
@@ -186,6 +235,7 @@ class SortingSession(AggregateRoot):
             raise InvalidSessionStateError(f"Cannot process frame in {self._status} status")
         
         self._statistics.total_frames += 1
+        self._current_track = None
         
         if not frame.has_detection:
             self._handle_no_detection()
@@ -197,9 +247,13 @@ class SortingSession(AggregateRoot):
         tracked = self._update_tracking(frame)
         if tracked is None:
             return None
+        self._current_track = tracked
         
         # 检查稳定性
         if self._check_stability(tracked):
+            if not tracked.is_stable:
+                # 首次稳定时做一次第二阶段分类，结果缓存在跟踪对象上
+                self._classify_crop(tracked, frame)
             tracked.is_stable = True
             self._statistics.stable_detections += 1
             
@@ -229,6 +283,8 @@ class SortingSession(AggregateRoot):
             return None
         
         x, y = frame.x_normalized, frame.y_normalized
+        now = self._clock()
+        self._prune_stale_tracks(now)
         
         # 查找现有跟踪对象
         existing = None
@@ -242,8 +298,10 @@ class SortingSession(AggregateRoot):
             # 更新现有对象
             existing.last_x = x
             existing.last_y = y
-            existing.last_updated = datetime.utcnow()
+            existing.last_updated = now
             existing.detection_count += 1
+            existing.evidence += self._stability_policy.frame_evidence(frame.confidence)
+            self._append_history(existing, frame)
             return existing
         else:
             # 创建新跟踪对象
@@ -253,29 +311,94 @@ class SortingSession(AggregateRoot):
                 first_y=y,
                 last_x=x,
                 last_y=y,
-                first_seen=datetime.utcnow(),
-                last_updated=datetime.utcnow(),
+                first_seen=now,
+                last_updated=now,
                 detection_count=1,
+                evidence=self._stability_policy.frame_evidence(frame.confidence),
                 is_stable=False,
-                is_counted=False
+                is_counted=False,
+                track_id=self._next_track_id
             )
+            self._next_track_id += 1
+            self._append_history(obj, frame)
             self._tracked_objects[str(uuid4())] = obj
             return obj
     
-    def _check_stability(self, tracked: TrackedObject) -> bool:
-        """检查稳定性"""
-        if tracked.detection_count < self._stability_policy.min_detection_count:
-            return False
+    def _prune_stale_tracks(self, now: datetime) -> None:
+        """移除超过重置时间未再出现的跟踪对象（同一位置的新物品重新计数）"""
+        reset = timedelta(milliseconds=self._stability_policy.detection_reset_ms)
+        stale = [key for key, obj in self._tracked_objects.items() if now - obj.last_updated > reset]
+        for key in stale:
+            del self._tracked_objects[key]
+    
+    def _append_history(self, tracked: TrackedObject, frame: DetectionFrame) -> None:
+        """记录观测位置（以帧采集时间为准，不受管线排队影响）"""
+        if not self._compensation_policy.enabled:
+            return
+        tracked.history.append(
+            (frame.timestamp.timestamp(), frame.x_normalized, frame.y_normalized)
+        )
+        while len(tracked.history) > self._compensation_policy.history_size:
+            tracked.history.popleft()
+    
+    def _actuation_position(self, tracked: TrackedObject) -> Tuple[float, float]:
+        """预计执行时刻的位置（未启用补偿时为最后观测位置）"""
+        if not self._compensation_policy.enabled or not tracked.history:
+            return (tracked.last_x, tracked.last_y)
+        observed_at = tracked.history[-1][0]
+        horizon_ms = self._compensation_policy.horizon_ms(
+            (self._clock().timestamp() - observed_at) * 1000, self._output_latency_ms
+        )
+        return self._compensation_policy.extrapolate(tracked.history, horizon_ms)
+    
+    def _classify_crop(self, tracked: TrackedObject, frame: DetectionFrame) -> None:
+        """对跟踪对象做第二阶段裁剪分类"""
+        if self._crop_classifier is None or tracked.crop_classified:
+            return
+        tracked.crop_classified = True
+        if frame.crop_loader is None or frame.box_width is None or frame.box_height is None:
+            return
+        
+        image = frame.crop_loader()
+        if image is None:
+            return
+        height, width = image.shape[:2]
+        x1, y1, x2, y2 = self._crop_policy.crop_box(
+            frame.x_normalized, frame.y_normalized, frame.box_width, frame.box_height,
+            width, height
+        )
+        if min(x2 - x1, y2 - y1) < self._crop_policy.min_crop_pixels:
+            return
         
-        elapsed = (datetime.utcnow() - tracked.first_seen).total_seconds() * 1000
-        return elapsed >= self._stability_policy.stability_threshold_ms
+        result = self._crop_classifier.classify(image[y1:y2, x1:x2])
+        self._statistics.crop_classifications += 1
+        if result is None:
+            return
+        category, confidence = result
+        if not self._crop_policy.accepts(confidence):
+            return
+        tracked.verified_category_id = self._get_protocol_class_id(category)
+        tracked.verified_confidence = confidence
+        if tracked.verified_category_id != tracked.category_id:
+            self._statistics.crop_overrides += 1
+    
+    def _check_stability(self, tracked: TrackedObject) -> bool:
+        """检查稳定性（按策略的判定规则）"""
+        elapsed = (self._clock() - tracked.first_seen).total_seconds() * 1000
+        return self._stability_policy.is_decided(tracked.detection_count, elapsed, tracked.evidence)
     
     def _create_serial_packet(self, tracked: TrackedObject) -> Optional[SerialPacket]:
-        """创建串口数据包"""
+        """创建串口数据包（有第二阶段结果时以其类别为准）"""
+        category_id = (
+            tracked.verified_category_id
+            if tracked.verified_category_id is not None else tracked.category_id
+        )
         # 检查冷却
+        now = self._clock()
         if not self._cooldown_policy.should_send(
             self._last_serial_time,
-            tracked.category_id
+            category_id,
+            now
         ):
             return None
         
@@ -283,26 +406,27 @@ class SortingSession(AggregateRoot):
         if tracked.category_id == self._last_detected_category:
             return None
         
-        # 创建数据包
+        # 创建数据包（坐标外推到预计执行时刻）
+        x, y = self._actuation_position(tracked)
         packet = SerialPacket.from_normalized(
-            class_id=tracked.category_id,
-            x_normalized=tracked.last_x,
-            y_normalized=tracked.last_y
+            class_id=category_id,
+            x_normalized=x,
+            y_normalized=y
         )
         
         # 更新状态
-        self._last_serial_time = datetime.utcnow()
+        self._last_serial_time = now
         self._last_detected_category = tracked.category_id
         tracked.is_counted = True
         self._statistics.serial_packets_sent += 1
         
         # 更新计数
-        self._counter.increment(self._get_waste_category(tracked.category_id))
+        self._counter.increment(self._get_waste_category(category_id))
         
         # 发布领域事件
         self.add_domain_event(ItemClassified(
             session_id=self._session_id,
-            category_id=tracked.category_id,
+            category_id=category_id,
             x=tracked.last_x,
             y=tracked.last_y
         ))
@@ -310,28 +434,33 @@ class SortingSession(AggregateRoot):
         return packet
     
     def _get_protocol_class_id(self, category) -> Optional[int]:
-        """获取协议类别编号"""
+        """获取协议类别编号（映射键为分类序号，未映射时按默认协议 序号+1）"""
         if category is None:
             return None
-        return self._class_mapping.get(category.value, category.value)
+        index = _CATEGORY_ORDER.index(category)
+        return self._class_mapping.get(index, index + 1)
     
-    def _get_waste_category(self, protocol_id: int) -> Optional[int]:
-        """从协议编号获取垃圾分类（返回协议中的分类值）"""
-        for protocol, cat_value in self._class_mapping.items():
+    def _get_waste_category(self, protocol_id: int) -> Optional[WasteCategory]:
+        """从协议编号获取垃圾分类"""
+        for index, cat_value in self._class_mapping.items():
             if cat_value == protocol_id:
-                return protocol
+                return _CATEGORY_ORDER[index]
+        if 1 <= protocol_id <= len(_CATEGORY_ORDER):
+            return _CATEGORY_ORDER[protocol_id - 1]
         return None
     
     def get_tracked_objects_info(self) -> List[Dict[str, Any]]:
         """获取跟踪对象信息"""
         return [
             {
+                "track_id": obj.track_id,
                 "category_id": obj.category_id,
                 "first_position": (obj.first_x, obj.first_y),
                 "last_position": (obj.last_x, obj.last_y),
                 "detection_count": obj.detection_count,
                 "is_stable": obj.is_stable,
                 "is_counted": obj.is_counted,
+                "verified_category_id": obj.verified_category_id,
             }
             for obj in self._tracked_objects.values()
         ]
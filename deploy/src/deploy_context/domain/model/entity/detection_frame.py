@@ -2,7 +2,7 @@
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 
 from shared_kernel.domain.base import Entity
 from shared_kernel.domain.taxonomy import WasteCategory
@@ -24,9 +24,12 @@ class DetectionFrame(Entity):
     confidence: Optional[float] = None
     x_normalized: Optional[float] = None  # 归一化中心X坐标
     y_normalized: Optional[float] = None  # 归一化中心Y坐标
+    box_width: Optional[float] = None     # 归一化检测框宽度
+    box_height: Optional[float] = None    # 归一化检测框高度
     timestamp: datetime = field(default_factory=datetime.utcnow)
     metadata: Dict[str, Any] = field(default_factory=dict)
     is_processed: bool = False
+    crop_loader: Optional[Callable[[], Any]] = None  # 按需获取原图（仅在需要裁剪时解码）
     
     @property
     def id(self) -> str:
@@ -3,5 +3,15 @@
 from .serial_packet import SerialPacket
 from .cooldown_policy import CooldownPolicy
 from .stability_policy import StabilityPolicy
+from .latency_budget_policy import LatencyBudgetPolicy, DegradationLevel, DEFAULT_DEGRADATION_LADDER
+from .actuation_compensation_policy import ActuationCompensationPolicy
+from .crop_classification_policy import CropClassificationPolicy
+from .thermal_policy import ThermalPolicy
+from .lane_definition import LaneDefinition
+from .hard_example_policy import HardExamplePolicy
+from .detection_batch import DetectionBatch
 
-__all__ = ["SerialPacket", "CooldownPolicy", "StabilityPolicy"]
+__all__ = ["SerialPacket", "CooldownPolicy", "StabilityPolicy",
+           "LatencyBudgetPolicy", "DegradationLevel", "DEFAULT_DEGRADATION_LADDER",
+           "ActuationCompensationPolicy", "CropClassificationPolicy", "ThermalPolicy", "LaneDefinition",
+           "HardExamplePolicy", "DetectionBatch"]
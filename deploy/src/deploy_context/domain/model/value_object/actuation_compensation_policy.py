@@ -0,0 +1,74 @@
+"""执行延迟补偿策略值对象 - 将发送坐标外推到执行时刻"""
+
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class ActuationCompensationPolicy:
+    """执行延迟补偿策略值对象
+
+    职责:
+    - 根据跟踪对象的位置历史估计速度（最小二乘）
+    - 将最后一次观测位置外推到预计执行时刻
+
+    外推时长 = 观测帧采集到决策的实测延迟 + 串口输出延迟 + 执行机构延迟，
+    并截断到 max_horizon_ms，避免异常延迟导致坐标飞出
+    """
+    enabled: bool = False
+    actuator_delay_ms: float = 0.0     # 下位机收到数据包到执行动作的固定延迟
+    history_size: int = 8              # 参与速度估计的最近观测数
+    min_samples: int = 3               # 少于该观测数时不做外推
+    max_horizon_ms: float = 1000.0     # 外推时长上限
+
+    def __post_init__(self):
+        if self.actuator_delay_ms < 0:
+            raise ValueError(f"actuator_delay_ms must be non-negative, got {self.actuator_delay_ms}")
+        if self.min_samples < 2:
+            raise ValueError(f"min_samples must be at least 2, got {self.min_samples}")
+        if self.history_size < self.min_samples:
+            raise ValueError(
+                f"history_size must be >= min_samples, got {self.history_size} < {self.min_samples}"
+            )
+        if self.max_horizon_ms < 0:
+            raise ValueError(f"max_horizon_ms must be non-negative, got {self.max_horizon_ms}")
+
+    def estimate_velocity(self, samples: Sequence[Tuple[float, float, float]]) -> Tuple[float, float]:
+        """估计速度（归一化坐标/秒）
+
+        Args:
+            samples: (时间戳秒, x, y) 观测序列
+        """
+        if len(samples) < self.min_samples:
+            return (0.0, 0.0)
+        n = len(samples)
+        t_mean = sum(s[0] for s in samples) / n
+        x_mean = sum(s[1] for s in samples) / n
+        y_mean = sum(s[2] for s in samples) / n
+        denominator = sum((s[0] - t_mean) ** 2 for s in samples)
+        if denominator <= 0.0:
+            return (0.0, 0.0)
+        vx = sum((s[0] - t_mean) * (s[1] - x_mean) for s in samples) / denominator
+        vy = sum((s[0] - t_mean) * (s[2] - y_mean) for s in samples) / denominator
+        return (vx, vy)
+
+    def horizon_ms(self, observed_latency_ms: float, output_latency_ms: float = 0.0) -> float:
+        """外推时长（毫秒）"""
+        horizon = max(0.0, observed_latency_ms) + max(0.0, output_latency_ms) + self.actuator_delay_ms
+        return min(horizon, self.max_horizon_ms)
+
+    def extrapolate(
+        self,
+        samples: Sequence[Tuple[float, float, float]],
+        horizon_ms: float,
+    ) -> Tuple[float, float]:
+        """将最后一次观测外推 horizon_ms 毫秒（结果截断到 0-1）"""
+        _, x, y = samples[-1]
+        if not self.enabled:
+            return (x, y)
+        vx, vy = self.estimate_velocity(samples)
+        seconds = horizon_ms / 1000.0
+        return (
+            max(0.0, min(1.0, x + vx * seconds)),
+            max(0.0, min(1.0, y + vy * seconds)),
+        )
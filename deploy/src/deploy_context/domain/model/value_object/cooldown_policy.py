@@ -26,13 +26,18 @@ class CooldownPolicy:
         """获取指定类别的冷却时间"""
         return self.category_cooldowns.get(category_id, self.min_interval_ms)
     
-    def should_send(self, last_send_time: Optional[datetime], category_id: int) -> bool:
-        """判断是否可以发送"""
+    def should_send(
+        self,
+        last_send_time: Optional[datetime],
+        category_id: int,
+        now: Optional[datetime] = None
+    ) -> bool:
+        """判断是否可以发送（now 缺省为当前时间）"""
         if last_send_time is None:
             return True
         
         interval = self.get_interval_for_category(category_id)
-        elapsed = datetime.utcnow() - last_send_time
+        elapsed = (now or datetime.utcnow()) - last_send_time
         return elapsed >= timedelta(milliseconds=interval)
     
     def get_next_send_time(self, last_send_time: datetime, category_id: int) -> datetime:
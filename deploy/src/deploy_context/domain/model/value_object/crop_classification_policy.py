@@ -0,0 +1,47 @@
+"""裁剪分类策略值对象 - 控制跟踪对象的第二阶段分类"""
+
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class CropClassificationPolicy:
+    """裁剪分类策略值对象
+
+    职责:
+    - 定义裁剪区域的外扩比例
+    - 定义第二阶段结果覆盖检测类别所需的最低置信度
+    """
+    min_confidence: float = 0.5   # 低于该置信度时保留检测器类别
+    padding: float = 0.1          # 裁剪框按宽高外扩的比例
+    min_crop_pixels: int = 16     # 裁剪边长下限（过小的目标不做分类）
+
+    def __post_init__(self):
+        if not 0.0 <= self.min_confidence <= 1.0:
+            raise ValueError(f"min_confidence must be between 0 and 1, got {self.min_confidence}")
+        if self.padding < 0:
+            raise ValueError(f"padding must be non-negative, got {self.padding}")
+        if self.min_crop_pixels <= 0:
+            raise ValueError(f"min_crop_pixels must be positive, got {self.min_crop_pixels}")
+
+    def crop_box(
+        self,
+        x_center: float,
+        y_center: float,
+        width: float,
+        height: float,
+        image_width: int,
+        image_height: int,
+    ) -> Tuple[int, int, int, int]:
+        """归一化检测框 -> 外扩后的像素裁剪框 (x1, y1, x2, y2)，截断到图像内"""
+        half_w = width * (1 + self.padding) / 2
+        half_h = height * (1 + self.padding) / 2
+        x1 = max(0, int((x_center - half_w) * image_width))
+        y1 = max(0, int((y_center - half_h) * image_height))
+        x2 = min(image_width, int(round((x_center + half_w) * image_width)))
+        y2 = min(image_height, int(round((y_center + half_h) * image_height)))
+        return (x1, y1, x2, y2)
+
+    def accepts(self, confidence: float) -> bool:
+        """第二阶段结果是否足以覆盖检测类别"""
+        return confidence >= self.min_confidence
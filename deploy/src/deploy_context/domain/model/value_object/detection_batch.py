@@ -0,0 +1,149 @@
+"""检测批值对象 - 以列数组保存一帧的全部检测结果"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from shared_kernel.domain.annotation import BoundingBox, Detection, DetectionSource
+from shared_kernel.domain.taxonomy import WasteCategory
+
+# class_ids 为分类序号（与检测日志 class_id 列、协议映射的键一致）
+_CATEGORIES: Tuple[WasteCategory, ...] = tuple(WasteCategory)
+_CATEGORY_INDEX = {category: index for index, category in enumerate(_CATEGORIES)}
+
+
+@dataclass(frozen=True, eq=False)
+class DetectionBatch(Sequence):
+    """检测批值对象
+
+    职责:
+    - 以 NumPy 列数组保存检测框（归一化 xywh）、置信度与分类序号
+    - 按下标读取单个检测的类别/置信度/检测框，不创建 Detection 对象
+    - 调用方确实需要 Detection 时按下标惰性创建并缓存
+
+    行顺序即检测器输出顺序（置信度降序），首行为送入分拣会话的检测
+    """
+    boxes: np.ndarray                   # (N, 4) float64 归一化 x_center, y_center, width, height
+    scores: np.ndarray                  # (N,) float64
+    class_ids: np.ndarray               # (N,) int16 分类序号
+    source: DetectionSource = DetectionSource.YOLO
+    _detections: List[Optional[Detection]] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        boxes = np.asarray(self.boxes, dtype=np.float64).reshape(-1, 4)
+        scores = np.asarray(self.scores, dtype=np.float64).reshape(-1)
+        class_ids = np.asarray(self.class_ids, dtype=np.int16).reshape(-1)
+        if not len(boxes) == len(scores) == len(class_ids):
+            raise ValueError(
+                f"column lengths differ: boxes {len(boxes)}, scores {len(scores)}, class_ids {len(class_ids)}"
+            )
+        if len(class_ids) and (class_ids.min() < 0 or class_ids.max() >= len(_CATEGORIES)):
+            raise ValueError(f"class_ids must be in [0, {len(_CATEGORIES)}), got {class_ids.tolist()}")
+        object.__setattr__(self, 'boxes', boxes)
+        object.__setattr__(self, 'scores', scores)
+        object.__setattr__(self, 'class_ids', class_ids)
+        if self._detections is None:
+            object.__setattr__(self, '_detections', [None] * len(class_ids))
+
+    @classmethod
+    def empty(cls) -> "DetectionBatch":
+        return cls(np.empty((0, 4)), np.empty(0), np.empty(0, dtype=np.int16))
+
+    @classmethod
+    def from_detections(cls, detections: Iterable[Detection]) -> "DetectionBatch":
+        """由 Detection 列表创建（保留原对象，按下标读取时不再重新创建）"""
+        detections = list(detections)
+        if not detections:
+            return cls.empty()
+        boxes = [
+            (d.bounding_box.x_center, d.bounding_box.y_center, d.bounding_box.width, d.bounding_box.height)
+            for d in detections
+        ]
+        return cls(
+            boxes=np.array(boxes, dtype=np.float64),
+            scores=np.array([d.confidence.value for d in detections], dtype=np.float64),
+            class_ids=np.array([_CATEGORY_INDEX[d.category] for d in detections], dtype=np.int16),
+            source=detections[0].source,
+            _detections=detections,
+        )
+
+    @classmethod
+    def coerce(cls, detections: Union["DetectionBatch", Iterable[Detection]]) -> "DetectionBatch":
+        """检测批原样返回，Detection 列表转换为检测批"""
+        if isinstance(detections, DetectionBatch):
+            return detections
+        return cls.from_detections(detections)
+
+    @staticmethod
+    def category_index(category: WasteCategory) -> int:
+        """分类 -> 分类序号"""
+        return _CATEGORY_INDEX[category]
+
+    @staticmethod
+    def map_class_ids(model_class_ids: np.ndarray, mapping: Dict[int, WasteCategory]) -> np.ndarray:
+        """模型输出类别 -> 分类序号（未映射的类别为 -1）"""
+        model_class_ids = np.asarray(model_class_ids, dtype=np.int64).reshape(-1)
+        lookup = np.full(max(mapping, default=-1) + 1, -1, dtype=np.int16)
+        for model_class, category in mapping.items():
+            if model_class >= 0:
+                lookup[model_class] = _CATEGORY_INDEX[category]
+        mapped = np.full(len(model_class_ids), -1, dtype=np.int16)
+        valid = (model_class_ids >= 0) & (model_class_ids < len(lookup))
+        mapped[valid] = lookup[model_class_ids[valid]]
+        return mapped
+
+    def __len__(self) -> int:
+        return len(self.class_ids)
+
+    def __bool__(self) -> bool:
+        return len(self.class_ids) > 0
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return self.take(np.arange(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"detection index {index} out of range for batch of {len(self)}")
+        detection = self._detections[index]
+        if detection is None:
+            x, y, w, h = self.boxes[index].tolist()
+            detection = Detection.create(
+                category=_CATEGORIES[self.class_ids[index]],
+                confidence=float(self.scores[index]),
+                bbox=BoundingBox(x_center=x, y_center=y, width=w, height=h),
+                source=self.source,
+            )
+            self._detections[index] = detection
+        return detection
+
+    def category(self, index: int) -> WasteCategory:
+        return _CATEGORIES[self.class_ids[index]]
+
+    def score(self, index: int) -> float:
+        return float(self.scores[index])
+
+    def box(self, index: int) -> Tuple[float, float, float, float]:
+        """归一化 (x_center, y_center, width, height)"""
+        x, y, w, h = self.boxes[index].tolist()
+        return (x, y, w, h)
+
+    def above(self, threshold: float) -> "DetectionBatch":
+        """置信度不低于 threshold 的子批（全部满足时返回自身）"""
+        keep = self.scores >= threshold
+        if keep.all():
+            return self
+        return self.take(np.flatnonzero(keep))
+
+    def take(self, indices: Any) -> "DetectionBatch":
+        """按下标取子批（保持给定顺序，已创建的 Detection 随行带走）"""
+        indices = np.asarray(indices, dtype=np.intp).reshape(-1)
+        return DetectionBatch(
+            boxes=self.boxes[indices],
+            scores=self.scores[indices],
+            class_ids=self.class_ids[indices],
+            source=self.source,
+            _detections=[self._detections[i] for i in indices.tolist()],
+        )
@@ -0,0 +1,55 @@
+"""难例采集策略值对象 - 控制哪些帧作为再训练样本保存"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class HardExamplePolicy:
+    """难例采集策略值对象
+
+    职责:
+    - 定义检测器"拿不准"的置信度区间
+    - 定义判定类别翻转/跟踪断裂时两次检测的最大距离
+    - 限定采集频率与磁盘占用
+    """
+    # 首个检测置信度落在 [low, high) 内视为难例；low 低于运行阈值时运行时按 low 输出，
+    # 低于运行阈值的检测只用于难例判定，不送入分拣会话
+    confidence_low: float = 0.3
+    confidence_high: float = 0.5
+    flip_distance: float = 0.1         # 相邻两帧首个检测中心距离不超过该值时视为同一物体（归一化坐标）
+    capture_category_flip: bool = True # 同一物体相邻帧类别不同
+    capture_track_break: bool = True   # 同一物体相邻帧被分到不同的跟踪对象
+    max_per_minute: float = 30.0       # 写入频率上限
+    quota_mb: float = 1024.0           # 采集目录磁盘占用上限
+    jpeg_quality: int = 90
+    queue_size: int = 4                # 等待写入的帧数上限，超出直接丢弃
+
+    def __post_init__(self):
+        if not 0.0 <= self.confidence_low <= self.confidence_high <= 1.0:
+            raise ValueError(
+                f"confidence band must satisfy 0 <= low <= high <= 1, "
+                f"got [{self.confidence_low}, {self.confidence_high})"
+            )
+        if not 0.0 <= self.flip_distance <= 1.0:
+            raise ValueError(f"flip_distance must be between 0 and 1, got {self.flip_distance}")
+        if self.max_per_minute <= 0:
+            raise ValueError(f"max_per_minute must be positive, got {self.max_per_minute}")
+        if self.quota_mb <= 0:
+            raise ValueError(f"quota_mb must be positive, got {self.quota_mb}")
+        if not 1 <= self.jpeg_quality <= 100:
+            raise ValueError(f"jpeg_quality must be between 1 and 100, got {self.jpeg_quality}")
+        if self.queue_size <= 0:
+            raise ValueError(f"queue_size must be positive, got {self.queue_size}")
+
+    @property
+    def min_interval_s(self) -> float:
+        """两次写入的最小间隔（秒）"""
+        return 60.0 / self.max_per_minute
+
+    @property
+    def quota_bytes(self) -> int:
+        return int(self.quota_mb * 1024 * 1024)
+
+    def is_uncertain(self, confidence: float) -> bool:
+        """置信度是否落在难例区间"""
+        return self.confidence_low <= confidence < self.confidence_high
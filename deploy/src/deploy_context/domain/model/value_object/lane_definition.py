@@ -0,0 +1,95 @@
+"""分拣通道值对象 - 单个相机画面中的一条通道（多边形 ROI + 串口目标）"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class LaneDefinition:
+    """分拣通道值对象
+
+    职责:
+    - 以归一化坐标多边形定义通道区域
+    - 指定该通道分拣器对应的串口
+
+    检测框中心落在多边形内（含边界）即归属该通道
+    """
+    name: str
+    polygon: Tuple[Tuple[float, float], ...]
+    serial_port: Optional[str] = None       # None 表示该通道只计数不输出
+    serial_baudrate: Optional[int] = None   # None 表示沿用全局波特率
+
+    def __post_init__(self):
+        if not self.name:
+            raise ValueError("lane name must not be empty")
+        polygon = tuple((float(x), float(y)) for x, y in self.polygon)
+        if len(polygon) < 3:
+            raise ValueError(f"lane {self.name!r} polygon needs at least 3 points, got {len(polygon)}")
+        for x, y in polygon:
+            if not (0.0 <= x <= 1.0 and 0.0 <= y <= 1.0):
+                raise ValueError(f"lane {self.name!r} polygon points must be normalized, got ({x}, {y})")
+        object.__setattr__(self, 'polygon', polygon)
+
+    @classmethod
+    def full_frame(cls, name: str = "default") -> "LaneDefinition":
+        """覆盖整个画面的通道"""
+        return cls(name=name, polygon=((0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LaneDefinition":
+        """从配置文件条目创建"""
+        return cls(
+            name=str(data.get("name", "")),
+            polygon=tuple(tuple(point) for point in data.get("roi") or ()),
+            serial_port=data.get("serial_port"),
+            serial_baudrate=data.get("serial_baudrate"),
+        )
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """外接矩形 (x_min, y_min, x_max, y_max)"""
+        xs = [x for x, _ in self.polygon]
+        ys = [y for _, y in self.polygon]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    def contains(self, x: float, y: float) -> bool:
+        """判断点是否在通道内（射线法，边界上的点视为在内）"""
+        inside = False
+        points = self.polygon
+        j = len(points) - 1
+        for i in range(len(points)):
+            xi, yi = points[i]
+            xj, yj = points[j]
+            # 边界
+            cross = (x - xi) * (yj - yi) - (y - yi) * (xj - xi)
+            if abs(cross) < 1e-12 and min(xi, xj) <= x <= max(xi, xj) and min(yi, yj) <= y <= max(yi, yj):
+                return True
+            if (yi > y) != (yj > y):
+                x_cross = xi + (y - yi) * (xj - xi) / (yj - yi)
+                if x < x_cross:
+                    inside = not inside
+            j = i
+        return inside
+
+    def contains_points(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """contains 的向量化版本，返回布尔数组"""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        inside = np.zeros(xs.shape, dtype=bool)
+        on_edge = np.zeros(xs.shape, dtype=bool)
+        points = self.polygon
+        j = len(points) - 1
+        for i in range(len(points)):
+            xi, yi = points[i]
+            xj, yj = points[j]
+            cross = (xs - xi) * (yj - yi) - (ys - yi) * (xj - xi)
+            on_edge |= ((np.abs(cross) < 1e-12)
+                        & (xs >= min(xi, xj)) & (xs <= max(xi, xj))
+                        & (ys >= min(yi, yj)) & (ys <= max(yi, yj)))
+            if yi != yj:
+                straddles = (yi > ys) != (yj > ys)
+                inside ^= straddles & (xs < xi + (ys - yi) * (xj - xi) / (yj - yi))
+            j = i
+        return inside | on_edge
@@ -0,0 +1,88 @@
+"""延迟预算策略值对象 - 定义端到端延迟预算与降级阶梯"""
+
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class DegradationLevel:
+    """降级档位值对象
+
+    描述推理管线在某一档位下的运行参数，档位越高越省算力
+    """
+    input_size: int = 640             # 推理输入尺寸（像素）
+    motion_threshold: float = 0.0     # 运动门控阈值（0 表示不做门控）
+    use_fallback_model: bool = False  # 是否切换到小模型
+
+    def __post_init__(self):
+        if self.input_size <= 0:
+            raise ValueError(f"input_size must be positive, got {self.input_size}")
+        if not 0.0 <= self.motion_threshold <= 1.0:
+            raise ValueError(f"motion_threshold must be between 0 and 1, got {self.motion_threshold}")
+
+
+# 默认降级阶梯：先降输入尺寸，再逐步加强运动门控，最后切换小模型
+DEFAULT_DEGRADATION_LADDER: Tuple[DegradationLevel, ...] = (
+    DegradationLevel(input_size=640),
+    DegradationLevel(input_size=480),
+    DegradationLevel(input_size=480, motion_threshold=0.02),
+    DegradationLevel(input_size=480, motion_threshold=0.05),
+    DegradationLevel(input_size=480, motion_threshold=0.05, use_fallback_model=True),
+)
+
+
+@dataclass(frozen=True)
+class LatencyBudgetPolicy:
+    """延迟预算策略值对象
+
+    职责:
+    - 定义端到端延迟预算及滚动窗口
+    - 定义降档/升档的判定条件（带滞回，避免来回抖动）
+    - 持有降级阶梯
+    """
+    budget_ms: float = 150.0          # 端到端延迟预算（毫秒）
+    window_size: int = 30             # 滚动窗口帧数
+    percentile: float = 0.9           # 与预算比较的分位数
+    headroom_ratio: float = 0.6       # 低于 预算*比例 时尝试升档
+    levels: Tuple[DegradationLevel, ...] = DEFAULT_DEGRADATION_LADDER
+
+    def __post_init__(self):
+        if self.budget_ms <= 0:
+            raise ValueError(f"budget_ms must be positive, got {self.budget_ms}")
+        if self.window_size <= 0:
+            raise ValueError(f"window_size must be positive, got {self.window_size}")
+        if not 0.0 < self.percentile <= 1.0:
+            raise ValueError(f"percentile must be in (0, 1], got {self.percentile}")
+        if not 0.0 < self.headroom_ratio < 1.0:
+            raise ValueError(f"headroom_ratio must be in (0, 1), got {self.headroom_ratio}")
+        if not self.levels:
+            raise ValueError("levels must not be empty")
+        object.__setattr__(self, 'levels', tuple(self.levels))
+
+    @property
+    def max_level(self) -> int:
+        """最高档位编号"""
+        return len(self.levels) - 1
+
+    def get_level(self, index: int) -> DegradationLevel:
+        """获取指定档位（越界时截断到合法范围）"""
+        return self.levels[max(0, min(self.max_level, index))]
+
+    def is_breached(self, latency_ms: float) -> bool:
+        """判断是否超出预算"""
+        return latency_ms > self.budget_ms
+
+    def has_headroom(self, latency_ms: float) -> bool:
+        """判断是否有足够余量可以升档"""
+        return latency_ms < self.budget_ms * self.headroom_ratio
+
+    def without_fallback_model(self) -> "LatencyBudgetPolicy":
+        """去掉需要小模型的档位（未配置小模型时使用）"""
+        levels = tuple(level for level in self.levels if not level.use_fallback_model)
+        return LatencyBudgetPolicy(
+            budget_ms=self.budget_ms,
+            window_size=self.window_size,
+            percentile=self.percentile,
+            headroom_ratio=self.headroom_ratio,
+            levels=levels or (DegradationLevel(),)
+        )
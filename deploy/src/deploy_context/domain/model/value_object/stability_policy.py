@@ -1,8 +1,12 @@
 """稳定策略值对象 - 控制识别稳定性判断"""
 
+import math
 from dataclasses import dataclass
 from typing import Optional
 
+# 稳定判定规则：fixed 固定时长 + 最少检测次数；sprt 按置信度累积证据（序贯概率比检验）
+DECISION_RULES = ("fixed", "sprt")
+
 
 @dataclass(frozen=True)
 class StabilityPolicy:
@@ -12,16 +16,48 @@ class StabilityPolicy:
     - 定义识别稳定性的判断条件
     - 控制防重计数机制
     - 管理对象跟踪状态
+
+    sprt 规则下每帧证据为置信度的对数几率 ln(p / (1 - p))，跟踪对象累计证据
+    达到 evidence_threshold 即判定稳定；高置信度目标一两帧即可判定，
+    置信度接近 0.5 的目标证据累积缓慢，最迟在固定规则的时长与次数满足时判定
     """
     stability_threshold_ms: int = 1000  # 稳定性判定时间（毫秒）
     detection_reset_ms: int = 500       # 检测重置时间（毫秒）
     position_tolerance: float = 0.05    # 位置容差（归一化坐标）
     min_detection_count: int = 2        # 最小检测次数
     max_retry_count: int = 3            # 最大重试次数
+    decision_rule: str = "fixed"        # fixed / sprt
+    evidence_threshold: float = 4.0     # sprt 判定所需的累计对数几率（4.0 约对应 0.98）
+    max_frame_confidence: float = 0.99  # 单帧置信度上限，限制单帧证据
     
     def __post_init__(self):
         if not 0.0 <= self.position_tolerance <= 1.0:
             raise ValueError(f"position_tolerance must be between 0 and 1, got {self.position_tolerance}")
+        if self.decision_rule not in DECISION_RULES:
+            raise ValueError(f"decision_rule must be one of {DECISION_RULES}, got {self.decision_rule!r}")
+        if self.evidence_threshold <= 0:
+            raise ValueError(f"evidence_threshold must be positive, got {self.evidence_threshold}")
+        if not 0.5 < self.max_frame_confidence < 1.0:
+            raise ValueError(
+                f"max_frame_confidence must be between 0.5 and 1 (exclusive), got {self.max_frame_confidence}"
+            )
+    
+    def frame_evidence(self, confidence: Optional[float]) -> float:
+        """单帧证据：置信度的对数几率（置信度低于 0.5 时为负）"""
+        if confidence is None:
+            return 0.0
+        p = min(max(confidence, 1.0 - self.max_frame_confidence), self.max_frame_confidence)
+        return math.log(p / (1.0 - p))
+    
+    def is_decided(self, detection_count: int, elapsed_ms: float, evidence: float = 0.0) -> bool:
+        """判断跟踪对象是否已稳定
+
+        fixed：检测次数与持续时长均达到阈值；
+        sprt：累计证据达到阈值，或与 fixed 相同的条件（截断，模糊目标不会无限等待）
+        """
+        if detection_count >= self.min_detection_count and elapsed_ms >= self.stability_threshold_ms:
+            return True
+        return self.decision_rule == "sprt" and evidence >= self.evidence_threshold
     
     def is_position_stable(
         self,
@@ -50,6 +86,7 @@ class StabilityPolicy:
             return False
         if not is_stable:
             return False
-        if detection_count < self.min_detection_count:
+        # sprt 下证据充足即可计数，不要求最少检测次数
+        if self.decision_rule == "fixed" and detection_count < self.min_detection_count:
             return False
         return True
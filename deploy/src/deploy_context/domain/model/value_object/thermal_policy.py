@@ -0,0 +1,69 @@
+"""温控策略值对象 - 根据芯片温度提前降档，避开内核硬限频"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ThermalPolicy:
+    """温控策略值对象
+
+    职责:
+    - 将最高温度映射为温控档位（0 表示不限制）
+    - 回落时要求温度低于档位阈值一段滞回距离，避免在阈值附近反复切换
+    - 定义每一档额外增加的推理间隔
+
+    温控档位作为延迟调控的下限：降级阶梯不会回升到该档位之上
+    """
+    enabled: bool = False
+    throttle_start_c: float = 70.0        # 开始降档的温度（应低于内核 passive 触发点）
+    step_c: float = 5.0                   # 每升高多少度再降一档
+    hysteresis_c: float = 3.0             # 回升档位需要额外降低的温度
+    interval_step_ms: int = 20            # 每档额外增加的推理间隔（降低推理频率）
+    freq_capped_ratio: float = 0.9        # CPU 频率上限低于最大频率的该比例时视为内核已限频
+    poll_interval_s: float = 1.0          # 采样间隔
+
+    def __post_init__(self):
+        if self.step_c <= 0:
+            raise ValueError(f"step_c must be positive, got {self.step_c}")
+        if self.hysteresis_c < 0:
+            raise ValueError(f"hysteresis_c must be non-negative, got {self.hysteresis_c}")
+        if self.interval_step_ms < 0:
+            raise ValueError(f"interval_step_ms must be non-negative, got {self.interval_step_ms}")
+        if not 0.0 < self.freq_capped_ratio <= 1.0:
+            raise ValueError(f"freq_capped_ratio must be in (0, 1], got {self.freq_capped_ratio}")
+        if self.poll_interval_s <= 0:
+            raise ValueError(f"poll_interval_s must be positive, got {self.poll_interval_s}")
+
+    def level_for(self, temperature_c: float) -> int:
+        """温度对应的档位（不考虑滞回）"""
+        if temperature_c < self.throttle_start_c:
+            return 0
+        return 1 + int((temperature_c - self.throttle_start_c) // self.step_c)
+
+    def target_level(
+        self,
+        temperature_c: float,
+        current_level: int,
+        max_level: int,
+        freq_ratio: float = 1.0,
+    ) -> int:
+        """计算下一档位
+
+        Args:
+            temperature_c: 各温区中的最高温度
+            current_level: 当前温控档位
+            max_level: 最高档位
+            freq_ratio: CPU 频率上限 / 硬件最大频率（各策略取最小）
+        """
+        level = self.level_for(temperature_c)
+        if freq_ratio < self.freq_capped_ratio:
+            # 内核已开始限频，至少保持一档
+            level = max(level, 1)
+        if level < current_level:
+            # 回落：按 温度+滞回 计算，未降够不回升
+            level = max(level, min(current_level, self.level_for(temperature_c + self.hysteresis_c)))
+        return max(0, min(max_level, level))
+
+    def inference_interval_ms(self, base_interval_ms: int, level: int) -> int:
+        """温控档位下的推理间隔"""
+        return base_interval_ms + self.interval_step_ms * max(0, level)
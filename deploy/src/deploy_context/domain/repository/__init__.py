@@ -2,5 +2,6 @@
 
 from .i_runtime_model import IInferenceRuntime
 from .i_device_io import ICamera, ISerialDevice
+from .i_crop_classifier import ICropClassifier
 
-__all__ = ["IInferenceRuntime", "ICamera", "ISerialDevice"]
+__all__ = ["IInferenceRuntime", "ICamera", "ISerialDevice", "ICropClassifier"]
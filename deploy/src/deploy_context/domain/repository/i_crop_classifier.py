@@ -0,0 +1,39 @@
+"""裁剪分类器接口"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Tuple
+
+from shared_kernel.domain.taxonomy import WasteCategory
+
+
+class ICropClassifier(ABC):
+    """裁剪分类器接口
+
+    第二阶段分类：对单个目标的裁剪图给出类别与置信度
+    """
+
+    @abstractmethod
+    def load_model(self, model_path: str) -> None:
+        """加载模型"""
+        pass
+
+    @abstractmethod
+    def classify(self, crop: Any) -> Optional[Tuple[WasteCategory, float]]:
+        """分类裁剪图
+
+        Args:
+            crop: BGR 裁剪图像
+
+        Returns:
+            (类别, 置信度)；无法判断时返回 None
+        """
+        pass
+
+    @abstractmethod
+    def is_loaded(self) -> bool:
+        """检查模型是否已加载"""
+        pass
+
+    def unload(self) -> None:
+        """卸载模型"""
+        pass
@@ -5,6 +5,8 @@ from typing import Optional, List, Any
 
 from shared_kernel.domain.annotation import Detection, LabelFile
 
+from ..model.value_object import DetectionBatch
+
 
 class IInferenceRuntime(ABC):
     """推理运行时接口
@@ -29,6 +31,19 @@ class IInferenceRuntime(ABC):
         """
         pass
     
+    def infer_batch(self, image) -> DetectionBatch:
+        """执行推理，以列数组返回结果（部署热路径使用）
+        
+        默认由 infer() 的结果转换；运行时应直接从输出张量构造，不创建 Detection 对象
+        
+        Args:
+            image: 输入图像
+            
+        Returns:
+            DetectionBatch: 检测批
+        """
+        return DetectionBatch.from_detections(self.infer(image))
+    
     @abstractmethod
     def detect(self, image_path: str) -> LabelFile:
         """检测图像
@@ -50,3 +65,10 @@ class IInferenceRuntime(ABC):
     def unload(self) -> None:
         """卸载模型"""
         pass
+    
+    def set_input_size(self, input_size: int) -> bool:
+        """设置推理输入尺寸
+        
+        默认不支持（如 RKNN 模型输入尺寸在编译时固定），返回 False
+        """
+        return False
@@ -2,5 +2,12 @@
 
 from .stability_judge import StabilityJudge, StabilityReport
 from .packet_encoder import PacketEncoder
+from .latency_governor import LatencyGovernor, GovernorTransition
+from .policy_replay import PolicyReplayer, ReplayFrame, ReplayResult
+from .lane_router import LaneRouter
+from .hard_example_sampler import HardExampleSampler
 
-__all__ = ["StabilityJudge", "StabilityReport", "PacketEncoder"]
+__all__ = ["StabilityJudge", "StabilityReport", "PacketEncoder",
+           "LatencyGovernor", "GovernorTransition",
+           "PolicyReplayer", "ReplayFrame", "ReplayResult", "LaneRouter",
+           "HardExampleSampler"]
@@ -0,0 +1,64 @@
+"""难例判定领域服务 - 标记值得保存用于再训练的帧"""
+
+from typing import Any, Optional, Sequence, Tuple
+
+from ..model.value_object import HardExamplePolicy, DetectionBatch
+
+# 难例原因
+REASON_LOW_CONFIDENCE = "low_confidence"
+REASON_CATEGORY_FLIP = "category_flip"
+REASON_TRACK_BREAK = "track_break"
+
+
+class HardExampleSampler:
+    """难例判定服务
+
+    职责:
+    - 首个检测置信度落在难例区间
+    - 同一位置的物体在相邻帧间类别翻转
+    - 同一位置、同一类别的物体在相邻帧间被分到新的跟踪对象（跟踪不稳定）
+
+    只比较相邻两帧的首个检测，每帧 O(1)，在决策线程中调用
+    """
+
+    def __init__(self, policy: Optional[HardExamplePolicy] = None):
+        self._policy = policy or HardExamplePolicy()
+        self._previous: Optional[Tuple[Any, float, float, Optional[int]]] = None
+
+    @property
+    def policy(self) -> HardExamplePolicy:
+        return self._policy
+
+    def reset(self) -> None:
+        self._previous = None
+
+    def reasons(self, detections: Sequence[Any], track_id: Optional[int] = None) -> Tuple[str, ...]:
+        """判定本帧的难例原因，非难例返回空元组
+
+        Args:
+            detections: 本帧检测（置信度降序）
+            track_id: 首个检测所属的跟踪编号（未跟踪时为 None）
+        """
+        if not detections:
+            self._previous = None
+            return ()
+        policy = self._policy
+        batch = DetectionBatch.coerce(detections)
+        category = batch.category(0)
+        x_center, y_center, _, _ = batch.box(0)
+        previous, self._previous = self._previous, (category, x_center, y_center, track_id)
+
+        reasons = []
+        if policy.is_uncertain(batch.score(0)):
+            reasons.append(REASON_LOW_CONFIDENCE)
+        if previous is not None:
+            previous_category, x, y, previous_track = previous
+            nearby = (abs(x_center - x) <= policy.flip_distance
+                      and abs(y_center - y) <= policy.flip_distance)
+            if nearby and previous_category != category:
+                if policy.capture_category_flip:
+                    reasons.append(REASON_CATEGORY_FLIP)
+            elif (nearby and policy.capture_track_break and track_id is not None
+                  and previous_track is not None and track_id != previous_track):
+                reasons.append(REASON_TRACK_BREAK)
+        return tuple(reasons)
@@ -0,0 +1,62 @@
+"""通道路由领域服务 - 按检测框中心把一帧的检测分配到各通道"""
+
+from typing import Any, List, Sequence
+
+import numpy as np
+
+from ..model.value_object import LaneDefinition, DetectionBatch
+
+
+class LaneRouter:
+    """通道路由服务
+
+    职责:
+    - 按检测框中心位置把检测分配到通道（按配置顺序取第一个匹配）
+    - 不在任何通道内的检测丢弃
+
+    各通道内保持检测器输出的顺序（置信度降序），通道会话仍以首个检测为准
+    """
+
+    def __init__(self, lanes: Sequence[LaneDefinition]):
+        if not lanes:
+            raise ValueError("at least one lane is required")
+        names = [lane.name for lane in lanes]
+        if len(set(names)) != len(names):
+            raise ValueError(f"lane names must be unique, got {names}")
+        self._lanes = tuple(lanes)
+        self._bounds = [lane.bounds for lane in self._lanes]
+
+    @property
+    def lanes(self) -> Sequence[LaneDefinition]:
+        return self._lanes
+
+    def lane_index(self, x: float, y: float) -> int:
+        """点所在的通道序号，不在任何通道内返回 -1"""
+        for index, (lane, (x0, y0, x1, y1)) in enumerate(zip(self._lanes, self._bounds)):
+            if x0 <= x <= x1 and y0 <= y <= y1 and lane.contains(x, y):
+                return index
+        return -1
+
+    def lane_indices(self, batch: DetectionBatch) -> np.ndarray:
+        """检测批中每个检测所在的通道序号（向量化），不在任何通道内为 -1"""
+        xs, ys = batch.boxes[:, 0], batch.boxes[:, 1]
+        indices = np.full(len(batch), -1, dtype=np.intp)
+        for index, (lane, (x0, y0, x1, y1)) in enumerate(zip(self._lanes, self._bounds)):
+            candidates = (indices < 0) & (xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)
+            if candidates.any():
+                hits = np.flatnonzero(candidates)
+                indices[hits[lane.contains_points(xs[hits], ys[hits])]] = index
+        return indices
+    
+    def route(self, detections: Sequence[Any]) -> List[Any]:
+        """按通道分组，返回与 lanes 一一对应的检测列表（检测批按列分组为子批）"""
+        if isinstance(detections, DetectionBatch):
+            indices = self.lane_indices(detections)
+            return [detections.take(np.flatnonzero(indices == index)) for index in range(len(self._lanes))]
+        routed: List[List[Any]] = [[] for _ in self._lanes]
+        for detection in detections:
+            box = detection.bounding_box
+            index = self.lane_index(box.x_center, box.y_center)
+            if index >= 0:
+                routed[index].append(detection)
+        return routed
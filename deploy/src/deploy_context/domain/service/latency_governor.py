@@ -0,0 +1,131 @@
+"""延迟预算调控领域服务"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, List, Optional, Dict, Any
+
+from ..model.value_object import LatencyBudgetPolicy, DegradationLevel
+
+
+@dataclass
+class GovernorTransition:
+    """档位切换记录"""
+    from_level: int
+    to_level: int
+    reason: str                 # budget_exceeded / headroom / thermal
+    latency_ms: float           # 触发切换时的滚动延迟
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "from_level": self.from_level,
+            "to_level": self.to_level,
+            "reason": self.reason,
+            "latency_ms": round(self.latency_ms, 3),
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+
+class LatencyGovernor:
+    """延迟预算调控服务
+
+    职责:
+    - 维护端到端延迟的滚动窗口
+    - 超出预算时沿降级阶梯下降一档，余量充足时回升一档
+    - 记录每一次档位切换
+
+    每次切换后清空窗口，新档位需要积累满一个窗口才会再次评估，
+    配合 headroom_ratio 形成滞回，避免在两档之间来回抖动。
+    外部约束（如温控）可通过 set_floor 设定档位下限，升档不会越过下限
+    """
+
+    def __init__(self, policy: Optional[LatencyBudgetPolicy] = None, max_transitions: int = 50):
+        self._policy = policy or LatencyBudgetPolicy()
+        self._window: Deque[float] = deque(maxlen=self._policy.window_size)
+        self._level = 0
+        self._floor = 0
+        self._transitions: Deque[GovernorTransition] = deque(maxlen=max_transitions)
+
+    @property
+    def policy(self) -> LatencyBudgetPolicy:
+        return self._policy
+
+    @property
+    def level(self) -> int:
+        return self._level
+
+    @property
+    def floor(self) -> int:
+        """档位下限"""
+        return self._floor
+
+    @property
+    def current(self) -> DegradationLevel:
+        """当前档位参数"""
+        return self._policy.get_level(self._level)
+
+    @property
+    def transitions(self) -> List[GovernorTransition]:
+        return list(self._transitions)
+
+    @property
+    def rolling_latency_ms(self) -> float:
+        """当前窗口内的分位延迟（窗口为空时为 0）"""
+        return self._window_percentile() if self._window else 0.0
+
+    def observe(self, latency_ms: float) -> Optional[GovernorTransition]:
+        """记录一帧的端到端延迟
+
+        Returns:
+            GovernorTransition: 发生档位切换时返回切换记录；否则返回 None
+        """
+        self._window.append(latency_ms)
+        if len(self._window) < self._policy.window_size:
+            return None
+
+        observed = self._window_percentile()
+        if self._policy.is_breached(observed) and self._level < self._policy.max_level:
+            return self._transition(self._level + 1, "budget_exceeded", observed)
+        if self._policy.has_headroom(observed) and self._level > self._floor:
+            return self._transition(self._level - 1, "headroom", observed)
+        return None
+
+    def set_floor(self, level: int, reason: str = "thermal") -> Optional[GovernorTransition]:
+        """设定档位下限；当前档位低于下限时立即降到下限
+
+        下限降低时不立即升档，仍由延迟窗口按余量逐档回升
+
+        Returns:
+            GovernorTransition: 发生档位切换时返回切换记录；否则返回 None
+        """
+        self._floor = max(0, min(self._policy.max_level, level))
+        if self._level < self._floor:
+            return self._transition(self._floor, reason, self.rolling_latency_ms)
+        return None
+
+    def _transition(self, to_level: int, reason: str, latency_ms: float) -> GovernorTransition:
+        """切换档位"""
+        transition = GovernorTransition(
+            from_level=self._level,
+            to_level=to_level,
+            reason=reason,
+            latency_ms=latency_ms
+        )
+        self._level = to_level
+        self._window.clear()
+        self._transitions.append(transition)
+        return transition
+
+    def _window_percentile(self) -> float:
+        """计算窗口分位数（最近邻取整）"""
+        ordered = sorted(self._window)
+        index = min(len(ordered) - 1, int(self._policy.percentile * len(ordered)))
+        return ordered[index]
+
+    def reset(self) -> None:
+        """重置到最高质量档位"""
+        self._window.clear()
+        self._level = 0
+        self._floor = 0
+        self._transitions.clear()
@@ -4,7 +4,7 @@ from typing import Dict, Optional
 
 from shared_kernel.config.loader import ConfigLoader
 
-from ..model.value_object import SerialPacket
+from ..model.value_object import SerialPacket, DetectionBatch
 
 
 class PacketEncoder:
@@ -50,6 +50,11 @@ class PacketEncoder:
         protocol_id = self._protocol_map.get(category_id, category_id)
         return SerialPacket.from_normalized(protocol_id, x_normalized, y_normalized)
     
+    def encode_detection(self, batch: DetectionBatch, index: int = 0) -> SerialPacket:
+        """直接按列编码检测批中的一个检测（不创建 Detection 对象）"""
+        x_normalized, y_normalized = batch.boxes[index, :2].tolist()
+        return self.encode(int(batch.class_ids[index]), x_normalized, y_normalized)
+    
     def encode_empty(self) -> SerialPacket:
         """编码空检测"""
         return SerialPacket.empty()
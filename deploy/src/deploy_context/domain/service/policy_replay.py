@@ -0,0 +1,118 @@
+"""策略回放领域服务 - 用记录的检测流离线评估稳定/冷却策略"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from shared_kernel.domain.taxonomy import WasteCategory
+
+from ..model.aggregate.sorting_session import SortingSession
+from ..model.entity import DetectionFrame
+from ..model.value_object import CooldownPolicy, StabilityPolicy
+
+
+# 回放时空帧的时间步长（与会话中无检测重置的帧间隔假设一致）
+_IDLE_FRAME_S = 0.033
+
+
+class ReplayFrame(NamedTuple):
+    """回放帧（记录中首个检测；category 为 None 表示无检测）"""
+    timestamp: float                       # 采集时间戳（秒）
+    category: Optional[WasteCategory]
+    confidence: float = 0.0
+    x: float = 0.0
+    y: float = 0.0
+    idle_before: int = 0                   # 此帧之前连续的无检测帧数
+
+
+@dataclass
+class ReplayResult:
+    """单条检测流的回放结果"""
+    frames: int = 0
+    packets: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)        # 分类值 -> 计数
+    decision_latencies_ms: List[float] = field(default_factory=list)
+
+    def count_error(self, truth: Dict[str, int]) -> int:
+        """各类别计数绝对误差之和"""
+        categories = set(truth) | set(self.counts)
+        return sum(abs(self.counts.get(c, 0) - truth.get(c, 0)) for c in categories)
+
+
+def _utc(timestamp: float) -> datetime:
+    """Unix 时间戳 -> 不带时区的 UTC 时间（与会话时钟 datetime.utcnow 一致）"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+class _ReplayClock:
+    """回放时钟：返回当前回放帧的时间"""
+
+    def __init__(self):
+        self.now = _utc(0)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class PolicyReplayer:
+    """策略回放服务
+
+    职责:
+    - 以记录的采集时间驱动 SortingSession，复现线上的跟踪、稳定与冷却判定
+    - 统计各类别计数与决策延迟（目标首次出现到发出数据包）
+
+    连续的无检测帧最多回放到重置计时触发为止，之后的空帧对会话状态没有影响
+    """
+
+    def __init__(
+        self,
+        stability_policy: StabilityPolicy,
+        cooldown_policy: CooldownPolicy,
+        class_mapping: Optional[Dict[int, int]] = None,
+    ):
+        self._stability_policy = stability_policy
+        self._cooldown_policy = cooldown_policy
+        self._class_mapping = class_mapping or {}
+        self._max_idle = int(stability_policy.detection_reset_ms / 1000.0 / _IDLE_FRAME_S) + 2
+
+    def replay(self, frames: Sequence[ReplayFrame]) -> ReplayResult:
+        """回放一条检测流"""
+        clock = _ReplayClock()
+        session = SortingSession.create(
+            class_mapping=self._class_mapping,
+            cooldown_policy=self._cooldown_policy,
+            stability_policy=self._stability_policy,
+            clock=clock,
+        )
+        session.initialize(1, 1)
+        session.start()
+        empty = DetectionFrame(frame_id="", image_width=1, image_height=1)
+        result = ReplayResult()
+
+        for frame in frames:
+            for _ in range(min(frame.idle_before, self._max_idle)):
+                session.process_frame(empty)
+            clock.now = _utc(frame.timestamp)
+            packet = session.process_frame(DetectionFrame(
+                frame_id="",
+                image_width=1,
+                image_height=1,
+                detected_category=frame.category,
+                confidence=frame.confidence,
+                x_normalized=frame.x,
+                y_normalized=frame.y,
+                timestamp=clock.now,
+            ) if frame.category is not None else empty)
+            result.frames += 1 + frame.idle_before
+            if packet is not None:
+                result.packets += 1
+                track = session.current_track
+                result.decision_latencies_ms.append(
+                    (clock.now - track.first_seen).total_seconds() * 1000
+                )
+
+        result.counts = {
+            category.value: count for category, count in session.counter.counts.items()
+            if count and category is not None
+        }
+        return result
@@ -1,10 +1,8 @@
 """稳定性判断领域服务"""
 
+import math
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
-
-from shared_kernel.domain.annotation import Detection
+from typing import Optional, List, Dict, Hashable
 
 from ..model.value_object import StabilityPolicy
 from ..model.entity import DetectionFrame
@@ -21,6 +19,102 @@ class StabilityReport:
     should_classify: bool
 
 
+class _TrackWindow:
+    """单个跟踪对象的定长环形窗口
+
+    窗口内各帧的类别、置信度、位置与时间戳存放在预分配的环形数组中，
+    置信度维护滑动和，类别维护游程编码（同样是环形数组），
+    因此追加一帧（必要时淘汰最旧一帧）与读取各项指标都是 O(1)
+    """
+    __slots__ = ("capacity", "size", "head", "categories", "confidences", "xs", "ys", "timestamps",
+                 "confidence_sum", "confidence_count", "run_categories", "run_lengths",
+                 "run_head", "run_count")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.size = 0
+        self.head = 0                       # 最旧一帧的下标
+        self.categories = [None] * capacity
+        self.confidences = [None] * capacity
+        self.xs = [None] * capacity
+        self.ys = [None] * capacity
+        self.timestamps = [None] * capacity
+        self.confidence_sum = 0.0
+        self.confidence_count = 0
+        # 类别游程：窗口最前面的游程长度即连续匹配次数
+        self.run_categories = [None] * capacity
+        self.run_lengths = [0] * capacity
+        self.run_head = 0
+        self.run_count = 0
+
+    def push(self, frame: DetectionFrame) -> None:
+        """追加一帧，窗口已满时先淘汰最旧一帧"""
+        capacity = self.capacity
+        if self.size == capacity:
+            head = self.head
+            confidence = self.confidences[head]
+            if confidence is not None:
+                self.confidence_sum -= confidence
+                self.confidence_count -= 1
+            self.run_lengths[self.run_head] -= 1
+            if self.run_lengths[self.run_head] == 0:
+                self.run_categories[self.run_head] = None
+                self.run_head = (self.run_head + 1) % capacity
+                self.run_count -= 1
+            self.categories[head] = None
+            self.head = (head + 1) % capacity
+            self.size -= 1
+
+        index = (self.head + self.size) % capacity
+        category = frame.detected_category
+        self.categories[index] = category
+        self.confidences[index] = frame.confidence
+        self.xs[index] = frame.x_normalized
+        self.ys[index] = frame.y_normalized
+        self.timestamps[index] = frame.timestamp
+        self.size += 1
+        if frame.confidence is not None:
+            self.confidence_sum += frame.confidence
+            self.confidence_count += 1
+
+        last_run = (self.run_head + self.run_count - 1) % capacity
+        if self.run_count and self.run_categories[last_run] == category:
+            self.run_lengths[last_run] += 1
+        else:
+            last_run = (self.run_head + self.run_count) % capacity
+            self.run_categories[last_run] = category
+            self.run_lengths[last_run] = 1
+            self.run_count += 1
+
+    @property
+    def consecutive_matches(self) -> int:
+        """从窗口最旧一帧起与其类别相同的连续帧数"""
+        return self.run_lengths[self.run_head] if self.run_count else 0
+
+    @property
+    def confidence_score(self) -> float:
+        if not self.confidence_count:
+            return 0.0
+        return self.confidence_sum / self.confidence_count
+
+    @property
+    def position_delta(self) -> float:
+        """最旧一帧到最新一帧的位移（任一端缺少位置时为 1.0）"""
+        if self.size < 2:
+            return 0.0
+        first = self.head
+        last = (self.head + self.size - 1) % self.capacity
+        x1, y1, x2, y2 = self.xs[first], self.ys[first], self.xs[last], self.ys[last]
+        if x1 is None or y1 is None or x2 is None or y2 is None:
+            return 1.0
+        dx = x2 - x1
+        dy = y2 - y1
+        return (dx ** 2 + dy ** 2) ** 0.5
+
+    def duration_ms(self, current_frame: DetectionFrame) -> float:
+        return (current_frame.timestamp - self.timestamps[self.head]).total_seconds() * 1000
+
+
 class StabilityJudge:
     """稳定性判断服务
     
@@ -28,26 +122,57 @@ class StabilityJudge:
     - 判断检测结果是否稳定
     - 决定是否触发分类
     - 提供稳定性详细信息
+    
+    按 track_id 评估时每个跟踪对象保留最近 window_size 帧（含当前帧）的环形窗口，
+    结果与传入这些帧作为 history 时一致，每帧 O(1)。
+    窗口跨度决定可观测的最长跟踪时长，未指定 window_size 时按策略的稳定时长与
+    最高帧率推导，保证任意不超过 max_fps 的帧率下都能累计到 stability_threshold_ms
     """
     
-    def __init__(self, policy: Optional[StabilityPolicy] = None):
+    def __init__(
+        self,
+        policy: Optional[StabilityPolicy] = None,
+        window_size: Optional[int] = None,
+        max_fps: float = 120.0
+    ):
+        if max_fps <= 0:
+            raise ValueError(f"max_fps must be positive, got {max_fps}")
         self._policy = policy or StabilityPolicy()
-        self._history: Dict[str, List[DetectionFrame]] = {}
+        if window_size is None:
+            window_size = self.required_window_size(self._policy, max_fps)
+        if window_size <= 0:
+            raise ValueError(f"window_size must be positive, got {window_size}")
+        self._window_size = window_size
+        self._tracks: Dict[Hashable, _TrackWindow] = {}
+    
+    @property
+    def window_size(self) -> int:
+        return self._window_size
+    
+    @staticmethod
+    def required_window_size(policy: StabilityPolicy, max_fps: float) -> int:
+        """覆盖 stability_threshold_ms 所需的窗口帧数（帧间隔数 + 1，且不少于最小检测次数）"""
+        intervals = math.ceil(policy.stability_threshold_ms * max_fps / 1000)
+        return max(intervals + 1, policy.min_detection_count)
     
     def evaluate(
         self,
         current_frame: DetectionFrame,
-        history: Optional[List[DetectionFrame]] = None
+        history: Optional[List[DetectionFrame]] = None,
+        track_id: Optional[Hashable] = None
     ) -> StabilityReport:
         """评估当前帧的稳定性
         
         Args:
             current_frame: 当前检测帧
-            history: 历史检测帧列表
+            history: 历史检测帧列表（与 track_id 二选一）
+            track_id: 跟踪对象标识，给出时使用该对象的环形窗口作为历史并追加当前帧
             
         Returns:
             StabilityReport: 稳定性评估报告
         """
+        if history is not None and track_id is not None:
+            raise ValueError("history and track_id are mutually exclusive")
         if not current_frame.has_detection:
             return StabilityReport(
                 is_stable=False,
@@ -58,25 +183,23 @@ class StabilityJudge:
                 should_classify=False
             )
         
-        history = history or []
-        frames = history + [current_frame]
-        
-        # 计算连续匹配次数
-        consecutive = self._count_consecutive_matches(frames)
-        
-        # 计算位置变化
-        if len(frames) >= 2:
-            first = frames[0]
-            last = frames[-1]
-            position_delta = self._calculate_position_delta(first, last)
+        if track_id is not None:
+            window = self._tracks.get(track_id)
+            if window is None:
+                window = self._tracks[track_id] = _TrackWindow(self._window_size)
         else:
-            position_delta = 0.0
-        
-        # 计算跟踪时长
-        tracking_duration = (current_frame.timestamp - frames[0].timestamp).total_seconds() * 1000
-        
-        # 计算置信度分数
-        confidence_score = self._calculate_confidence_score(frames)
+            # 显式传入的历史：临时窗口容纳全部帧
+            window = _TrackWindow(len(history) + 1 if history else 1)
+            for frame in history or ():
+                window.push(frame)
+        window.push(current_frame)
+        return self._report(current_frame, window)
+    
+    def _report(self, current_frame: DetectionFrame, window: _TrackWindow) -> StabilityReport:
+        """由窗口指标生成报告"""
+        consecutive = window.consecutive_matches
+        position_delta = window.position_delta
+        tracking_duration = window.duration_ms(current_frame)
         
         # 判断是否稳定
         is_stable = (
@@ -95,54 +218,16 @@ class StabilityJudge:
         return StabilityReport(
             is_stable=is_stable,
             tracking_duration_ms=tracking_duration,
-            confidence_score=confidence_score,
+            confidence_score=window.confidence_score,
             position_delta=position_delta,
             consecutive_matches=consecutive,
             should_classify=should_classify
         )
     
-    def _count_consecutive_matches(self, frames: List[DetectionFrame]) -> int:
-        """计算连续匹配次数"""
-        if not frames:
-            return 0
-        
-        consecutive = 0
-        last_category = frames[0].detected_category
-        
-        for frame in frames:
-            if frame.detected_category == last_category:
-                consecutive += 1
-            else:
-                break
-        
-        return consecutive
-    
-    def _calculate_position_delta(self, frame1: DetectionFrame, frame2: DetectionFrame) -> float:
-        """计算位置变化"""
-        if frame1.x_normalized is None or frame1.y_normalized is None:
-            return 1.0
-        if frame2.x_normalized is None or frame2.y_normalized is None:
-            return 1.0
-        
-        dx = frame2.x_normalized - frame1.x_normalized
-        dy = frame2.y_normalized - frame1.y_normalized
-        return (dx ** 2 + dy ** 2) ** 0.5
-    
-    def _calculate_confidence_score(self, frames: List[DetectionFrame]) -> float:
-        """计算置信度分数"""
-        if not frames:
-            return 0.0
-        
-        confidences = [
-            f.confidence for f in frames
-            if f.confidence is not None
-        ]
-        
-        if not confidences:
-            return 0.0
-        
-        return sum(confidences) / len(confidences)
+    def forget(self, track_id: Hashable) -> None:
+        """丢弃一个跟踪对象的窗口（对象离开画面或被计数后调用）"""
+        self._tracks.pop(track_id, None)
     
     def reset(self) -> None:
         """重置历史记录"""
-        self._history.clear()
+        self._tracks.clear()
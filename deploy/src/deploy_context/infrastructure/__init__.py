@@ -2,6 +2,21 @@
 
 from .runtime import *
 from .device import *
+from .recorder import *
+from .builder import *
+from .scheduling import *
+from .metrics import *
+from .preview import *
+from .thermal import *
+from .shadow import *
 
-__all__ = ["IInferenceRuntime", "YoloRuntime", "RknnRuntime",
-           "ICamera", "ISerialDevice", "CameraOpencv", "SerialPyserial"]
+__all__ = ["IInferenceRuntime", "YoloRuntime", "RknnRuntime", "MotionGate", "YoloCropClassifier",
+           "BackendSelector", "BackendCandidate", "BackendChoice",
+           "ICamera", "ISerialDevice", "CameraOpencv", "SerialPyserial",
+           "MjpegCameraOpencv", "CompressedFrame", "select_decode_scale",
+           "DetectionRecorder", "DetectionLogReader", "DecisionFlag", "HardExampleWriter", "HardExampleStats",
+           "PipelineBuilder", "PipelineSettings", "StageScheduling", "apply_stage_scheduling",
+           "LatencyStats", "ResourceSample", "ProcResourceReader", "ResourceSampler",
+           "MjpegPreviewServer", "PreviewFrame",
+           "ThermalReading", "SysfsThermalReader", "ThermalMonitor",
+           "ShadowRunner", "ShadowStats"]
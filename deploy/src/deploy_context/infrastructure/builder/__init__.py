@@ -0,0 +1,5 @@
+"""管线构建模块导出"""
+
+from .pipeline_builder import PipelineBuilder, PipelineSettings
+
+__all__ = ["PipelineBuilder", "PipelineSettings"]
@@ -0,0 +1,471 @@
+"""管线构建器 - 根据设备配置文件构建部署管线"""
+
+import logging
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from shared_kernel.config.loader import ConfigLoader
+
+from ...domain.model.value_object import (
+    CooldownPolicy, StabilityPolicy, ActuationCompensationPolicy, CropClassificationPolicy,
+    ThermalPolicy, LaneDefinition, HardExamplePolicy
+)
+from ..runtime import (
+    IInferenceRuntime, YoloRuntime, RknnRuntime, YoloCropClassifier,
+    BackendSelector, BackendCandidate, BackendChoice
+)
+from ..device import CameraOpencv, SerialPyserial, MjpegCameraOpencv, select_decode_scale
+from ..device.mjpeg_camera import SUPPORTED_DECODE_SCALES
+from ..scheduling import StageScheduling
+from ..preview import MjpegPreviewServer
+from ..thermal import ThermalMonitor, SysfsThermalReader
+from ..shadow import ShadowRunner
+from ..recorder import HardExampleWriter
+from ..metrics import ResourceSampler, ProcResourceReader
+
+logger = logging.getLogger(__name__)
+
+# 可配置调度参数的管线阶段
+PIPELINE_STAGES = ("capture", "inference", "decision", "serial", "metrics", "shadow", "hard_examples")
+
+# 配置文件 inference.runtime -> 运行时类型
+_RUNTIME_TYPES = {
+    "rknn": RknnRuntime,
+    "onnx": YoloRuntime,      # ultralytics 可直接加载 .onnx
+    "pytorch": YoloRuntime,
+}
+# auto：启动时测量候选后端，结果按主机与模型哈希缓存
+AUTO_RUNTIME = "auto"
+
+
+@dataclass(frozen=True)
+class PipelineSettings:
+    """部署管线参数
+
+    默认值与未指定配置文件时的行为一致：单工作线程、PyTorch 运行时、
+    不限制推理间隔
+    """
+    # 相机
+    camera_index: Union[int, str] = 0
+    camera_width: int = 1280
+    camera_height: int = 720
+    camera_fps: int = 30
+    camera_format: Optional[str] = None     # FOURCC，如 MJPG
+    decode_scale: Union[int, str] = 1       # MJPG 降采样解码倍数（1/2/4/8 或 auto）
+    decode_scale_auto: bool = False         # auto：按最终的相机分辨率与模型输入尺寸选择倍数
+    # 串口
+    serial_port: Optional[str] = None
+    serial_baudrate: int = 115200
+    serial_timeout: float = 0.1
+    # 推理
+    runtime: str = "pytorch"                # rknn / onnx / pytorch / auto
+    threads: Optional[int] = None           # CPU 推理线程数（auto 探测结果或配置）
+    backend_cache: Optional[str] = None     # auto 探测结果缓存文件，None 为用户缓存目录
+    input_size: int = 640
+    workers: int = 1                        # 推理工作线程数（RKNN 下每个线程绑定一个 NPU 核心）
+    npu_cores: int = 0
+    # 性能
+    inference_interval_ms: int = 0          # 两次送入推理的最小间隔
+    frame_queue_size: int = 2               # 采集 -> 推理 队列深度
+    max_queue_size: int = 50                # 推理 -> 决策 队列深度
+    # 策略
+    stability_policy: StabilityPolicy = field(default_factory=StabilityPolicy)
+    cooldown_policy: CooldownPolicy = field(default_factory=CooldownPolicy)
+    compensation_policy: ActuationCompensationPolicy = field(
+        default_factory=ActuationCompensationPolicy
+    )
+    # 第二阶段裁剪分类（未配置模型时不启用）
+    crop_classifier_model: Optional[str] = None
+    crop_classifier_input_size: int = 224
+    crop_policy: CropClassificationPolicy = field(default_factory=CropClassificationPolicy)
+    # 分拣通道（为空表示整个画面一个会话）
+    lanes: Tuple[LaneDefinition, ...] = ()
+    # 影子模型（候选模型在抽样帧上评估，不影响主路径；RKNN 下独占最后一个 NPU 核心）
+    shadow_model: Optional[str] = None
+    shadow_fps: float = 2.0
+    # 难例采集（未配置目录时不启用）
+    hard_example_dir: Optional[str] = None
+    hard_example_policy: HardExamplePolicy = field(default_factory=HardExamplePolicy)
+    # 温控（sysfs_root 可指向伪造的 sysfs 目录树）
+    thermal_policy: ThermalPolicy = field(default_factory=ThermalPolicy)
+    sysfs_root: str = "/"
+    # 资源采样（0 表示不启用；NPU 负载文件未配置时不采样 NPU）
+    resource_interval_s: float = 1.0
+    npu_load_path: Optional[str] = None
+    # 预览
+    preview_port: Optional[int] = None      # MJPEG 预览端口，None 表示不启用
+    preview_fps: float = 5.0
+    # 阶段调度（阶段名 -> CPU 亲和性/优先级），为空表示不做绑定
+    stage_scheduling: Dict[str, StageScheduling] = field(default_factory=dict)
+    profile_name: Optional[str] = None
+
+    def __post_init__(self):
+        if self.runtime not in _RUNTIME_TYPES and self.runtime != AUTO_RUNTIME:
+            raise ValueError(
+                f"runtime must be one of {sorted(_RUNTIME_TYPES) + [AUTO_RUNTIME]}, got {self.runtime!r}"
+            )
+        if self.threads is not None and self.threads <= 0:
+            raise ValueError(f"threads must be positive, got {self.threads}")
+        if self.workers <= 0:
+            raise ValueError(f"workers must be positive, got {self.workers}")
+        if self.frame_queue_size <= 0 or self.max_queue_size <= 0:
+            raise ValueError("queue sizes must be positive")
+        if self.inference_interval_ms < 0:
+            raise ValueError(
+                f"inference_interval_ms must be non-negative, got {self.inference_interval_ms}"
+            )
+        if self.resource_interval_s < 0:
+            raise ValueError(f"resource_interval_s must be non-negative, got {self.resource_interval_s}")
+        # auto 在每次构造（含命令行覆盖分辨率后的 replace）时按当前分辨率重新选择
+        if self.decode_scale == "auto":
+            object.__setattr__(self, 'decode_scale_auto', True)
+        if self.decode_scale_auto:
+            object.__setattr__(self, 'decode_scale', select_decode_scale(
+                (self.camera_width, self.camera_height), self.input_size
+            ))
+        elif self.decode_scale not in SUPPORTED_DECODE_SCALES:
+            raise ValueError(
+                f"decode_scale must be one of {SUPPORTED_DECODE_SCALES} or 'auto', got {self.decode_scale!r}"
+            )
+        if self.camera_format is not None and len(self.camera_format) != 4:
+            raise ValueError(f"camera_format must be a FOURCC code, got {self.camera_format!r}")
+        names = [lane.name for lane in self.lanes]
+        if len(set(names)) != len(names):
+            raise ValueError(f"lane names must be unique, got {names}")
+        unknown = set(self.stage_scheduling) - set(PIPELINE_STAGES)
+        if unknown:
+            raise ValueError(f"unknown pipeline stages in scheduling: {sorted(unknown)}")
+        if self.shadow_model and self.runtime == "rknn" and self.npu_cores:
+            # 影子模型独占最后一个 NPU 核心，主路径工作线程只使用其余核心
+            if self.npu_cores < 2:
+                raise ValueError("shadow model on RKNN needs at least 2 NPU cores, one reserved for the candidate")
+            if self.workers > self.npu_cores - 1:
+                logger.warning(
+                    "Shadow model reserves NPU core %d; inference workers reduced from %d to %d",
+                    self.npu_cores - 1, self.workers, self.npu_cores - 1
+                )
+                object.__setattr__(self, 'workers', self.npu_cores - 1)
+
+    @classmethod
+    def from_profile(cls, profile: Dict[str, Any], profile_name: Optional[str] = None) -> "PipelineSettings":
+        """从设备配置文件内容创建（缺省的字段取默认值）"""
+        camera = profile.get("camera") or {}
+        serial = profile.get("serial") or {}
+        npu = profile.get("npu") or {}
+        inference = profile.get("inference") or {}
+        performance = profile.get("performance") or {}
+        stability = profile.get("stability") or {}
+        cooldown = profile.get("cooldown") or {}
+        scheduling = profile.get("scheduling") or {}
+        actuation = profile.get("actuation") or {}
+        display = profile.get("display") or {}
+        second_stage = profile.get("second_stage") or {}
+        thermal = profile.get("thermal") or {}
+        shadow = profile.get("shadow") or {}
+        hard_examples = profile.get("hard_examples") or {}
+        monitoring = profile.get("monitoring") or {}
+        defaults = cls()
+
+        runtime = str(inference.get("runtime", defaults.runtime)).lower()
+        npu_cores = int(npu.get("cores", 0)) if npu.get("enabled", False) else 0
+        # 未显式指定工作线程数时，RKNN 每个 NPU 核心一个线程
+        workers = performance.get("workers")
+        if workers is None:
+            workers = npu_cores if runtime == "rknn" and npu_cores > 0 else 1
+
+        input_size = inference.get("input_size", defaults.input_size)
+        if isinstance(input_size, (list, tuple)):
+            input_size = max(input_size)
+
+        # auto：按模型输入尺寸选择解码倍数（在 __post_init__ 中解析），全分辨率只在需要裁剪时解码
+        decode_scale = camera.get("decode_scale", defaults.decode_scale)
+
+        stability_policy = StabilityPolicy(
+            stability_threshold_ms=int(stability.get(
+                "threshold_seconds", defaults.stability_policy.stability_threshold_ms / 1000
+            ) * 1000),
+            detection_reset_ms=int(stability.get(
+                "reset_timeout_seconds", defaults.stability_policy.detection_reset_ms / 1000
+            ) * 1000),
+            position_tolerance=stability.get(
+                "position_tolerance", defaults.stability_policy.position_tolerance
+            ),
+            min_detection_count=stability.get(
+                "min_detection_count", defaults.stability_policy.min_detection_count
+            ),
+            decision_rule=str(stability.get("decision_rule", defaults.stability_policy.decision_rule)).lower(),
+            evidence_threshold=float(stability.get(
+                "evidence_threshold", defaults.stability_policy.evidence_threshold
+            )),
+        )
+        cooldown_policy = CooldownPolicy(
+            min_interval_ms=int(cooldown.get(
+                "duration_seconds", defaults.cooldown_policy.min_interval_ms / 1000
+            ) * 1000),
+            max_queue_size=cooldown.get("max_queue_size", defaults.cooldown_policy.max_queue_size),
+        )
+
+        compensation_defaults = defaults.compensation_policy
+        compensation_policy = ActuationCompensationPolicy(
+            enabled=bool(actuation.get("compensation", compensation_defaults.enabled)),
+            actuator_delay_ms=float(actuation.get(
+                "actuator_delay_ms", compensation_defaults.actuator_delay_ms
+            )),
+            history_size=int(actuation.get("history_size", compensation_defaults.history_size)),
+            min_samples=int(actuation.get("min_samples", compensation_defaults.min_samples)),
+            max_horizon_ms=float(actuation.get(
+                "max_horizon_ms", compensation_defaults.max_horizon_ms
+            )),
+        )
+
+        crop_defaults = defaults.crop_policy
+        crop_policy = CropClassificationPolicy(
+            min_confidence=float(second_stage.get("min_confidence", crop_defaults.min_confidence)),
+            padding=float(second_stage.get("padding", crop_defaults.padding)),
+            min_crop_pixels=int(second_stage.get("min_crop_pixels", crop_defaults.min_crop_pixels)),
+        )
+
+        thermal_defaults = defaults.thermal_policy
+        thermal_policy = ThermalPolicy(
+            enabled=bool(thermal.get("enabled", thermal_defaults.enabled)),
+            throttle_start_c=float(thermal.get("throttle_start_c", thermal_defaults.throttle_start_c)),
+            step_c=float(thermal.get("step_c", thermal_defaults.step_c)),
+            hysteresis_c=float(thermal.get("hysteresis_c", thermal_defaults.hysteresis_c)),
+            interval_step_ms=int(thermal.get("interval_step_ms", thermal_defaults.interval_step_ms)),
+            freq_capped_ratio=float(thermal.get(
+                "freq_capped_ratio", thermal_defaults.freq_capped_ratio
+            )),
+            poll_interval_s=float(thermal.get("poll_interval_s", thermal_defaults.poll_interval_s)),
+        )
+
+        hard_example_defaults = defaults.hard_example_policy
+        hard_example_policy = HardExamplePolicy(
+            confidence_low=float(hard_examples.get("confidence_low", hard_example_defaults.confidence_low)),
+            confidence_high=float(hard_examples.get(
+                "confidence_high", hard_example_defaults.confidence_high
+            )),
+            flip_distance=float(hard_examples.get("flip_distance", hard_example_defaults.flip_distance)),
+            capture_category_flip=bool(hard_examples.get(
+                "category_flip", hard_example_defaults.capture_category_flip
+            )),
+            capture_track_break=bool(hard_examples.get(
+                "track_break", hard_example_defaults.capture_track_break
+            )),
+            max_per_minute=float(hard_examples.get("max_per_minute", hard_example_defaults.max_per_minute)),
+            quota_mb=float(hard_examples.get("quota_mb", hard_example_defaults.quota_mb)),
+            jpeg_quality=int(hard_examples.get("jpeg_quality", hard_example_defaults.jpeg_quality)),
+            queue_size=int(hard_examples.get("queue_size", hard_example_defaults.queue_size)),
+        )
+
+        resource_interval_s = float(monitoring.get("interval_s", defaults.resource_interval_s))
+        if not monitoring.get("enabled", True):
+            resource_interval_s = 0.0
+
+        return cls(
+            camera_index=camera.get("index", defaults.camera_index),
+            camera_width=camera.get("width", defaults.camera_width),
+            camera_height=camera.get("height", defaults.camera_height),
+            camera_fps=camera.get("fps", defaults.camera_fps),
+            camera_format=camera.get("format", defaults.camera_format),
+            decode_scale=decode_scale if decode_scale == "auto" else int(decode_scale),
+            serial_port=serial.get("port", defaults.serial_port),
+            serial_baudrate=serial.get("baudrate", defaults.serial_baudrate),
+            serial_timeout=serial.get("timeout", defaults.serial_timeout),
+            runtime=runtime,
+            threads=inference.get("threads", defaults.threads),
+            backend_cache=inference.get("backend_cache", defaults.backend_cache),
+            input_size=int(input_size),
+            workers=int(workers),
+            npu_cores=npu_cores,
+            inference_interval_ms=int(performance.get(
+                "inference_interval_ms", defaults.inference_interval_ms
+            )),
+            frame_queue_size=int(performance.get("frame_queue_size", defaults.frame_queue_size)),
+            max_queue_size=int(performance.get("max_queue_size", defaults.max_queue_size)),
+            stability_policy=stability_policy,
+            cooldown_policy=cooldown_policy,
+            compensation_policy=compensation_policy,
+            crop_classifier_model=second_stage.get("model_path", defaults.crop_classifier_model),
+            crop_classifier_input_size=int(second_stage.get(
+                "input_size", defaults.crop_classifier_input_size
+            )),
+            crop_policy=crop_policy,
+            lanes=tuple(LaneDefinition.from_dict(entry) for entry in profile.get("lanes") or ()),
+            shadow_model=shadow.get("model_path", defaults.shadow_model),
+            shadow_fps=float(shadow.get("max_fps", defaults.shadow_fps)),
+            hard_example_dir=hard_examples.get("output_dir", defaults.hard_example_dir),
+            hard_example_policy=hard_example_policy,
+            thermal_policy=thermal_policy,
+            sysfs_root=thermal.get("sysfs_root", defaults.sysfs_root),
+            resource_interval_s=resource_interval_s,
+            npu_load_path=monitoring.get("npu_load_path", defaults.npu_load_path),
+            preview_port=display.get("preview_port", defaults.preview_port),
+            preview_fps=float(display.get("preview_fps", defaults.preview_fps)),
+            stage_scheduling={
+                stage: StageScheduling.from_dict(entry or {})
+                for stage, entry in (scheduling.get("stages") or {}).items()
+            } if scheduling.get("enabled", True) else {},
+            profile_name=profile_name,
+        )
+
+    def override(self, **values: Any) -> "PipelineSettings":
+        """用非 None 的值覆盖（命令行参数优先于配置文件）"""
+        return replace(self, **{k: v for k, v in values.items() if v is not None})
+
+    def runtime_confidence_threshold(self, confidence_threshold: float) -> float:
+        """运行时的输出阈值
+
+        启用难例采集且难例区间下限低于运行阈值时，运行时按区间下限输出，
+        决策线程再按运行阈值过滤后送入会话，低置信度检测只用于难例判定
+        """
+        if self.hard_example_dir:
+            return min(confidence_threshold, self.hard_example_policy.confidence_low)
+        return confidence_threshold
+
+
+class PipelineBuilder:
+    """管线构建器
+
+    职责:
+    - 读取设备配置文件并转换为 PipelineSettings
+    - 按配置创建运行时（每个工作线程一个实例）、相机与串口
+    """
+
+    def __init__(self, config_loader: Optional[ConfigLoader] = None):
+        self._config_loader = config_loader or ConfigLoader()
+
+    def load_settings(self, profile: str) -> PipelineSettings:
+        """加载设备配置文件"""
+        return PipelineSettings.from_profile(
+            self._config_loader.get_device_profile(profile), profile_name=profile
+        )
+
+    def resolve_backend(
+        self,
+        settings: PipelineSettings,
+        model_path: str,
+        confidence_threshold: float = 0.5,
+        selector: Optional[BackendSelector] = None,
+    ) -> Tuple[PipelineSettings, Optional[BackendChoice]]:
+        """runtime 为 auto 时探测（或读取缓存）最快的后端，返回确定后的参数"""
+        if settings.runtime != AUTO_RUNTIME:
+            return settings, None
+        selector = selector or BackendSelector(cache_path=settings.backend_cache)
+
+        def factory(candidate: BackendCandidate) -> IInferenceRuntime:
+            probe = replace(settings, runtime=candidate.runtime, threads=candidate.threads)
+            return self._build_runtime(probe, confidence_threshold, 0)
+
+        choice = selector.select(
+            model_path, factory, frame_shape=(settings.camera_height, settings.camera_width, 3)
+        )
+        return replace(settings, runtime=choice.runtime, threads=choice.threads), choice
+
+    def build_runtimes(
+        self,
+        settings: PipelineSettings,
+        confidence_threshold: float = 0.5,
+    ) -> List[IInferenceRuntime]:
+        """为每个工作线程创建一个运行时实例（未加载模型）"""
+        return [
+            self._build_runtime(settings, confidence_threshold, worker)
+            for worker in range(settings.workers)
+        ]
+
+    def build_shadow_runner(
+        self,
+        settings: PipelineSettings,
+        confidence_threshold: float = 0.5,
+    ) -> Optional[ShadowRunner]:
+        """创建影子模型运行器（运行时未加载模型；未配置候选模型时返回 None）
+
+        RKNN 下候选模型固定使用最后一个 NPU 核心，该核心不分配给推理工作线程
+        """
+        if not settings.shadow_model:
+            return None
+        runtime = self._build_runtime(
+            settings, confidence_threshold, max(0, settings.npu_cores - 1)
+        )
+        return ShadowRunner(
+            runtime,
+            max_fps=settings.shadow_fps,
+            decode_scale=settings.decode_scale,
+            scheduling=settings.stage_scheduling.get("shadow"),
+        )
+
+    def build_hard_example_writer(self, settings: PipelineSettings) -> Optional[HardExampleWriter]:
+        """创建难例写入器（未启动；未配置目录时返回 None）"""
+        if not settings.hard_example_dir:
+            return None
+        return HardExampleWriter(
+            settings.hard_example_dir,
+            policy=settings.hard_example_policy,
+            scheduling=settings.stage_scheduling.get("hard_examples"),
+        )
+
+    @staticmethod
+    def _build_runtime(
+        settings: PipelineSettings,
+        confidence_threshold: float,
+        worker: int,
+    ) -> IInferenceRuntime:
+        """创建单个运行时；RKNN 按工作线程编号绑定 NPU 核心"""
+        if settings.runtime == "rknn":
+            core_mask = 1 << (worker % settings.npu_cores) if settings.npu_cores else None
+            return RknnRuntime(confidence_threshold=confidence_threshold, core_mask=core_mask)
+        return YoloRuntime(
+            confidence_threshold=confidence_threshold,
+            input_size=settings.input_size,
+            num_threads=settings.threads
+        )
+
+    def build_camera(self, settings: PipelineSettings) -> CameraOpencv:
+        """创建相机（未打开）；MJPG 格式采集压缩帧，由推理线程按需解码"""
+        if settings.camera_format == "MJPG":
+            return MjpegCameraOpencv(fps=settings.camera_fps, decode_scale=settings.decode_scale)
+        return CameraOpencv(fps=settings.camera_fps, fourcc=settings.camera_format)
+
+    def build_serial(self, settings: PipelineSettings) -> Optional[SerialPyserial]:
+        """创建串口（未配置端口时返回 None）"""
+        return SerialPyserial() if settings.serial_port else None
+
+    def build_lane_serial(self, lane: LaneDefinition) -> Optional[SerialPyserial]:
+        """创建通道串口（未打开；通道未配置端口时返回 None）"""
+        return SerialPyserial() if lane.serial_port else None
+
+    def build_crop_classifier(self, settings: PipelineSettings) -> Optional[YoloCropClassifier]:
+        """创建第二阶段裁剪分类器（未加载模型；未配置模型时返回 None）"""
+        if not settings.crop_classifier_model:
+            return None
+        return YoloCropClassifier(input_size=settings.crop_classifier_input_size)
+
+    def build_thermal_monitor(
+        self,
+        settings: PipelineSettings,
+        max_level: int,
+        on_level_change=None,
+    ) -> Optional[ThermalMonitor]:
+        """创建温度监控（未启用温控时返回 None）"""
+        if not settings.thermal_policy.enabled:
+            return None
+        return ThermalMonitor(
+            settings.thermal_policy, max_level, on_level_change,
+            reader=SysfsThermalReader(settings.sysfs_root)
+        )
+
+    def build_resource_sampler(self, settings: PipelineSettings, frame_counter=None) -> Optional[ResourceSampler]:
+        """创建资源采样器（未启动；采样间隔为 0 时返回 None）"""
+        if not settings.resource_interval_s:
+            return None
+        return ResourceSampler(
+            ProcResourceReader(settings.sysfs_root, settings.npu_load_path),
+            interval_s=settings.resource_interval_s,
+            frame_counter=frame_counter,
+            scheduling=settings.stage_scheduling.get("metrics"),
+        )
+
+    def build_preview(self, settings: PipelineSettings) -> Optional[MjpegPreviewServer]:
+        """创建预览服务（未配置端口时返回 None）"""
+        if settings.preview_port is None:
+            return None
+        return MjpegPreviewServer(port=settings.preview_port, max_fps=settings.preview_fps)
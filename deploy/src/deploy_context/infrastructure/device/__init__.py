@@ -2,5 +2,7 @@
 
 from .camera_opencv import CameraOpencv
 from .serial_pyserial import SerialPyserial
+from .mjpeg_camera import MjpegCameraOpencv, CompressedFrame, select_decode_scale
 
-__all__ = ["CameraOpencv", "SerialPyserial"]
+__all__ = ["CameraOpencv", "SerialPyserial", "MjpegCameraOpencv", "CompressedFrame",
+           "select_decode_scale"]
@@ -1,7 +1,7 @@
 """OpenCV 相机实现"""
 
 import cv2
-from typing import Optional, Tuple, Any
+from typing import Optional, Tuple, Any, Union
 
 from ...domain.repository import ICamera
 
@@ -12,15 +12,17 @@ class CameraOpencv(ICamera):
     使用 OpenCV 进行相机捕获
     """
     
-    def __init__(self):
+    def __init__(self, fps: int = 30, fourcc: Optional[str] = None):
         self._camera = None
-        self._camera_id: int = 0
+        self._camera_id: Union[int, str] = 0
         self._width: int = 1280
         self._height: int = 720
+        self._fps = fps
+        self._fourcc = fourcc
         self._is_opened: bool = False
     
-    def open(self, camera_id: int = 0, width: int = 1280, height: int = 720) -> bool:
-        """打开相机"""
+    def open(self, camera_id: Union[int, str] = 0, width: int = 1280, height: int = 720) -> bool:
+        """打开相机（camera_id 可为设备编号或路径，如 /dev/video0）"""
         self._camera_id = camera_id
         self._width = width
         self._height = height
@@ -30,9 +32,12 @@ class CameraOpencv(ICamera):
         if not self._camera.isOpened():
             return False
         
+        # V4L2 需要先设置像素格式，再设置分辨率
+        if self._fourcc:
+            self._camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self._fourcc))
         self._camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
         self._camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-        self._camera.set(cv2.CAP_PROP_FPS, 30)
+        self._camera.set(cv2.CAP_PROP_FPS, self._fps)
         
         self._is_opened = True
         return True
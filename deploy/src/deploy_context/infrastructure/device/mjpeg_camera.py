@@ -0,0 +1,132 @@
+"""MJPEG 相机实现 - 采集压缩帧，按需降采样解码"""
+
+import cv2
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple, Any
+
+from .camera_opencv import CameraOpencv
+
+
+# 缩放倍数 -> libjpeg 降采样解码标志（DCT 域缩放，解码量随之减少）
+_REDUCED_COLOR = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+SUPPORTED_DECODE_SCALES = tuple(_REDUCED_COLOR)
+
+
+def select_decode_scale(frame_size: Tuple[int, int], input_size: int) -> int:
+    """选择解码缩放倍数：解码后长边仍不小于模型输入尺寸的最大倍数"""
+    long_side = max(frame_size)
+    scale = 1
+    for candidate in SUPPORTED_DECODE_SCALES:
+        if long_side // candidate >= input_size:
+            scale = candidate
+    return scale
+
+
+@dataclass
+class CompressedFrame:
+    """压缩帧
+
+    持有 MJPEG 原始字节，按需解码；同一缩放倍数只解码一次。
+    后端不支持输出压缩数据时退化为持有已解码图像，decode 时再缩放。
+    """
+    data: Optional[np.ndarray] = None        # JPEG 字节（一维 uint8）
+    image: Optional[np.ndarray] = None       # 已解码的全分辨率图像（退化情况）
+    frame_size: Tuple[int, int] = (0, 0)     # 全分辨率 (宽, 高)
+    _decoded: Dict[int, np.ndarray] = field(default_factory=dict, repr=False)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        """全分辨率图像形状 (高, 宽, 通道)，与 ndarray 帧一致"""
+        return (self.frame_size[1], self.frame_size[0], 3)
+
+    @property
+    def nbytes(self) -> int:
+        """占用字节数"""
+        source = self.data if self.data is not None else self.image
+        return int(source.nbytes) if source is not None else 0
+
+    def decode(self, scale: int = 1, cache: bool = True) -> Optional[np.ndarray]:
+        """解码为 1/scale 分辨率的 BGR 图像
+
+        其他线程（如预览）读取时应传 cache=False，不修改共享的解码缓存
+        """
+        if scale not in _REDUCED_COLOR:
+            raise ValueError(f"scale must be one of {SUPPORTED_DECODE_SCALES}, got {scale}")
+        decoded = self._decoded.get(scale)
+        if decoded is not None:
+            return decoded
+        if self.data is not None:
+            decoded = cv2.imdecode(self.data, _REDUCED_COLOR[scale])
+        elif self.image is not None:
+            decoded = self.image if scale == 1 else cv2.resize(
+                self.image,
+                (self.image.shape[1] // scale, self.image.shape[0] // scale),
+                interpolation=cv2.INTER_AREA
+            )
+        if decoded is not None and cache:
+            self._decoded[scale] = decoded
+        return decoded
+
+    def decode_full(self) -> Optional[np.ndarray]:
+        """全分辨率解码（仅在需要裁剪原图时使用）"""
+        return self.decode(1)
+
+    def decode_preview(self) -> Optional[np.ndarray]:
+        """1/8 分辨率灰度图（运动门控用，解码开销最小）"""
+        if self.data is not None:
+            return cv2.imdecode(self.data, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        return self.decode(8)
+
+
+class MjpegCameraOpencv(CameraOpencv):
+    """MJPEG 相机实现
+
+    设置 MJPG 像素格式并关闭 OpenCV 的 RGB 转换，read_compressed()
+    直接返回相机输出的 JPEG 字节，由下游按模型需要的尺寸解码。
+    """
+
+    def __init__(self, fps: int = 30, decode_scale: int = 1):
+        super().__init__(fps=fps, fourcc="MJPG")
+        if decode_scale not in SUPPORTED_DECODE_SCALES:
+            raise ValueError(
+                f"decode_scale must be one of {SUPPORTED_DECODE_SCALES}, got {decode_scale}"
+            )
+        self._decode_scale = decode_scale
+        self._frame_size: Tuple[int, int] = (0, 0)
+
+    @property
+    def decode_scale(self) -> int:
+        return self._decode_scale
+
+    def open(self, camera_id=0, width: int = 1280, height: int = 720) -> bool:
+        """打开相机并请求输出未解码的 MJPEG 数据"""
+        if not super().open(camera_id, width, height):
+            return False
+        self._camera.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+        self._frame_size = self.get_resolution()
+        return True
+
+    def read_compressed(self) -> Optional[CompressedFrame]:
+        """读取一帧压缩数据（不解码）"""
+        if not self._is_opened:
+            return None
+        ret, raw = self._camera.read()
+        if not ret or raw is None:
+            return None
+        if raw.ndim == 3:
+            # 后端忽略了 CONVERT_RGB，已输出解码图像
+            return CompressedFrame(image=raw, frame_size=(raw.shape[1], raw.shape[0]))
+        return CompressedFrame(data=raw.reshape(-1), frame_size=self._frame_size)
+
+    def read(self) -> Optional[Any]:
+        """读取帧（按 decode_scale 降采样解码）"""
+        frame = self.read_compressed()
+        if frame is None:
+            return None
+        return frame.decode(self._decode_scale)
@@ -0,0 +1,6 @@
+"""运行指标模块导出"""
+
+from .latency_stats import LatencyStats
+from .resource_sampler import ResourceSample, ProcResourceReader, ResourceSampler, DEFAULT_NPU_LOAD_PATH
+
+__all__ = ["LatencyStats", "ResourceSample", "ProcResourceReader", "ResourceSampler", "DEFAULT_NPU_LOAD_PATH"]
@@ -0,0 +1,59 @@
+"""阶段延迟统计 - 滚动窗口分位数与抖动"""
+
+import threading
+from collections import deque
+from typing import Deque, Dict
+
+import numpy as np
+
+
+class LatencyStats:
+    """阶段延迟统计
+
+    可由多个线程写入（如多个推理工作线程）、任意线程读取；
+    写入在锁内只做一次 deque 追加与计数
+    """
+
+    def __init__(self, window_size: int = 1024):
+        if window_size <= 0:
+            raise ValueError(f"window_size must be positive, got {window_size}")
+        self._samples: Deque[float] = deque(maxlen=window_size)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def add(self, latency_ms: float) -> None:
+        """记录一次延迟（毫秒）"""
+        with self._lock:
+            self._samples.append(latency_ms)
+            self._count += 1
+
+    @property
+    def count(self) -> int:
+        """累计样本数"""
+        return self._count
+
+    def summary(self) -> Dict[str, float]:
+        """窗口统计：均值、p50/p90/p99、最大值，以及抖动（p99 - p50）与标准差"""
+        with self._lock:
+            count = self._count
+            snapshot = list(self._samples)
+        if not snapshot:
+            return {"count": count}
+        samples = np.fromiter(snapshot, dtype=np.float64)
+        p50, p90, p99 = np.percentile(samples, (50, 90, 99))
+        return {
+            "count": count,
+            "mean_ms": round(float(samples.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p90_ms": round(float(p90), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(samples.max()), 3),
+            "jitter_ms": round(float(p99 - p50), 3),
+            "stdev_ms": round(float(samples.std()), 3),
+        }
+
+    def reset(self) -> None:
+        """清空窗口"""
+        with self._lock:
+            self._samples.clear()
+            self._count = 0
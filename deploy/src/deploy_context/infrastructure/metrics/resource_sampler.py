@@ -0,0 +1,201 @@
+"""系统资源采样 - 从 /proc 与 /sys 读取进程 CPU、内存、各核负载与 NPU 负载（仅 Linux）"""
+
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..scheduling import StageScheduling, apply_stage_scheduling
+
+logger = logging.getLogger(__name__)
+
+# RK3588 rknpu 驱动的负载文件，如 "NPU load:  Core0: 35%, Core1:  0%, Core2:  0%,"
+DEFAULT_NPU_LOAD_PATH = "/sys/kernel/debug/rknpu/load"
+_PERCENT = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+
+try:
+    _CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    _CLOCK_TICKS = 100
+
+
+@dataclass
+class ResourceSample:
+    """一次资源采样（读取失败的项为 None 或空列表）"""
+    process_cpu_percent: Optional[float] = None     # 本进程 CPU 占用，多核累加（可超过 100）
+    rss_mb: Optional[float] = None
+    core_load_percent: List[float] = field(default_factory=list)   # 各 CPU 核心负载
+    npu_load_percent: List[float] = field(default_factory=list)    # 各 NPU 核心负载
+    camera_fps: Optional[float] = None              # 采集阶段实际帧率
+    sampled_at: float = 0.0                         # time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "process_cpu_percent": self.process_cpu_percent,
+            "rss_mb": self.rss_mb,
+            "core_load_percent": list(self.core_load_percent),
+            "npu_load_percent": list(self.npu_load_percent),
+            "camera_fps": self.camera_fps,
+        }
+
+
+class ProcResourceReader:
+    """/proc 与 /sys 读取器
+
+    root 默认为 /，测试时可指向伪造的目录树；npu_load_path 为绝对路径，
+    按 root 解析，None 表示不读取 NPU 负载（debugfs 通常需要 root 权限）
+    """
+
+    def __init__(self, root: str = "/", npu_load_path: Optional[str] = None, pid: str = "self"):
+        self._root = Path(root)
+        self._proc = self._root / "proc"
+        self._pid = str(pid)
+        self._npu_load_path = self._root / npu_load_path.lstrip("/") if npu_load_path else None
+
+    def process_cpu_ticks(self) -> Optional[int]:
+        """本进程累计 CPU 时间（utime + stime，单位时钟滴答）"""
+        text = self._read_text(self._proc / self._pid / "stat")
+        if not text:
+            return None
+        # 进程名可能含空格与括号，从最后一个 ')' 之后按空格切分：utime/stime 为第 14/15 个字段
+        fields = text.rsplit(")", 1)[-1].split()
+        try:
+            return int(fields[11]) + int(fields[12])
+        except (IndexError, ValueError):
+            return None
+
+    def rss_kb(self) -> Optional[int]:
+        """本进程常驻内存（KB）"""
+        text = self._read_text(self._proc / self._pid / "status")
+        for line in (text or "").splitlines():
+            if line.startswith("VmRSS:"):
+                try:
+                    return int(line.split()[1])
+                except (IndexError, ValueError):
+                    return None
+        return None
+
+    def core_ticks(self) -> List[Tuple[int, int]]:
+        """各 CPU 核心累计 (忙碌, 总计) 时钟滴答"""
+        ticks: List[Tuple[int, int]] = []
+        for line in (self._read_text(self._proc / "stat") or "").splitlines():
+            name, _, values = line.partition(" ")
+            if not name.startswith("cpu") or name == "cpu":
+                continue
+            try:
+                # user nice system idle iowait irq softirq steal（guest 已计入 user）
+                numbers = [int(v) for v in values.split()[:8]]
+            except ValueError:
+                continue
+            idle = sum(numbers[3:5])
+            total = sum(numbers)
+            ticks.append((total - idle, total))
+        return ticks
+
+    def npu_load(self) -> List[float]:
+        """各 NPU 核心负载百分比（未配置或无权限读取时为空）"""
+        if self._npu_load_path is None:
+            return []
+        text = self._read_text(self._npu_load_path)
+        return [float(value) for value in _PERCENT.findall(text or "")]
+
+    @staticmethod
+    def _read_text(path: Path) -> Optional[str]:
+        try:
+            return path.read_text(encoding="ascii", errors="replace")
+        except OSError:
+            return None
+
+
+class ResourceSampler:
+    """资源采样线程
+
+    职责:
+    - 按固定间隔低频采样，比率类指标（CPU 占用、核心负载、相机帧率）取相邻两次采样的差值
+    - 保存最近一次采样供状态查询，读取方只做一次引用读取
+
+    frame_counter 返回采集阶段累计帧数，用于计算相机实际帧率
+    """
+
+    def __init__(
+        self,
+        reader: Optional[ProcResourceReader] = None,
+        interval_s: float = 1.0,
+        frame_counter: Optional[Callable[[], int]] = None,
+        scheduling: Optional[StageScheduling] = None,
+    ):
+        if interval_s <= 0:
+            raise ValueError(f"interval_s must be positive, got {interval_s}")
+        self._reader = reader or ProcResourceReader()
+        self._interval_s = interval_s
+        self._frame_counter = frame_counter
+        self._scheduling = scheduling
+        self._previous: Optional[Tuple[float, Optional[int], List[Tuple[int, int]], Optional[int]]] = None
+        self._latest = ResourceSample()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def latest(self) -> ResourceSample:
+        return self._latest
+
+    def sample(self, now: Optional[float] = None) -> ResourceSample:
+        """采样一次（首次采样只有 RSS 与 NPU 负载，比率类指标从第二次开始）"""
+        now = time.monotonic() if now is None else now
+        cpu_ticks = self._reader.process_cpu_ticks()
+        cores = self._reader.core_ticks()
+        frames = self._frame_counter() if self._frame_counter else None
+        rss_kb = self._reader.rss_kb()
+        sample = ResourceSample(
+            rss_mb=round(rss_kb / 1024, 1) if rss_kb is not None else None,
+            npu_load_percent=self._reader.npu_load(),
+            sampled_at=now,
+        )
+
+        if self._previous is not None:
+            last_time, last_cpu, last_cores, last_frames = self._previous
+            elapsed = now - last_time
+            if elapsed > 0:
+                if cpu_ticks is not None and last_cpu is not None:
+                    sample.process_cpu_percent = round(
+                        (cpu_ticks - last_cpu) / _CLOCK_TICKS / elapsed * 100, 1
+                    )
+                if frames is not None and last_frames is not None:
+                    sample.camera_fps = round((frames - last_frames) / elapsed, 1)
+            if len(cores) == len(last_cores):
+                sample.core_load_percent = [
+                    round((busy - last_busy) / (total - last_total) * 100, 1)
+                    if total > last_total else 0.0
+                    for (busy, total), (last_busy, last_total) in zip(cores, last_cores)
+                ]
+        self._previous = (now, cpu_ticks, cores, frames)
+        self._latest = sample
+        return sample
+
+    def start(self) -> None:
+        """启动采样线程"""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止采样线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        if self._scheduling:
+            apply_stage_scheduling("metrics", self._scheduling)
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning("Resource sampling failed: %s", e)
+            self._stop_event.wait(self._interval_s)
@@ -0,0 +1,5 @@
+"""预览模块导出"""
+
+from .mjpeg_preview import MjpegPreviewServer, PreviewFrame
+
+__all__ = ["MjpegPreviewServer", "PreviewFrame"]
@@ -0,0 +1,319 @@
+"""MJPEG 预览服务 - 通过 HTTP 推送带标注的实时画面"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from ...domain.model.value_object import DetectionBatch
+from ..device import CompressedFrame, select_decode_scale
+
+logger = logging.getLogger(__name__)
+
+_BOUNDARY = "frame"
+
+_INDEX_HTML = b"""<!DOCTYPE html>
+<html><head><title>Deploy Preview</title></head>
+<body style="margin:0;background:#111">
+<img src="/stream" style="max-width:100%">
+</body></html>
+"""
+
+# 跟踪状态 -> 框颜色 (BGR)
+_STATE_COLORS = {
+    "tracking": (0, 200, 255),
+    "stable": (0, 255, 0),
+    "sent": (255, 128, 0),
+}
+
+
+@dataclass
+class PreviewFrame:
+    """预览帧
+
+    只持有推理结果的引用，标注时在预览线程中复制，不修改原始帧
+    """
+    frame: Any                                      # ndarray 或 CompressedFrame
+    detections: Sequence[Any] = field(default_factory=list)    # Detection 列表或检测批
+    track_id: Optional[int] = None                  # 首个检测关联的跟踪编号
+    track_state: str = ""                           # tracking / stable / sent
+    packet: Optional[Any] = None                    # 本帧发出的串口数据包
+    latency_ms: float = 0.0
+
+
+class MjpegPreviewServer:
+    """MJPEG 预览服务
+
+    职责:
+    - 提供 /stream（multipart/x-mixed-replace）与 / 预览页面
+    - 仅在有订阅者时由独立线程按限定帧率标注并编码 JPEG
+    - 设置了状态提供函数时在 /metrics 以 JSON 返回运行状态（管线统计与资源采样）
+
+    无订阅者时 offer() 只是一次引用赋值，推理与决策线程不受影响
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        max_fps: float = 5.0,
+        jpeg_quality: int = 70,
+        preview_width: int = 640,
+    ):
+        if max_fps <= 0:
+            raise ValueError(f"max_fps must be positive, got {max_fps}")
+        if not 1 <= jpeg_quality <= 100:
+            raise ValueError(f"jpeg_quality must be between 1 and 100, got {jpeg_quality}")
+        self._host = host
+        self._port = port
+        self._interval = 1.0 / max_fps
+        self._jpeg_quality = jpeg_quality
+        self._preview_width = preview_width
+
+        self._subscribers = 0
+        self._subscribers_lock = threading.Lock()
+        self._pending: Optional[PreviewFrame] = None
+        self._pending_event = threading.Event()
+        self._jpeg: Optional[bytes] = None
+        self._jpeg_seq = 0
+        self._jpeg_cond = threading.Condition()
+        self._frames_encoded = 0
+        self._status_provider: Optional[Callable[[], Dict[str, Any]]] = None
+
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._threads: List[threading.Thread] = []
+        self._is_running = False
+
+    @property
+    def port(self) -> int:
+        """实际监听端口（端口为 0 时由系统分配）"""
+        return self._server.server_address[1] if self._server else self._port
+
+    @property
+    def has_subscribers(self) -> bool:
+        return self._subscribers > 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._subscribers
+
+    @property
+    def frames_encoded(self) -> int:
+        """累计编码的预览帧数"""
+        return self._frames_encoded
+
+    def set_status_provider(self, provider: Optional[Callable[[], Dict[str, Any]]]) -> None:
+        """设置 /metrics 的状态提供函数（在 HTTP 线程中调用）"""
+        self._status_provider = provider
+
+    def metrics_json(self) -> Optional[bytes]:
+        """当前运行状态的 JSON（未设置状态提供函数时返回 None）"""
+        if self._status_provider is None:
+            return None
+        return json.dumps(self._status_provider(), default=str).encode("utf-8")
+
+    def start(self) -> None:
+        """启动 HTTP 服务与标注线程"""
+        self._server = ThreadingHTTPServer((self._host, self._port), _PreviewRequestHandler)
+        self._server.daemon_threads = True
+        self._server.preview = self
+        self._is_running = True
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name="preview-http"),
+            threading.Thread(target=self._annotate_loop, name="preview-annotate"),
+        ]
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+        logger.info("Preview stream on http://%s:%d/stream", self._host, self.port)
+
+    def stop(self) -> None:
+        """停止服务"""
+        self._is_running = False
+        self._pending_event.set()
+        with self._jpeg_cond:
+            self._jpeg_cond.notify_all()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+
+    def offer(self, preview: PreviewFrame) -> None:
+        """提交最新一帧（无订阅者时直接忽略）"""
+        if self._subscribers <= 0:
+            return
+        self._pending = preview
+        self._pending_event.set()
+
+    def _annotate_loop(self) -> None:
+        """标注线程：按限定帧率取最新帧，标注并编码"""
+        next_slot = 0.0
+        while self._is_running:
+            if not self._pending_event.wait(timeout=0.5):
+                continue
+            self._pending_event.clear()
+            if self._subscribers <= 0:
+                self._pending = None
+                continue
+            delay = next_slot - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            preview, self._pending = self._pending, None
+            if preview is None:
+                continue
+            next_slot = time.perf_counter() + self._interval
+            try:
+                jpeg = self._encode(preview)
+            except Exception as e:
+                logger.warning("Failed to render preview frame: %s", e)
+                continue
+            if jpeg is None:
+                continue
+            with self._jpeg_cond:
+                self._jpeg = jpeg
+                self._jpeg_seq += 1
+                self._jpeg_cond.notify_all()
+            self._frames_encoded += 1
+
+    def _encode(self, preview: PreviewFrame) -> Optional[bytes]:
+        """标注并编码为 JPEG"""
+        image = self._preview_image(preview.frame)
+        if image is None:
+            return None
+        self._annotate(image, preview)
+        ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self._jpeg_quality])
+        return data.tobytes() if ok else None
+
+    def _preview_image(self, frame: Any) -> Optional[np.ndarray]:
+        """得到预览尺寸的私有副本（不修改推理线程持有的缓冲区）"""
+        if isinstance(frame, CompressedFrame):
+            scale = select_decode_scale(frame.frame_size, self._preview_width)
+            return frame.decode(scale, cache=False).copy()
+        if frame is None:
+            return None
+        height, width = frame.shape[:2]
+        if width > self._preview_width:
+            size = (self._preview_width, int(height * self._preview_width / width))
+            return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return frame.copy()
+
+    @staticmethod
+    def _annotate(image: np.ndarray, preview: PreviewFrame) -> None:
+        """绘制检测框、跟踪编号与决策
+
+        检测批由决策线程创建，这里只通过下标访问器读取列数组，
+        不创建 Detection 对象，也不写入检测批的惰性缓存
+        """
+        height, width = image.shape[:2]
+        detections = DetectionBatch.coerce(preview.detections)
+        for index in range(len(detections)):
+            x, y, w, h = detections.box(index)
+            x1 = int((x - w / 2) * width)
+            y1 = int((y - h / 2) * height)
+            x2 = int((x + w / 2) * width)
+            y2 = int((y + h / 2) * height)
+            if index == 0:
+                color = _STATE_COLORS.get(preview.track_state, (200, 200, 200))
+                label = f"{detections.category(index).value} {detections.score(index):.2f}"
+                if preview.track_id is not None:
+                    label = f"#{preview.track_id} {label} {preview.track_state}"
+                cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+                cv2.putText(image, label, (x1, max(12, y1 - 4)),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1, cv2.LINE_AA)
+            else:
+                cv2.rectangle(image, (x1, y1), (x2, y2), (160, 160, 160), 1)
+
+        status = f"{preview.latency_ms:.1f} ms"
+        if preview.packet is not None:
+            status += f"  SENT class={preview.packet.class_id} x={preview.packet.x} y={preview.packet.y}"
+        cv2.putText(image, status, (6, height - 8),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1, cv2.LINE_AA)
+
+    def _subscribe(self) -> int:
+        with self._subscribers_lock:
+            self._subscribers += 1
+            return self._subscribers
+
+    def _unsubscribe(self) -> None:
+        with self._subscribers_lock:
+            self._subscribers -= 1
+            if self._subscribers <= 0:
+                self._pending = None
+
+    def _wait_jpeg(self, last_seq: int, timeout: float = 1.0):
+        """等待比 last_seq 更新的 JPEG"""
+        with self._jpeg_cond:
+            if self._jpeg_seq <= last_seq:
+                self._jpeg_cond.wait(timeout)
+            return self._jpeg_seq, self._jpeg
+
+
+class _PreviewRequestHandler(BaseHTTPRequestHandler):
+    """预览 HTTP 请求处理"""
+
+    def do_GET(self):
+        preview: MjpegPreviewServer = self.server.preview
+        if self.path == "/":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(_INDEX_HTML)))
+            self.end_headers()
+            self.wfile.write(_INDEX_HTML)
+            return
+        if self.path == "/metrics":
+            self._send_metrics(preview)
+            return
+        if self.path != "/stream":
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={_BOUNDARY}")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        preview._subscribe()
+        last_seq = 0
+        try:
+            while preview._is_running:
+                seq, jpeg = preview._wait_jpeg(last_seq)
+                if jpeg is None or seq == last_seq:
+                    continue
+                last_seq = seq
+                self.wfile.write(
+                    f"--{_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(jpeg)}\r\n\r\n".encode("ascii")
+                )
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            preview._unsubscribe()
+
+    def _send_metrics(self, preview: MjpegPreviewServer) -> None:
+        try:
+            body = preview.metrics_json()
+        except Exception as e:
+            logger.warning("Failed to collect metrics: %s", e)
+            self.send_error(500)
+            return
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("preview %s - %s", self.address_string(), format % args)
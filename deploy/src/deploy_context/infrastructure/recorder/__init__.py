@@ -0,0 +1,7 @@
+"""检测记录模块导出"""
+
+from .detection_recorder import DetectionRecorder, DetectionLogReader, DecisionFlag
+from .hard_example_writer import HardExampleWriter, HardExampleStats
+
+__all__ = ["DetectionRecorder", "DetectionLogReader", "DecisionFlag",
+           "HardExampleWriter", "HardExampleStats"]
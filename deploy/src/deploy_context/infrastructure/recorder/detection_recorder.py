@@ -0,0 +1,301 @@
+"""检测记录器 - 基于内存映射列文件的逐帧检测日志
+
+目录结构::
+
+    <root>/segment_000000/
+        meta.json        # 段容量与列定义
+        count.bin        # 已提交记录数（int64，内存映射）
+        timestamp.bin    # 各列定长数据（内存映射，预分配）
+        frame_seq.bin
+        ...
+
+记录先进入暂存区（逐条记录为扁平列表，整帧批次为列数组引用），
+攒满一批后按列拼接、一次性向量化写入各列；
+count.bin 在数据写入之后更新，读取端只会看到完整提交的记录。
+"""
+
+import json
+from datetime import datetime
+from enum import IntFlag
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class DecisionFlag(IntFlag):
+    """检测决策标志位"""
+    NONE = 0
+    PRIMARY = 1       # 本帧送入分拣会话的检测
+    STABLE = 2        # 本帧判定为稳定
+    PACKET_SENT = 4   # 本帧发出了串口数据包
+
+
+# 列名 -> (数据类型, 单条记录形状)
+COLUMNS: Dict[str, Tuple[np.dtype, Tuple[int, ...]]] = {
+    "timestamp": (np.dtype("<f8"), ()),
+    "frame_seq": (np.dtype("<i8"), ()),  # 会话处理过的帧序号（连续，未送入会话的帧不占序号）
+    "class_id": (np.dtype("<i2"), ()),
+    "confidence": (np.dtype("<f4"), ()),
+    "box": (np.dtype("<f4"), (4,)),      # 归一化 x_center, y_center, width, height
+    "flags": (np.dtype("u1"), ()),
+}
+
+RECORD_BYTES = sum(dtype.itemsize * int(np.prod(shape)) for dtype, shape in COLUMNS.values())
+
+_SEGMENT_PREFIX = "segment_"
+_STAGED_FIELDS = 9  # timestamp, frame_seq, class_id, confidence, x, y, w, h, flags
+
+
+class DetectionRecorder:
+    """检测记录器
+
+    职责:
+    - 以定长记录追加写入预分配的内存映射列文件
+    - 段写满后按大小滚动到新段
+    - 热路径只做一次列表追加（整帧批次只暂存列数组引用），写盘按批向量化完成
+
+    非线程安全，应由单一线程（推理线程）写入
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        flush_every: int = 256,
+    ):
+        if max_segment_bytes < RECORD_BYTES:
+            raise ValueError(f"max_segment_bytes must be at least {RECORD_BYTES}")
+        self._root = Path(directory)
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._capacity = max_segment_bytes // RECORD_BYTES
+        self._flush_every = max(1, flush_every)
+        self._staged: List[float] = []
+        self._stage_limit = self._flush_every * _STAGED_FIELDS
+        self._batches: List[tuple] = []
+        self._batched = 0
+
+        self._segment_index = self._next_segment_index()
+        self._columns: Dict[str, np.memmap] = {}
+        self._count: Optional[np.memmap] = None
+        self._position = 0
+        self._records_written = 0
+        self._closed = False
+        self._open_segment()
+
+    @property
+    def records_written(self) -> int:
+        """已提交到列文件的记录数（不含暂存）"""
+        return self._records_written
+
+    @property
+    def segment_capacity(self) -> int:
+        return self._capacity
+
+    def record(
+        self,
+        timestamp: float,
+        frame_seq: int,
+        class_id: int,
+        confidence: float,
+        x_center: float,
+        y_center: float,
+        width: float,
+        height: float,
+        flags: int = 0,
+    ) -> None:
+        """追加一条检测记录（热路径）"""
+        if self._batches:
+            self._flush_batches()
+        staged = self._staged
+        staged.extend((timestamp, frame_seq, class_id, confidence,
+                       x_center, y_center, width, height, flags))
+        if len(staged) >= self._stage_limit:
+            self.flush()
+
+    def record_batch(
+        self,
+        timestamp: float,
+        frame_seq: int,
+        class_ids: np.ndarray,
+        confidences: np.ndarray,
+        boxes: np.ndarray,
+        flags: int = 0,
+        primary: bool = False,
+    ) -> None:
+        """追加同一帧的一批检测记录（热路径）
+
+        只暂存列数组的引用（调用方之后不得原地修改），攒满 flush_every 条后按列拼接写入。
+        flags 为本帧决策标志（整批共用），primary 为 True 时首条另加 PRIMARY 标志
+        """
+        n = len(class_ids)
+        if n == 0:
+            return
+        if self._staged:
+            self.flush()
+        self._batches.append((timestamp, frame_seq, class_ids, confidences, boxes, flags, primary))
+        self._batched += n
+        if self._batched >= self._flush_every:
+            self._flush_batches()
+
+    def flush(self) -> None:
+        """将暂存记录写入列文件"""
+        if self._batches:
+            self._flush_batches()
+        if not self._staged:
+            return
+        block = np.array(self._staged, dtype=np.float64).reshape(-1, _STAGED_FIELDS)
+        self._staged.clear()
+        self._write(block[:, 0], block[:, 1], block[:, 2], block[:, 3],
+                    block[:, 4:8], block[:, 8])
+
+    def _flush_batches(self) -> None:
+        """将暂存的整帧批次按列拼接后写入"""
+        batches = self._batches
+        single = self._batched == len(batches)  # 每帧恰好一条检测
+        self._batches = []
+        self._batched = 0
+        timestamps, frame_seqs, class_ids, confidences, boxes, frame_flags, primary = zip(*batches)
+        timestamp = np.array(timestamps, dtype=np.float64)
+        frame_seq = np.array(frame_seqs, dtype=np.int64)
+        flags = np.array(frame_flags, dtype=np.uint8)
+        primary_rows = np.flatnonzero(np.array(primary, dtype=bool))
+        if not single:
+            # 逐帧字段按检测数展开，PRIMARY 只落在各帧首条
+            lengths = np.fromiter(map(len, class_ids), dtype=np.intp, count=len(batches))
+            primary_rows = (np.cumsum(lengths) - lengths)[primary_rows]
+            timestamp = np.repeat(timestamp, lengths)
+            frame_seq = np.repeat(frame_seq, lengths)
+            flags = np.repeat(flags, lengths)
+        flags[primary_rows] |= np.uint8(DecisionFlag.PRIMARY)
+        self._write(
+            timestamp,
+            frame_seq,
+            np.concatenate(class_ids),
+            np.concatenate(confidences),
+            np.concatenate(boxes).reshape(-1, 4),
+            flags,
+        )
+
+    def close(self) -> None:
+        """刷新并关闭记录器"""
+        if self._closed:
+            return
+        self.flush()
+        self._close_segment()
+        self._closed = True
+
+    def _write(self, timestamp, frame_seq, class_id, confidence, box, flags) -> None:
+        """按段容量切分写入"""
+        values = {
+            "timestamp": timestamp,
+            "frame_seq": frame_seq,
+            "class_id": class_id,
+            "confidence": confidence,
+            "box": box,
+            "flags": flags,
+        }
+        total = len(timestamp)
+        offset = 0
+        while offset < total:
+            if self._position >= self._capacity:
+                self._close_segment()
+                self._segment_index += 1
+                self._open_segment()
+            n = min(total - offset, self._capacity - self._position)
+            end = self._position + n
+            for name, column in self._columns.items():
+                column[self._position:end] = values[name][offset:offset + n]
+            self._position = end
+            self._count[0] = end
+            offset += n
+        self._records_written += total
+
+    def _open_segment(self) -> None:
+        """预分配新段"""
+        segment_dir = self._root / f"{_SEGMENT_PREFIX}{self._segment_index:06d}"
+        segment_dir.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "capacity": self._capacity,
+            "columns": {name: [dtype.str, list(shape)] for name, (dtype, shape) in COLUMNS.items()},
+            "created_at": datetime.utcnow().isoformat(),
+        }
+        (segment_dir / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        self._count = np.memmap(segment_dir / "count.bin", dtype="<i8", mode="w+", shape=(1,))
+        self._count[0] = 0
+        self._columns = {
+            name: np.memmap(segment_dir / f"{name}.bin", dtype=dtype, mode="w+",
+                            shape=(self._capacity,) + shape)
+            for name, (dtype, shape) in COLUMNS.items()
+        }
+        self._position = 0
+
+    def _close_segment(self) -> None:
+        """刷新当前段到磁盘"""
+        for column in self._columns.values():
+            column.flush()
+        if self._count is not None:
+            self._count.flush()
+        self._columns = {}
+        self._count = None
+
+    def _next_segment_index(self) -> int:
+        """已有段之后的下一个段号（不覆盖历史日志）"""
+        existing = [
+            int(p.name[len(_SEGMENT_PREFIX):]) for p in self._root.glob(f"{_SEGMENT_PREFIX}*")
+            if p.is_dir() and p.name[len(_SEGMENT_PREFIX):].isdigit()
+        ]
+        return max(existing) + 1 if existing else 0
+
+    def __enter__(self) -> "DetectionRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class DetectionLogReader:
+    """检测日志读取器
+
+    以内存映射方式打开各段，按列返回 NumPy 数组
+    """
+
+    def __init__(self, directory: str):
+        self._root = Path(directory)
+
+    def segments(self) -> List[Path]:
+        """按段号排序的段目录"""
+        return sorted(
+            p for p in self._root.glob(f"{_SEGMENT_PREFIX}*")
+            if p.is_dir() and (p / "meta.json").exists()
+        )
+
+    def read_segment(self, segment: Path) -> Dict[str, np.ndarray]:
+        """读取单个段（零拷贝内存映射视图）"""
+        meta = json.loads((segment / "meta.json").read_text(encoding="utf-8"))
+        capacity = meta["capacity"]
+        count = int(np.memmap(segment / "count.bin", dtype="<i8", mode="r", shape=(1,))[0])
+        columns = {}
+        for name, (dtype_str, shape) in meta["columns"].items():
+            column = np.memmap(segment / f"{name}.bin", dtype=np.dtype(dtype_str), mode="r",
+                               shape=(capacity,) + tuple(shape))
+            columns[name] = column[:count]
+        return columns
+
+    def load(self) -> Dict[str, np.ndarray]:
+        """读取全部段并按列拼接"""
+        parts = [self.read_segment(segment) for segment in self.segments()]
+        if not parts:
+            return {
+                name: np.empty((0,) + shape, dtype=dtype)
+                for name, (dtype, shape) in COLUMNS.items()
+            }
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+    def __len__(self) -> int:
+        total = 0
+        for segment in self.segments():
+            total += int(np.memmap(segment / "count.bin", dtype="<i8", mode="r", shape=(1,))[0])
+        return total
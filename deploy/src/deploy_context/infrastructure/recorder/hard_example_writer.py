@@ -0,0 +1,213 @@
+"""难例写入器 - 在后台线程中将难例帧编码为 JPEG 并与检测结果一起落盘
+
+目录结构::
+
+    <root>/
+        20260101-120000_00001234.jpg    # 帧图像
+        20260101-120000_00001234.json   # 难例原因与检测结果
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import cv2
+
+from ...domain.model.value_object import HardExamplePolicy, DetectionBatch
+from ..device import CompressedFrame
+from ..scheduling import StageScheduling, apply_stage_scheduling
+
+logger = logging.getLogger(__name__)
+
+# 未配置调度参数时写入线程使用最低优先级
+DEFAULT_WRITER_SCHEDULING = StageScheduling(nice=19)
+
+
+@dataclass
+class HardExampleStats:
+    """难例采集统计"""
+    offered: int = 0          # 判定为难例并提交的帧数
+    written: int = 0
+    dropped_rate: int = 0     # 超过写入频率上限
+    dropped_busy: int = 0     # 写入线程积压
+    dropped_quota: int = 0    # 超过磁盘占用上限
+    errors: int = 0
+    bytes_used: int = 0       # 采集目录当前占用
+    reasons: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "offered": self.offered,
+            "written": self.written,
+            "dropped_rate": self.dropped_rate,
+            "dropped_busy": self.dropped_busy,
+            "dropped_quota": self.dropped_quota,
+            "errors": self.errors,
+            "bytes_used": self.bytes_used,
+            "reasons": dict(self.reasons),
+        }
+
+
+class HardExampleWriter:
+    """难例写入器
+
+    职责:
+    - 按频率上限与磁盘配额接收难例帧，写入线程积压时直接丢弃
+    - 在独立的低优先级线程中编码 JPEG 并写入检测结果
+
+    offer() 只做时间/配额比较与一次非阻塞入队；MJPG 压缩帧直接写原始字节，不重新编码
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        policy: Optional[HardExamplePolicy] = None,
+        scheduling: Optional[StageScheduling] = None,
+    ):
+        self._root = Path(output_dir)
+        self._policy = policy or HardExamplePolicy()
+        self._scheduling = scheduling or DEFAULT_WRITER_SCHEDULING
+        self._queue: queue.Queue = queue.Queue(maxsize=self._policy.queue_size)
+        self._stats = HardExampleStats()
+        self._next_slot = 0.0
+        self._is_running = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def stats(self) -> HardExampleStats:
+        return self._stats
+
+    @property
+    def output_dir(self) -> Path:
+        return self._root
+
+    def start(self) -> None:
+        """创建目录、统计已有占用并启动写入线程"""
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._stats.bytes_used = self._disk_usage()
+        self._is_running = True
+        self._thread = threading.Thread(target=self._run, name="hard-examples")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止写入线程（已入队的帧写完为止）"""
+        self._is_running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def offer(
+        self,
+        frame: Any,
+        detections: Sequence[Any],
+        reasons: Sequence[str],
+        frame_seq: int = 0,
+    ) -> bool:
+        """提交一帧难例（不等待）
+
+        Returns:
+            bool: 本帧被接受写入时返回 True
+        """
+        stats = self._stats
+        stats.offered += 1
+        now = time.monotonic()
+        if now < self._next_slot:
+            stats.dropped_rate += 1
+            return False
+        if stats.bytes_used >= self._policy.quota_bytes:
+            stats.dropped_quota += 1
+            return False
+        try:
+            self._queue.put_nowait(
+                (frame, DetectionBatch.coerce(detections), tuple(reasons), frame_seq, time.time())
+            )
+        except queue.Full:
+            stats.dropped_busy += 1
+            return False
+        self._next_slot = now + self._policy.min_interval_s
+        return True
+
+    def _run(self) -> None:
+        """写入线程：降低优先级后逐帧写入"""
+        apply_stage_scheduling("hard_examples", self._scheduling)
+        while self._is_running or not self._queue.empty():
+            try:
+                item = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            try:
+                self.write(*item)
+            except Exception as e:
+                self._stats.errors += 1
+                logger.warning("Failed to write hard example: %s", e)
+
+    def write(
+        self,
+        frame: Any,
+        detections: DetectionBatch,
+        reasons: Sequence[str],
+        frame_seq: int,
+        timestamp: float,
+    ) -> Optional[Path]:
+        """编码并写入一帧，返回图像路径（超出配额时返回 None）"""
+        jpeg = self._encode(frame)
+        if jpeg is None:
+            self._stats.errors += 1
+            return None
+        meta = json.dumps({
+            "frame_seq": frame_seq,
+            "timestamp": timestamp,
+            "image_size": [int(frame.shape[1]), int(frame.shape[0])],
+            "reasons": list(reasons),
+            "detections": [
+                {
+                    "category": detections.category(index).value,
+                    "confidence": round(detections.score(index), 4),
+                    "box": [round(v, 6) for v in detections.box(index)],
+                }
+                for index in range(len(detections))
+            ],
+        }, ensure_ascii=False).encode("utf-8")
+        if self._stats.bytes_used + len(jpeg) + len(meta) > self._policy.quota_bytes:
+            self._stats.dropped_quota += 1
+            return None
+
+        stem = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(timestamp))}_{frame_seq:08d}"
+        image_path = self._root / f"{stem}.jpg"
+        image_path.write_bytes(jpeg)
+        # 元数据最后写入，读取端以 .json 存在作为样本完整的标志
+        (self._root / f"{stem}.json").write_bytes(meta)
+
+        stats = self._stats
+        stats.bytes_used += len(jpeg) + len(meta)
+        stats.written += 1
+        for reason in reasons:
+            stats.reasons[reason] = stats.reasons.get(reason, 0) + 1
+        return image_path
+
+    def _encode(self, frame: Any) -> Optional[bytes]:
+        """帧 -> JPEG 字节"""
+        if isinstance(frame, CompressedFrame):
+            if frame.data is not None:
+                return frame.data.tobytes()
+            frame = frame.image
+        if frame is None:
+            return None
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self._policy.jpeg_quality])
+        return buffer.tobytes() if ok else None
+
+    def _disk_usage(self) -> int:
+        """采集目录已占用的字节数"""
+        total = 0
+        with os.scandir(self._root) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    total += entry.stat().st_size
+        return total
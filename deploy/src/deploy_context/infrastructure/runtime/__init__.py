@@ -3,5 +3,9 @@
 from .i_inference_runtime import IInferenceRuntime
 from .yolo_runtime import YoloRuntime
 from .rknn_runtime import RknnRuntime
+from .motion_gate import MotionGate
+from .yolo_crop_classifier import YoloCropClassifier
+from .backend_selector import BackendSelector, BackendCandidate, BackendChoice
 
-__all__ = ["IInferenceRuntime", "YoloRuntime", "RknnRuntime"]
+__all__ = ["IInferenceRuntime", "YoloRuntime", "RknnRuntime", "MotionGate", "YoloCropClassifier",
+           "BackendSelector", "BackendCandidate", "BackendChoice"]
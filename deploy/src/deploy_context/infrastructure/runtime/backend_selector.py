@@ -0,0 +1,200 @@
+"""运行时后端选择 - 启动时微基准测试，按主机与模型哈希缓存结果"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import platform
+import socket
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .i_inference_runtime import IInferenceRuntime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "garbage_ai_suite" / "runtime_backend.json"
+
+
+@dataclass(frozen=True)
+class BackendCandidate:
+    """候选后端配置"""
+    runtime: str                      # rknn / onnx / pytorch（后两者由 ultralytics 加载）
+    threads: Optional[int] = None     # CPU 推理线程数，None 表示库默认
+
+    @property
+    def key(self) -> str:
+        return f"{self.runtime}/t{self.threads}" if self.threads else self.runtime
+
+
+@dataclass
+class BackendChoice:
+    """后端选择结果"""
+    runtime: str
+    threads: Optional[int] = None
+    latency_ms: float = 0.0
+    results: Dict[str, float] = field(default_factory=dict)   # 候选 -> 中位延迟（失败为 -1）
+    probed_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    from_cache: bool = False
+
+
+def _module_available(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def model_hash(model_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """模型文件内容的 SHA-256（前 16 位）"""
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def host_id() -> str:
+    """主机标识（主机名 + 架构）"""
+    return f"{socket.gethostname()}-{platform.machine()}"
+
+
+class BackendSelector:
+    """运行时后端选择器
+
+    职责:
+    - 按模型格式与已安装的库列出候选后端及线程数（仅 PyTorch 模型扫描线程数）
+    - 用少量预热帧逐一测量推理延迟，选出中位延迟最低的配置
+    - 以 主机标识|模型哈希 为键缓存结果，之后启动直接复用
+    """
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        warmup_frames: int = 2,
+        timed_frames: int = 5,
+        thread_options: Optional[Sequence[int]] = None,
+    ):
+        if timed_frames <= 0:
+            raise ValueError(f"timed_frames must be positive, got {timed_frames}")
+        self._cache_path = Path(cache_path) if cache_path else DEFAULT_CACHE_PATH
+        self._warmup_frames = max(0, warmup_frames)
+        self._timed_frames = timed_frames
+        cpus = os.cpu_count() or 1
+        options = thread_options or (1, 2, 4, cpus)
+        self._thread_options = sorted({t for t in options if 0 < t <= cpus})
+
+    def candidates(self, model_path: str) -> List[BackendCandidate]:
+        """模型可用的候选后端"""
+        suffix = Path(model_path).suffix.lower()
+        if suffix == ".rknn":
+            available = _module_available("rknnlite") or _module_available("rknn")
+            return [BackendCandidate("rknn")] if available else []
+        if not _module_available("ultralytics"):
+            return []
+        if suffix == ".onnx":
+            # ultralytics 以默认 SessionOptions 创建 ONNX Runtime 会话，
+            # torch 线程数对其无效，各线程数候选的配置完全相同，不做线程扫描
+            return [BackendCandidate("onnx")]
+        return [BackendCandidate("pytorch", threads) for threads in self._thread_options]
+
+    def select(
+        self,
+        model_path: str,
+        runtime_factory: Callable[[BackendCandidate], IInferenceRuntime],
+        frame_shape: tuple = (720, 1280, 3),
+        candidates: Optional[List[BackendCandidate]] = None,
+    ) -> BackendChoice:
+        """选择后端（优先使用缓存）
+
+        Args:
+            model_path: 模型路径
+            runtime_factory: 候选配置 -> 未加载模型的运行时
+            frame_shape: 预热帧形状（与相机分辨率一致）
+            candidates: 候选列表，None 时按模型格式自动列出
+        """
+        key = f"{host_id()}|{model_hash(model_path)}"
+        cached = self._load_cache().get(key)
+        if cached:
+            choice = BackendChoice(**cached)
+            choice.from_cache = True
+            logger.info("Runtime backend from cache: %s (%.1f ms)", choice.runtime, choice.latency_ms)
+            return choice
+
+        candidates = candidates if candidates is not None else self.candidates(model_path)
+        if not candidates:
+            raise RuntimeError(f"No inference backend available for {model_path}")
+
+        frames = self._probe_frames(frame_shape)
+        results: Dict[str, float] = {}
+        best: Optional[BackendCandidate] = None
+        for candidate in candidates:
+            latency = self._measure(candidate, model_path, runtime_factory, frames)
+            results[candidate.key] = round(latency, 3) if latency is not None else -1.0
+            if latency is not None and (best is None or latency < results[best.key]):
+                best = candidate
+        if best is None:
+            raise RuntimeError(f"All inference backends failed for {model_path}: {list(results)}")
+
+        choice = BackendChoice(
+            runtime=best.runtime, threads=best.threads, latency_ms=results[best.key], results=results
+        )
+        logger.info("Runtime backend probe: %s -> %s", results, best.key)
+        self._store_cache(key, choice)
+        return choice
+
+    def _measure(
+        self,
+        candidate: BackendCandidate,
+        model_path: str,
+        runtime_factory: Callable[[BackendCandidate], IInferenceRuntime],
+        frames: List[np.ndarray],
+    ) -> Optional[float]:
+        """测量单个候选的中位推理延迟（毫秒），失败返回 None"""
+        runtime = runtime_factory(candidate)
+        try:
+            runtime.load_model(model_path)
+            for i in range(self._warmup_frames):
+                runtime.infer(frames[i % len(frames)])
+            timings = []
+            for i in range(self._timed_frames):
+                start = time.perf_counter()
+                runtime.infer(frames[i % len(frames)])
+                timings.append((time.perf_counter() - start) * 1000)
+            return float(np.median(timings))
+        except Exception as e:
+            logger.warning("Backend %s failed during probe: %s", candidate.key, e)
+            return None
+        finally:
+            runtime.unload()
+
+    @staticmethod
+    def _probe_frames(frame_shape: tuple, count: int = 2) -> List[np.ndarray]:
+        """预热帧（固定种子的噪声图像，各候选输入一致）"""
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 256, size=frame_shape, dtype=np.uint8) for _ in range(count)]
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        try:
+            return json.loads(self._cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _store_cache(self, key: str, choice: BackendChoice) -> None:
+        cache = self._load_cache()
+        entry = asdict(choice)
+        entry.pop("from_cache")
+        cache[key] = entry
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._cache_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+            os.replace(tmp, self._cache_path)
+        except OSError as e:
+            logger.warning("Failed to write backend cache %s: %s", self._cache_path, e)
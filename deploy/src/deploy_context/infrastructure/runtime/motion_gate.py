@@ -0,0 +1,61 @@
+"""运动门控 - 画面基本不变时跳过推理"""
+
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+
+class MotionGate:
+    """运动门控
+
+    对降采样后的灰度图做帧差，与上一次推理的参考帧相比变化量
+    低于阈值时跳过本帧推理。阈值为 0 时不做门控。
+    """
+
+    def __init__(self, threshold: float = 0.0, sample_size: Tuple[int, int] = (64, 36)):
+        self._threshold = threshold
+        self._sample_size = sample_size
+        self._reference: Optional[np.ndarray] = None
+        self._last_score: float = 0.0
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    @property
+    def last_score(self) -> float:
+        """最近一次帧差得分（0-1）"""
+        return self._last_score
+
+    def set_threshold(self, threshold: float) -> None:
+        """设置门控阈值（0-1）"""
+        if not 0.0 <= threshold <= 1.0:
+            raise ValueError(f"threshold must be between 0 and 1, got {threshold}")
+        self._threshold = threshold
+        if threshold <= 0.0:
+            self._reference = None
+
+    def should_infer(self, frame: np.ndarray) -> bool:
+        """判断当前帧是否需要推理"""
+        if self._threshold <= 0.0:
+            return True
+
+        small = cv2.resize(frame, self._sample_size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+
+        if self._reference is None:
+            self._reference = gray
+            self._last_score = 1.0
+            return True
+
+        self._last_score = float(cv2.absdiff(gray, self._reference).mean()) / 255.0
+        if self._last_score >= self._threshold:
+            # 参考帧只在推理时更新，缓慢漂移也能累积到阈值
+            self._reference = gray
+            return True
+        return False
+
+    def reset(self) -> None:
+        """清空参考帧"""
+        self._reference = None
+        self._last_score = 0.0
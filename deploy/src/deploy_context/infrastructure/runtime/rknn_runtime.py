@@ -6,11 +6,12 @@ from typing import Optional, List, Any, Dict
 from pathlib import Path
 
 from shared_kernel.domain.annotation import (
-    Detection, LabelFile, BoundingBox, Confidence, DetectionSource
+    Detection, LabelFile, Confidence, DetectionSource
 )
 from shared_kernel.domain.taxonomy import WasteCategory
 
-from ..domain.repository import IInferenceRuntime
+from ...domain.model.value_object import DetectionBatch
+from .i_inference_runtime import IInferenceRuntime
 
 
 class RknnRuntime(IInferenceRuntime):
@@ -23,8 +24,10 @@ class RknnRuntime(IInferenceRuntime):
     def __init__(
         self,
         confidence_threshold: float = 0.5,
+        core_mask: Optional[int] = None,
     ):
         self._model = None
+        self._core_mask = core_mask  # NPU 核心掩码（1/2/4 对应 core0/1/2），None 表示自动
         self._model_path: Optional[str] = None
         self._confidence_threshold = confidence_threshold
         self._rknn = None
@@ -38,9 +41,16 @@ class RknnRuntime(IInferenceRuntime):
     def load_model(self, model_path: str) -> None:
         """加载 RKNN 模型"""
         try:
-            from rknn.api import RKNN
+            try:
+                from rknnlite.api import RKNNLite as RKNN  # 板端运行时
+            except ImportError:
+                from rknn.api import RKNN
             self._rknn = RKNN()
             self._rknn.load_rknn(model_path)
+            if self._core_mask is None:
+                self._rknn.init_runtime()
+            else:
+                self._rknn.init_runtime(core_mask=self._core_mask)
             self._model_path = model_path
         except ImportError:
             raise RuntimeError("rknn-toolkit not installed")
@@ -49,15 +59,18 @@ class RknnRuntime(IInferenceRuntime):
     
     def infer(self, image) -> List[Detection]:
         """执行推理"""
+        return list(self.infer_batch(image))
+    
+    def infer_batch(self, image) -> DetectionBatch:
+        """执行推理，直接由输出张量构造检测批"""
         if not self.is_loaded():
             raise RuntimeError("Model not loaded. Call load_model() first.")
         
         if isinstance(image, str):
             image = cv2.imread(image)
-        elif isinstance(image, np.ndarray):
-            image = image.copy()
-        else:
+        elif not isinstance(image, np.ndarray):
             raise ValueError(f"Unsupported image type: {type(image)}")
+        # 预处理不修改输入，直接使用调用方的帧缓冲区，不逐帧复制
         
         # 预处理
         input_tensor = self._preprocess(image)
@@ -66,9 +79,7 @@ class RknnRuntime(IInferenceRuntime):
         outputs = self._rknn.inference(inputs=[input_tensor])
         
         # 后处理
-        detections = self._postprocess(outputs, image.shape)
-        
-        return detections
+        return self._postprocess(outputs, image.shape)
     
     def _preprocess(self, image: np.ndarray) -> np.ndarray:
         """预处理图像"""
@@ -79,49 +90,34 @@ class RknnRuntime(IInferenceRuntime):
         transposed = np.transpose(normalized, (2, 0, 1))
         return np.expand_dims(transposed, axis=0)
     
-    def _postprocess(self, outputs: List[np.ndarray], image_shape: tuple) -> List[Detection]:
-        """后处理输出"""
-        detections = []
-        h, w = image_shape[:2]
-        
+    def _postprocess(self, outputs: List[np.ndarray], image_shape: tuple) -> DetectionBatch:
+        """后处理输出（按列向量化：置信度过滤、类别映射、框换算）"""
         if not outputs or len(outputs) == 0:
-            return detections
+            return DetectionBatch.empty()
         
         output = outputs[0]
         
         if len(output.shape) == 3:
             output = output[0]
+        if len(output) == 0:
+            return DetectionBatch.empty()
         
-        for detection in output:
-            conf = float(detection[4])
-            if conf < self._confidence_threshold:
-                continue
-            
-            cls = int(detection[5])
-            category = self._class_mapping.get(cls)
-            if category is None:
-                continue
-            
-            bbox = detection[0:4]
-            x_center = (bbox[0] + bbox[2] / 2) / 640
-            y_center = (bbox[1] + bbox[3] / 2) / 640
-            width = bbox[2] / 640
-            height = bbox[3] / 640
-            
-            detection_obj = Detection.create(
-                category=category,
-                confidence=conf,
-                bounding_box=BoundingBox(
-                    x_center=max(0, min(1, x_center)),
-                    y_center=max(0, min(1, y_center)),
-                    width=max(0, min(1, width)),
-                    height=max(0, min(1, height))
-                ),
-                source=DetectionSource.YOLO
-            )
-            detections.append(detection_obj)
+        scores = output[:, 4].astype(np.float64)
+        class_ids = DetectionBatch.map_class_ids(output[:, 5], self._class_mapping)
+        keep = (scores >= self._confidence_threshold) & (class_ids >= 0)
         
-        return detections
+        # 输出为左上角 xywh（640 输入尺度）
+        bbox = output[keep, 0:4].astype(np.float64)
+        boxes = np.empty_like(bbox)
+        boxes[:, 0] = (bbox[:, 0] + bbox[:, 2] / 2) / 640
+        boxes[:, 1] = (bbox[:, 1] + bbox[:, 3] / 2) / 640
+        boxes[:, 2:] = bbox[:, 2:] / 640
+        return DetectionBatch(
+            boxes=np.clip(boxes, 0.0, 1.0),
+            scores=scores[keep],
+            class_ids=class_ids[keep],
+            source=DetectionSource.YOLO
+        )
     
     def detect(self, image_path: str) -> LabelFile:
         """检测图像"""
@@ -0,0 +1,77 @@
+"""YOLO 裁剪分类器实现"""
+
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from shared_kernel.domain.taxonomy import WasteCategory
+
+from ...domain.repository import ICropClassifier
+
+logger = logging.getLogger(__name__)
+
+
+class YoloCropClassifier(ICropClassifier):
+    """YOLO 裁剪分类器
+
+    使用 ultralytics 分类模型（如 yolov8n-cls）对单个目标的裁剪图分类。
+    类别按模型输出编号映射到垃圾分类；也可按类别名称匹配。
+    """
+
+    def __init__(self, device: str = "cuda", input_size: int = 224):
+        self._model = None
+        self._model_path: Optional[str] = None
+        self._device = device
+        self._input_size = input_size
+        self._class_mapping: Dict[int, WasteCategory] = {
+            0: WasteCategory.KITCHEN_WASTE,
+            1: WasteCategory.RECYCLABLE_WASTE,
+            2: WasteCategory.HAZARDOUS_WASTE,
+            3: WasteCategory.OTHER_WASTE,
+        }
+
+    def load_model(self, model_path: str) -> None:
+        """加载分类模型"""
+        try:
+            from ultralytics import YOLO
+            self._model = YOLO(model_path)
+            self._model_path = model_path
+        except ImportError:
+            raise RuntimeError("ultralytics not installed. Run: pip install ultralytics")
+        # 模型类别名与垃圾分类同名时按名称映射
+        names = getattr(self._model, "names", None) or {}
+        by_value = {category.value.lower(): category for category in WasteCategory}
+        for index, name in names.items():
+            category = by_value.get(str(name).lower())
+            if category is not None:
+                self._class_mapping[int(index)] = category
+
+    def classify(self, crop: Any) -> Optional[Tuple[WasteCategory, float]]:
+        """分类裁剪图"""
+        if not self.is_loaded():
+            raise RuntimeError("Model not loaded. Call load_model() first.")
+        if not isinstance(crop, np.ndarray) or crop.size == 0:
+            return None
+
+        results = self._model(crop, imgsz=self._input_size, verbose=False)
+        if not results or results[0].probs is None:
+            return None
+        probs = results[0].probs
+        category = self._class_mapping.get(int(probs.top1))
+        if category is None:
+            return None
+        return (category, float(probs.top1conf))
+
+    def is_loaded(self) -> bool:
+        """检查模型是否已加载"""
+        return self._model is not None
+
+    def unload(self) -> None:
+        """卸载模型"""
+        self._model = None
+        self._model_path = None
+
+    def set_class_mapping(self, mapping: Dict[int, WasteCategory]) -> None:
+        """设置分类映射"""
+        self._class_mapping = mapping
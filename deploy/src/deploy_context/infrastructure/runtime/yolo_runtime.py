@@ -6,11 +6,12 @@ from typing import Optional, List, Any, Dict
 from pathlib import Path
 
 from shared_kernel.domain.annotation import (
-    Detection, LabelFile, BoundingBox, Confidence, DetectionSource
+    Detection, LabelFile, Confidence, DetectionSource
 )
 from shared_kernel.domain.taxonomy import WasteCategory
 
-from ..domain.repository import IInferenceRuntime
+from ...domain.model.value_object import DetectionBatch
+from .i_inference_runtime import IInferenceRuntime
 
 
 class YoloRuntime(IInferenceRuntime):
@@ -22,12 +23,16 @@ class YoloRuntime(IInferenceRuntime):
     def __init__(
         self,
         confidence_threshold: float = 0.5,
-        device: str = "cuda"
+        device: str = "cuda",
+        input_size: int = 640,
+        num_threads: Optional[int] = None
     ):
         self._model = None
+        self._num_threads = num_threads  # CPU 推理线程数（torch 全进程设置，对 .onnx 模型无效），None 表示默认
         self._model_path: Optional[str] = None
         self._confidence_threshold = confidence_threshold
         self._device = device
+        self._input_size = input_size
         self._class_mapping: Dict[int, WasteCategory] = {
             0: WasteCategory.KITCHEN_WASTE,
             1: WasteCategory.RECYCLABLE_WASTE,
@@ -39,6 +44,9 @@ class YoloRuntime(IInferenceRuntime):
         """加载 YOLO 模型"""
         try:
             from ultralytics import YOLO
+            if self._num_threads:
+                import torch
+                torch.set_num_threads(self._num_threads)
             self._model = YOLO(model_path)
             self._model.fuse()
             self._model_path = model_path
@@ -47,46 +55,35 @@ class YoloRuntime(IInferenceRuntime):
     
     def infer(self, image) -> List[Detection]:
         """执行推理"""
+        return list(self.infer_batch(image))
+    
+    def infer_batch(self, image) -> DetectionBatch:
+        """执行推理，直接由输出张量构造检测批"""
         if not self.is_loaded():
             raise RuntimeError("Model not loaded. Call load_model() first.")
         
         if isinstance(image, str):
             image = cv2.imread(image)
-        elif isinstance(image, np.ndarray):
-            image = image.copy()
-        else:
+        elif not isinstance(image, np.ndarray):
             raise ValueError(f"Unsupported image type: {type(image)}")
+        # 预处理不修改输入，直接使用调用方的帧缓冲区，不逐帧复制
         
-        results = self._model(image, conf=self._confidence_threshold, verbose=False)
-        detections = []
-        
-        if results and len(results) > 0:
-            result = results[0]
-            if result.boxes is not None:
-                for box in result.boxes:
-                    xywh = box.xywh[0].cpu().numpy()
-                    x_center, y_center, width, height = xywh
-                    conf = box.conf[0].cpu().numpy()
-                    cls = int(box.cls[0].cpu().numpy())
-                    
-                    category = self._class_mapping.get(cls)
-                    if category is None:
-                        continue
-                    
-                    detection = Detection.create(
-                        category=category,
-                        confidence=float(conf),
-                        bounding_box=BoundingBox(
-                            x_center=float(x_center) / image.shape[1],
-                            y_center=float(y_center) / image.shape[0],
-                            width=float(width) / image.shape[1],
-                            height=float(height) / image.shape[0]
-                        ),
-                        source=DetectionSource.YOLO
-                    )
-                    detections.append(detection)
+        results = self._model(
+            image, conf=self._confidence_threshold, imgsz=self._input_size, verbose=False
+        )
+        if not results or results[0].boxes is None or len(results[0].boxes) == 0:
+            return DetectionBatch.empty()
         
-        return detections
+        # 整批从张量取出，不逐框转换
+        boxes = results[0].boxes
+        class_ids = DetectionBatch.map_class_ids(boxes.cls.cpu().numpy(), self._class_mapping)
+        keep = class_ids >= 0
+        return DetectionBatch(
+            boxes=np.clip(boxes.xywhn.cpu().numpy()[keep], 0.0, 1.0),
+            scores=boxes.conf.cpu().numpy()[keep],
+            class_ids=class_ids[keep],
+            source=DetectionSource.YOLO
+        )
     
     def detect(self, image_path: str) -> LabelFile:
         """检测图像"""
@@ -114,6 +111,13 @@ class YoloRuntime(IInferenceRuntime):
         self._model = None
         self._model_path = None
     
+    def set_input_size(self, input_size: int) -> bool:
+        """设置推理输入尺寸（ultralytics 按 imgsz 做 letterbox 缩放）"""
+        if input_size <= 0:
+            raise ValueError(f"input_size must be positive, got {input_size}")
+        self._input_size = input_size
+        return True
+    
     def set_class_mapping(self, mapping: Dict[int, WasteCategory]) -> None:
         """设置分类映射"""
         self._class_mapping = mapping
@@ -0,0 +1,5 @@
+"""阶段调度模块导出"""
+
+from .stage_scheduling import StageScheduling, apply_stage_scheduling
+
+__all__ = ["StageScheduling", "apply_stage_scheduling"]
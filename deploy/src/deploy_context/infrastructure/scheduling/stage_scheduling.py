@@ -0,0 +1,80 @@
+"""管线阶段调度 - CPU 亲和性与线程优先级（仅 Linux）"""
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_POLICIES = ("other", "fifo", "rr")
+
+
+@dataclass(frozen=True)
+class StageScheduling:
+    """单个管线阶段的调度参数
+
+    cpus 为空表示不限制；nice 与实时优先级二选一，
+    实时策略（fifo/rr）通常需要 CAP_SYS_NICE
+    """
+    cpus: Tuple[int, ...] = ()
+    nice: Optional[int] = None
+    policy: str = "other"           # other / fifo / rr
+    priority: int = 0               # 实时优先级（1-99，仅 fifo/rr）
+
+    def __post_init__(self):
+        object.__setattr__(self, 'cpus', tuple(int(cpu) for cpu in self.cpus))
+        if any(cpu < 0 for cpu in self.cpus):
+            raise ValueError(f"cpus must be non-negative, got {self.cpus}")
+        if self.policy not in _POLICIES:
+            raise ValueError(f"policy must be one of {_POLICIES}, got {self.policy!r}")
+        if self.policy != "other" and not 1 <= self.priority <= 99:
+            raise ValueError(f"priority must be between 1 and 99 for {self.policy}, got {self.priority}")
+        if self.nice is not None and not -20 <= self.nice <= 19:
+            raise ValueError(f"nice must be between -20 and 19, got {self.nice}")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StageScheduling":
+        """从配置文件条目创建"""
+        return cls(
+            cpus=tuple(data.get("cpus") or ()),
+            nice=data.get("nice"),
+            policy=str(data.get("policy", "other")).lower(),
+            priority=int(data.get("priority", 0)),
+        )
+
+
+def apply_stage_scheduling(stage: str, scheduling: StageScheduling) -> bool:
+    """将调度参数应用到调用线程
+
+    Linux 下 sched_setaffinity/sched_setscheduler 的 pid=0 与
+    setpriority 的线程 ID 都只作用于当前线程。任何一项失败只记录警告，
+    不影响管线运行。
+
+    Returns:
+        bool: 全部参数均应用成功时返回 True
+    """
+    applied = True
+    if scheduling.cpus:
+        try:
+            os.sched_setaffinity(0, scheduling.cpus)
+        except (AttributeError, OSError) as e:
+            logger.warning("Failed to pin %s stage to CPUs %s: %s", stage, scheduling.cpus, e)
+            applied = False
+
+    if scheduling.policy != "other":
+        try:
+            policy = os.SCHED_FIFO if scheduling.policy == "fifo" else os.SCHED_RR
+            os.sched_setscheduler(0, policy, os.sched_param(scheduling.priority))
+        except (AttributeError, OSError) as e:
+            logger.warning("Failed to set %s scheduling for %s stage: %s", scheduling.policy, stage, e)
+            applied = False
+    elif scheduling.nice is not None:
+        try:
+            import threading
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), scheduling.nice)
+        except (AttributeError, OSError) as e:
+            logger.warning("Failed to set nice %d for %s stage: %s", scheduling.nice, stage, e)
+            applied = False
+
+    return applied
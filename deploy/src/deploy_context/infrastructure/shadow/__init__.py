@@ -0,0 +1,5 @@
+"""影子模型评估模块导出"""
+
+from .shadow_runner import ShadowRunner, ShadowStats, box_iou, xywh_iou
+
+__all__ = ["ShadowRunner", "ShadowStats", "box_iou", "xywh_iou"]
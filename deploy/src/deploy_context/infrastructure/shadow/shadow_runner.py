@@ -0,0 +1,247 @@
+"""影子模型评估 - 在抽样帧上运行候选模型并统计与主模型的分歧"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared_kernel.domain.annotation import BoundingBox
+from shared_kernel.domain.taxonomy import WasteCategory
+
+from ...domain.model.value_object import DetectionBatch
+from ..runtime import IInferenceRuntime
+from ..device import CompressedFrame
+from ..metrics import LatencyStats
+from ..scheduling import StageScheduling, apply_stage_scheduling
+
+logger = logging.getLogger(__name__)
+
+# 未配置调度参数时影子线程使用最低优先级
+DEFAULT_SHADOW_SCHEDULING = StageScheduling(nice=19)
+
+
+def box_iou(a: BoundingBox, b: BoundingBox) -> float:
+    """两个归一化检测框的 IoU"""
+    return xywh_iou((a.x_center, a.y_center, a.width, a.height), (b.x_center, b.y_center, b.width, b.height))
+
+
+def xywh_iou(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> float:
+    """两个归一化 (x_center, y_center, width, height) 检测框的 IoU"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ax1, ay1 = ax - aw / 2, ay - ah / 2
+    bx1, by1 = bx - bw / 2, by - bh / 2
+    ix = max(0.0, min(ax1 + aw, bx1 + bw) - max(ax1, bx1))
+    iy = max(0.0, min(ay1 + ah, by1 + bh) - max(ay1, by1))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+@dataclass
+class ShadowStats:
+    """影子模型分歧统计
+
+    逐帧比较双方首个检测；主路径会话在该帧已判定稳定时，另按会话的判定类别
+    统计候选模型是否会做出同样的分拣决策
+    """
+    offered: int = 0              # 主路径提交的帧数
+    evaluated: int = 0            # 实际评估的帧数
+    agree_empty: int = 0          # 双方均无检测
+    agree_category: int = 0       # 类别一致
+    category_mismatch: int = 0    # 类别不一致
+    primary_only: int = 0         # 仅主模型有检测
+    candidate_only: int = 0       # 仅候选模型有检测
+    errors: int = 0
+    iou_sum: float = 0.0          # 双方均有检测时首个框的 IoU 累计
+    decisions: int = 0            # 主路径会话已判定稳定的评估帧数
+    decision_agree: int = 0       # 候选模型首个检测类别与会话判定一致
+    decision_mismatch: int = 0    # 候选模型检测到其他类别
+    decision_missed: int = 0      # 候选模型无检测
+    # 主模型类别 -> 候选模型类别 -> 次数（无检测记为 none）
+    confusion: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def disagreements(self) -> int:
+        return self.category_mismatch + self.primary_only + self.candidate_only
+
+    def to_dict(self) -> Dict[str, Any]:
+        both = self.agree_category + self.category_mismatch
+        return {
+            "offered": self.offered,
+            "evaluated": self.evaluated,
+            "agree_empty": self.agree_empty,
+            "agree_category": self.agree_category,
+            "category_mismatch": self.category_mismatch,
+            "primary_only": self.primary_only,
+            "candidate_only": self.candidate_only,
+            "errors": self.errors,
+            "disagreement_rate": round(self.disagreements / self.evaluated, 4) if self.evaluated else 0.0,
+            "mean_iou": round(self.iou_sum / both, 4) if both else 0.0,
+            "decisions": self.decisions,
+            "decision_agree": self.decision_agree,
+            "decision_mismatch": self.decision_mismatch,
+            "decision_missed": self.decision_missed,
+            "decision_disagreement_rate": (
+                round((self.decision_mismatch + self.decision_missed) / self.decisions, 4)
+                if self.decisions else 0.0
+            ),
+            "confusion": {k: dict(v) for k, v in self.confusion.items()},
+        }
+
+
+class ShadowRunner:
+    """影子模型运行器
+
+    职责:
+    - 按限定帧率从主路径抽样帧，在独立的低优先级线程中运行候选模型
+    - 将候选模型输出与主模型的检测逐帧比较，累计分歧统计
+
+    offer() 只做时间比较与引用赋值，不等待；候选模型忙或未到抽样时间时直接丢弃
+    """
+
+    def __init__(
+        self,
+        runtime: IInferenceRuntime,
+        max_fps: float = 2.0,
+        decode_scale: int = 1,
+        scheduling: Optional[StageScheduling] = None,
+    ):
+        if max_fps <= 0:
+            raise ValueError(f"max_fps must be positive, got {max_fps}")
+        self._runtime = runtime
+        self._interval = 1.0 / max_fps
+        self._decode_scale = decode_scale
+        self._scheduling = scheduling or DEFAULT_SHADOW_SCHEDULING
+        self._stats = ShadowStats()
+        self._latency = LatencyStats()
+        self._pending: Optional[Tuple[Any, List[Any], Optional[WasteCategory]]] = None
+        self._pending_event = threading.Event()
+        self._next_slot = 0.0
+        self._busy = False
+        self._is_running = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def stats(self) -> ShadowStats:
+        return self._stats
+
+    @property
+    def runtime(self) -> IInferenceRuntime:
+        return self._runtime
+
+    def summary(self) -> Dict[str, Any]:
+        """分歧统计与候选模型推理延迟"""
+        summary = self._stats.to_dict()
+        summary["inference"] = self._latency.summary()
+        return summary
+
+    def start(self) -> None:
+        """启动影子线程"""
+        self._is_running = True
+        self._thread = threading.Thread(target=self._run, name="shadow")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止影子线程"""
+        self._is_running = False
+        self._pending_event.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def offer(
+        self, frame: Any, primary_detections: List[Any], decision: Optional[WasteCategory] = None
+    ) -> bool:
+        """提交主路径的一帧及其检测结果
+
+        decision 为主路径会话在该帧已判定稳定的类别（未判定时为 None）
+
+        Returns:
+            bool: 本帧被接受进行影子评估时返回 True
+        """
+        self._stats.offered += 1
+        now = time.perf_counter()
+        if self._busy or now < self._next_slot:
+            return False
+        self._next_slot = now + self._interval
+        # 检测批不可变，直接持有引用；首个检测在影子线程中按需创建
+        if not isinstance(primary_detections, DetectionBatch):
+            primary_detections = list(primary_detections)
+        self._pending = (frame, primary_detections, decision)
+        self._busy = True
+        self._pending_event.set()
+        return True
+
+    def _run(self) -> None:
+        """影子线程：降低优先级后逐帧评估"""
+        apply_stage_scheduling("shadow", self._scheduling)
+        while self._is_running:
+            if not self._pending_event.wait(timeout=0.5):
+                continue
+            self._pending_event.clear()
+            pending, self._pending = self._pending, None
+            if pending is None:
+                continue
+            try:
+                self.evaluate(*pending)
+            except Exception as e:
+                self._stats.errors += 1
+                logger.warning("Shadow inference failed: %s", e)
+            finally:
+                self._busy = False
+
+    def evaluate(
+        self, frame: Any, primary_detections: Any, decision: Optional[WasteCategory] = None
+    ) -> None:
+        """在一帧上运行候选模型并与主模型比较"""
+        image = frame.decode(self._decode_scale, cache=False) if isinstance(frame, CompressedFrame) else frame
+        if image is None:
+            return
+        start = time.perf_counter()
+        if isinstance(self._runtime, IInferenceRuntime):
+            candidate = self._runtime.infer_batch(image)
+        else:
+            candidate = self._runtime.infer(image)
+        self._latency.add((time.perf_counter() - start) * 1000)
+        self._compare(primary_detections, candidate, decision)
+
+    def _compare(self, primary: Any, candidate: Any, decision: Optional[WasteCategory] = None) -> None:
+        """比较双方首个检测，以及候选模型与会话判定
+
+        主路径检测批由决策线程创建，这里只通过下标访问器读取列数组，
+        不创建 Detection 对象，也不写入检测批的惰性缓存
+        """
+        primary = DetectionBatch.coerce(primary)
+        candidate = DetectionBatch.coerce(candidate)
+        stats = self._stats
+        stats.evaluated += 1
+        if decision is not None:
+            stats.decisions += 1
+            if not candidate:
+                stats.decision_missed += 1
+            elif candidate.category(0) == decision:
+                stats.decision_agree += 1
+            else:
+                stats.decision_mismatch += 1
+        p = primary.category(0) if primary else None
+        c = candidate.category(0) if candidate else None
+        p_key = p.value if p is not None else "none"
+        c_key = c.value if c is not None else "none"
+        row = stats.confusion.setdefault(p_key, {})
+        row[c_key] = row.get(c_key, 0) + 1
+
+        if p is None and c is None:
+            stats.agree_empty += 1
+        elif c is None:
+            stats.primary_only += 1
+        elif p is None:
+            stats.candidate_only += 1
+        else:
+            if p == c:
+                stats.agree_category += 1
+            else:
+                stats.category_mismatch += 1
+            stats.iou_sum += xywh_iou(primary.box(0), candidate.box(0))
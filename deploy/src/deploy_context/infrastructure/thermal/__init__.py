@@ -0,0 +1,5 @@
+"""温度监控模块导出"""
+
+from .sysfs_thermal import ThermalReading, SysfsThermalReader, ThermalMonitor
+
+__all__ = ["ThermalReading", "SysfsThermalReader", "ThermalMonitor"]
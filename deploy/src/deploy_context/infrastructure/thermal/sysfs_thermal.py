@@ -0,0 +1,151 @@
+"""温度监控 - 读取 sysfs 温区与 cpufreq 状态（仅 Linux）"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from ...domain.model.value_object import ThermalPolicy
+
+logger = logging.getLogger(__name__)
+
+_THERMAL_DIR = "sys/class/thermal"
+_CPUFREQ_DIR = "sys/devices/system/cpu/cpufreq"
+
+
+@dataclass
+class ThermalReading:
+    """一次温度采样"""
+    zones: Dict[str, float] = field(default_factory=dict)    # 温区类型 -> 摄氏度
+    freq_ratio: float = 1.0                                  # 频率上限 / 硬件最大频率（各策略最小值）
+
+    @property
+    def max_temperature_c(self) -> Optional[float]:
+        return max(self.zones.values()) if self.zones else None
+
+
+class SysfsThermalReader:
+    """sysfs 温度读取器
+
+    root 默认为 /，测试时可指向伪造的 sysfs 目录树
+    """
+
+    def __init__(self, root: str = "/"):
+        self._root = Path(root)
+
+    def read(self) -> ThermalReading:
+        """读取所有温区温度与 CPU 频率比
+
+        频率比取 scaling_max_freq（温控降频时内核压低的频率上限）相对
+        cpuinfo_max_freq 的比例；空闲时 DVFS 降低的当前频率不代表限频，不参与计算
+        """
+        zones: Dict[str, float] = {}
+        for zone in sorted((self._root / _THERMAL_DIR).glob("thermal_zone*")):
+            millidegrees = self._read_int(zone / "temp")
+            if millidegrees is None:
+                continue
+            name = self._read_text(zone / "type") or zone.name
+            if name in zones:
+                name = f"{name}:{zone.name}"
+            zones[name] = millidegrees / 1000.0
+
+        ratios: List[float] = []
+        for policy in sorted((self._root / _CPUFREQ_DIR).glob("policy*")):
+            ceiling = self._read_int(policy / "scaling_max_freq")
+            maximum = self._read_int(policy / "cpuinfo_max_freq")
+            if ceiling is not None and maximum:
+                ratios.append(ceiling / maximum)
+        return ThermalReading(zones=zones, freq_ratio=min(ratios) if ratios else 1.0)
+
+    @staticmethod
+    def _read_text(path: Path) -> Optional[str]:
+        try:
+            return path.read_text(encoding="ascii").strip()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    @classmethod
+    def _read_int(cls, path: Path) -> Optional[int]:
+        text = cls._read_text(path)
+        try:
+            return int(text) if text else None
+        except ValueError:
+            return None
+
+
+class ThermalMonitor:
+    """温度监控线程
+
+    职责:
+    - 按策略周期采样温度与 CPU 频率
+    - 按 ThermalPolicy 计算温控档位，档位变化时回调
+
+    回调在监控线程中执行，应只做赋值等轻量操作
+    """
+
+    def __init__(
+        self,
+        policy: ThermalPolicy,
+        max_level: int,
+        on_level_change: Optional[Callable[[int, ThermalReading], None]] = None,
+        reader: Optional[SysfsThermalReader] = None,
+    ):
+        self._policy = policy
+        self._max_level = max_level
+        self._on_level_change = on_level_change
+        self._reader = reader or SysfsThermalReader()
+        self._level = 0
+        self._last_reading = ThermalReading()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def level(self) -> int:
+        return self._level
+
+    @property
+    def last_reading(self) -> ThermalReading:
+        return self._last_reading
+
+    def poll(self) -> int:
+        """采样一次并更新档位"""
+        reading = self._reader.read()
+        self._last_reading = reading
+        temperature = reading.max_temperature_c
+        if temperature is None:
+            return self._level
+        level = self._policy.target_level(
+            temperature, self._level, self._max_level, reading.freq_ratio
+        )
+        if level != self._level:
+            logger.info(
+                "Thermal level %d -> %d (max %.1f C, cpufreq ceiling at %.0f%%)",
+                self._level, level, temperature, reading.freq_ratio * 100
+            )
+            self._level = level
+            if self._on_level_change:
+                self._on_level_change(level, reading)
+        return self._level
+
+    def start(self) -> None:
+        """启动监控线程"""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="thermal-monitor")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止监控线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.warning("Thermal poll failed: %s", e)
+            self._stop_event.wait(self._policy.poll_interval_s)
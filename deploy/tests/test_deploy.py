@@ -11,6 +11,8 @@ from deploy_context.domain.model.value_object import SerialPacket, CooldownPolic
 from deploy_context.domain.model.entity import DetectionFrame, Counter
 from deploy_context.domain.model.aggregate import SortingSession, SessionStatus
 from deploy_context.domain.service import StabilityJudge, PacketEncoder
+from deploy_context.domain.model.value_object import LatencyBudgetPolicy, DegradationLevel
+from deploy_context.domain.service import LatencyGovernor
 from shared_kernel.domain.taxonomy import WasteCategory
 
 
@@ -91,6 +93,28 @@ class TestStabilityPolicy:
         policy = StabilityPolicy(position_tolerance=0.05)
         assert policy.is_position_stable(0.5, 0.5, 0.52, 0.48) is True
         assert policy.is_position_stable(0.5, 0.5, 0.6, 0.6) is False
+    
+    def test_sprt_evidence(self):
+        """测试 sprt 证据累积判定与截断"""
+        import math
+        fixed = StabilityPolicy()
+        sprt = StabilityPolicy(decision_rule="sprt", evidence_threshold=4.0)
+        assert sprt.frame_evidence(0.5) == 0.0
+        assert sprt.frame_evidence(1.0) == pytest.approx(math.log(99))
+        assert sprt.frame_evidence(0.2) < 0
+        assert sprt.frame_evidence(None) == 0.0
+        # 单帧 0.99 即满足阈值；fixed 规则仍需时长与次数
+        assert sprt.is_decided(1, 0.0, sprt.frame_evidence(0.99)) is True
+        assert fixed.is_decided(1, 0.0, fixed.frame_evidence(0.99)) is False
+        assert sprt.is_decided(3, 100.0, 3 * sprt.frame_evidence(0.55)) is False
+        # 证据不足时按 fixed 条件截断
+        assert sprt.is_decided(2, 1000.0, 0.0) is True
+        assert sprt.should_count(1, True, False) is True
+        assert fixed.should_count(1, True, False) is False
+        with pytest.raises(ValueError):
+            StabilityPolicy(decision_rule="vote")
+        with pytest.raises(ValueError):
+            StabilityPolicy(evidence_threshold=0)
 
 
 class TestDetectionFrame:
@@ -205,6 +229,128 @@ class TestStabilityJudge:
         
         report = judge.evaluate(frame)
         assert report.consecutive_matches == 1
+    
+    @staticmethod
+    def _reference(policy, current_frame, history):
+        """原实现：每帧拼接 history + [current_frame] 并整体重新扫描"""
+        if not current_frame.has_detection:
+            return (False, 0.0, 0.0, 0.0, 0, False)
+        frames = history + [current_frame]
+        consecutive = 0
+        for frame in frames:
+            if frame.detected_category == frames[0].detected_category:
+                consecutive += 1
+            else:
+                break
+        first, last = frames[0], frames[-1]
+        if len(frames) < 2:
+            position_delta = 0.0
+        elif None in (first.x_normalized, first.y_normalized, last.x_normalized, last.y_normalized):
+            position_delta = 1.0
+        else:
+            position_delta = ((last.x_normalized - first.x_normalized) ** 2
+                              + (last.y_normalized - first.y_normalized) ** 2) ** 0.5
+        duration = (current_frame.timestamp - frames[0].timestamp).total_seconds() * 1000
+        confidences = [f.confidence for f in frames if f.confidence is not None]
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        is_stable = (consecutive >= policy.min_detection_count and duration >= policy.stability_threshold_ms
+                     and position_delta <= policy.position_tolerance * 2)
+        should_classify = is_stable and current_frame.confidence is not None and current_frame.confidence > 0.5
+        return (is_stable, duration, confidence, position_delta, consecutive, should_classify)
+    
+    @staticmethod
+    def _random_frames(rng, count):
+        """随机帧序列：类别/置信度/位置可缺失，时间戳递增"""
+        from datetime import datetime, timedelta
+        categories = [None, WasteCategory.KITCHEN_WASTE, WasteCategory.OTHER_WASTE]
+        t = datetime(2026, 1, 1)
+        frames = []
+        for i in range(count):
+            t += timedelta(milliseconds=rng.choice([0, 33, 100, 400]))
+            x = None if rng.random() < 0.05 else rng.choice([0.5, 0.52, 0.6, rng.random()])
+            frames.append(DetectionFrame(
+                frame_id=str(i), image_width=640, image_height=480,
+                detected_category=rng.choice(categories + categories[1:] * 3),
+                confidence=None if rng.random() < 0.1 else rng.choice([0.3, 0.5, 0.9, rng.random()]),
+                x_normalized=x, y_normalized=None if x is None else rng.choice([0.5, 0.51, rng.random()]),
+                timestamp=t
+            ))
+        return frames
+    
+    def _assert_matches(self, report, expected):
+        is_stable, duration, confidence, delta, consecutive, should_classify = expected
+        assert report.is_stable == is_stable
+        assert report.tracking_duration_ms == duration
+        assert report.confidence_score == pytest.approx(confidence, abs=1e-9)
+        assert report.position_delta == delta
+        assert report.consecutive_matches == consecutive
+        assert report.should_classify == should_classify
+    
+    def test_history_matches_reference(self):
+        """性质测试：显式 history 的结果与原实现一致"""
+        import random
+        rng = random.Random(40)
+        policy = StabilityPolicy(stability_threshold_ms=300, min_detection_count=3, position_tolerance=0.05)
+        judge = StabilityJudge(policy)
+        for _ in range(500):
+            frames = self._random_frames(rng, rng.randint(1, 12))
+            history, current = frames[:-1], frames[-1]
+            self._assert_matches(judge.evaluate(current, history), self._reference(policy, current, history))
+    
+    def test_track_window_matches_reference(self):
+        """性质测试：按跟踪对象增量评估与传入最近 window_size-1 帧历史的原实现一致"""
+        import random
+        rng = random.Random(41)
+        policy = StabilityPolicy(stability_threshold_ms=300, min_detection_count=3, position_tolerance=0.05)
+        for window_size in (1, 2, 3, 8):
+            judge = StabilityJudge(policy, window_size=window_size)
+            observed = {"a": [], "b": []}
+            for frame in self._random_frames(rng, 2000):
+                track = rng.choice("ab")
+                history = observed[track][max(0, len(observed[track]) - (window_size - 1)):]
+                expected = self._reference(policy, frame, history)
+                self._assert_matches(judge.evaluate(frame, track_id=track), expected)
+                if frame.has_detection:
+                    observed[track].append(frame)
+    
+    def test_track_window_forget(self):
+        """测试丢弃跟踪窗口与参数校验"""
+        judge = StabilityJudge(window_size=4)
+        frame = DetectionFrame(
+            frame_id="1", image_width=640, image_height=480,
+            detected_category=WasteCategory.KITCHEN_WASTE, confidence=0.9,
+            x_normalized=0.5, y_normalized=0.5
+        )
+        assert judge.evaluate(frame, track_id=1).consecutive_matches == 1
+        assert judge.evaluate(frame, track_id=1).consecutive_matches == 2
+        judge.forget(1)
+        assert judge.evaluate(frame, track_id=1).consecutive_matches == 1
+        with pytest.raises(ValueError):
+            judge.evaluate(frame, history=[], track_id=1)
+        with pytest.raises(ValueError):
+            StabilityJudge(window_size=0)
+    
+    def test_track_window_covers_threshold_at_60fps(self):
+        """测试默认窗口按策略推导，60 fps 下跟踪时长可累计到稳定时长"""
+        from datetime import datetime, timedelta
+        policy = StabilityPolicy(stability_threshold_ms=1000, min_detection_count=2)
+        judge = StabilityJudge(policy)
+        assert judge.window_size == StabilityJudge.required_window_size(policy, 120.0) == 121
+        start = datetime(2026, 1, 1)
+        report = None
+        for i in range(61):
+            frame = DetectionFrame(
+                frame_id=str(i), image_width=640, image_height=480,
+                detected_category=WasteCategory.KITCHEN_WASTE, confidence=0.9,
+                x_normalized=0.5, y_normalized=0.5,
+                timestamp=start + timedelta(microseconds=round(i * 1_000_000 / 60))
+            )
+            report = judge.evaluate(frame, track_id=1)
+            assert report.is_stable == (i == 60)
+        assert report.tracking_duration_ms == pytest.approx(1000.0)
+        assert report.consecutive_matches == 61
+        with pytest.raises(ValueError):
+            StabilityJudge(policy, max_fps=0)
 
 
 class TestPacketEncoder:
@@ -219,5 +365,1636 @@ class TestPacketEncoder:
         assert packet.class_id == 1  # 0 -> 1 (default mapping)
 
 
+class TestLatencyGovernor:
+    """测试延迟预算调控"""
+    
+    def _policy(self):
+        return LatencyBudgetPolicy(
+            budget_ms=100.0,
+            window_size=5,
+            headroom_ratio=0.5,
+            levels=(
+                DegradationLevel(input_size=640),
+                DegradationLevel(input_size=480),
+                DegradationLevel(input_size=480, motion_threshold=0.05),
+            )
+        )
+    
+    def test_no_transition_until_window_full(self):
+        """测试窗口未满时不切换"""
+        governor = LatencyGovernor(self._policy())
+        for _ in range(4):
+            assert governor.observe(500.0) is None
+        assert governor.level == 0
+    
+    def test_step_down_on_budget_breach(self):
+        """测试超出预算时降档"""
+        governor = LatencyGovernor(self._policy())
+        transitions = [governor.observe(150.0) for _ in range(5)]
+        assert transitions[-1] is not None
+        assert transitions[-1].reason == "budget_exceeded"
+        assert governor.level == 1
+        assert governor.current.input_size == 480
+    
+    def test_ladder_is_bounded(self):
+        """测试降档不超过最高档位"""
+        governor = LatencyGovernor(self._policy())
+        for _ in range(50):
+            governor.observe(500.0)
+        assert governor.level == 2
+        assert len(governor.transitions) == 2
+    
+    def test_step_up_with_headroom(self):
+        """测试余量充足时升档"""
+        governor = LatencyGovernor(self._policy())
+        for _ in range(10):
+            governor.observe(500.0)
+        assert governor.level == 2
+        for _ in range(5):
+            governor.observe(20.0)
+        assert governor.level == 1
+        assert governor.transitions[-1].reason == "headroom"
+    
+    def test_hysteresis_band_holds_level(self):
+        """测试滞回区间内保持档位"""
+        governor = LatencyGovernor(self._policy())
+        for _ in range(5):
+            governor.observe(500.0)
+        for _ in range(20):
+            governor.observe(70.0)  # 低于预算，但高于 预算*headroom_ratio
+        assert governor.level == 1
+    
+    def test_without_fallback_model(self):
+        """测试未配置小模型时去掉小模型档位"""
+        policy = LatencyBudgetPolicy().without_fallback_model()
+        assert all(not level.use_fallback_model for level in policy.levels)
+        assert policy.budget_ms == LatencyBudgetPolicy().budget_ms
+    
+    def test_invalid_policy(self):
+        """测试无效的策略参数"""
+        with pytest.raises(ValueError):
+            LatencyBudgetPolicy(budget_ms=0)
+        with pytest.raises(ValueError):
+            DegradationLevel(motion_threshold=1.5)
+
+
+class TestMotionGate:
+    """测试运动门控"""
+    
+    def test_disabled_gate_always_infers(self):
+        """测试阈值为 0 时不门控"""
+        import numpy as np
+        from deploy_context.infrastructure.runtime.motion_gate import MotionGate
+        gate = MotionGate()
+        frame = np.zeros((72, 128, 3), dtype=np.uint8)
+        assert all(gate.should_infer(frame) for _ in range(3))
+    
+    def test_static_scene_is_skipped(self):
+        """测试静止画面被跳过，运动画面被推理"""
+        import numpy as np
+        from deploy_context.infrastructure.runtime.motion_gate import MotionGate
+        gate = MotionGate(threshold=0.02)
+        frame = np.zeros((72, 128, 3), dtype=np.uint8)
+        assert gate.should_infer(frame) is True
+        assert gate.should_infer(frame.copy()) is False
+        moved = frame.copy()
+        moved[:, :64] = 255
+        assert gate.should_infer(moved) is True
+
+
+class TestDetectionRecorder:
+    """测试检测记录器"""
+    
+    def test_round_trip(self, tmp_path):
+        """测试写入后按列读取"""
+        from deploy_context.infrastructure.recorder import (
+            DetectionRecorder, DetectionLogReader, DecisionFlag
+        )
+        with DetectionRecorder(str(tmp_path), flush_every=4) as recorder:
+            for seq in range(10):
+                recorder.record(1000.0 + seq, seq, seq % 4, 0.5 + seq * 0.01,
+                                0.1, 0.2, 0.3, 0.4, int(DecisionFlag.PRIMARY))
+        
+        columns = DetectionLogReader(str(tmp_path)).load()
+        assert len(columns["timestamp"]) == 10
+        assert columns["frame_seq"].tolist() == list(range(10))
+        assert columns["class_id"].tolist() == [seq % 4 for seq in range(10)]
+        assert columns["box"].shape == (10, 4)
+        assert columns["box"][3].tolist() == pytest.approx([0.1, 0.2, 0.3, 0.4])
+        assert (columns["flags"] == DecisionFlag.PRIMARY).all()
+    
+    def test_rollover_by_size(self, tmp_path):
+        """测试按段大小滚动"""
+        import numpy as np
+        from deploy_context.infrastructure.recorder import detection_recorder
+        from deploy_context.infrastructure.recorder import DetectionRecorder, DetectionLogReader
+        recorder = DetectionRecorder(
+            str(tmp_path), max_segment_bytes=detection_recorder.RECORD_BYTES * 8
+        )
+        recorder.record_batch(1.0, 1, np.arange(20) % 4, np.full(20, 0.9), np.zeros((20, 4)))
+        recorder.close()
+        
+        reader = DetectionLogReader(str(tmp_path))
+        assert len(reader.segments()) == 3
+        assert len(reader) == 20
+        assert reader.load()["class_id"].tolist() == (np.arange(20) % 4).tolist()
+    
+    def test_uncommitted_records_are_invisible(self, tmp_path):
+        """测试暂存未刷新的记录对读取端不可见"""
+        from deploy_context.infrastructure.recorder import DetectionRecorder, DetectionLogReader
+        recorder = DetectionRecorder(str(tmp_path), flush_every=100)
+        recorder.record(1.0, 1, 0, 0.9, 0.5, 0.5, 0.1, 0.1)
+        assert len(DetectionLogReader(str(tmp_path))) == 0
+        recorder.flush()
+        assert len(DetectionLogReader(str(tmp_path))) == 1
+        recorder.close()
+    
+    def test_batches_are_staged_in_order(self, tmp_path):
+        """测试整帧批次暂存后按列拼接写入，与逐条记录交替时保持顺序"""
+        import numpy as np
+        from deploy_context.infrastructure.recorder import (
+            DetectionRecorder, DetectionLogReader, DecisionFlag
+        )
+        recorder = DetectionRecorder(str(tmp_path), flush_every=4)
+        recorder.record_batch(1.0, 1, np.array([2, 3]), np.array([0.9, 0.8]),
+                              np.full((2, 4), 0.5), int(DecisionFlag.STABLE), primary=True)
+        assert len(DetectionLogReader(str(tmp_path))) == 0
+        recorder.record(2.0, 2, 4, 0.7, 0.5, 0.5, 0.1, 0.1)
+        recorder.record_batch(3.0, 3, np.array([5]), np.array([0.6]), np.full((1, 4), 0.5))
+        recorder.record_batch(4.0, 4, np.array([6, 7, 8]), np.array([0.5, 0.4, 0.3]),
+                              np.full((3, 4), 0.5), primary=True)
+        assert len(DetectionLogReader(str(tmp_path))) == 7
+        recorder.close()
+        
+        columns = DetectionLogReader(str(tmp_path)).load()
+        assert columns["frame_seq"].tolist() == [1, 1, 2, 3, 4, 4, 4]
+        assert columns["class_id"].tolist() == [2, 3, 4, 5, 6, 7, 8]
+        assert columns["timestamp"].tolist() == [1.0, 1.0, 2.0, 3.0, 4.0, 4.0, 4.0]
+        stable_primary = DecisionFlag.STABLE | DecisionFlag.PRIMARY
+        assert columns["flags"].tolist() == [stable_primary, DecisionFlag.STABLE, 0, 0,
+                                             DecisionFlag.PRIMARY, 0, 0]
+    
+    def test_reopen_appends_new_segment(self, tmp_path):
+        """测试重新打开时不覆盖历史段"""
+        from deploy_context.infrastructure.recorder import DetectionRecorder, DetectionLogReader
+        for _ in range(2):
+            with DetectionRecorder(str(tmp_path)) as recorder:
+                recorder.record(1.0, 1, 0, 0.9, 0.5, 0.5, 0.1, 0.1)
+        assert len(DetectionLogReader(str(tmp_path)).segments()) == 2
+        assert len(DetectionLogReader(str(tmp_path))) == 2
+    
+    def test_handler_records_multi_detection_frame(self, tmp_path):
+        """测试多检测帧按列一次写入：每条记录带本帧决策标志，只有首条带 PRIMARY"""
+        import time
+        import numpy as np
+        from unittest.mock import Mock
+        from deploy_context.application.handler import StartRuntimeHandler
+        from deploy_context.domain.model.value_object import DetectionBatch
+        from deploy_context.infrastructure.recorder import (
+            DetectionRecorder, DetectionLogReader, DecisionFlag
+        )
+        session = Mock()
+        session.current_track = None
+        session.statistics.stable_detections = 0
+        
+        def process_frame(frame):
+            session.statistics.stable_detections = 1
+            return Mock()
+        session.process_frame.side_effect = process_frame
+        
+        handler = StartRuntimeHandler(config_loader=Mock())
+        handler._session = session
+        handler._recorder = DetectionRecorder(str(tmp_path))
+        batch = DetectionBatch(
+            boxes=np.array([[0.2, 0.3, 0.1, 0.1], [0.5, 0.5, 0.2, 0.2], [0.8, 0.6, 0.1, 0.3]]),
+            scores=np.array([0.9, 0.7, 0.6]),
+            class_ids=np.array([2, 0, 3]),
+        )
+        handler._decide(1, np.zeros((72, 128, 3), dtype=np.uint8), batch, time.perf_counter())
+        handler._recorder.close()
+        
+        columns = DetectionLogReader(str(tmp_path)).load()
+        decided = DecisionFlag.STABLE | DecisionFlag.PACKET_SENT
+        assert columns["frame_seq"].tolist() == [1, 1, 1]
+        assert columns["class_id"].tolist() == [2, 0, 3]
+        assert columns["confidence"].tolist() == pytest.approx([0.9, 0.7, 0.6])
+        assert columns["box"][2].tolist() == pytest.approx([0.8, 0.6, 0.1, 0.3])
+        assert columns["flags"].tolist() == [decided | DecisionFlag.PRIMARY, decided, decided]
+
+
+class TestActuationCompensation:
+    """测试执行延迟补偿"""
+    
+    def _run_moving_object(self, policy):
+        """匀速移动的对象连续出现三帧，返回发出的数据包"""
+        from datetime import datetime, timedelta
+        session = SortingSession.create(
+            stability_policy=StabilityPolicy(stability_threshold_ms=0, min_detection_count=3),
+            compensation_policy=policy
+        )
+        session.initialize(640, 480)
+        session.start()
+        now = datetime.utcnow()
+        packet = None
+        for i, x in enumerate((0.50, 0.51, 0.52)):
+            packet = session.process_frame(DetectionFrame(
+                frame_id=str(i), image_width=640, image_height=480,
+                detected_category=WasteCategory.RECYCLABLE_WASTE, confidence=0.9,
+                x_normalized=x, y_normalized=0.5,
+                timestamp=now - timedelta(seconds=0.1 * (2 - i))
+            )) or packet
+        return packet
+    
+    def test_estimate_velocity(self):
+        """测试最小二乘速度估计"""
+        from deploy_context.domain.model.value_object import ActuationCompensationPolicy
+        policy = ActuationCompensationPolicy(enabled=True)
+        vx, vy = policy.estimate_velocity([(0.0, 0.1, 0.5), (0.1, 0.2, 0.5), (0.2, 0.3, 0.5)])
+        assert vx == pytest.approx(1.0)
+        assert vy == pytest.approx(0.0)
+        assert policy.estimate_velocity([(0.0, 0.1, 0.5), (0.1, 0.2, 0.5)]) == (0.0, 0.0)
+    
+    def test_horizon_clamped(self):
+        """测试外推时长截断"""
+        from deploy_context.domain.model.value_object import ActuationCompensationPolicy
+        policy = ActuationCompensationPolicy(actuator_delay_ms=20, max_horizon_ms=100)
+        assert policy.horizon_ms(30, 10) == 60
+        assert policy.horizon_ms(500, 10) == 100
+    
+    def test_packet_extrapolated_to_actuation_time(self):
+        """测试数据包坐标外推"""
+        from deploy_context.domain.model.value_object import ActuationCompensationPolicy
+        compensated = self._run_moving_object(
+            ActuationCompensationPolicy(enabled=True, actuator_delay_ms=100)
+        )
+        uncompensated = self._run_moving_object(ActuationCompensationPolicy())
+        assert uncompensated.x == int(0.52 * 255)
+        # 速度 0.1/s，外推约 100ms -> x 约 0.53
+        assert compensated.x in (int(0.53 * 255), int(0.53 * 255) + 1)
+        assert compensated.y == uncompensated.y
+    
+    def test_invalid_policy(self):
+        """测试无效参数"""
+        from deploy_context.domain.model.value_object import ActuationCompensationPolicy
+        with pytest.raises(ValueError):
+            ActuationCompensationPolicy(min_samples=1)
+        with pytest.raises(ValueError):
+            ActuationCompensationPolicy(history_size=2, min_samples=3)
+
+
+class TestThermalThrottling:
+    """测试温控降档"""
+    
+    def _write_sysfs(self, root, temps_c, cur_freq=1800000, max_freq=1800000, ceiling_freq=None):
+        """在临时目录中伪造 sysfs 温区与 cpufreq（ceiling_freq 为温控压低后的频率上限）"""
+        for index, (name, temp) in enumerate(temps_c.items()):
+            zone = root / "sys/class/thermal" / f"thermal_zone{index}"
+            zone.mkdir(parents=True, exist_ok=True)
+            (zone / "type").write_text(name + "\n")
+            (zone / "temp").write_text(f"{int(temp * 1000)}\n")
+        policy = root / "sys/devices/system/cpu/cpufreq/policy0"
+        policy.mkdir(parents=True, exist_ok=True)
+        (policy / "scaling_cur_freq").write_text(f"{cur_freq}\n")
+        (policy / "cpuinfo_max_freq").write_text(f"{max_freq}\n")
+        (policy / "scaling_max_freq").write_text(f"{ceiling_freq or max_freq}\n")
+    
+    def test_reader(self, tmp_path):
+        """测试读取伪造 sysfs"""
+        from deploy_context.infrastructure.thermal import SysfsThermalReader
+        self._write_sysfs(tmp_path, {"soc-thermal": 61.5, "npu-thermal": 66.0}, ceiling_freq=900000)
+        reading = SysfsThermalReader(str(tmp_path)).read()
+        assert reading.zones == {"soc-thermal": 61.5, "npu-thermal": 66.0}
+        assert reading.max_temperature_c == 66.0
+        assert reading.freq_ratio == pytest.approx(0.5)
+        assert SysfsThermalReader(str(tmp_path / "missing")).read().max_temperature_c is None
+    
+    def test_idle_dvfs_is_not_throttling(self, tmp_path):
+        """测试冷芯片空闲降频（当前频率低、频率上限为满频）时不降档"""
+        from deploy_context.domain.model.value_object import ThermalPolicy
+        from deploy_context.infrastructure.thermal import SysfsThermalReader, ThermalMonitor
+        self._write_sysfs(tmp_path, {"soc-thermal": 40.0}, cur_freq=408000, max_freq=1800000)
+        reading = SysfsThermalReader(str(tmp_path)).read()
+        assert reading.freq_ratio == pytest.approx(1.0)
+        monitor = ThermalMonitor(
+            ThermalPolicy(enabled=True), max_level=3, reader=SysfsThermalReader(str(tmp_path))
+        )
+        assert monitor.poll() == 0
+    
+    def test_policy_hysteresis(self):
+        """测试档位计算与回落滞回"""
+        from deploy_context.domain.model.value_object import ThermalPolicy
+        policy = ThermalPolicy(enabled=True, throttle_start_c=70, step_c=5, hysteresis_c=3)
+        assert policy.target_level(65, 0, 4) == 0
+        assert policy.target_level(71, 0, 4) == 1
+        assert policy.target_level(90, 0, 4) == 4
+        # 76°C 处于第 2 档，降到 74°C 时滞回未满足，保持
+        assert policy.target_level(74, 2, 4) == 2
+        assert policy.target_level(71, 2, 4) == 1
+        # 内核已限频时至少一档
+        assert policy.target_level(60, 0, 4, freq_ratio=0.5) == 1
+        assert policy.inference_interval_ms(100, 2) == 100 + 2 * policy.interval_step_ms
+    
+    def test_monitor_follows_temperature(self, tmp_path):
+        """测试监控随温度升降档位"""
+        from deploy_context.domain.model.value_object import ThermalPolicy
+        from deploy_context.infrastructure.thermal import ThermalMonitor, SysfsThermalReader
+        changes = []
+        monitor = ThermalMonitor(
+            ThermalPolicy(enabled=True, throttle_start_c=70, step_c=5, hysteresis_c=3),
+            max_level=4,
+            on_level_change=lambda level, reading: changes.append(level),
+            reader=SysfsThermalReader(str(tmp_path))
+        )
+        for temp in (60, 72, 78, 76, 60):
+            self._write_sysfs(tmp_path, {"soc-thermal": temp})
+            monitor.poll()
+        assert changes == [1, 2, 0]
+        assert monitor.level == 0
+    
+    def test_governor_floor(self):
+        """测试温控下限：立即降档，下限解除后随延迟余量回升"""
+        from deploy_context.domain.model.value_object import LatencyBudgetPolicy
+        from deploy_context.domain.service import LatencyGovernor
+        governor = LatencyGovernor(LatencyBudgetPolicy(budget_ms=100, window_size=2))
+        transition = governor.set_floor(2)
+        assert transition.reason == "thermal"
+        assert governor.level == 2
+        # 余量充足也不低于下限
+        for _ in range(4):
+            governor.observe(10.0)
+        assert governor.level == 2
+        assert governor.set_floor(0) is None
+        for _ in range(4):
+            governor.observe(10.0)
+        assert governor.level == 0
+    
+    def test_profile_section(self):
+        """测试配置文件中的温控参数"""
+        from deploy_context.infrastructure.builder import PipelineSettings, PipelineBuilder
+        settings = PipelineSettings.from_profile({
+            "thermal": {"enabled": True, "throttle_start_c": 80, "sysfs_root": "/tmp/fake"}
+        })
+        assert settings.thermal_policy.throttle_start_c == 80
+        monitor = PipelineBuilder().build_thermal_monitor(settings, max_level=3)
+        assert monitor is not None and monitor.level == 0
+        assert PipelineBuilder().build_thermal_monitor(PipelineSettings(), max_level=3) is None
+
+
+class TestPolicyTuner:
+    """测试离线策略调参"""
+    
+    def _write_item_stream(self, directory, items=12, frames_per_item=10, idle_frames=20, fps=30.0,
+                           confidences=(0.9,)):
+        """写入合成检测日志：每个物品在固定位置出现若干帧，之后空若干帧（置信度按物品轮换）"""
+        import json
+        from deploy_context.infrastructure.recorder import DetectionRecorder, DecisionFlag
+        truth = {}
+        seq = 0
+        with DetectionRecorder(str(directory)) as recorder:
+            for item in range(items):
+                category = list(WasteCategory)[item % 4]
+                truth[category.value] = truth.get(category.value, 0) + 1
+                for _ in range(frames_per_item):
+                    recorder.record(1000.0 + seq / fps, seq, item % 4, confidences[item % len(confidences)],
+                                    0.3 + 0.1 * (item % 3), 0.5, 0.1, 0.1, int(DecisionFlag.PRIMARY))
+                    seq += 1
+                seq += idle_frames
+        (directory / "ground_truth.json").write_text(json.dumps({"counts": truth}))
+        return truth
+    
+    def test_load_replay_frames(self, tmp_path):
+        """测试从检测日志还原回放帧与空帧数"""
+        from deploy_context.application.handler.tune_policy_handler import load_replay_frames
+        self._write_item_stream(tmp_path, items=2, frames_per_item=3, idle_frames=5)
+        frames = load_replay_frames(str(tmp_path))
+        assert len(frames) == 6
+        assert [f.idle_before for f in frames] == [0, 0, 0, 5, 0, 0]
+        assert frames[3].category == WasteCategory.RECYCLABLE_WASTE
+    
+    def test_log_skips_frames_the_session_never_saw(self, tmp_path):
+        """测试队列丢弃的帧不占日志帧序号，回放只补会话处理过的空帧"""
+        import time
+        import numpy as np
+        from unittest.mock import Mock
+        from deploy_context.application.handler import StartRuntimeHandler
+        from deploy_context.application.handler.tune_policy_handler import load_replay_frames
+        from deploy_context.domain.model.value_object import DetectionBatch
+        from deploy_context.infrastructure.recorder import DetectionRecorder
+        batch = DetectionBatch(boxes=np.array([[0.5, 0.5, 0.1, 0.1]]), scores=np.array([0.9]),
+                               class_ids=np.array([1]))
+        handler = StartRuntimeHandler(config_loader=Mock())
+        handler._session = SortingSession.create()
+        handler._session.initialize(128, 72)
+        handler._session.start()
+        handler._recorder = DetectionRecorder(str(tmp_path))
+        image = np.zeros((72, 128, 3), dtype=np.uint8)
+        # 采集序号 3-8 在分阶段管线的队列中被丢弃，从未送入会话
+        for frame_seq, detections in [(1, batch), (2, DetectionBatch.empty()), (9, batch)]:
+            handler._decide(frame_seq, image, detections, time.perf_counter())
+        handler._recorder.close()
+        frames = load_replay_frames(str(tmp_path))
+        assert [f.idle_before for f in frames] == [0, 1]
+        assert handler._session.statistics.total_frames == 3
+    
+    def test_replay_uses_recorded_time(self, tmp_path):
+        """测试回放按记录时间判定稳定：物品停留 333ms，阈值 1s 时不计数"""
+        from deploy_context.application.handler.tune_policy_handler import load_replay_frames
+        from deploy_context.domain.service import PolicyReplayer
+        truth = self._write_item_stream(tmp_path)
+        frames = load_replay_frames(str(tmp_path))
+        fast = PolicyReplayer(
+            StabilityPolicy(stability_threshold_ms=200, min_detection_count=3), CooldownPolicy()
+        ).replay(frames)
+        slow = PolicyReplayer(StabilityPolicy(stability_threshold_ms=1000), CooldownPolicy()).replay(frames)
+        assert fast.count_error(truth) == 0
+        assert fast.packets == 12
+        assert all(200 <= latency < 300 for latency in fast.decision_latencies_ms)
+        assert slow.packets == 0
+    
+    def test_handler_ranks_configurations(self, tmp_path):
+        """测试网格评估与排序（含进程池）"""
+        from deploy_context.application.command import TunePolicyCmd
+        from deploy_context.application.handler import TunePolicyHandler
+        for name in ("a", "b"):
+            (tmp_path / name).mkdir()
+            self._write_item_stream(tmp_path / name)
+        result = TunePolicyHandler().handle(TunePolicyCmd(
+            recordings=[str(tmp_path / "a"), str(tmp_path / "b")],
+            grid={"stability_threshold_ms": [100, 200, 1000], "min_detection_count": [2, 3]},
+            processes=2,
+            top=3
+        ))
+        assert result.error is None
+        assert result.configurations == 6
+        assert result.streams == 2
+        assert len(result.results) == 3
+        best = result.results[0]
+        assert best["count_error"] == 0
+        assert best["params"]["stability_threshold_ms"] == 100
+        assert best["latency_mean_ms"] <= result.results[1]["latency_mean_ms"]
+    
+    def test_expand_grid(self):
+        """测试网格展开、随机抽样与未知参数"""
+        from deploy_context.application.handler import TunePolicyHandler
+        grid = {"cooldown_ms": [100, 200], "position_tolerance": [0.02, 0.05, 0.1]}
+        assert len(TunePolicyHandler.expand_grid(grid)) == 6
+        sampled = TunePolicyHandler.expand_grid(grid, samples=4, seed=1)
+        assert len(sampled) == 4
+        assert sampled == TunePolicyHandler.expand_grid(grid, samples=4, seed=1)
+        with pytest.raises(ValueError):
+            TunePolicyHandler.expand_grid({"unknown": [1]})
+    
+    def test_sprt_decides_confident_items_sooner(self, tmp_path):
+        """测试 sprt：高置信度物品两帧内判定，模糊物品等待更久，计数不变"""
+        from deploy_context.application.handler.tune_policy_handler import load_replay_frames
+        from deploy_context.domain.service import PolicyReplayer
+        truth = self._write_item_stream(tmp_path, frames_per_item=40, confidences=(0.95, 0.55))
+        frames = load_replay_frames(str(tmp_path))
+        fixed = PolicyReplayer(StabilityPolicy(), CooldownPolicy(min_interval_ms=100)).replay(frames)
+        sprt = PolicyReplayer(
+            StabilityPolicy(decision_rule="sprt"), CooldownPolicy(min_interval_ms=100)
+        ).replay(frames)
+        assert fixed.count_error(truth) == 0
+        assert sprt.count_error(truth) == 0
+        confident, ambiguous = sprt.decision_latencies_ms[0::2], sprt.decision_latencies_ms[1::2]
+        assert all(latency <= 1000 / 30 + 1 for latency in confident)
+        assert all(latency > 100 for latency in ambiguous)
+        assert all(latency >= 1000 for latency in fixed.decision_latencies_ms)
+        assert sum(sprt.decision_latencies_ms) < sum(fixed.decision_latencies_ms) / 2
+    
+    def test_handler_reports_latency_reduction(self, tmp_path):
+        """测试 sprt 调参结果附带相同参数 fixed 规则的延迟对比"""
+        from deploy_context.application.command import TunePolicyCmd
+        from deploy_context.application.handler import TunePolicyHandler
+        self._write_item_stream(tmp_path, frames_per_item=40, confidences=(0.95, 0.55))
+        result = TunePolicyHandler().handle(TunePolicyCmd(
+            recordings=[str(tmp_path)],
+            grid={"evidence_threshold": [2.0, 4.0], "cooldown_ms": [100]},
+            processes=1,
+            decision_rule="sprt",
+        ))
+        assert result.error is None
+        for entry in result.results:
+            assert entry["count_error"] == entry["baseline_count_error"] == 0
+            assert entry["latency_reduction_ms"] == pytest.approx(
+                entry["baseline_latency_mean_ms"] - entry["latency_mean_ms"], abs=1e-3
+            )
+            assert entry["latency_reduction_ms"] > 0
+        assert "evidence_threshold" in TunePolicyHandler.default_grid("sprt")
+        assert "evidence_threshold" not in TunePolicyHandler.default_grid()
+        invalid = TunePolicyHandler().handle(TunePolicyCmd(recordings=[str(tmp_path)], decision_rule="vote"))
+        assert invalid.error is not None
+
+
+class TestCropClassification:
+    """测试第二阶段裁剪分类"""
+    
+    def _make_classifier(self, category, confidence):
+        """固定输出的裁剪分类器，记录调用次数与裁剪尺寸"""
+        from deploy_context.domain.repository import ICropClassifier
+        
+        class FixedClassifier(ICropClassifier):
+            def __init__(self):
+                self.crops = []
+            
+            def load_model(self, model_path):
+                return True
+            
+            def classify(self, crop):
+                self.crops.append(crop.shape)
+                return (category, confidence)
+            
+            def is_loaded(self):
+                return True
+            
+            def unload(self):
+                pass
+        
+        return FixedClassifier()
+    
+    def _run(self, classifier, frames=5, policy=None):
+        """同一目标连续出现若干帧，返回发出的数据包"""
+        import numpy as np
+        session = SortingSession.create(
+            stability_policy=StabilityPolicy(stability_threshold_ms=0, min_detection_count=3),
+            crop_classifier=classifier,
+            crop_policy=policy
+        )
+        session.initialize(640, 480)
+        session.start()
+        image = np.zeros((480, 640, 3), dtype=np.uint8)
+        packets = []
+        for i in range(frames):
+            packet = session.process_frame(DetectionFrame(
+                frame_id=str(i), image_width=640, image_height=480,
+                detected_category=WasteCategory.RECYCLABLE_WASTE, confidence=0.9,
+                x_normalized=0.5, y_normalized=0.5, box_width=0.25, box_height=0.25,
+                crop_loader=lambda: image
+            ))
+            if packet is not None:
+                packets.append(packet)
+        return session, packets
+    
+    def test_classified_once_per_track(self):
+        """测试每个跟踪对象只分类一次"""
+        classifier = self._make_classifier(WasteCategory.RECYCLABLE_WASTE, 0.9)
+        session, packets = self._run(classifier, frames=8)
+        assert len(classifier.crops) == 1
+        # 外扩 10% 的裁剪框
+        assert classifier.crops[0][:2] == (132, 176)
+        assert session.statistics.crop_classifications == 1
+        assert session.statistics.crop_overrides == 0
+        assert len(packets) == 1
+    
+    def test_override_changes_packet_class(self):
+        """测试高置信度结果覆盖检测类别"""
+        from deploy_context.domain.model.value_object import CropClassificationPolicy
+        classifier = self._make_classifier(WasteCategory.HAZARDOUS_WASTE, 0.8)
+        session, packets = self._run(classifier, policy=CropClassificationPolicy(min_confidence=0.6))
+        baseline_session, baseline = self._run(None)
+        assert packets[0].class_id != baseline[0].class_id
+        assert packets[0].class_id == session._get_protocol_class_id(WasteCategory.HAZARDOUS_WASTE)
+        assert session.statistics.crop_overrides == 1
+    
+    def test_low_confidence_keeps_detector_class(self):
+        """测试低置信度结果不覆盖检测类别"""
+        from deploy_context.domain.model.value_object import CropClassificationPolicy
+        classifier = self._make_classifier(WasteCategory.HAZARDOUS_WASTE, 0.3)
+        session, packets = self._run(classifier, policy=CropClassificationPolicy(min_confidence=0.6))
+        _, baseline = self._run(None)
+        assert len(classifier.crops) == 1
+        assert packets[0].class_id == baseline[0].class_id
+        assert session.statistics.crop_overrides == 0
+    
+    def test_pipeline_settings_second_stage(self):
+        """测试配置文件中的第二阶段参数"""
+        from deploy_context.infrastructure.builder import PipelineSettings, PipelineBuilder
+        settings = PipelineSettings.from_profile({
+            "second_stage": {"model_path": "cls.pt", "min_confidence": 0.7, "padding": 0.2}
+        })
+        assert settings.crop_classifier_model == "cls.pt"
+        assert settings.crop_policy.min_confidence == 0.7
+        assert PipelineBuilder().build_crop_classifier(settings) is not None
+        assert PipelineBuilder().build_crop_classifier(PipelineSettings()) is None
+
+
+class TestPipelineSettings:
+    """测试设备配置文件构建管线参数"""
+    
+    def test_from_rk3588_profile(self):
+        """测试 RK3588 配置文件映射"""
+        from shared_kernel.config.loader import ConfigLoader
+        from deploy_context.infrastructure.builder import PipelineBuilder
+        settings = PipelineBuilder(ConfigLoader()).load_settings("rk3588")
+        assert settings.profile_name == "rk3588"
+        assert settings.runtime == "rknn"
+        assert settings.workers == 3
+        assert settings.camera_format == "MJPG"
+        assert settings.decode_scale == 2
+        assert settings.camera_fps == 30
+        assert settings.inference_interval_ms == 100
+        assert settings.max_queue_size == 50
+        assert settings.stability_policy.stability_threshold_ms == 1000
+        assert settings.stability_policy.detection_reset_ms == 500
+        assert settings.cooldown_policy.min_interval_ms == 5000
+        assert settings.stage_scheduling["inference"].cpus == (4, 5, 6, 7)
+        assert settings.stage_scheduling["inference"].policy == "fifo"
+    
+    def test_override_ignores_none(self):
+        """测试命令行参数覆盖配置文件"""
+        from deploy_context.infrastructure.builder import PipelineSettings
+        settings = PipelineSettings.from_profile({"camera": {"width": 640}, "serial": {"port": "/dev/ttyS0"}})
+        overridden = settings.override(camera_width=320, serial_port=None)
+        assert overridden.camera_width == 320
+        assert overridden.serial_port == "/dev/ttyS0"
+    
+    def test_rknn_workers_bind_npu_cores(self):
+        """测试 RKNN 工作线程按核心分配掩码"""
+        from deploy_context.infrastructure.builder import PipelineBuilder, PipelineSettings
+        settings = PipelineSettings.from_profile({
+            "npu": {"enabled": True, "cores": 3},
+            "inference": {"runtime": "rknn"},
+            "performance": {"workers": 4},
+        })
+        runtimes = PipelineBuilder(config_loader=object()).build_runtimes(settings)
+        assert [runtime._core_mask for runtime in runtimes] == [1, 2, 4, 1]
+    
+    def test_invalid_runtime(self):
+        """测试无效运行时"""
+        from deploy_context.infrastructure.builder import PipelineSettings
+        with pytest.raises(ValueError):
+            PipelineSettings(runtime="tensorrt")
+
+
+class TestMjpegCapture:
+    """测试 MJPEG 压缩帧与降采样解码"""
+    
+    def _jpeg(self, width=1280, height=720):
+        import cv2
+        import numpy as np
+        image = np.zeros((height, width, 3), dtype=np.uint8)
+        image[:, width // 2:] = 200
+        ok, data = cv2.imencode(".jpg", image)
+        assert ok
+        return data.reshape(-1)
+    
+    def test_select_decode_scale(self):
+        """测试按模型输入尺寸选择解码倍数"""
+        from deploy_context.infrastructure.device import select_decode_scale
+        assert select_decode_scale((1280, 720), 640) == 2
+        assert select_decode_scale((640, 480), 640) == 1
+        assert select_decode_scale((2560, 1440), 320) == 8
+    
+    def test_reduced_decode(self):
+        """测试降采样解码与缓存"""
+        from deploy_context.infrastructure.device import CompressedFrame
+        frame = CompressedFrame(data=self._jpeg(), frame_size=(1280, 720))
+        half = frame.decode(2)
+        assert half.shape == (360, 640, 3)
+        assert frame.decode(2) is half
+        assert frame.decode_preview().shape == (90, 160)
+        assert frame.shape == (720, 1280, 3)
+        assert frame.decode_full().shape == (720, 1280, 3)
+    
+    def test_decoded_fallback(self):
+        """测试后端输出已解码图像时的退化路径"""
+        import numpy as np
+        from deploy_context.infrastructure.device import CompressedFrame
+        frame = CompressedFrame(image=np.zeros((720, 1280, 3), dtype=np.uint8), frame_size=(1280, 720))
+        assert frame.decode(4).shape == (180, 320, 3)
+        with pytest.raises(ValueError):
+            frame.decode(3)
+    
+    def test_builder_selects_mjpeg_camera(self):
+        """测试 MJPG 配置创建压缩帧相机"""
+        from deploy_context.infrastructure.builder import PipelineBuilder, PipelineSettings
+        from deploy_context.infrastructure.device import MjpegCameraOpencv
+        settings = PipelineSettings.from_profile({"camera": {"format": "MJPG", "decode_scale": "auto"}})
+        camera = PipelineBuilder(config_loader=object()).build_camera(settings)
+        assert isinstance(camera, MjpegCameraOpencv)
+        assert camera.decode_scale == 2
+    
+    def test_auto_decode_scale_follows_overrides(self):
+        """测试 auto 解码倍数按命令行覆盖后的分辨率重新选择"""
+        from deploy_context.infrastructure.builder import PipelineSettings
+        settings = PipelineSettings.from_profile({"camera": {"format": "MJPG", "decode_scale": "auto"}})
+        assert settings.decode_scale == 2
+        assert settings.override(camera_width=2560, camera_height=1440).decode_scale == 4
+        assert settings.override(camera_width=640, camera_height=480).decode_scale == 1
+        fixed = PipelineSettings.from_profile({"camera": {"decode_scale": 2}})
+        assert fixed.override(camera_width=2560, camera_height=1440).decode_scale == 2
+        with pytest.raises(ValueError):
+            PipelineSettings(decode_scale=3)
+    
+    def test_single_worker_crops_full_resolution(self):
+        """测试单工作线程保留压缩帧：推理用降采样图像，裁剪用全分辨率解码"""
+        from unittest.mock import Mock
+        from deploy_context.application.handler import StartRuntimeHandler
+        from deploy_context.infrastructure.builder import PipelineSettings
+        from deploy_context.infrastructure.device import CompressedFrame, MjpegCameraOpencv
+        frames = [CompressedFrame(data=self._jpeg(), frame_size=(1280, 720))]
+        camera = Mock(spec=MjpegCameraOpencv)
+        camera.is_opened.side_effect = lambda: bool(frames)
+        camera.read_compressed.side_effect = lambda: frames.pop(0)
+        from shared_kernel.domain.annotation import Detection, BoundingBox, DetectionSource
+        runtime = Mock()
+        runtime.infer.return_value = [Detection.create(
+            category=WasteCategory.OTHER_WASTE, confidence=0.8,
+            bbox=BoundingBox(x_center=0.5, y_center=0.5, width=0.2, height=0.2),
+            source=DetectionSource.YOLO
+        )]
+        session = Mock()
+        session.process_frame.return_value = None
+        session.current_track = None
+        session.statistics.stable_detections = 0
+        
+        handler = StartRuntimeHandler(config_loader=Mock())
+        handler._settings = PipelineSettings(camera_format="MJPG", decode_scale=2)
+        handler._session = session
+        handler._camera = camera
+        handler._runtime = runtime
+        handler._active_runtime = runtime
+        handler._crop_classifier = Mock()
+        handler._is_running = True
+        handler._process_frames()
+        
+        camera.read.assert_not_called()
+        assert runtime.infer.call_args[0][0].shape == (360, 640, 3)
+        frame = session.process_frame.call_args[0][0]
+        assert (frame.image_width, frame.image_height) == (1280, 720)
+        assert frame.crop_loader().shape == (720, 1280, 3)
+
+
+class TestMjpegPreview:
+    """测试 MJPEG 预览服务"""
+    
+    def _detection(self):
+        from shared_kernel.domain.annotation import Detection, BoundingBox, DetectionSource
+        return Detection.create(
+            category=WasteCategory.OTHER_WASTE, confidence=0.8,
+            bbox=BoundingBox(x_center=0.5, y_center=0.5, width=0.2, height=0.2),
+            source=DetectionSource.YOLO
+        )
+    
+    def test_no_subscribers_no_encoding(self):
+        """测试无订阅者时不标注不编码"""
+        import time
+        import numpy as np
+        from deploy_context.infrastructure.preview import MjpegPreviewServer, PreviewFrame
+        server = MjpegPreviewServer(host="127.0.0.1", port=0, max_fps=50)
+        server.start()
+        try:
+            for _ in range(10):
+                server.offer(PreviewFrame(frame=np.zeros((72, 128, 3), dtype=np.uint8)))
+            time.sleep(0.1)
+            assert server.has_subscribers is False
+            assert server.frames_encoded == 0
+        finally:
+            server.stop()
+    
+    def test_stream_annotated_frames(self):
+        """测试订阅后推送标注帧且不修改原始帧"""
+        import http.client
+        import time
+        import cv2
+        import numpy as np
+        from deploy_context.infrastructure.preview import MjpegPreviewServer, PreviewFrame
+        server = MjpegPreviewServer(host="127.0.0.1", port=0, max_fps=50)
+        server.start()
+        frame = np.zeros((72, 128, 3), dtype=np.uint8)
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+            connection.request("GET", "/stream")
+            response = connection.getresponse()
+            assert response.status == 200
+            assert "multipart/x-mixed-replace" in response.getheader("Content-Type")
+            
+            deadline = time.time() + 5
+            while not server.has_subscribers and time.time() < deadline:
+                time.sleep(0.01)
+            server.offer(PreviewFrame(frame=frame, detections=[self._detection()],
+                                      track_id=3, track_state="stable"))
+            
+            assert response.readline().strip() == b"--frame"
+            headers = {}
+            while True:
+                line = response.readline().strip()
+                if not line:
+                    break
+                key, value = line.decode().split(": ", 1)
+                headers[key] = value
+            jpeg = response.read(int(headers["Content-Length"]))
+            image = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+            assert image.shape == (72, 128, 3)
+            assert image.max() > 0
+            assert frame.max() == 0
+            response.close()
+            connection.close()
+            
+            deadline = time.time() + 5
+            while server.has_subscribers and time.time() < deadline:
+                server.offer(PreviewFrame(frame=frame))
+                time.sleep(0.05)
+            assert server.subscriber_count == 0
+        finally:
+            server.stop()
+    
+    def test_session_track_ids(self):
+        """测试会话为跟踪对象分配编号"""
+        session = SortingSession.create(class_mapping={0: 1})
+        session.initialize(640, 480)
+        session.start()
+        session.process_frame(DetectionFrame(
+            frame_id="1", image_width=640, image_height=480,
+            detected_category=WasteCategory.KITCHEN_WASTE, confidence=0.9,
+            x_normalized=0.5, y_normalized=0.5
+        ))
+        assert session.current_track.track_id == 1
+        session.process_frame(DetectionFrame(frame_id="2", image_width=640, image_height=480))
+        assert session.current_track is None
+
+
+class TestShadowRunner:
+    """测试影子模型评估"""
+    
+    def _detection(self, category, x=0.5):
+        from shared_kernel.domain.annotation import BoundingBox, DetectionSource, Detection
+        return Detection.create(
+            category=category, confidence=0.8,
+            bbox=BoundingBox(x_center=x, y_center=0.5, width=0.2, height=0.2),
+            source=DetectionSource.YOLO
+        )
+    
+    def test_disagreement_stats(self):
+        """测试分歧统计与混淆表"""
+        import numpy as np
+        from unittest.mock import Mock
+        from deploy_context.infrastructure.shadow import ShadowRunner
+        candidate = Mock()
+        runner = ShadowRunner(candidate)
+        image = np.zeros((8, 8, 3), dtype=np.uint8)
+        cases = [
+            ([], []),
+            ([self._detection(WasteCategory.OTHER_WASTE)], [self._detection(WasteCategory.OTHER_WASTE)]),
+            ([self._detection(WasteCategory.OTHER_WASTE)], [self._detection(WasteCategory.KITCHEN_WASTE, x=0.6)]),
+            ([self._detection(WasteCategory.OTHER_WASTE)], []),
+            ([], [self._detection(WasteCategory.KITCHEN_WASTE)]),
+        ]
+        for primary, output in cases:
+            candidate.infer.return_value = output
+            runner.evaluate(image, primary)
+        summary = runner.summary()
+        assert summary["evaluated"] == 5
+        assert summary["agree_empty"] == 1
+        assert summary["agree_category"] == 1
+        assert summary["category_mismatch"] == 1
+        assert summary["primary_only"] == 1
+        assert summary["candidate_only"] == 1
+        assert summary["disagreement_rate"] == pytest.approx(0.6)
+        # IoU: 1.0 与 偏移 0.1 的 0.2 框 (0.1*0.2)/(0.08-0.02)=1/3
+        assert summary["mean_iou"] == pytest.approx((1.0 + 1 / 3) / 2, abs=1e-3)
+        assert summary["confusion"]["Other_waste"] == {"Other_waste": 1, "Kitchen_waste": 1, "none": 1}
+        assert summary["inference"]["count"] == 5
+    
+    def test_offer_rate_limited_and_non_blocking(self):
+        """测试抽样限速、忙时丢弃"""
+        import time
+        import numpy as np
+        from unittest.mock import Mock
+        from deploy_context.infrastructure.shadow import ShadowRunner
+        candidate = Mock()
+        candidate.infer.side_effect = lambda image: time.sleep(0.05) or []
+        runner = ShadowRunner(candidate, max_fps=1000.0)
+        runner.start()
+        try:
+            image = np.zeros((8, 8, 3), dtype=np.uint8)
+            start = time.perf_counter()
+            accepted = [runner.offer(image, []) for _ in range(20)]
+            offer_ms = (time.perf_counter() - start) * 1000
+            assert accepted[0] is True
+            assert sum(accepted) == 1
+            assert offer_ms < 20
+            deadline = time.time() + 2.0
+            while runner.stats.evaluated < 1 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            runner.stop()
+        assert runner.stats.offered == 20
+        assert runner.stats.evaluated == 1
+        
+        slow = ShadowRunner(Mock(), max_fps=0.5)
+        assert slow.offer(image, []) is True
+        slow._busy = False
+        assert slow.offer(image, []) is False
+    
+    def test_builder(self):
+        """测试按配置创建影子运行器"""
+        from deploy_context.infrastructure.builder import PipelineSettings, PipelineBuilder
+        settings = PipelineSettings.from_profile({"shadow": {"model_path": "candidate.pt", "max_fps": 1}})
+        runner = PipelineBuilder().build_shadow_runner(settings)
+        assert runner is not None
+        assert PipelineBuilder().build_shadow_runner(PipelineSettings()) is None
+    
+    def test_decision_stats(self):
+        """测试按主路径会话的判定类别统计候选模型的分拣决策"""
+        import numpy as np
+        from unittest.mock import Mock
+        from deploy_context.infrastructure.shadow import ShadowRunner
+        candidate = Mock()
+        runner = ShadowRunner(candidate)
+        image = np.zeros((8, 8, 3), dtype=np.uint8)
+        primary = [self._detection(WasteCategory.OTHER_WASTE)]
+        for decision, output in [
+            (None, [self._detection(WasteCategory.KITCHEN_WASTE)]),
+            (WasteCategory.OTHER_WASTE, [self._detection(WasteCategory.OTHER_WASTE)]),
+            (WasteCategory.OTHER_WASTE, [self._detection(WasteCategory.KITCHEN_WASTE)]),
+            (WasteCategory.OTHER_WASTE, []),
+        ]:
+            candidate.infer.return_value = output
+            runner.evaluate(image, primary, decision)
+        summary = runner.summary()
+        assert summary["evaluated"] == 4
+        assert (summary["decisions"], summary["decision_agree"],
+                summary["decision_mismatch"], summary["decision_missed"]) == (3, 1, 1, 1)
+        assert summary["decision_disagreement_rate"] == pytest.approx(2 / 3, abs=1e-4)
+    
+    def test_readers_do_not_materialize_detections(self):
+        """测试影子比较与预览标注只读列数组，不在其他线程创建 Detection 对象"""
+        import numpy as np
+        from unittest.mock import Mock
+        from deploy_context.domain.model.value_object import DetectionBatch
+        from deploy_context.infrastructure.preview import MjpegPreviewServer, PreviewFrame
+        from deploy_context.infrastructure.shadow import ShadowRunner
+        batch = DetectionBatch(
+            boxes=np.array([[0.5, 0.5, 0.2, 0.2], [0.2, 0.2, 0.1, 0.1]]),
+            scores=np.array([0.9, 0.6]),
+            class_ids=np.array([DetectionBatch.category_index(WasteCategory.OTHER_WASTE), 0]),
+        )
+        candidate = Mock()
+        candidate.infer.return_value = [self._detection(WasteCategory.OTHER_WASTE)]
+        runner = ShadowRunner(candidate)
+        image = np.zeros((72, 128, 3), dtype=np.uint8)
+        runner.evaluate(image, batch, WasteCategory.OTHER_WASTE)
+        MjpegPreviewServer._annotate(image, PreviewFrame(frame=image, detections=batch, track_state="stable"))
+        summary = runner.summary()
+        assert summary["agree_category"] == 1 and summary["decision_agree"] == 1
+        assert summary["mean_iou"] == pytest.approx(1.0)
+        assert image.max() > 0
+        assert batch._detections == [None, None]
+    
+    def test_rknn_reserves_npu_core(self):
+        """测试 RKNN 下影子模型独占最后一个 NPU 核心，主路径工作线程不使用该核心"""
+        from deploy_context.infrastructure.builder import PipelineSettings, PipelineBuilder
+        profile = {"npu": {"enabled": True, "cores": 3}, "inference": {"runtime": "rknn"}}
+        assert PipelineSettings.from_profile(profile).workers == 3
+        settings = PipelineSettings.from_profile(profile).override(shadow_model="candidate.rknn")
+        assert settings.workers == 2
+        builder = PipelineBuilder(config_loader=object())
+        worker_masks = {runtime._core_mask for runtime in builder.build_runtimes(settings)}
+        shadow_mask = builder.build_shadow_runner(settings).runtime._core_mask
+        assert worker_masks == {1, 2} and shadow_mask == 4
+        with pytest.raises(ValueError):
+            PipelineSettings(runtime="rknn", npu_cores=1, shadow_model="candidate.rknn")
+
+
+class TestBackendSelector:
+    """测试运行时后端自动选择"""
+    
+    def _factory(self, latencies_s, created):
+        """按候选线程数返回不同延迟的运行时"""
+        import time
+        from unittest.mock import Mock
+        
+        def factory(candidate):
+            created.append(candidate.key)
+            runtime = Mock()
+            runtime.infer.side_effect = lambda image: time.sleep(latencies_s[candidate.threads]) or []
+            return runtime
+        return factory
+    
+    def test_picks_fastest_and_caches(self, tmp_path):
+        """测试选择最快配置并按模型哈希缓存"""
+        from deploy_context.infrastructure.runtime import BackendSelector, BackendCandidate
+        model = tmp_path / "model.onnx"
+        model.write_bytes(b"model-v1")
+        candidates = [BackendCandidate("pytorch", 1), BackendCandidate("pytorch", 2)]
+        selector = BackendSelector(cache_path=str(tmp_path / "cache.json"), warmup_frames=1, timed_frames=3)
+        created = []
+        factory = self._factory({1: 0.02, 2: 0.002}, created)
+        
+        choice = selector.select(str(model), factory, frame_shape=(8, 8, 3), candidates=candidates)
+        assert (choice.runtime, choice.threads) == ("pytorch", 2)
+        assert not choice.from_cache
+        assert set(choice.results) == {"pytorch/t1", "pytorch/t2"}
+        assert created == ["pytorch/t1", "pytorch/t2"]
+        
+        # 缓存命中时不再探测
+        cached = selector.select(str(model), factory, frame_shape=(8, 8, 3), candidates=candidates)
+        assert cached.from_cache and cached.threads == 2
+        assert len(created) == 2
+        
+        # 模型内容变化后重新探测
+        model.write_bytes(b"model-v2")
+        selector.select(str(model), factory, frame_shape=(8, 8, 3), candidates=candidates)
+        assert len(created) == 4
+    
+    def test_onnx_has_single_candidate(self, tmp_path):
+        """测试 .onnx 模型不扫描线程数（torch 线程设置对 ONNX Runtime 会话无效）"""
+        from unittest.mock import patch
+        from deploy_context.infrastructure.runtime import BackendSelector, BackendCandidate
+        selector = BackendSelector(cache_path=str(tmp_path / "cache.json"))
+        with patch("deploy_context.infrastructure.runtime.backend_selector._module_available",
+                   return_value=True):
+            assert selector.candidates("model.onnx") == [BackendCandidate("onnx")]
+            assert {c.runtime for c in selector.candidates("model.pt")} == {"pytorch"}
+    
+    def test_failed_candidate_skipped(self, tmp_path):
+        """测试加载失败的候选被跳过"""
+        from unittest.mock import Mock
+        from deploy_context.infrastructure.runtime import BackendSelector, BackendCandidate
+        model = tmp_path / "model.rknn"
+        model.write_bytes(b"npu")
+        broken = Mock()
+        broken.load_model.side_effect = RuntimeError("rknn-toolkit not installed")
+        working = Mock()
+        working.infer.return_value = []
+        runtimes = {"rknn": broken, "pytorch": working}
+        selector = BackendSelector(cache_path=str(tmp_path / "cache.json"), timed_frames=1)
+        choice = selector.select(
+            str(model), lambda c: runtimes[c.runtime], frame_shape=(8, 8, 3),
+            candidates=[BackendCandidate("rknn"), BackendCandidate("pytorch")]
+        )
+        assert choice.runtime == "pytorch"
+        assert choice.results["rknn"] == -1.0
+        broken.unload.assert_called_once()
+    
+    def test_resolve_backend(self, tmp_path):
+        """测试 auto 解析为具体运行时与线程数"""
+        from unittest.mock import Mock
+        from deploy_context.infrastructure.builder import PipelineSettings, PipelineBuilder
+        from deploy_context.infrastructure.runtime import BackendChoice
+        builder = PipelineBuilder()
+        settings = PipelineSettings(runtime="pytorch")
+        assert builder.resolve_backend(settings, "model.pt") == (settings, None)
+        
+        selector = Mock()
+        selector.select.return_value = BackendChoice(runtime="pytorch", threads=4, latency_ms=12.0)
+        resolved, choice = builder.resolve_backend(
+            PipelineSettings(runtime="auto"), "model.pt", selector=selector
+        )
+        assert (resolved.runtime, resolved.threads) == ("pytorch", 4)
+        assert builder.build_runtimes(resolved)[0]._num_threads == 4
+        with pytest.raises(ValueError):
+            PipelineSettings(runtime="tensorrt")
+
+
+class TestStageScheduling:
+    """测试阶段调度参数"""
+    
+    def test_from_dict(self):
+        """测试从配置条目创建"""
+        from deploy_context.infrastructure.scheduling import StageScheduling
+        scheduling = StageScheduling.from_dict({"cpus": [4, 5], "policy": "FIFO", "priority": 10})
+        assert scheduling.cpus == (4, 5)
+        assert scheduling.policy == "fifo"
+    
+    def test_invalid_values(self):
+        """测试无效参数"""
+        from deploy_context.infrastructure.scheduling import StageScheduling
+        with pytest.raises(ValueError):
+            StageScheduling(policy="fifo", priority=0)
+        with pytest.raises(ValueError):
+            StageScheduling(nice=30)
+        with pytest.raises(ValueError):
+            StageScheduling(policy="deadline")
+    
+    @pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="Linux only")
+    def test_apply_affinity_to_current_thread(self):
+        """测试在当前线程应用 CPU 亲和性"""
+        import threading
+        from deploy_context.infrastructure.scheduling import StageScheduling, apply_stage_scheduling
+        cpu = min(os.sched_getaffinity(0))
+        result = {}
+        
+        def stage():
+            result["applied"] = apply_stage_scheduling("capture", StageScheduling(cpus=(cpu,)))
+            result["affinity"] = os.sched_getaffinity(0)
+        
+        thread = threading.Thread(target=stage)
+        thread.start()
+        thread.join()
+        assert result["applied"] is True
+        assert result["affinity"] == {cpu}
+    
+    def test_every_stage_thread_scheduled(self, monkeypatch):
+        """测试同一阶段的每个线程都应用调度参数，并按线程名上报"""
+        import threading
+        from unittest.mock import Mock
+        from deploy_context.application.handler import start_runtime_handler
+        from deploy_context.application.handler.start_runtime_handler import StartRuntimeHandler
+        from deploy_context.infrastructure.builder import PipelineSettings
+        from deploy_context.infrastructure.scheduling import StageScheduling
+        applied = []
+        monkeypatch.setattr(
+            start_runtime_handler, "apply_stage_scheduling",
+            lambda name, scheduling: applied.append(name) or name != "inference-2"
+        )
+        handler = StartRuntimeHandler(config_loader=Mock())
+        handler._settings = PipelineSettings(
+            stage_scheduling={"inference": StageScheduling(cpus=(0,)), "serial": StageScheduling(nice=5)}
+        )
+        threads = [threading.Thread(target=handler._enter_stage, args=("inference",), name=f"inference-{i}")
+                   for i in range(3)]
+        threads += [threading.Thread(target=handler._enter_stage, args=("serial",), name=f"serial-{lane}")
+                    for lane in ("left", "right")]
+        threads.append(threading.Thread(target=handler._enter_stage, args=("decision",), name="decision"))
+        for thread in threads:
+            thread.start()
+            thread.join()
+        
+        assert sorted(applied) == ["inference-0", "inference-1", "inference-2", "serial-left", "serial-right"]
+        assert handler.get_status().pinned_stages == {
+            "inference-0": True, "inference-1": True, "inference-2": False,
+            "serial-left": True, "serial-right": True,
+        }
+    
+    def test_unknown_stage_rejected(self):
+        """测试未知阶段名"""
+        from deploy_context.infrastructure.builder import PipelineSettings
+        with pytest.raises(ValueError):
+            PipelineSettings.from_profile({"scheduling": {"stages": {"display": {"cpus": [0]}}}})
+
+
+class TestLatencyStats:
+    """测试阶段延迟统计"""
+    
+    def test_summary(self):
+        """测试分位数与抖动"""
+        from deploy_context.infrastructure.metrics import LatencyStats
+        stats = LatencyStats(window_size=100)
+        for value in range(1, 101):
+            stats.add(float(value))
+        summary = stats.summary()
+        assert summary["count"] == 100
+        assert summary["p50_ms"] == pytest.approx(50.5)
+        assert summary["max_ms"] == 100.0
+        assert summary["jitter_ms"] == pytest.approx(summary["p99_ms"] - summary["p50_ms"], abs=1e-3)
+    
+    def test_empty_summary(self):
+        """测试空窗口"""
+        from deploy_context.infrastructure.metrics import LatencyStats
+        assert LatencyStats().summary() == {"count": 0}
+    
+    def test_end_to_end_includes_capture(self):
+        """测试端到端延迟从采集算起，延迟预算调控看到的是完整管线延迟"""
+        import time
+        import numpy as np
+        from unittest.mock import Mock
+        from deploy_context.application.handler import StartRuntimeHandler
+        frames = [np.zeros((72, 128, 3), dtype=np.uint8) for _ in range(3)]
+        
+        def read():
+            time.sleep(0.03)
+            return frames.pop(0)
+        runtime = Mock()
+        runtime.infer.return_value = []
+        handler = StartRuntimeHandler(config_loader=Mock())
+        handler._session = SortingSession.create()
+        handler._session.initialize(128, 72)
+        handler._session.start()
+        handler._camera = Mock()
+        handler._camera.is_opened.side_effect = lambda: bool(frames)
+        handler._camera.read.side_effect = read
+        handler._runtime = runtime
+        handler._active_runtime = runtime
+        handler._governor = Mock()
+        handler._governor.floor = 0
+        handler._governor.observe.return_value = None
+        handler._is_running = True
+        handler._process_frames()
+        
+        end_to_end = handler._stage_stats["end_to_end"].summary()
+        assert end_to_end["count"] == 3
+        assert end_to_end["p50_ms"] >= handler._stage_stats["capture"].summary()["p50_ms"] >= 30.0
+        assert all(call.args[0] >= 30.0 for call in handler._governor.observe.call_args_list)
+    
+    def test_output_latency_includes_serial_queue_wait(self):
+        """测试输出延迟从采集算到串口写入完成，会话补偿使用决策之后的排队与写入时长"""
+        import queue
+        import time
+        from unittest.mock import Mock
+        from deploy_context.application.handler import StartRuntimeHandler
+        handler = StartRuntimeHandler(config_loader=Mock())
+        handler._session = Mock()
+        handler._serial = Mock()
+        handler._serial_queue = queue.Queue()
+        captured = time.perf_counter() - 0.05
+        handler._send_packet("packet", captured)
+        time.sleep(0.03)
+        packet, item_captured, decided = handler._serial_queue.get_nowait()
+        assert packet == "packet" and item_captured == captured
+        handler._write_packet(handler._serial, packet, item_captured, decided)
+        
+        handler._serial.write_packet.assert_called_once_with("packet")
+        assert handler._stage_stats["output"].summary()["max_ms"] >= 80.0
+        # 滑动平均首个样本为 0.2 倍实测值：决策后等待了 30ms 以上
+        output_latency = handler._session.set_output_latency.call_args[0][0]
+        assert 0.2 * 30.0 <= output_latency < 0.2 * 80.0
+    
+    def test_concurrent_writers(self):
+        """测试多个推理工作线程同时写入时计数不丢失"""
+        import threading
+        from deploy_context.infrastructure.metrics import LatencyStats
+        stats = LatencyStats(window_size=64)
+        
+        def writer():
+            for _ in range(20000):
+                stats.add(1.0)
+        
+        threads = [threading.Thread(target=writer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for _ in range(50):
+            stats.summary()
+        for thread in threads:
+            thread.join()
+        assert stats.count == 80000
+        assert stats.summary()["p50_ms"] == 1.0
+
+
+class TestLaneRouting:
+    """测试多通道路由"""
+    
+    _LEFT = ((0.0, 0.0), (0.5, 0.0), (0.5, 1.0), (0.0, 1.0))
+    _TRIANGLE = ((0.5, 0.0), (1.0, 0.0), (1.0, 1.0))
+    
+    def _detection(self, x, y):
+        from unittest.mock import Mock
+        from shared_kernel.domain.annotation import BoundingBox
+        return Mock(bounding_box=BoundingBox(x_center=x, y_center=y, width=0.1, height=0.1))
+    
+    def test_polygon_contains(self):
+        """测试多边形包含判断（边界视为在内）"""
+        from deploy_context.domain.model.value_object import LaneDefinition
+        lane = LaneDefinition("right", self._TRIANGLE)
+        assert lane.contains(0.9, 0.2) is True
+        assert lane.contains(0.6, 0.9) is False
+        assert lane.contains(0.75, 0.5) is True
+        assert lane.bounds == (0.5, 0.0, 1.0, 1.0)
+        with pytest.raises(ValueError):
+            LaneDefinition("bad", ((0.0, 0.0), (1.0, 1.0)))
+        with pytest.raises(ValueError):
+            LaneDefinition("bad", ((0.0, 0.0), (1.5, 0.0), (1.0, 1.0)))
+    
+    def test_router_drops_unrouted(self):
+        """测试检测按中心分配到首个匹配通道，不在任何通道内的丢弃"""
+        from deploy_context.domain.model.value_object import LaneDefinition
+        from deploy_context.domain.service import LaneRouter
+        router = LaneRouter([LaneDefinition("left", self._LEFT), LaneDefinition("right", self._TRIANGLE)])
+        left, right, outside = self._detection(0.2, 0.5), self._detection(0.9, 0.1), self._detection(0.6, 0.9)
+        assert router.route([outside, right, left]) == [[left], [right]]
+        assert router.lane_index(0.5, 0.5) == 0
+    
+    def test_duplicate_names_rejected(self):
+        """测试通道名必须唯一"""
+        from deploy_context.domain.model.value_object import LaneDefinition
+        from deploy_context.domain.service import LaneRouter
+        from deploy_context.infrastructure.builder import PipelineSettings
+        lanes = (LaneDefinition("a", self._LEFT), LaneDefinition("a", self._TRIANGLE))
+        with pytest.raises(ValueError):
+            LaneRouter(lanes)
+        with pytest.raises(ValueError):
+            PipelineSettings(lanes=lanes)
+    
+    def test_lanes_from_profile(self):
+        """测试从配置读取通道"""
+        from deploy_context.infrastructure.builder import PipelineSettings
+        settings = PipelineSettings.from_profile({"lanes": [
+            {"name": "left", "roi": [[0, 0], [0.5, 0], [0.5, 1], [0, 1]], "serial_port": "/dev/ttyS3"},
+            {"name": "right", "roi": [[0.5, 0], [1, 0], [1, 1]], "serial_baudrate": 115200},
+        ]})
+        assert [lane.name for lane in settings.lanes] == ["left", "right"]
+        assert settings.lanes[0].serial_port == "/dev/ttyS3"
+        assert settings.lanes[1].serial_port is None
+        assert settings.lanes[1].serial_baudrate == 115200
+        assert PipelineSettings.from_profile({}).lanes == ()
+
+
+class TestHardExampleCapture:
+    """测试难例采集"""
+    
+    def _detection(self, category, confidence=0.9, x=0.5):
+        from shared_kernel.domain.annotation import BoundingBox, DetectionSource, Detection
+        return Detection.create(
+            category=category, confidence=confidence,
+            bbox=BoundingBox(x_center=x, y_center=0.5, width=0.2, height=0.2),
+            source=DetectionSource.YOLO
+        )
+    
+    def test_sampler_reasons(self):
+        """测试置信度区间、类别翻转与跟踪断裂"""
+        from deploy_context.domain.service import HardExampleSampler
+        sampler = HardExampleSampler()
+        assert sampler.reasons([self._detection(WasteCategory.OTHER_WASTE)], track_id=1) == ()
+        assert sampler.reasons([self._detection(WasteCategory.OTHER_WASTE, 0.4)], track_id=1) == ("low_confidence",)
+        assert sampler.reasons([self._detection(WasteCategory.KITCHEN_WASTE, x=0.55)], track_id=2) == ("category_flip",)
+        assert sampler.reasons([self._detection(WasteCategory.KITCHEN_WASTE, x=0.6)], track_id=3) == ("track_break",)
+        # 远处的另一个物体不算翻转
+        assert sampler.reasons([self._detection(WasteCategory.OTHER_WASTE, x=0.9)], track_id=4) == ()
+        assert sampler.reasons([]) == ()
+        assert sampler.reasons([self._detection(WasteCategory.KITCHEN_WASTE, x=0.9)], track_id=5) == ()
+    
+    def test_policy_validation(self):
+        """测试策略参数校验"""
+        from deploy_context.domain.model.value_object import HardExamplePolicy
+        with pytest.raises(ValueError):
+            HardExamplePolicy(confidence_low=0.6, confidence_high=0.5)
+        with pytest.raises(ValueError):
+            HardExamplePolicy(max_per_minute=0)
+        assert HardExamplePolicy(max_per_minute=120).min_interval_s == 0.5
+    
+    def test_writer_writes_image_and_detections(self, tmp_path):
+        """测试写入 JPEG 与检测结果"""
+        import json
+        import time
+        import numpy as np
+        from deploy_context.infrastructure.recorder import HardExampleWriter
+        writer = HardExampleWriter(str(tmp_path))
+        writer.start()
+        try:
+            detections = [self._detection(WasteCategory.OTHER_WASTE, 0.4)]
+            assert writer.offer(np.zeros((48, 64, 3), dtype=np.uint8), detections, ("low_confidence",), 7)
+            deadline = time.time() + 5.0
+            while writer.stats.written == 0 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            writer.stop()
+        meta_files = list(tmp_path.glob("*.json"))
+        assert len(meta_files) == 1
+        meta = json.loads(meta_files[0].read_text(encoding="utf-8"))
+        assert meta["frame_seq"] == 7
+        assert meta["image_size"] == [64, 48]
+        assert meta["reasons"] == ["low_confidence"]
+        assert meta["detections"][0]["category"] == "Other_waste"
+        assert meta_files[0].with_suffix(".jpg").stat().st_size > 0
+        assert writer.stats.reasons == {"low_confidence": 1}
+    
+    def test_writer_drops_instead_of_blocking(self, tmp_path):
+        """测试超频、积压与超配额时丢弃"""
+        import numpy as np
+        from deploy_context.domain.model.value_object import HardExamplePolicy
+        from deploy_context.infrastructure.recorder import HardExampleWriter
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        # 未启动写入线程：队列满后丢弃
+        writer = HardExampleWriter(str(tmp_path), HardExamplePolicy(max_per_minute=1e9, queue_size=2))
+        results = [writer.offer(frame, [], ("low_confidence",)) for _ in range(5)]
+        assert results == [True, True, False, False, False]
+        assert writer.stats.dropped_busy == 3
+        # 频率上限
+        writer = HardExampleWriter(str(tmp_path), HardExamplePolicy(max_per_minute=1))
+        assert writer.offer(frame, [], ("low_confidence",)) is True
+        assert writer.offer(frame, [], ("low_confidence",)) is False
+        assert writer.stats.dropped_rate == 1
+        # 已有文件占满配额
+        (tmp_path / "old.jpg").write_bytes(b"x" * 2048)
+        writer = HardExampleWriter(str(tmp_path), HardExamplePolicy(quota_mb=1 / 1024))
+        writer.start()
+        writer.stop()
+        assert writer.offer(frame, [], ("low_confidence",)) is False
+        assert writer.stats.dropped_quota == 1
+    
+    def test_settings_from_profile(self):
+        """测试从配置读取难例采集参数"""
+        from deploy_context.infrastructure.builder import PipelineSettings, PipelineBuilder
+        settings = PipelineSettings.from_profile({"hard_examples": {
+            "output_dir": "/tmp/hard", "confidence_low": 0.2, "max_per_minute": 10, "track_break": False
+        }})
+        assert settings.hard_example_dir == "/tmp/hard"
+        assert settings.hard_example_policy.confidence_low == 0.2
+        assert settings.hard_example_policy.capture_track_break is False
+        assert PipelineBuilder(config_loader=object()).build_hard_example_writer(settings) is not None
+        assert PipelineBuilder(config_loader=object()).build_hard_example_writer(PipelineSettings()) is None
+
+
+class TestDetectionBatch:
+    """测试列式检测批"""
+    
+    def _batch(self):
+        import numpy as np
+        from deploy_context.domain.model.value_object import DetectionBatch
+        return DetectionBatch(
+            boxes=np.array([[0.2, 0.5, 0.1, 0.1], [0.7, 0.5, 0.2, 0.2], [0.9, 0.1, 0.1, 0.1]]),
+            scores=np.array([0.9, 0.6, 0.4]),
+            class_ids=np.array([0, 3, 1]),
+        )
+    
+    def test_above_threshold(self):
+        """测试按置信度过滤，全部满足时不复制"""
+        batch = self._batch()
+        assert batch.above(0.4) is batch
+        assert batch.above(0.5).scores.tolist() == [0.9, 0.6]
+        assert not batch.above(0.95)
+    
+    def test_columns_without_objects(self):
+        """测试按列读取不创建 Detection，按下标读取时惰性创建并缓存"""
+        batch = self._batch()
+        assert len(batch) == 3
+        assert batch.category(1) == WasteCategory.OTHER_WASTE
+        assert batch.score(0) == 0.9
+        assert batch.box(1) == (0.7, 0.5, 0.2, 0.2)
+        assert batch._detections == [None, None, None]
+        first = batch[0]
+        assert first.category == WasteCategory.KITCHEN_WASTE
+        assert first.confidence.value == 0.9
+        assert batch[0] is first
+        assert batch._detections[1:] == [None, None]
+        assert [d.category for d in batch[1:]] == [WasteCategory.OTHER_WASTE, WasteCategory.RECYCLABLE_WASTE]
+    
+    def test_from_detections_round_trip(self):
+        """测试由 Detection 列表创建时保留原对象"""
+        from deploy_context.domain.model.value_object import DetectionBatch
+        detections = list(self._batch())
+        batch = DetectionBatch.from_detections(detections)
+        assert batch[2] is detections[2]
+        assert batch.class_ids.tolist() == [0, 3, 1]
+        assert DetectionBatch.coerce(batch) is batch
+        assert not DetectionBatch.from_detections([])
+        sub = batch.take([2, 0])
+        assert sub[0] is detections[2]
+        assert sub.scores.tolist() == [0.4, 0.9]
+    
+    def test_validation(self):
+        """测试列长度与分类序号校验"""
+        import numpy as np
+        from deploy_context.domain.model.value_object import DetectionBatch
+        with pytest.raises(ValueError):
+            DetectionBatch(np.zeros((2, 4)), np.zeros(1), np.zeros(2))
+        with pytest.raises(ValueError):
+            DetectionBatch(np.zeros((1, 4)), np.zeros(1), np.array([len(WasteCategory)]))
+        mapped = DetectionBatch.map_class_ids(
+            np.array([0, 5, -1, 2]), {0: WasteCategory.OTHER_WASTE, 2: WasteCategory.KITCHEN_WASTE}
+        )
+        assert mapped.tolist() == [3, -1, -1, 0]
+    
+    def test_rknn_postprocess_vectorized(self):
+        """测试 RKNN 后处理按列过滤与换算"""
+        import numpy as np
+        from deploy_context.infrastructure.runtime import RknnRuntime
+        runtime = RknnRuntime(confidence_threshold=0.5)
+        output = np.array([[[64, 128, 128, 64, 0.9, 1],
+                            [0, 0, 64, 64, 0.3, 0],      # 低于阈值
+                            [600, 600, 100, 100, 0.8, 2],
+                            [10, 10, 10, 10, 0.95, 7]]], dtype=np.float32)  # 未映射类别
+        batch = runtime._postprocess([output], (480, 640, 3))
+        assert batch.class_ids.tolist() == [1, 2]
+        assert batch.scores.tolist() == pytest.approx([0.9, 0.8])
+        assert batch.box(0) == pytest.approx((128 / 640, 160 / 640, 0.2, 0.1))
+        # 超出画面的框截断到 [0, 1]
+        assert batch.box(1) == pytest.approx((1.0, 1.0, 100 / 640, 100 / 640))
+        assert batch[1].bounding_box.x_center == 1.0
+        assert not runtime._postprocess([np.zeros((1, 0, 6), dtype=np.float32)], (480, 640, 3))
+    
+    def test_lane_routing_matches_objects(self):
+        """测试检测批按列路由与逐个 Detection 路由结果一致"""
+        import random
+        import numpy as np
+        from deploy_context.domain.model.value_object import DetectionBatch, LaneDefinition
+        from deploy_context.domain.service import LaneRouter
+        lanes = [
+            LaneDefinition("left", ((0.0, 0.0), (0.5, 0.0), (0.5, 1.0), (0.0, 1.0))),
+            LaneDefinition("wedge", ((0.5, 0.0), (1.0, 0.0), (1.0, 1.0))),
+        ]
+        router = LaneRouter(lanes)
+        rng = random.Random(41)
+        points = [(rng.choice([0.0, 0.5, 0.75, 1.0, rng.random()]), rng.choice([0.0, 0.5, 1.0, rng.random()]))
+                  for _ in range(400)]
+        batch = DetectionBatch(
+            boxes=np.array([(x, y, 0.0, 0.0) for x, y in points]),
+            scores=np.full(len(points), 0.9),
+            class_ids=np.zeros(len(points)),
+        )
+        for lane in lanes:
+            assert lane.contains_points(batch.boxes[:, 0], batch.boxes[:, 1]).tolist() == [
+                lane.contains(x, y) for x, y in points
+            ]
+        routed = router.route(batch)
+        expected = router.route(list(batch))
+        for lane_batch, lane_objects in zip(routed, expected):
+            assert [lane_batch.box(i)[:2] for i in range(len(lane_batch))] == [
+                (d.bounding_box.x_center, d.bounding_box.y_center) for d in lane_objects
+            ]
+    
+    def test_encode_detection(self):
+        """测试直接按列编码串口数据包"""
+        encoder = PacketEncoder()
+        encoder.load_protocol_mapping("default")
+        batch = self._batch()
+        assert encoder.encode_detection(batch, 1) == encoder.encode(3, 0.7, 0.5)
+
+
+
+class TestResourceSampler:
+    """测试系统资源采样"""
+    
+    def _write_proc(self, root, utime, stime, rss_kb, cores, npu=None):
+        """在临时目录中伪造 /proc 与 rknpu 负载文件（cores 为各核 (user, idle) 滴答）"""
+        proc = root / "proc" / "self"
+        proc.mkdir(parents=True, exist_ok=True)
+        fields = ["S"] + ["0"] * 10 + [str(utime), str(stime)] + ["0"] * 10
+        (proc / "stat").write_text(f"1234 (deploy (main)) {' '.join(fields)}\n")
+        (proc / "status").write_text(f"Name:\tpython\nVmRSS:\t  {rss_kb} kB\nThreads:\t8\n")
+        lines = ["cpu  0 0 0 0 0 0 0 0 0 0"]
+        lines += [f"cpu{i} {user} 0 0 {idle} 0 0 0 0 0 0" for i, (user, idle) in enumerate(cores)]
+        (root / "proc" / "stat").write_text("\n".join(lines + ["intr 0"]) + "\n")
+        if npu is not None:
+            path = root / "sys/kernel/debug/rknpu"
+            path.mkdir(parents=True, exist_ok=True)
+            (path / "load").write_text(npu)
+    
+    def test_reader(self, tmp_path):
+        """测试读取伪造的 /proc 与 NPU 负载"""
+        from deploy_context.infrastructure.metrics import ProcResourceReader, DEFAULT_NPU_LOAD_PATH
+        self._write_proc(tmp_path, 30, 12, 204800, [(10, 90), (50, 50)],
+                         npu="NPU load:  Core0: 35%, Core1:  0%, Core2: 12%,\n")
+        reader = ProcResourceReader(str(tmp_path), DEFAULT_NPU_LOAD_PATH)
+        assert reader.process_cpu_ticks() == 42
+        assert reader.rss_kb() == 204800
+        assert reader.core_ticks() == [(10, 100), (50, 100)]
+        assert reader.npu_load() == [35.0, 0.0, 12.0]
+        # 未配置或无法读取时为空
+        assert ProcResourceReader(str(tmp_path)).npu_load() == []
+        missing = ProcResourceReader(str(tmp_path / "missing"), DEFAULT_NPU_LOAD_PATH)
+        assert missing.process_cpu_ticks() is None
+        assert missing.rss_kb() is None
+        assert missing.core_ticks() == [] and missing.npu_load() == []
+    
+    def test_sampler_rates(self, tmp_path):
+        """测试比率类指标取相邻两次采样的差值"""
+        from deploy_context.infrastructure.metrics import ProcResourceReader, ResourceSampler
+        from deploy_context.infrastructure.metrics import resource_sampler
+        frames = {"count": 0}
+        sampler = ResourceSampler(
+            ProcResourceReader(str(tmp_path), "/sys/kernel/debug/rknpu/load"),
+            frame_counter=lambda: frames["count"],
+        )
+        ticks = resource_sampler._CLOCK_TICKS
+        self._write_proc(tmp_path, 0, 0, 1024, [(0, 0), (0, 0)], npu="NPU load:  20%\n")
+        first = sampler.sample(now=10.0)
+        assert first.process_cpu_percent is None and first.camera_fps is None
+        assert first.core_load_percent == [] and first.rss_mb == 1.0
+        assert first.npu_load_percent == [20.0]
+        
+        # 2 秒内进程用了 1.5 个 CPU 秒，核 0 忙 25%，核 1 无变化；采集 60 帧
+        self._write_proc(tmp_path, ticks, ticks // 2, 2048, [(25, 75), (0, 0)], npu="NPU load:  80%\n")
+        frames["count"] = 60
+        second = sampler.sample(now=12.0)
+        assert second.process_cpu_percent == pytest.approx(75.0)
+        assert second.core_load_percent == [25.0, 0.0]
+        assert second.camera_fps == 30.0
+        assert second.rss_mb == 2.0 and second.npu_load_percent == [80.0]
+        assert sampler.latest is second
+        assert set(second.to_dict()) == {
+            "process_cpu_percent", "rss_mb", "core_load_percent", "npu_load_percent", "camera_fps"
+        }
+    
+    def test_profile_section(self):
+        """测试配置文件中的资源采样参数"""
+        from deploy_context.infrastructure.builder import PipelineSettings, PipelineBuilder
+        settings = PipelineSettings.from_profile({
+            "monitoring": {"interval_s": 2.0, "npu_load_path": "/sys/kernel/debug/rknpu/load"}
+        })
+        assert settings.resource_interval_s == 2.0
+        assert settings.npu_load_path == "/sys/kernel/debug/rknpu/load"
+        assert PipelineBuilder().build_resource_sampler(settings) is not None
+        disabled = PipelineSettings.from_profile({"monitoring": {"enabled": False}})
+        assert PipelineBuilder().build_resource_sampler(disabled) is None
+        with pytest.raises(ValueError):
+            PipelineSettings(resource_interval_s=-1)
+    
+    def test_metrics_endpoint(self):
+        """测试预览服务 /metrics 返回状态 JSON"""
+        import http.client
+        import json
+        from deploy_context.infrastructure.preview import MjpegPreviewServer
+        server = MjpegPreviewServer(host="127.0.0.1", port=0)
+        server.start()
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+            connection.request("GET", "/metrics")
+            assert connection.getresponse().status == 404
+            connection.close()
+            
+            server.set_status_provider(lambda: {"total_frames": 7, "resources": {"rss_mb": 12.5}})
+            connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+            connection.request("GET", "/metrics")
+            response = connection.getresponse()
+            assert response.status == 200
+            assert response.getheader("Content-Type") == "application/json"
+            assert json.loads(response.read()) == {"total_frames": 7, "resources": {"rss_mb": 12.5}}
+            connection.close()
+        finally:
+            server.stop()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
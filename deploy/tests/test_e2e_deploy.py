@@ -20,7 +20,7 @@ from deploy_context.domain.model.aggregate.sorting_session import SortingSession
 from deploy_context.domain.service.stability_judge import StabilityJudge, StabilityReport
 from deploy_context.domain.service.packet_encoder import PacketEncoder
 from shared_kernel.domain.taxonomy import WasteCategory
-from shared_kernel.domain.annotation import BoundingBox, DetectionSource, Detection
+from shared_kernel.domain.annotation import BoundingBox, DetectionSource, Detection, Confidence
 from shared_kernel.domain.mapping import MappingSet
 
 
@@ -173,5 +173,268 @@ class TestDeployEndToEnd:
         assert stats.total_detections == 3
 
 
+class TestLatencyGovernedRuntime:
+    """End-to-end tests for the latency-budget governed processing loop"""
+
+    def test_breached_budget_switches_to_fallback_model(self):
+        """Test the loop steps down the ladder and reports it in status"""
+        import numpy as np
+        from deploy_context.application.handler import StartRuntimeHandler
+        from deploy_context.domain.model.value_object import LatencyBudgetPolicy, DegradationLevel
+        from deploy_context.domain.service import LatencyGovernor
+
+        frames = [np.zeros((72, 128, 3), dtype=np.uint8) for _ in range(4)]
+        camera = Mock()
+        camera.is_opened.side_effect = lambda: bool(frames)
+        camera.read.side_effect = lambda: frames.pop(0)
+        primary, fallback = Mock(), Mock()
+        primary.infer.return_value = []
+        fallback.infer.return_value = []
+
+        handler = StartRuntimeHandler(config_loader=Mock())
+        handler._session = SortingSession.create()
+        handler._session.initialize(128, 72)
+        handler._session.start()
+        handler._camera = camera
+        handler._runtime = primary
+        handler._active_runtime = primary
+        handler._fallback_runtime = fallback
+        handler._governor = LatencyGovernor(LatencyBudgetPolicy(
+            budget_ms=1e-6,
+            window_size=2,
+            levels=(
+                DegradationLevel(input_size=640),
+                DegradationLevel(input_size=320, motion_threshold=0.05, use_fallback_model=True),
+            )
+        ))
+        handler._is_running = True
+
+        handler._process_frames()
+
+        assert primary.infer.call_count == 2
+        # Identical frames after the switch are motion-gated
+        assert fallback.infer.call_count == 1
+        primary.set_input_size.assert_called_with(320)
+        status = handler.get_status()
+        assert status.degradation_level == 1
+        assert status.governor_transitions[0]["reason"] == "budget_exceeded"
+
+
+class TestThermalGovernedRuntime:
+    """End-to-end tests for thermal throttling feeding the latency governor"""
+
+    def test_hot_soc_steps_down_and_recovers(self, tmp_path):
+        """Test a hot fake sysfs lowers input size and cooling restores it"""
+        import numpy as np
+        from deploy_context.application.handler import StartRuntimeHandler
+        from deploy_context.domain.model.value_object import (
+            LatencyBudgetPolicy, DegradationLevel, ThermalPolicy
+        )
+        from deploy_context.domain.service import LatencyGovernor
+        from deploy_context.infrastructure.builder import PipelineSettings
+        from deploy_context.infrastructure.thermal import ThermalMonitor, SysfsThermalReader
+
+        zone = tmp_path / "sys/class/thermal/thermal_zone0"
+        zone.mkdir(parents=True)
+        (zone / "type").write_text("soc-thermal\n")
+
+        def run_frames(count):
+            frames = [np.zeros((72, 128, 3), dtype=np.uint8) for _ in range(count)]
+            handler._camera.is_opened.side_effect = lambda: bool(frames)
+            handler._camera.read.side_effect = lambda: frames.pop(0)
+            handler._is_running = True
+            handler._process_frames()
+
+        runtime = Mock()
+        runtime.infer.return_value = []
+        policy = ThermalPolicy(enabled=True, throttle_start_c=70, step_c=5, interval_step_ms=0)
+        handler = StartRuntimeHandler(config_loader=Mock())
+        handler._settings = PipelineSettings(thermal_policy=policy)
+        handler._session = SortingSession.create()
+        handler._session.initialize(128, 72)
+        handler._session.start()
+        handler._camera = Mock()
+        handler._runtime = runtime
+        handler._active_runtime = runtime
+        handler._governor = LatencyGovernor(LatencyBudgetPolicy(
+            budget_ms=float("inf"),
+            window_size=2,
+            levels=(DegradationLevel(input_size=640), DegradationLevel(input_size=320))
+        ))
+        monitor = ThermalMonitor(
+            policy, handler._governor.policy.max_level, handler._on_thermal_level,
+            reader=SysfsThermalReader(str(tmp_path))
+        )
+        handler._thermal_monitor = monitor
+
+        (zone / "temp").write_text("78000\n")
+        monitor.poll()
+        run_frames(1)
+        runtime.set_input_size.assert_called_with(320)
+        assert handler.get_status().thermal_level == 1
+        assert handler.get_status().governor_transitions[0]["reason"] == "thermal"
+
+        (zone / "temp").write_text("55000\n")
+        monitor.poll()
+        run_frames(2)
+        runtime.set_input_size.assert_called_with(640)
+        assert handler.get_status().degradation_level == 0
+
+
+class TestStagedPipeline:
+    """End-to-end tests for the multi-worker staged pipeline"""
+
+    def test_workers_feed_single_decision_stage(self):
+        """Test frames flow capture -> inference workers -> decision in order"""
+        import time
+        import numpy as np
+        from deploy_context.application.handler import StartRuntimeHandler
+        from deploy_context.infrastructure.builder import PipelineSettings
+
+        frames = [np.zeros((72, 128, 3), dtype=np.uint8) for _ in range(20)]
+        camera = Mock()
+        camera.is_opened.return_value = True
+        camera.read.side_effect = lambda: frames.pop(0) if frames else None
+        runtimes = [Mock(), Mock()]
+        for runtime in runtimes:
+            runtime.infer.return_value = []
+
+        handler = StartRuntimeHandler(config_loader=Mock())
+        handler._settings = PipelineSettings(workers=2, frame_queue_size=20, max_queue_size=20)
+        handler._session = SortingSession.create()
+        handler._session.initialize(128, 72)
+        handler._session.start()
+        handler._camera = camera
+        handler._worker_runtimes = runtimes
+        handler._is_running = True
+
+        handler._start_staged_pipeline()
+        deadline = time.time() + 5.0
+        while time.time() < deadline and handler._session.statistics.total_frames < 20:
+            time.sleep(0.01)
+        handler.stop()
+
+        assert sum(runtime.infer.call_count for runtime in runtimes) == 20
+        # Out-of-order completions may be dropped, never processed twice
+        assert 0 < handler._session.statistics.total_frames <= 20
+        assert handler._last_decided_seq <= 20
+
+
+class TestLaneRouting:
+    """End-to-end tests for several sorting lanes sharing one camera"""
+
+    def test_one_inference_feeds_each_lane(self):
+        """Test one inference per frame produces packets on each lane's own serial"""
+        import numpy as np
+        from deploy_context.application.handler import StartRuntimeHandler
+        from deploy_context.application.handler.start_runtime_handler import SortingLane
+        from deploy_context.domain.model.value_object import LaneDefinition
+        from deploy_context.domain.service import LaneRouter
+        from deploy_context.infrastructure.builder import PipelineSettings
+
+        def detection(category, x):
+            return Detection(
+                detection_id=f"{category.value}-{x}",
+                category=category,
+                confidence=Confidence(0.9),
+                bounding_box=BoundingBox(x_center=x, y_center=0.5, width=0.1, height=0.1),
+                source=DetectionSource.YOLO
+            )
+
+        clock_ticks = iter(datetime(2026, 1, 1) + timedelta(milliseconds=100 * i) for i in range(1000))
+        definitions = (
+            LaneDefinition("left", ((0.0, 0.0), (0.5, 0.0), (0.5, 1.0), (0.0, 1.0)), serial_port="/dev/ttyS3"),
+            LaneDefinition("right", ((0.5, 0.0), (1.0, 0.0), (1.0, 1.0), (0.5, 1.0)), serial_port="/dev/ttyS4"),
+        )
+        handler = StartRuntimeHandler(config_loader=Mock())
+        handler._settings = PipelineSettings(lanes=definitions)
+        for definition in definitions:
+            session = SortingSession.create(
+                class_mapping={0: 1, 1: 2, 2: 3, 3: 4},
+                stability_policy=StabilityPolicy(stability_threshold_ms=0, min_detection_count=2),
+                clock=lambda: next(clock_ticks)
+            )
+            session.initialize(128, 72)
+            session.start()
+            handler._lanes.append(SortingLane(definition, session, serial=Mock()))
+        handler._lane_router = LaneRouter(definitions)
+        handler._session = handler._lanes[0].session
+
+        frames = [np.zeros((72, 128, 3), dtype=np.uint8) for _ in range(3)]
+        runtime = Mock()
+        runtime.infer.return_value = [
+            detection(WasteCategory.KITCHEN_WASTE, 0.25),
+            detection(WasteCategory.RECYCLABLE_WASTE, 0.75),
+        ]
+        handler._camera = Mock()
+        handler._camera.is_opened.side_effect = lambda: bool(frames)
+        handler._camera.read.side_effect = lambda: frames.pop(0)
+        handler._runtime = runtime
+        handler._active_runtime = runtime
+        handler._is_running = True
+        handler._process_frames()
+
+        assert runtime.infer.call_count == 3
+        left, right = handler._lanes
+        left_packet = left.serial.write_packet.call_args[0][0]
+        right_packet = right.serial.write_packet.call_args[0][0]
+        assert left_packet.x < 128 <= right_packet.x
+        assert left_packet.class_id != right_packet.class_id
+
+        status = handler.get_status()
+        assert status.lanes["left"]["serial_packets_sent"] == left.serial.write_packet.call_count
+        assert status.serial_packets_sent == (
+            left.serial.write_packet.call_count + right.serial.write_packet.call_count
+        )
+
+
+
+class TestHardExampleRuntime:
+    """End-to-end tests for hard-example capture below the operating threshold"""
+
+    def test_low_confidence_band_reaches_sampler_not_session(self, tmp_path):
+        """Test the runtime emits the capture band while the session only sees operating detections"""
+        import numpy as np
+        from deploy_context.application.handler import StartRuntimeHandler
+        from deploy_context.domain.service import HardExampleSampler
+        from deploy_context.infrastructure.builder import PipelineBuilder, PipelineSettings
+
+        settings = PipelineSettings(runtime="rknn", hard_example_dir=str(tmp_path))
+        assert PipelineSettings(runtime="rknn").runtime_confidence_threshold(0.5) == 0.5
+        runtime = PipelineBuilder(config_loader=Mock()).build_runtimes(
+            settings, settings.runtime_confidence_threshold(0.5)
+        )[0]
+        # Raw NPU output rows: left-top xywh at 640 scale, score, model class
+        runtime._rknn = Mock()
+        runtime._rknn.inference.side_effect = [
+            [np.array([[[288, 288, 64, 64, 0.9, 0]]], dtype=np.float32)],
+            [np.array([[[288, 288, 64, 64, 0.42, 0]]], dtype=np.float32)],
+            [np.array([[[288, 288, 64, 64, 0.2, 3]]], dtype=np.float32)],
+        ]
+        frames = [np.zeros((72, 128, 3), dtype=np.uint8) for _ in range(3)]
+
+        handler = StartRuntimeHandler(config_loader=Mock())
+        handler._settings = settings
+        handler._confidence_threshold = 0.5
+        handler._session = SortingSession.create()
+        handler._session.initialize(128, 72)
+        handler._session.start()
+        handler._camera = Mock()
+        handler._camera.is_opened.side_effect = lambda: bool(frames)
+        handler._camera.read.side_effect = lambda: frames.pop(0)
+        handler._runtime = runtime
+        handler._active_runtime = runtime
+        handler._hard_example_sampler = HardExampleSampler(settings.hard_example_policy)
+        handler._hard_example_writer = Mock()
+        handler._is_running = True
+        handler._process_frames()
+
+        assert runtime._rknn.inference.call_count == 3
+        handler._hard_example_writer.offer.assert_called_once()
+        _, offered, reasons, frame_seq = handler._hard_example_writer.offer.call_args[0]
+        assert reasons == ("low_confidence",) and frame_seq == 2
+        assert offered.scores.tolist() == pytest.approx([0.42])
+        assert handler._session.statistics.total_detections == 1
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,14 +1,26 @@
 """Utilities"""
 
-from .fs import ensure_dir, read_text_safe, write_text_safe
+from .fs import (
+    ensure_dir, read_text_safe, write_text_safe, fsync_dir, file_digest, iter_files, shard_of,
+    IMAGE_EXTENSIONS
+)
 from .time_utils import timestamp_to_datetime, datetime_to_timestamp
 from .logging_setup import setup_logging
+from .image_meta import probe_image_size, ImageSizeCache, image_size_cache
 
 __all__ = [
     "ensure_dir",
     "read_text_safe",
     "write_text_safe",
+    "fsync_dir",
+    "file_digest",
+    "iter_files",
+    "shard_of",
+    "IMAGE_EXTENSIONS",
     "timestamp_to_datetime",
     "datetime_to_timestamp",
     "setup_logging",
+    "probe_image_size",
+    "ImageSizeCache",
+    "image_size_cache",
 ]
@@ -1,8 +1,13 @@
 """文件系统工具"""
 
+import hashlib
 import os
+import zlib
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, List, Optional
+
+# 默认识别的图片扩展名（小写）
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
 
 
 def ensure_dir(path: Path | str) -> Path:
@@ -34,3 +39,76 @@ def write_text_safe(
         return True
     except (FileNotFoundError, OSError):
         return False
+
+
+def fsync_dir(path: Path | str) -> None:
+    """fsync 目录，使其中文件的创建与重命名落盘（不支持打开目录的平台上跳过）"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def file_digest(path: Path | str, chunk_size: int = 1 << 20) -> str:
+    """文件内容哈希（BLAKE2b-160 十六进制），按块读取，内存占用与文件大小无关"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def shard_of(relative_path: str, shard_count: int) -> int:
+    """相对路径的分片编号（CRC32，跨进程与机器稳定）"""
+    return zlib.crc32(relative_path.replace(os.sep, "/").encode("utf-8")) % shard_count
+
+
+def iter_files(
+    root: Path | str,
+    extensions: Optional[Iterable[str]] = None,
+    recursive: bool = True,
+    shard_index: int = 0,
+    shard_count: int = 1,
+) -> Iterator[str]:
+    """流式遍历目录下的文件，逐个产生绝对路径
+
+    基于 os.scandir 按目录深度优先遍历，不排序、不预先收集，
+    首个文件在扫描到时即可产生，内存占用只与目录深度有关。
+    extensions 为小写扩展名（含点），None 表示不过滤；
+    shard_count > 1 时只产生相对路径落在 shard_index 分片的文件。
+    不跟随目录符号链接，无权限读取的子目录跳过
+    """
+    if shard_count <= 0 or not 0 <= shard_index < shard_count:
+        raise ValueError(f"invalid shard {shard_index}/{shard_count}")
+    suffixes = tuple(e.lower() for e in extensions) if extensions is not None else None
+    root = os.path.abspath(root)
+    prefix = len(root) + 1
+    stack: List[str] = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+                    if suffixes is not None and not entry.name.lower().endswith(suffixes):
+                        continue
+                    if shard_count > 1 and shard_of(entry.path[prefix:], shard_count) != shard_index:
+                        continue
+                    yield entry.path
+        except OSError:
+            if directory == root:
+                raise
@@ -0,0 +1,168 @@
+"""图像元数据工具 - 只读文件头获取 JPEG/PNG 尺寸，并按文件缓存"""
+
+import os
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# 携带图像尺寸的 JPEG 帧头（SOF0-SOF15，排除 DHT/JPG/DAC）
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# 无长度字段的 JPEG 标记（RST0-7、SOI、EOI、TEM）
+_JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xDA)) | {0x01}
+_EXIF_ORIENTATION_TAG = 0x0112
+
+
+def probe_image_size(path: Path | str) -> Optional[Tuple[int, int]]:
+    """只读文件头获取图像尺寸 (width, height)
+
+    支持 PNG 与 JPEG；JPEG 的 EXIF 方向为 5-8（旋转 90°）时交换宽高，
+    与 cv2.imread 按方向旋转后的尺寸一致。无法识别时返回 None
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(len(_PNG_SIGNATURE))
+            if head == _PNG_SIGNATURE:
+                return _probe_png(f)
+            if head[:2] == b"\xff\xd8":
+                f.seek(2)
+                return _probe_jpeg(f)
+    except (OSError, struct.error):
+        return None
+    return None
+
+
+def _probe_png(f: BinaryIO) -> Optional[Tuple[int, int]]:
+    """PNG：签名之后第一个块必须是 IHDR"""
+    length, chunk_type = struct.unpack(">I4s", f.read(8))
+    if chunk_type != b"IHDR" or length < 8:
+        return None
+    width, height = struct.unpack(">II", f.read(8))
+    return (width, height) if width and height else None
+
+
+def _probe_jpeg(f: BinaryIO) -> Optional[Tuple[int, int]]:
+    """JPEG：逐段跳过直到帧头，途中读取 APP1 中的 EXIF 方向"""
+    orientation = 1
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b"\xff":
+            continue
+        marker = f.read(1)
+        while marker == b"\xff":            # 填充字节
+            marker = f.read(1)
+        if not marker:
+            return None
+        code = marker[0]
+        if code in _JPEG_STANDALONE_MARKERS or code == 0x00:
+            continue
+        if code == 0xDA:                    # 扫描数据开始仍未见帧头
+            return None
+        (length,) = struct.unpack(">H", f.read(2))
+        if length < 2:
+            return None
+        if code in _JPEG_SOF_MARKERS:
+            _, height, width = struct.unpack(">BHH", f.read(5))
+            if not width or not height:
+                return None
+            return (height, width) if orientation >= 5 else (width, height)
+        segment = f.read(length - 2)
+        if code == 0xE1 and segment.startswith(b"Exif\x00\x00"):
+            orientation = _exif_orientation(segment[6:]) or orientation
+
+
+def _exif_orientation(tiff: bytes) -> Optional[int]:
+    """从 TIFF 结构的 IFD0 中读取方向标签"""
+    if tiff[:2] == b"II":
+        endian = "<"
+    elif tiff[:2] == b"MM":
+        endian = ">"
+    else:
+        return None
+    try:
+        (offset,) = struct.unpack_from(endian + "I", tiff, 4)
+        (count,) = struct.unpack_from(endian + "H", tiff, offset)
+        for index in range(count):
+            entry = offset + 2 + index * 12
+            tag, _, _, value = struct.unpack_from(endian + "HHIH", tiff, entry)
+            if tag == _EXIF_ORIENTATION_TAG:
+                return value if 1 <= value <= 8 else None
+    except struct.error:
+        return None
+    return None
+
+
+class ImageSizeCache:
+    """图像尺寸缓存
+
+    职责:
+    - 记录已解码图像的尺寸（解码方调用 put），避免下游再次读取
+    - 未记录时用文件头探测补齐
+
+    以 (路径, 修改时间, 文件大小) 判断缓存是否有效；按最近使用淘汰，线程安全
+    """
+
+    def __init__(self, capacity: int = 65536):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self._capacity = capacity
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], Tuple[int, int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.probes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, path: Path | str, width: int, height: int) -> None:
+        """记录已解码图像的尺寸"""
+        key = str(path)
+        signature = self._signature(key)
+        if signature is None:
+            return
+        with self._lock:
+            self._entries[key] = (signature, (int(width), int(height)))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._capacity:
+                self._entries.popitem(last=False)
+
+    def get(self, path: Path | str) -> Optional[Tuple[int, int]]:
+        """图像尺寸 (width, height)；未缓存时探测文件头，无法识别时返回 None"""
+        key = str(path)
+        signature = self._signature(key)
+        if signature is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        size = probe_image_size(key)
+        self.probes += 1
+        if size is not None:
+            self.put(key, *size)
+        return size
+
+    def clear(self) -> None:
+        """清空缓存与命中统计"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.probes = 0
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+
+# 进程内共享的尺寸缓存（检测引擎写入，标注处理读取）
+image_size_cache = ImageSizeCache()
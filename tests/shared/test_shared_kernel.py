@@ -266,5 +266,131 @@ class TestAggregateRoot:
         assert len(aggregate.clear_domain_events()) == 0
 
 
+
+class TestImageMeta:
+    """测试图像尺寸探测与缓存"""
+    
+    @staticmethod
+    def _png(width, height):
+        import struct
+        import zlib
+        ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+        chunk = struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+        return b"\x89PNG\r\n\x1a\n" + chunk
+    
+    @staticmethod
+    def _jpeg(width, height, orientation=None):
+        """SOI + (APP1 EXIF) + APP0 + SOF0，省略扫描数据"""
+        import struct
+        data = b"\xff\xd8"
+        if orientation is not None:
+            tiff = b"MM\x00\x2a" + struct.pack(">I", 8) + struct.pack(">H", 1)
+            tiff += struct.pack(">HHIHH", 0x0112, 3, 1, orientation, 0) + struct.pack(">I", 0)
+            payload = b"Exif\x00\x00" + tiff
+            data += b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload
+        app0 = b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+        data += b"\xff\xe0" + struct.pack(">H", len(app0) + 2) + app0
+        sof = struct.pack(">BHHB", 8, height, width, 3) + b"\x01\x11\x00\x02\x11\x01\x03\x11\x01"
+        return data + b"\xff\xc0" + struct.pack(">H", len(sof) + 2) + sof + b"\xff\xd9"
+    
+    def test_probe_headers(self, tmp_path):
+        """测试 PNG/JPEG 文件头探测与 EXIF 旋转"""
+        from shared_kernel.utils import probe_image_size
+        cases = {
+            "a.png": (self._png(640, 480), (640, 480)),
+            "b.jpg": (self._jpeg(1280, 720), (1280, 720)),
+            "c.jpg": (self._jpeg(1280, 720, orientation=6), (720, 1280)),
+            "d.jpg": (self._jpeg(1280, 720, orientation=3), (1280, 720)),
+            "e.bin": (b"not an image", None),
+            "f.jpg": (b"\xff\xd8\xff\xe0\x00", None),
+        }
+        for name, (data, expected) in cases.items():
+            (tmp_path / name).write_bytes(data)
+            assert probe_image_size(tmp_path / name) == expected, name
+        assert probe_image_size(tmp_path / "missing.jpg") is None
+    
+    def test_cache(self, tmp_path):
+        """测试缓存命中、文件变化后失效与容量淘汰"""
+        import os
+        from shared_kernel.utils import ImageSizeCache
+        cache = ImageSizeCache(capacity=2)
+        path = tmp_path / "a.png"
+        path.write_bytes(self._png(32, 16))
+        assert cache.get(path) == (32, 16)
+        assert cache.get(path) == (32, 16)
+        assert (cache.probes, cache.hits) == (1, 1)
+        # 解码方记录的尺寸优先
+        cache.put(path, 64, 48)
+        assert cache.get(path) == (64, 48)
+        # 文件内容变化后重新探测
+        path.write_bytes(self._png(8, 4) + b"\x00" * 16)
+        os.utime(path, ns=(1, 1))
+        assert cache.get(path) == (8, 4)
+        for name in ("b.png", "c.png"):
+            (tmp_path / name).write_bytes(self._png(1, 1))
+            cache.get(tmp_path / name)
+        assert len(cache) == 2
+        with pytest.raises(ValueError):
+            ImageSizeCache(capacity=0)
+
+
+class TestIterFiles:
+    """测试流式目录扫描"""
+    
+    @staticmethod
+    def _tree(root):
+        for rel in ("a.jpg", "b.PNG", "notes.txt", "sub/c.jpeg", "sub/deep/d.bmp", "sub/deep/e.json"):
+            path = root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"x")
+    
+    def test_recursive_and_filter(self, tmp_path):
+        """测试递归扫描、扩展名过滤（不区分大小写）与非递归"""
+        import os
+        from shared_kernel.utils import IMAGE_EXTENSIONS, iter_files
+        self._tree(tmp_path)
+        found = sorted(os.path.relpath(p, tmp_path) for p in iter_files(tmp_path, IMAGE_EXTENSIONS))
+        assert found == sorted(["a.jpg", "b.PNG", os.path.join("sub", "c.jpeg"),
+                                os.path.join("sub", "deep", "d.bmp")])
+        assert all(os.path.isabs(p) for p in iter_files(tmp_path))
+        assert len(list(iter_files(tmp_path))) == 6
+        top = sorted(os.path.basename(p) for p in iter_files(tmp_path, IMAGE_EXTENSIONS, recursive=False))
+        assert top == ["a.jpg", "b.PNG"]
+    
+    def test_shards_partition(self, tmp_path):
+        """测试各分片互不重叠且合起来覆盖全部文件"""
+        from shared_kernel.utils import iter_files
+        self._tree(tmp_path)
+        everything = set(iter_files(tmp_path))
+        shards = [set(iter_files(tmp_path, shard_index=i, shard_count=3)) for i in range(3)]
+        assert set().union(*shards) == everything
+        assert sum(len(s) for s in shards) == len(everything)
+        with pytest.raises(ValueError):
+            list(iter_files(tmp_path, shard_index=3, shard_count=3))
+    
+    def test_lazy(self, tmp_path):
+        """测试扫描是惰性的：逐个产出，消费前创建的子目录也会被扫描"""
+        import types
+        from shared_kernel.utils import iter_files
+        (tmp_path / "a.jpg").write_bytes(b"x")
+        scanner = iter_files(tmp_path)
+        assert isinstance(scanner, types.GeneratorType)
+        (tmp_path / "later").mkdir()
+        (tmp_path / "later" / "b.jpg").write_bytes(b"x")
+        assert len(list(scanner)) == 2
+        with pytest.raises(FileNotFoundError):
+            next(iter_files(tmp_path / "missing"))
+    
+    def test_file_digest(self, tmp_path):
+        """测试内容哈希只取决于文件内容"""
+        from shared_kernel.utils import file_digest
+        (tmp_path / "a.jpg").write_bytes(b"same")
+        (tmp_path / "b.jpg").write_bytes(b"same")
+        (tmp_path / "c.jpg").write_bytes(b"other")
+        assert file_digest(tmp_path / "a.jpg") == file_digest(tmp_path / "b.jpg")
+        assert file_digest(tmp_path / "a.jpg") != file_digest(tmp_path / "c.jpg")
+        assert file_digest(tmp_path / "a.jpg", chunk_size=1) == file_digest(tmp_path / "a.jpg")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
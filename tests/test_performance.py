@@ -170,6 +170,317 @@ class TestPerformanceAutoLabel:
         print(f"ImageItem creation: {elapsed:.4f}s for 10000 iterations")
 
 
+    def test_dense_image_labelling(self, tmp_path):
+        """Test labelling dense images decodes each image once instead of once per box"""
+        import cv2
+        import numpy as np
+        from unittest.mock import Mock
+        from autolabel_context.application.command.run_autolabel_cmd import RunAutoLabelCmd
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.domain.model.aggregate.autolabel_job import AutoLabelJob
+        from autolabel_context.domain.model.value_object.engine_type import EngineType
+        from autolabel_context.infrastructure.engine.i_detection_engine import IDetectionEngine
+        from shared_kernel.utils import image_size_cache
+
+        rng = np.random.default_rng(0)
+        paths = []
+        for i in range(6):
+            path = tmp_path / f"dense_{i}.jpg"
+            cv2.imwrite(str(path), rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8))
+            paths.append(str(path.resolve()))
+        boxes = [{"name": "Recyclable_waste", "confidence": 0.9, "x1": 10 * k, "y1": 10, "x2": 10 * k + 40, "y2": 60}
+                 for k in range(20)]
+
+        class DecodingEngine(IDetectionEngine):
+            engine_type = EngineType.YOLO
+
+            def validate(self):
+                return True
+
+            def detect(self, image_path):
+                image = cv2.imread(image_path)
+                image_size_cache.put(image_path, image.shape[1], image.shape[0])
+                return boxes
+
+        handler = RunAutoLabelHandler(Mock(), Mock(), Mock())
+        command = RunAutoLabelCmd(engine_type=EngineType.YOLO, image_paths=paths, output_dir=str(tmp_path),
+                                  batch_size=1)
+        job = AutoLabelJob.create(EngineType.YOLO, paths, 0.5)
+        job.start()
+        start = time.perf_counter()
+        handler._process_images(job, DecodingEngine(), command)
+        cached = time.perf_counter() - start
+
+        # Previous behaviour: one decode in the engine, then a full decode per box for the size
+        start = time.perf_counter()
+        for path in paths:
+            DecodingEngine().detect(path)
+            for _ in boxes:
+                cv2.imread(path).shape[:2]
+        per_box = time.perf_counter() - start
+
+        assert job.statistics.total_detections == len(paths) * len(boxes)
+        assert cached * 3 < per_box, f"cached {cached:.3f}s vs per-box decode {per_box:.3f}s"
+        print(f"Dense labelling ({len(paths)} images x {len(boxes)} boxes): {cached:.3f}s, "
+              f"per-box decode {per_box:.3f}s")
+
+    def test_batched_detection_throughput(self, tmp_path):
+        """Benchmark YOLO images per second on CPU at several batch sizes"""
+        pytest.importorskip("ultralytics")
+        import cv2
+        import numpy as np
+        from autolabel_context.infrastructure.engine.yolo_engine import YoloEngine
+
+        rng = np.random.default_rng(0)
+        paths = []
+        for i in range(16):
+            path = tmp_path / f"frame_{i}.jpg"
+            cv2.imwrite(str(path), rng.integers(0, 256, (480, 640, 3), dtype=np.uint8))
+            paths.append(str(path))
+        # Randomly initialised network built from the model config; no weights download
+        engine = YoloEngine({"model_path": "yolov8n.yaml", "confidence_threshold": 0.5})
+        engine.detect_batch(paths[:2])
+
+        throughput = {}
+        for batch_size in (1, 4, 8):
+            start = time.perf_counter()
+            for i in range(0, len(paths), batch_size):
+                results = engine.detect_batch(paths[i:i + batch_size])
+                assert len(results) == len(paths[i:i + batch_size])
+            throughput[batch_size] = len(paths) / (time.perf_counter() - start)
+
+        assert engine.detect_batch(paths[:4]) == [engine.detect(path) for path in paths[:4]]
+        assert max(throughput[4], throughput[8]) > throughput[1] * 0.8, throughput
+        print("YOLO CPU throughput: " + ", ".join(
+            f"batch {size}: {rate:.1f} img/s" for size, rate in throughput.items()))
+
+    def test_prefetch_decode_saturates_inference(self, tmp_path):
+        """Test a separate decode stage keeps the (simulated) inference worker busy"""
+        import threading
+        import cv2
+        import numpy as np
+        from unittest.mock import Mock
+        from autolabel_context.application.command.run_autolabel_cmd import RunAutoLabelCmd
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.domain.model.aggregate.autolabel_job import AutoLabelJob
+        from autolabel_context.domain.model.value_object.engine_type import EngineType
+        from autolabel_context.infrastructure.engine.i_detection_engine import (
+            IDetectionEngine, decode_image
+        )
+
+        # Photo-like content (smooth gradients, mild noise) compresses and decodes like real frames
+        rng = np.random.default_rng(0)
+        y, x = np.mgrid[0:1080, 0:1920]
+        gradient = np.stack([x / 1920 * 255, y / 1080 * 255, (x + y) % 256], axis=-1)
+        paths = []
+        for i in range(24):
+            path = tmp_path / f"photo_{i}.jpg"
+            cv2.imwrite(str(path), np.clip(gradient + rng.normal(0, 3, gradient.shape), 0, 255).astype(np.uint8))
+            paths.append(str(path))
+
+        class AcceleratorEngine(IDetectionEngine):
+            """Inference is a GIL-free wait on a single device; paths are decoded inline"""
+            engine_type = EngineType.YOLO
+
+            def __init__(self):
+                self.device = threading.Lock()
+                self.busy = 0.0
+
+            def validate(self):
+                return True
+
+            def decode(self, image_path, allow_reduced=False):
+                return decode_image(image_path, 640 if allow_reduced else None)
+
+            def detect(self, image):
+                self._as_decoded(image)
+                with self.device:
+                    start = time.perf_counter()
+                    time.sleep(0.015)
+                    self.busy += time.perf_counter() - start
+                return []
+
+        def run(**options):
+            engine = AcceleratorEngine()
+            command = RunAutoLabelCmd(engine_type=EngineType.YOLO, image_paths=paths,
+                                      output_dir=str(tmp_path), batch_size=4, **options)
+            job = AutoLabelJob.create(EngineType.YOLO, paths, 0.5)
+            job.start()
+            start = time.perf_counter()
+            RunAutoLabelHandler(Mock(), Mock(), Mock())._process_images(job, engine, command)
+            elapsed = time.perf_counter() - start
+            assert job.statistics.processed_images == len(paths)
+            return elapsed, engine.busy / elapsed
+
+        inline, inline_busy = run(prefetch=0)
+        prefetched, prefetched_busy = run(prefetch=8, decode_workers=2)
+        reduced, reduced_busy = run(prefetch=8, decode_workers=2, reduced_decode=True)
+
+        # Margins are small on a single core, where decode cannot run in parallel with itself
+        assert reduced < inline * 1.05, f"reduced prefetch {reduced:.3f}s vs inline decode {inline:.3f}s"
+        assert reduced_busy > inline_busy * 0.95
+        print(f"Autolabel {len(paths)} x 1080p: inline decode {inline:.3f}s ({inline_busy:.0%} busy), "
+              f"prefetch {prefetched:.3f}s ({prefetched_busy:.0%} busy), "
+              f"prefetch + reduced decode {reduced:.3f}s ({reduced_busy:.0%} busy)")
+
+    def test_streaming_label_writer_memory_flat(self, tmp_path):
+        """Test peak memory of a labelling job does not grow with the number of images"""
+        import tracemalloc
+        from unittest.mock import Mock
+        from autolabel_context.application.command.run_autolabel_cmd import RunAutoLabelCmd
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.domain.model.value_object.engine_type import EngineType
+        from autolabel_context.infrastructure.engine.i_detection_engine import IDetectionEngine
+        from autolabel_context.infrastructure.persistence.file_label_store import FileLabelStore
+        from shared_kernel.utils import image_size_cache
+
+        class BoxEngine(IDetectionEngine):
+            engine_type = EngineType.YOLO
+
+            def validate(self):
+                return True
+
+            def detect(self, image):
+                image_size_cache.put(image, 640, 480)
+                return [{"name": "Other_waste", "confidence": 0.9, "x1": 10, "y1": 10, "x2": 100, "y2": 100}] * 5
+
+        def run(count):
+            images = tmp_path / f"images_{count}"
+            images.mkdir()
+            for i in range(count):
+                (images / f"{i:06d}.jpg").write_bytes(b"x")
+            output = tmp_path / f"labels_{count}"
+            engine_repo = Mock()
+            engine_repo.get_engine.return_value = BoxEngine()
+            handler = RunAutoLabelHandler(engine_repo, FileLabelStore(str(output)), Mock())
+            command = RunAutoLabelCmd(engine_type=EngineType.YOLO, image_paths=[str(images)],
+                                      output_dir=str(output))
+            image_size_cache.clear()
+            tracemalloc.start()
+            try:
+                result = handler.handle(command)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            assert result.processed_images == count
+            assert len(list(output.iterdir())) == count
+            return peak
+
+        # Both runs exceed the writer queue bound; only the shared size cache (about 400 B
+        # per image, capped at its capacity) grows, results and image items are not retained
+        small, large = run(600), run(2400)
+        assert large < small + 1800 * 600, f"peak {small / 1024:.0f} KiB -> {large / 1024:.0f} KiB"
+        print(f"Autolabel peak memory: 600 images {small / 1024:.0f} KiB, 2400 images {large / 1024:.0f} KiB")
+
+    def test_result_cache_rerun(self, tmp_path):
+        """Test re-running over unchanged images costs only the content hashing"""
+        import os
+        from unittest.mock import Mock
+        from autolabel_context.application.command.run_autolabel_cmd import RunAutoLabelCmd
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.domain.model.value_object.engine_type import EngineType
+        from autolabel_context.infrastructure.engine.i_detection_engine import IDetectionEngine
+        from autolabel_context.infrastructure.persistence.sqlite_result_cache import SqliteResultCache
+
+        images = tmp_path / "images"
+        images.mkdir()
+        for i in range(100):
+            (images / f"{i:04d}.jpg").write_bytes(os.urandom(200 * 1024))
+
+        class SlowEngine(IDetectionEngine):
+            """Stands in for a model forward pass or a paid API call"""
+            engine_type = EngineType.VLM
+
+            def __init__(self):
+                self.calls = 0
+
+            def validate(self):
+                return True
+
+            def cache_identity(self):
+                return "slow:v1"
+
+            def detect(self, image):
+                self.calls += 1
+                time.sleep(0.01)
+                return []
+
+        engine = SlowEngine()
+        engine_repo = Mock()
+        engine_repo.get_engine.return_value = engine
+        cache = SqliteResultCache(str(tmp_path / "cache.sqlite"))
+        handler = RunAutoLabelHandler(engine_repo, Mock(), Mock(), cache)
+        command = RunAutoLabelCmd(engine_type=EngineType.VLM, image_paths=[str(images)], output_dir=str(tmp_path))
+
+        start = time.perf_counter()
+        first = handler.handle(command)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        second = handler.handle(command)
+        warm = time.perf_counter() - start
+
+        assert (first.cache_misses, second.cache_hits, engine.calls) == (100, 100, 100)
+        assert warm * 3 < cold, f"re-run {warm:.3f}s vs first run {cold:.3f}s"
+        print(f"Autolabel 100 x 200 KiB images: first run {cold:.3f}s, cached re-run {warm:.3f}s")
+
+    def test_journal_resume_cost(self, tmp_path):
+        """Test resuming a cancelled run only pays for the images it has not finished"""
+        from unittest.mock import Mock
+        from autolabel_context.application.command.run_autolabel_cmd import RunAutoLabelCmd
+        from autolabel_context.application.handler.run_autolabel_handler import RunAutoLabelHandler
+        from autolabel_context.domain.model.value_object.engine_type import EngineType
+        from autolabel_context.infrastructure.engine.i_detection_engine import IDetectionEngine
+        from autolabel_context.infrastructure.persistence.file_job_journal import FileJobJournal
+
+        images = tmp_path / "images"
+        images.mkdir()
+        for i in range(200):
+            (images / f"{i:04d}.jpg").write_bytes(b"x")
+
+        class SlowEngine(IDetectionEngine):
+            """Cancels the run once 90% of the images are done"""
+            engine_type = EngineType.VLM
+
+            def __init__(self):
+                self.calls = 0
+                self.cancel_at = 180
+
+            def validate(self):
+                return True
+
+            def cache_identity(self):
+                return "slow:v1"
+
+            def detect(self, image):
+                self.calls += 1
+                if self.calls == self.cancel_at:
+                    handler.cancel()
+                time.sleep(0.005)
+                return []
+
+        engine = SlowEngine()
+        engine_repo = Mock()
+        engine_repo.get_engine.return_value = engine
+        journal = FileJobJournal(str(tmp_path / "journal.jsonl"))
+        handler = RunAutoLabelHandler(engine_repo, Mock(), Mock(), journal=journal)
+        command = RunAutoLabelCmd(engine_type=EngineType.VLM, image_paths=[str(images)],
+                                  output_dir=str(tmp_path), prefetch=0)
+
+        start = time.perf_counter()
+        first = handler.handle(command)
+        cancelled = time.perf_counter() - start
+        done = engine.calls
+        engine.cancel_at = None
+        start = time.perf_counter()
+        second = handler.handle(command)
+        resumed = time.perf_counter() - start
+
+        assert first.status == "cancelled" and second.status == "completed"
+        assert second.journaled_images == done and engine.calls == 200
+        assert resumed * 3 < cancelled, f"resume {resumed:.3f}s vs cancelled run {cancelled:.3f}s"
+        print(f"Autolabel 200 images: cancelled after {done} in {cancelled:.3f}s, "
+              f"resumed remaining {200 - done} in {resumed:.3f}s")
+
 class TestPerformanceTrain:
     """Performance tests for Train Context"""
 
@@ -274,6 +585,309 @@ class TestPerformanceDeploy:
         assert elapsed < 1.0, f"Counter increment took {elapsed:.3f}s, expected < 1.0s"
         print(f"Counter increment: {elapsed:.4f}s for 10000 iterations")
 
+    @pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="Linux only")
+    def test_stage_pinning_jitter(self):
+        """Report inference-stage latency jitter with and without CPU pinning"""
+        import threading
+        import numpy as np
+        from deploy_context.infrastructure.metrics import LatencyStats
+        from deploy_context.infrastructure.scheduling import StageScheduling, apply_stage_scheduling
+        
+        frame = np.random.default_rng(0).random((160, 160), dtype=np.float32)
+        
+        def run_stage(scheduling):
+            stats = LatencyStats()
+            result = {}
+            
+            def stage():
+                result["applied"] = apply_stage_scheduling("inference", scheduling)
+                for _ in range(300):
+                    start = time.perf_counter()
+                    _ = frame @ frame
+                    stats.add((time.perf_counter() - start) * 1000)
+            
+            thread = threading.Thread(target=stage)
+            thread.start()
+            thread.join()
+            return result["applied"], stats.summary()
+        
+        _, unpinned = run_stage(StageScheduling())
+        applied, pinned = run_stage(StageScheduling(cpus=(max(os.sched_getaffinity(0)),)))
+        
+        assert applied
+        assert unpinned["count"] == pinned["count"] == 300
+        print(f"Inference stage unpinned: p50 {unpinned['p50_ms']}ms, jitter {unpinned['jitter_ms']}ms")
+        print(f"Inference stage pinned:   p50 {pinned['p50_ms']}ms, jitter {pinned['jitter_ms']}ms")
+
+    def test_mjpeg_reduced_decode_performance(self):
+        """Compare full-resolution and reduced-resolution MJPEG decode cost"""
+        import cv2
+        import numpy as np
+        from deploy_context.infrastructure.device import CompressedFrame
+        
+        rng = np.random.default_rng(0)
+        image = cv2.GaussianBlur((rng.random((720, 1280, 3)) * 255).astype(np.uint8), (0, 0), 3)
+        ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        assert ok
+        
+        def decode_ms(scale):
+            start = time.perf_counter()
+            for _ in range(30):
+                CompressedFrame(data=data.reshape(-1), frame_size=(1280, 720)).decode(scale)
+            return (time.perf_counter() - start) / 30 * 1000
+        
+        full_ms = decode_ms(1)
+        half_ms = decode_ms(2)
+        start = time.perf_counter()
+        for _ in range(30):
+            CompressedFrame(data=data.reshape(-1), frame_size=(1280, 720)).decode_preview()
+        preview_ms = (time.perf_counter() - start) / 30 * 1000
+        
+        assert half_ms < full_ms, f"Reduced decode {half_ms:.2f}ms not faster than full {full_ms:.2f}ms"
+        print(f"MJPEG 1280x720 decode: full {full_ms:.2f}ms ({1000 / full_ms:.0f} fps), "
+              f"1/2 {half_ms:.2f}ms ({1000 / half_ms:.0f} fps), gray 1/8 preview {preview_ms:.2f}ms")
+
+    def test_detection_recorder_performance(self, tmp_path):
+        """Test DetectionRecorder per-detection cost and log load time"""
+        import numpy as np
+        from deploy_context.domain.model.value_object import DetectionBatch
+        from deploy_context.infrastructure.recorder import DetectionRecorder, DetectionLogReader
+        
+        # Frames with 1-3 detections, recorded the way the runtime handler does
+        batches = [
+            DetectionBatch(np.full((n, 4), 0.5), np.full(n, 0.9), np.arange(n, dtype=np.int16))
+            for n in (1, 2, 3)
+        ]
+        recorder = DetectionRecorder(str(tmp_path), max_segment_bytes=8 * 1024 * 1024)
+        record_batch = recorder.record_batch
+        
+        # Best of three rounds of 20000 frames (40000 detections each)
+        batch_elapsed = float("inf")
+        for round_index in range(3):
+            start = time.perf_counter()
+            for i in range(round_index * 20000, (round_index + 1) * 20000):
+                batch = batches[i % 3]
+                record_batch(1700000000.0, i, batch.class_ids, batch.scores, batch.boxes, 6, primary=True)
+            recorder.flush()
+            batch_elapsed = min(batch_elapsed, time.perf_counter() - start)
+        detections = 3 * 40000
+        
+        record = recorder.record
+        start = time.perf_counter()
+        for i in range(100000):
+            record(1700000000.0, i, 1, 0.9, 0.5, 0.5, 0.1, 0.1, 1)
+        recorder.flush()
+        elapsed = time.perf_counter() - start
+        recorder.close()
+        
+        per_detection_us = batch_elapsed / 40000 * 1e6
+        per_record_us = elapsed / 100000 * 1e6
+        assert per_detection_us < 1.0, f"DetectionRecorder.record_batch took {per_detection_us:.2f}us per detection"
+        assert per_record_us < 5.0, f"DetectionRecorder took {per_record_us:.2f}us per record"
+        print(f"DetectionRecorder: record_batch {per_detection_us:.3f}us per detection, "
+              f"record {per_record_us:.3f}us per record")
+        
+        start = time.perf_counter()
+        columns = DetectionLogReader(str(tmp_path)).load()
+        elapsed = time.perf_counter() - start
+        
+        assert len(columns["frame_seq"]) == detections + 100000
+        assert elapsed < 1.0, f"DetectionLogReader load took {elapsed:.3f}s, expected < 1.0s"
+        print(f"DetectionLogReader load: {elapsed * 1000:.2f}ms for {len(columns['frame_seq'])} records")
+
+
+    def test_policy_replay_throughput(self):
+        """Test PolicyReplayer detection frames replayed per second on one core"""
+        from deploy_context.domain.service import PolicyReplayer, ReplayFrame
+        from deploy_context.domain.model.value_object import StabilityPolicy, CooldownPolicy
+        from shared_kernel.domain.taxonomy import WasteCategory
+
+        categories = list(WasteCategory)
+        frames = []
+        t = 1700000000.0
+        for item in range(2000):
+            for k in range(10):
+                frames.append(ReplayFrame(t, categories[item % 4], 0.9, 0.3 + 0.1 * (item % 3), 0.5,
+                                          20 if k == 0 and item else 0))
+                t += 1 / 30
+            t += 20 / 30
+        replayer = PolicyReplayer(
+            StabilityPolicy(stability_threshold_ms=200, min_detection_count=3), CooldownPolicy()
+        )
+
+        start = time.perf_counter()
+        result = replayer.replay(frames)
+        elapsed = time.perf_counter() - start
+
+        frames_per_s = len(frames) / elapsed
+        assert result.packets == 2000
+        assert frames_per_s > 15000, f"PolicyReplayer replayed {frames_per_s:.0f} frames/s"
+        print(f"PolicyReplayer: {frames_per_s:.0f} detection frames/s per configuration")
+
+    def test_shadow_runner_primary_latency(self):
+        """Test the shadow runner leaves the primary inference-stage histogram unchanged"""
+        import numpy as np
+        from unittest.mock import Mock
+        from deploy_context.application.handler import StartRuntimeHandler
+        from deploy_context.domain.model.aggregate import SortingSession
+        from deploy_context.infrastructure.shadow import ShadowRunner
+
+        matrix = np.random.rand(160, 160)
+
+        def workload(repeats):
+            def infer(image):
+                for _ in range(repeats):
+                    matrix @ matrix
+                return []
+            return infer
+
+        def run(with_shadow):
+            frames = [np.zeros((72, 128, 3), dtype=np.uint8) for _ in range(300)]
+            camera = Mock()
+            camera.is_opened.side_effect = lambda: bool(frames)
+            camera.read.side_effect = lambda: time.sleep(0.005) or frames.pop(0)
+            primary = Mock()
+            primary.infer.side_effect = workload(2)
+            handler = StartRuntimeHandler(config_loader=Mock())
+            handler._session = SortingSession.create()
+            handler._session.initialize(128, 72)
+            handler._session.start()
+            handler._camera = camera
+            handler._runtime = primary
+            handler._active_runtime = primary
+            if with_shadow:
+                candidate = Mock()
+                candidate.infer.side_effect = workload(10)
+                handler._shadow = ShadowRunner(candidate, max_fps=20.0)
+                handler._shadow.start()
+            handler._is_running = True
+            handler._process_frames()
+            if with_shadow:
+                handler._shadow.stop()
+            return handler.get_status()
+
+        baseline = run(False).stage_latency["inference"]
+        status = run(True)
+        shadowed = status.stage_latency["inference"]
+
+        assert status.shadow["evaluated"] > 5
+        assert shadowed["p50_ms"] < baseline["p50_ms"] * 1.5 + 0.5, \
+            f"primary p50 {shadowed['p50_ms']}ms with shadow vs {baseline['p50_ms']}ms without"
+        assert shadowed["p90_ms"] < baseline["p90_ms"] * 1.5 + 1.0, \
+            f"primary p90 {shadowed['p90_ms']}ms with shadow vs {baseline['p90_ms']}ms without"
+        print(f"Primary inference p50/p90: {baseline['p50_ms']}/{baseline['p90_ms']}ms without shadow, "
+              f"{shadowed['p50_ms']}/{shadowed['p90_ms']}ms with {status.shadow['evaluated']} shadow frames")
+
+    def test_hard_example_offer_overhead(self, tmp_path):
+        """Test flagging a hard example costs the decision thread only a queue handoff"""
+        import numpy as np
+        from deploy_context.domain.model.value_object import HardExamplePolicy
+        from deploy_context.domain.service import HardExampleSampler
+        from deploy_context.infrastructure.recorder import HardExampleWriter
+        from shared_kernel.domain.annotation import BoundingBox, Detection, DetectionSource
+        from shared_kernel.domain.taxonomy import WasteCategory
+
+        frame = np.random.randint(0, 256, (720, 1280, 3), dtype=np.uint8)
+        detections = [Detection.create(
+            category=WasteCategory.OTHER_WASTE, confidence=0.4,
+            bbox=BoundingBox(x_center=0.5, y_center=0.5, width=0.2, height=0.2),
+            source=DetectionSource.YOLO
+        )]
+        policy = HardExamplePolicy(max_per_minute=600)
+        sampler = HardExampleSampler(policy)
+        writer = HardExampleWriter(str(tmp_path), policy)
+        writer.start()
+        iterations = 2000
+        try:
+            start = time.perf_counter()
+            for seq in range(iterations):
+                reasons = sampler.reasons(detections, track_id=1)
+                writer.offer(frame, detections, reasons, seq)
+            elapsed = time.perf_counter() - start
+        finally:
+            writer.stop()
+
+        per_frame_us = elapsed / iterations * 1e6
+        stats = writer.stats
+        assert stats.offered == iterations
+        assert stats.written >= 1
+        assert per_frame_us < 50, f"Hard example flag + offer took {per_frame_us:.1f} us/frame"
+        print(f"Hard example flag + offer: {per_frame_us:.1f} us/frame, "
+              f"{stats.written} written, {stats.dropped_rate} rate-dropped")
+
+    def test_stability_judge_window_independent(self):
+        """Test per-track StabilityJudge.evaluate cost does not grow with the window size"""
+        from datetime import datetime, timedelta
+        from deploy_context.domain.model.entity import DetectionFrame
+        from deploy_context.domain.service import StabilityJudge
+        from shared_kernel.domain.taxonomy import WasteCategory
+
+        t0 = datetime(2026, 1, 1)
+        frames = [
+            DetectionFrame(
+                frame_id=str(i), image_width=640, image_height=480,
+                detected_category=WasteCategory.KITCHEN_WASTE, confidence=0.9,
+                x_normalized=0.5, y_normalized=0.5, timestamp=t0 + timedelta(milliseconds=33 * i)
+            )
+            for i in range(5000)
+        ]
+
+        def per_call_us(window_size):
+            judge = StabilityJudge(window_size=window_size)
+            start = time.perf_counter()
+            for frame in frames:
+                judge.evaluate(frame, track_id=1)
+            return (time.perf_counter() - start) / len(frames) * 1e6
+
+        small, large = per_call_us(16), per_call_us(2048)
+        assert large < small * 2 + 5, f"window 16: {small:.1f} us, window 2048: {large:.1f} us"
+        print(f"StabilityJudge per-track evaluate: {small:.1f} us (window 16), {large:.1f} us (window 2048)")
+
+
+    def test_detection_batch_postprocess(self):
+        """Test columnar RKNN postprocessing against building one Detection per box"""
+        import numpy as np
+        from deploy_context.infrastructure.runtime import RknnRuntime
+        from shared_kernel.domain.annotation import BoundingBox, Detection, DetectionSource
+        from shared_kernel.domain.taxonomy import WasteCategory
+
+        rng = np.random.default_rng(0)
+        rows = 100
+        output = np.column_stack([
+            rng.uniform(0, 500, (rows, 2)), rng.uniform(10, 100, (rows, 2)),
+            rng.uniform(0.5, 1.0, rows), rng.integers(0, 4, rows)
+        ]).astype(np.float32)[None]
+        runtime = RknnRuntime(confidence_threshold=0.5)
+        categories = list(WasteCategory)
+        iterations = 200
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            batch = runtime._postprocess([output], (640, 640, 3))
+            batch.category(0), batch.box(0)
+        columnar = (time.perf_counter() - start) / iterations
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            objects = [
+                Detection.create(
+                    category=categories[int(row[5])], confidence=float(row[4]),
+                    bbox=BoundingBox(
+                        x_center=min(1.0, float(row[0] + row[2] / 2) / 640),
+                        y_center=min(1.0, float(row[1] + row[3] / 2) / 640),
+                        width=float(row[2]) / 640, height=float(row[3]) / 640
+                    ),
+                    source=DetectionSource.YOLO
+                )
+                for row in output[0]
+            ]
+        per_object = (time.perf_counter() - start) / iterations
+
+        assert len(batch) == len(objects) == rows
+        assert columnar * 3 < per_object, f"columnar {columnar * 1e6:.0f} us vs objects {per_object * 1e6:.0f} us"
+        print(f"Postprocess {rows} boxes: columnar {columnar * 1e6:.0f} us, "
+              f"per-object Detection {per_object * 1e6:.0f} us")
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])